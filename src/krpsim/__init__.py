@@ -4,9 +4,6 @@ Ce module centralise les symboles considérés stables pour les appels
 externes afin de limiter les couplages aux détails internes.
 """
 
-# Pour lire la version installee depuis la source officielle.
-from importlib import metadata
-
 # Pour limiter l'API publique et reduire les couplages externes.
 __all__ = ["version"]
 
@@ -29,5 +26,8 @@ def version() -> str:
         Cette fonction reflète l'état réel de l'installation active et
         ne dépend pas d'une constante codée en dur.
     """
+    # Pour ne payer l'import des metadonnees qu'a la demande.
+    from importlib import metadata
+
     # Pour exposer la version effective de l'installation active.
     return metadata.version("krpsim")
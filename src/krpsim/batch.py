@@ -0,0 +1,323 @@
+"""Simulation vectorisee d'un meme graphe sous plusieurs stocks initiaux.
+
+Ce module execute la boucle de ``Simulator`` sur une matrice de stocks
+``(scenarios x ressources)``: les tests de faisabilite, debits et credits
+sont appliques a tous les scenarios a la fois, cycle par cycle.
+"""
+
+# Pour retarder l'evaluation des types et limiter les cycles.
+from __future__ import annotations
+
+# Pour formaliser des contrats de donnees clairs et compacts.
+from dataclasses import dataclass
+# Pour garder des signatures stables sur les collections en lecture seule.
+from typing import Mapping, Sequence
+
+# Pour vectoriser les operations sur l'axe des scenarios.
+import numpy as np
+# Pour typer explicitement les matrices manipulees.
+import numpy.typing as npt
+
+# Pour limiter le couplage aux composants internes necessaires.
+from .optimizer import get_policy
+# Pour limiter le couplage aux composants internes necessaires.
+from .parser import Config
+# Pour limiter le couplage aux composants internes necessaires.
+from .simulator import Simulator
+
+
+# Pour fiabiliser les objets metier via un schema declaratif.
+@dataclass
+# Pour encapsuler BatchResult autour d'un contrat clairement borne.
+class BatchResult:
+    """Resultats d'une simulation par lot.
+
+    Attributes:
+        resources: Nom de chaque colonne de ``stocks``.
+        stocks: Stocks finaux, une ligne par scenario.
+        time: Horloge finale de chaque scenario.
+        deadlock: Drapeau de blocage de chaque scenario.
+        traces: Traces par scenario si demandees, sinon ``None``.
+
+    Contrat:
+        La ligne ``i`` correspond a ``Simulator.run`` sur le scenario ``i``.
+    """
+
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    resources: tuple[str, ...]
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    stocks: npt.NDArray[np.int64]
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    time: npt.NDArray[np.int64]
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    deadlock: npt.NDArray[np.bool_]
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    traces: list[list[tuple[int, str]]] | None = None
+
+    # Pour isoler stocks_for et faciliter son evolution sous tests.
+    def stocks_for(self, index: int) -> dict[str, int]:
+        """Retourne les stocks finaux d'un scenario sous forme de dict.
+
+        Contrat:
+            Toutes les ressources sont presentes, y compris a zero.
+        """
+        # Pour convertir la ligne en entiers Python lisibles.
+        return {
+            name: int(qty) for name, qty in zip(self.resources, self.stocks[index])
+        }
+
+
+# Pour encapsuler BatchSimulator autour d'un contrat clairement borne.
+class BatchSimulator:
+    """Execute un graphe de processus sur un lot de stocks initiaux.
+
+    Parameters:
+        config: Configuration validee, dont les stocks servent de base.
+        scenarios: Surcharges de stocks, une par scenario.
+        policy: Nom de la politique de priorisation enregistree.
+
+    Contrat:
+        Les politiques dynamiques et la strategie custom dependent de
+        l'etat de chaque scenario: le lot retombe alors sur une boucle de
+        ``Simulator`` pour garder une semantique identique.
+    """
+
+    # Pour isoler __init__ et faciliter son evolution sous tests.
+    def __init__(
+        self,
+        config: Config,
+        scenarios: Sequence[Mapping[str, int]],
+        policy: str = "default",
+    ):
+        """Compile la configuration et la matrice de stocks initiaux.
+
+        Parameters:
+            config: Configuration source partagee en lecture seule.
+            scenarios: Stocks a surcharger par scenario.
+            policy: Nom d'une politique de ``krpsim.optimizer``.
+
+        Returns:
+            ``None``.
+
+        Raises:
+            ValueError:
+                Si le lot est vide, si une ressource est inconnue ou si
+                ``policy`` n'est pas enregistree.
+
+        Contrat:
+            Chaque scenario part de ``config.stocks`` puis applique ses
+            surcharges.
+        """
+        # Pour refuser un lot vide qui n'aurait aucune ligne de resultat.
+        if not scenarios:
+            # Pour signaler sans delai une violation explicite du contrat.
+            raise ValueError("batch needs at least one scenario")
+        # Pour garder un acces stable a la configuration source.
+        self.config = config
+        # Pour exposer le nom de la politique appliquee a chaque cycle.
+        self.policy = policy
+        # Pour conserver les scenarios pour un eventuel repli sequentiel.
+        self.scenarios = [dict(s) for s in scenarios]
+        # Pour fixer l'ordre des colonnes de la matrice de stocks.
+        self.resources = tuple(sorted(config.all_stock_names()))
+        # Pour retrouver la colonne d'une ressource en O(1).
+        index = {name: i for i, name in enumerate(self.resources)}
+        # Pour valider les surcharges avant toute allocation.
+        for scenario in self.scenarios:
+            # Pour appliquer uniformement la regle a chaque element concerne.
+            for name in scenario:
+                # Pour refuser une ressource absente du graphe.
+                if name not in index:
+                    # Pour signaler sans delai une violation explicite du contrat.
+                    raise ValueError(f"unknown resource '{name}'")
+        # Pour figer l'ordre de lancement une seule fois pour tout le lot.
+        self._policy = get_policy(policy, config)
+        # Pour materialiser la base commune de stocks initiaux.
+        base = np.array(
+            [config.stocks.get(name, 0) for name in self.resources], dtype=np.int64
+        )
+        # Pour repliquer la base sur chaque scenario.
+        self._initial = np.tile(base, (len(self.scenarios), 1))
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for row, scenario in enumerate(self.scenarios):
+            # Pour appliquer uniformement la regle a chaque element concerne.
+            for name, qty in scenario.items():
+                # Pour appliquer la surcharge du scenario.
+                self._initial[row, index[name]] = qty
+        # Pour compiler besoins et resultats en indices de colonnes.
+        self._compiled = [
+            (
+                proc.name,
+                proc.delay,
+                np.array([index[n] for n in proc.needs], dtype=np.intp),
+                np.array(list(proc.needs.values()), dtype=np.int64),
+                np.array([index[n] for n in proc.results], dtype=np.intp),
+                np.array(list(proc.results.values()), dtype=np.int64),
+            )
+            for proc in self._policy.order(config.stocks)
+        ]
+
+    # Pour isoler _sequential et faciliter son evolution sous tests.
+    def _sequential(self, max_time: int, record_traces: bool) -> BatchResult:
+        """Execute chaque scenario avec ``Simulator`` (repli exact)."""
+        # Pour collecter l'etat final de chaque scenario.
+        sims: list[Simulator] = []
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for scenario in self.scenarios:
+            # Pour executer la logique metier via l'implementation de reference.
+            sim = Simulator(self.config, policy=self.policy)
+            # Pour partir des stocks du scenario.
+            sim.stocks.update(scenario)
+            # Pour produire l'etat de reference a partir du moteur unique.
+            sim.run(max_time)
+            # Pour conserver le simulateur termine.
+            sims.append(sim)
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return BatchResult(
+            resources=self.resources,
+            stocks=np.array(
+                [[s.stocks.get(n, 0) for n in self.resources] for s in sims],
+                dtype=np.int64,
+            ).reshape(len(sims), len(self.resources)),
+            time=np.array([s.time for s in sims], dtype=np.int64),
+            deadlock=np.array([s.deadlock for s in sims], dtype=np.bool_),
+            traces=[list(s.trace) for s in sims] if record_traces else None,
+        )
+
+    # Pour isoler _vectorizable et faciliter son evolution sous tests.
+    def _vectorizable(self, max_time: int) -> bool:
+        """Indique si le lot peut partager un ordre de lancement unique."""
+        # Pour exclure les politiques qui reordonnent selon les stocks.
+        if self._policy.dynamic or self._policy.observes_launches:
+            # Pour rendre a l'appelant le resultat promis par le contrat.
+            return False
+        # Pour exclure la planification custom en forme close.
+        return not Simulator(self.config, policy=self.policy)._custom_strategy(
+            max_time
+        )
+
+    # Pour isoler run et faciliter son evolution sous tests.
+    def run(self, max_time: int, record_traces: bool = False) -> BatchResult:
+        """Simule tous les scenarios jusqu'a ``max_time``.
+
+        Parameters:
+            max_time: Dernier cycle autorise pour demarrage/avancement.
+            record_traces: ``True`` pour conserver la trace de chaque
+                scenario.
+
+        Returns:
+            Resultats par scenario.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            Chaque scenario s'arrete au cycle ou ``Simulator.step``
+            renverrait ``False``; les scenarios encore actifs continuent
+            ensemble.
+        """
+        # Pour garder une semantique exacte hors politique statique.
+        if not self._vectorizable(max_time):
+            # Pour rendre a l'appelant le resultat promis par le contrat.
+            return self._sequential(max_time, record_traces)
+        # Pour connaitre la taille de l'axe des scenarios.
+        count = len(self.scenarios)
+        # Pour partir d'une copie des stocks initiaux.
+        stocks = self._initial.copy()
+        # Pour marquer les scenarios encore en cours de simulation.
+        alive = np.ones(count, dtype=np.bool_)
+        # Pour memoriser le cycle final de chaque scenario.
+        final_time = np.zeros(count, dtype=np.int64)
+        # Pour compter les processus en cours par scenario.
+        inflight = np.zeros(count, dtype=np.int64)
+        # Pour compter les demarrages par scenario (diagnostic de blocage).
+        launches = np.zeros(count, dtype=np.int64)
+        # Pour indexer les credits differes par cycle d'arrivee.
+        arrivals: dict[int, tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]] = {}
+        # Pour conserver les traces seulement sur demande.
+        traces: list[list[tuple[int, str]]] | None = (
+            [[] for _ in range(count)] if record_traces else None
+        )
+        # Pour partir du meme cycle initial que ``Simulator``.
+        time = 0
+        # Pour iterer tant que la progression fonctionnelle reste possible.
+        while time <= max_time and alive.any():
+            # Pour reproduire ``running_before`` avant les fins de processus.
+            running_before = inflight > 0
+            # Pour crediter les productions arrivees a echeance.
+            due = arrivals.pop(time, None)
+            # Pour ne crediter que si des processus finissent a ce cycle.
+            if due is not None:
+                # Pour crediter les resultats des processus termines.
+                stocks += due[0]
+                # Pour retirer les processus termines du compteur en cours.
+                inflight -= due[1]
+            # Pour suivre les demarrages non instantanes du cycle.
+            started_nonzero = np.zeros(count, dtype=np.bool_)
+            # Pour appliquer uniformement la regle a chaque element concerne.
+            for name, delay, need_idx, need_qty, res_idx, res_qty in self._compiled:
+                # Pour ecarter les processus qui depasseraient l'horizon.
+                if time + delay > max_time:
+                    # Pour ignorer ce cas et laisser la boucle traiter les suivants.
+                    continue
+                # Pour tester la faisabilite sur tous les scenarios a la fois.
+                mask = alive & np.all(stocks[:, need_idx] >= need_qty, axis=1)
+                # Pour eviter les ecritures quand aucun scenario ne lance.
+                if not mask.any():
+                    # Pour ignorer ce cas et laisser la boucle traiter les suivants.
+                    continue
+                # Pour cibler les lignes qui lancent le processus.
+                rows = np.flatnonzero(mask)
+                # Pour consommer les besoins avant tout effet de production.
+                stocks[np.ix_(rows, need_idx)] -= need_qty
+                # Pour compter le demarrage dans chaque scenario concerne.
+                launches[rows] += 1
+                # Pour proteger un invariant de comparaison critique ici.
+                if delay == 0:
+                    # Pour crediter immediatement les processus sans delai.
+                    stocks[np.ix_(rows, res_idx)] += res_qty
+                # Pour couvrir explicitement le cas complementaire du contrat.
+                else:
+                    # Pour allouer le credit differe a la premiere arrivee.
+                    if time + delay not in arrivals:
+                        # Pour preparer credits et compteur du cycle d'arrivee.
+                        arrivals[time + delay] = (
+                            np.zeros_like(stocks),
+                            np.zeros(count, dtype=np.int64),
+                        )
+                    # Pour retrouver le credit differe du cycle d'arrivee.
+                    credit, finished = arrivals[time + delay]
+                    # Pour differer le credit jusqu'a la fin du processus.
+                    credit[np.ix_(rows, res_idx)] += res_qty
+                    # Pour compter le processus a retirer a son arrivee.
+                    finished[rows] += 1
+                    # Pour compter le processus parmi ceux en cours.
+                    inflight[rows] += 1
+                    # Pour expliciter l'etat de progression de la simulation.
+                    started_nonzero |= mask
+                # Pour enregistrer chaque demarrage dans l'ordre canonique.
+                if traces is not None:
+                    # Pour appliquer uniformement la regle a chaque element concerne.
+                    for row in rows:
+                        # Pour tracer le demarrage dans le scenario concerne.
+                        traces[row].append((time, name))
+            # Pour reproduire la decision d'avancement de ``Simulator.step``.
+            advance = running_before | (inflight > 0) | started_nonzero
+            # Pour figer l'horloge des scenarios qui n'avancent plus.
+            stopped = alive & ~advance
+            # Pour memoriser le cycle ou chaque scenario s'arrete.
+            final_time[stopped] = time
+            # Pour retirer ces scenarios des cycles suivants.
+            alive &= advance
+            # Pour avancer l'horloge commune des scenarios actifs.
+            time += 1
+        # Pour aligner l'horloge des scenarios coupes par l'horizon.
+        final_time[alive] = time
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return BatchResult(
+            resources=self.resources,
+            stocks=stocks,
+            time=final_time,
+            deadlock=(launches == 0) & bool(self.config.processes),
+            traces=traces,
+        )
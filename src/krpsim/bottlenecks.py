@@ -0,0 +1,288 @@
+"""Attribution des cycles bloques aux ressources manquantes.
+
+Quand le debit est faible, ``krpsim --bottlenecks`` indique pourquoi: pour
+chaque processus examine mais non lance faute de stock, le simulateur
+impute le cycle au premier besoin insuffisant, dans l'ordre de ``needs``
+teste par ``Simulator._start_processes``. Les compteurs tiennent dans deux
+tableaux ``array`` plats indexes par entiers, sans dictionnaire par cycle.
+"""
+
+# Pour retarder l'evaluation des types et limiter les cycles.
+from __future__ import annotations
+
+# Pour garder des compteurs compacts, sans un objet Python par case.
+from array import array
+# Pour formaliser des contrats de donnees clairs et compacts.
+from dataclasses import dataclass
+
+# Pour limiter le couplage aux composants internes necessaires.
+from .parser import Config, Process
+
+
+# Pour fiabiliser les objets metier via un schema declaratif.
+@dataclass(frozen=True)
+# Pour encapsuler StarvedResource autour d'un contrat clairement borne.
+class StarvedResource:
+    """Ressource dont le manque a bloque des lancements.
+
+    Attributes:
+        name: Nom de la ressource.
+        blocked: Cycles bloques imputes a la ressource, tous processus
+            confondus.
+        processes: Processus bloques au moins une fois par elle, du plus
+            touche au moins touche.
+
+    Contrat:
+        ``blocked`` est strictement positif.
+    """
+
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    name: str
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    blocked: int
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    processes: tuple[str, ...]
+
+
+# Pour fiabiliser les objets metier via un schema declaratif.
+@dataclass(frozen=True)
+# Pour encapsuler IdleProcess autour d'un contrat clairement borne.
+class IdleProcess:
+    """Processus bloque par ses besoins ou jamais lance.
+
+    Attributes:
+        name: Nom du processus.
+        blocked: Cycles ou il a ete examine sans pouvoir etre lance.
+        launches: Lancements effectifs.
+        shortage: Ressource qui l'a le plus souvent bloque, ``None`` s'il
+            n'a jamais ete bloque par un stock.
+
+    Contrat:
+        ``blocked`` ou ``launches == 0`` distingue le processus des autres.
+    """
+
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    name: str
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    blocked: int
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    launches: int
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    shortage: str | None
+
+
+# Pour encapsuler BottleneckCounters autour d'un contrat clairement borne.
+class BottleneckCounters:
+    """Compteurs de blocage par couple processus/ressource.
+
+    Parameters:
+        config: Configuration simulee.
+
+    Contrat:
+        Un cycle n'est impute qu'a une seule ressource: le premier besoin
+        insuffisant. Les candidats ecartes par l'horizon ou par le
+        plafonnement de demande ne sont pas comptes. Le plan en forme close
+        de ``Simulator._custom_strategy`` n'examine aucun candidat: seuls
+        ses lancements sont comptes.
+    """
+
+    # Pour isoler __init__ et faciliter son evolution sous tests.
+    def __init__(self, config: Config):
+        """Alloue les compteurs et indexe les besoins de chaque processus.
+
+        Parameters:
+            config: Configuration simulee.
+
+        Returns:
+            ``None``.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            La memoire est en O(processus x ressources), independante du
+            nombre de cycles.
+        """
+        # Pour indexer processus et ressources dans un ordre stable.
+        self.processes = tuple(sorted(config.processes))
+        # Pour indexer processus et ressources dans un ordre stable.
+        self.resources = tuple(sorted(config.all_stock_names()))
+        # Pour retrouver en O(1) la ligne d'un processus.
+        self._process_index = {name: i for i, name in enumerate(self.processes)}
+        # Pour retrouver en O(1) la colonne d'une ressource.
+        resource_index = {name: i for i, name in enumerate(self.resources)}
+        # Pour calculer une seule fois la case de chaque besoin.
+        width = len(self.resources)
+        # Pour tester les besoins dans l'ordre du simulateur.
+        self._needs: dict[str, tuple[tuple[str, int, int], ...]] = {
+            name: tuple(
+                (res, qty, row * width + resource_index[res])
+                for res, qty in config.processes[name].needs.items()
+            )
+            for row, name in enumerate(self.processes)
+        }
+        # Pour compter les blocages dans une matrice plate processus x ressource.
+        self.blocked = array("Q", bytes(8 * len(self.processes) * width))
+        # Pour compter les lancements effectifs de chaque processus.
+        self.launches = array("Q", bytes(8 * len(self.processes)))
+
+    # Pour isoler __copy__ et faciliter son evolution sous tests.
+    def __copy__(self) -> BottleneckCounters:
+        """Duplique les compteurs pour une branche ``Simulator.fork``."""
+        # Pour partager les index immuables sans rappeler le constructeur.
+        clone = object.__new__(BottleneckCounters)
+        # Pour reprendre index et compteurs de l'original.
+        clone.__dict__.update(self.__dict__)
+        # Pour isoler les compteurs mutables de la branche.
+        clone.blocked = array("Q", self.blocked)
+        # Pour isoler les compteurs mutables de la branche.
+        clone.launches = array("Q", self.launches)
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return clone
+
+    # Pour isoler blocked_on et faciliter son evolution sous tests.
+    def blocked_on(self, process: Process, stocks: dict[str, int]) -> None:
+        """Impute un cycle bloque au premier besoin insuffisant."""
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for res, qty, slot in self._needs[process.name]:
+            # Pour retenir le premier besoin qui fait echouer le lancement.
+            if stocks.get(res, 0) < qty:
+                # Pour compter le blocage dans la case du couple.
+                self.blocked[slot] += 1
+                # Pour rendre a l'appelant le resultat promis par le contrat.
+                return
+
+    # Pour isoler launched et faciliter son evolution sous tests.
+    def launched(self, process: Process) -> None:
+        """Compte un lancement effectif de ``process``."""
+        # Pour incrementer la ligne du processus.
+        self.launches[self._process_index[process.name]] += 1
+
+    # Pour isoler starved_resources et faciliter son evolution sous tests.
+    def starved_resources(self) -> list[StarvedResource]:
+        """Classe les ressources par cycles bloques decroissants.
+
+        Returns:
+            Ressources ayant bloque au moins un lancement, ex aequo tries
+            par nom.
+        """
+        # Pour parcourir la matrice colonne par colonne.
+        width = len(self.resources)
+        # Pour accumuler les ressources effectivement manquantes.
+        ranked: list[StarvedResource] = []
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for col, res in enumerate(self.resources):
+            # Pour lire la colonne de la ressource.
+            column = [
+                (self.blocked[row * width + col], name)
+                for row, name in enumerate(self.processes)
+            ]
+            # Pour ignorer une ressource qui n'a jamais manque.
+            if not any(count for count, _ in column):
+                # Pour ignorer ce cas et laisser la boucle traiter les suivants.
+                continue
+            # Pour memoriser la ressource et les processus qu'elle bloque.
+            ranked.append(
+                StarvedResource(
+                    res,
+                    sum(count for count, _ in column),
+                    tuple(
+                        name
+                        for count, name in sorted(column, key=lambda c: (-c[0], c[1]))
+                        if count
+                    ),
+                )
+            )
+        # Pour presenter d'abord les ressources les plus penalisantes.
+        ranked.sort(key=lambda r: (-r.blocked, r.name))
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return ranked
+
+    # Pour isoler idle_processes et faciliter son evolution sous tests.
+    def idle_processes(self) -> list[IdleProcess]:
+        """Classe les processus bloques ou jamais lances.
+
+        Returns:
+            Processus par cycles bloques decroissants, puis par lancements
+            croissants et par nom.
+        """
+        # Pour parcourir la matrice ligne par ligne.
+        width = len(self.resources)
+        # Pour accumuler les processus a signaler.
+        ranked: list[IdleProcess] = []
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for row, name in enumerate(self.processes):
+            # Pour lire la ligne du processus.
+            line = self.blocked[row * width : (row + 1) * width]
+            # Pour cumuler ses cycles bloques toutes ressources confondues.
+            blocked = sum(line)
+            # Pour ne garder que les processus freines ou inactifs.
+            if not blocked and self.launches[row]:
+                # Pour ignorer ce cas et laisser la boucle traiter les suivants.
+                continue
+            # Pour designer la ressource qui l'a le plus souvent bloque.
+            shortage = (
+                self.resources[max(range(width), key=line.__getitem__)]
+                if blocked
+                else None
+            )
+            # Pour memoriser le processus signale.
+            ranked.append(IdleProcess(name, blocked, self.launches[row], shortage))
+        # Pour presenter d'abord les processus les plus freines.
+        ranked.sort(key=lambda p: (-p.blocked, p.launches, p.name))
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return ranked
+
+
+# Pour isoler format_report et faciliter son evolution sous tests.
+def format_report(counters: BottleneckCounters, top: int = 10) -> list[str]:
+    """Formate le rapport de goulots d'etranglement.
+
+    Parameters:
+        counters: Compteurs d'une simulation terminee.
+        top: Nombre maximal de lignes par section.
+
+    Returns:
+        Lignes du rapport: ressources affamees puis processus inactifs.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Chaque section annonce ``(none)`` quand elle est vide.
+    """
+    # Pour classer une seule fois chaque section.
+    resources = counters.starved_resources()[:top]
+    # Pour classer une seule fois chaque section.
+    processes = counters.idle_processes()[:top]
+    # Pour ouvrir la section des ressources.
+    lines = ["Starved resources:"]
+    # Pour aligner les noms sur le plus long.
+    width = max((len(r.name) for r in resources), default=0)
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for r in resources:
+        # Pour publier la ressource et les processus qu'elle bloque.
+        lines.append(
+            f"  {r.name:<{width}}  blocked {r.blocked:>6}  ({', '.join(r.processes)})"
+        )
+    # Pour signaler explicitement l'absence de penurie.
+    if not resources:
+        # Pour garder une section lisible meme vide.
+        lines.append("  (none)")
+    # Pour ouvrir la section des processus.
+    lines.append("Idle processes:")
+    # Pour aligner les noms sur le plus long.
+    width = max((len(p.name) for p in processes), default=0)
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for p in processes:
+        # Pour publier le processus et sa penurie principale.
+        lines.append(
+            f"  {p.name:<{width}}  blocked {p.blocked:>6}  launches {p.launches:>6}"
+            + (f"  short of {p.shortage}" if p.shortage is not None else "")
+        )
+    # Pour signaler explicitement l'absence de processus freine.
+    if not processes:
+        # Pour garder une section lisible meme vide.
+        lines.append("  (none)")
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return lines
@@ -15,19 +15,91 @@ import logging
 import os
 # Pour aligner les flux CLI avec les attentes du shell.
 import sys
+# Pour ne rien mesurer quand le profilage n'est pas demande.
+from contextlib import nullcontext
 # Pour eviter les chemins fragiles relies aux separateurs OS.
 from pathlib import Path
+# Pour typer le chargeur de configuration substituable.
+from typing import TYPE_CHECKING, Callable, ContextManager, NoReturn
 
 # Pour limiter le couplage aux composants internes necessaires.
 from . import parser as parser_mod
 # Pour limiter le couplage aux composants internes necessaires.
-from .display import format_trace, print_header, save_trace
+from .conditions import StopCondition, parse_condition
 # Pour limiter le couplage aux composants internes necessaires.
-from .parser import ParseError
+from .display import (
+    DURABILITY_MODES,
+    NdjsonWriter,
+    format_trace,
+    print_event_counts,
+    print_header,
+    save_trace,
+    write_lines,
+)
 # Pour limiter le couplage aux composants internes necessaires.
-from .simulator import Simulator
+from .parser import Config, ParseError
+# Pour limiter le couplage aux composants internes necessaires.
+from .optimizer import policy_names
+# Pour limiter le couplage aux composants internes necessaires.
+from .simulator import (
+    ENGINES,
+    EVENT_START,
+    TIME_MODE_DELAY,
+    Simulator,
+    exit_decision,
+    run_until_quiescent,
+)
+
+from logger.analysis_log_krpsim import (
+    ANALYSIS_LEVELS,
+    AnalysisLogger,
+    JsonLinesSink,
+    set_active_analysis_logger,
+)
+
+# Pour typer le profilage sans charger cProfile ni tracemalloc au demarrage.
+if TYPE_CHECKING:
+    # Pour typer les compteurs de ``--bottlenecks``.
+    from .bottlenecks import BottleneckCounters
+
+    # Pour typer le collecteur de ``--profile``.
+    from .profiling import Profiler
+
+# Pour choisir ce que la CLI publie sur la sortie standard.
+OUTPUT_MODES = ("full", "summary", "none")
+
+# Pour laisser un processus long partager les configurations deja parsees.
+_CONFIG_LOADER: Callable[[Path], Config] = parser_mod.parse_file
+
+
+# Pour isoler set_config_loader et faciliter son evolution sous tests.
+def set_config_loader(loader: Callable[[Path], Config] | None) -> None:
+    """Remplace le chargeur de configuration utilise par la CLI.
+
+    Parameters:
+        loader: Chargeur a utiliser, ``None`` pour ``parser.parse_file``.
+
+    Returns:
+        ``None``.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Le chargeur doit lever les memes ``ParseError`` que
+        ``parser.parse_file`` pour garder des messages identiques.
+    """
+    # Pour partager le chargeur avec toutes les executions du processus.
+    global _CONFIG_LOADER
+    # Pour revenir au parsing direct quand aucun chargeur n'est fourni.
+    _CONFIG_LOADER = parser_mod.parse_file if loader is None else loader
 
-from logger.analysis_log_krpsim import AnalysisLogger, set_active_analysis_logger
+
+# Pour isoler _no_phase et faciliter son evolution sous tests.
+def _no_phase(name: str) -> ContextManager[None]:
+    """Remplace ``Profiler.phase`` quand le profilage est inactif."""
+    # Pour executer la phase sans aucune mesure.
+    return nullcontext()
 
 
 def _serialize_simulator_state(sim: Simulator) -> dict[str, object]:
@@ -46,6 +118,10 @@ def _serialize_simulator_state(sim: Simulator) -> dict[str, object]:
             },
             "optimize": sim.config.optimize,
         },
+        "policy": sim.policy,
+        "demand_cap": sim.demand_cap,
+        "engine": sim.engine,
+        "stopped": str(sim.stopped) if sim.stopped is not None else None,
         "stocks": sim.stocks,
         "time": sim.time,
         "_running": [
@@ -62,10 +138,51 @@ def _serialize_simulator_state(sim: Simulator) -> dict[str, object]:
         ],
         "trace": sim.trace,
         "deadlock": sim.deadlock,
-        "_max_time": sim._max_time,
+        "_max_time": sim.max_time,
     }
 
 
+# Pour isoler _stop_condition et faciliter son evolution sous tests.
+def _stop_condition(text: str) -> StopCondition:
+    """Convertit ``--stop-when`` en condition avec un message argparse."""
+    # Pour traduire une erreur de grammaire en erreur CLI uniforme.
+    try:
+        # Pour reutiliser la grammaire canonique des conditions.
+        return parse_condition(text)
+    # Pour fournir une erreur CLI uniforme et immediate a l'utilisateur.
+    except ValueError as exc:
+        # Pour laisser argparse formater l'erreur et sortir avec le code 2.
+        raise argparse.ArgumentTypeError(str(exc)) from None
+
+
+# Pour isoler _analysis_level et faciliter son evolution sous tests.
+def _analysis_level(text: str) -> tuple[str, str]:
+    """Convertit ``--analysis-log-level SCOPE=LEVEL`` avec un message argparse."""
+    # Pour separer la portee de son niveau.
+    scope, sep, level = text.partition("=")
+    # Pour refuser une portee vide ou un niveau inconnu.
+    if not sep or not scope or level not in ANALYSIS_LEVELS:
+        # Pour laisser argparse formater l'erreur et sortir avec le code 2.
+        raise argparse.ArgumentTypeError(
+            f"expected SCOPE=LEVEL with LEVEL in {', '.join(ANALYSIS_LEVELS)}"
+        )
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return scope, level
+
+
+# Pour isoler _analysis_sample et faciliter son evolution sous tests.
+def _analysis_sample(text: str) -> tuple[str, int]:
+    """Convertit ``--analysis-log-sample LABEL=N`` avec un message argparse."""
+    # Pour separer le libelle de sa periode.
+    label, sep, every = text.partition("=")
+    # Pour refuser un libelle vide ou une periode non strictement positive.
+    if not sep or not label or not every.isdigit() or int(every) <= 0:
+        # Pour laisser argparse formater l'erreur et sortir avec le code 2.
+        raise argparse.ArgumentTypeError("expected LABEL=N with N a positive integer")
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return label, int(every)
+
+
 # Pour isoler build_parser et faciliter son evolution sous tests.
 def build_parser() -> argparse.ArgumentParser:
     """Construit le parseur CLI expose au binaire ``krpsim``.
@@ -131,6 +248,34 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="print detailed analysis logs for CLI pipeline and simulation",
     )
+    # Pour rendre le journal d'analyse utilisable sur de grosses configurations.
+    parser.add_argument(
+        "--analysis-log-file",
+        default=None,
+        metavar="PATH",
+        help="write analysis logs to PATH as buffered JSON lines "
+        "{scope, label, kind, value} instead of printing them",
+    )
+    # Pour reduire le journal structure aux portees utiles.
+    parser.add_argument(
+        "--analysis-log-level",
+        action="append",
+        default=[],
+        type=_analysis_level,
+        metavar="SCOPE=LEVEL",
+        help="level for a scope and its sub-scopes in --analysis-log-file: "
+        f"{', '.join(ANALYSIS_LEVELS)} (repeatable, default: all)",
+    )
+    # Pour echantillonner les libelles emis a chaque cycle ou processus.
+    parser.add_argument(
+        "--analysis-log-sample",
+        action="append",
+        default=[],
+        type=_analysis_sample,
+        metavar="LABEL=N",
+        help="write only every N-th record with LABEL to --analysis-log-file "
+        "(repeatable)",
+    )
     # Pour figer l'interface publique attendue par les scripts externes.
     parser.add_argument(
         # Pour stabiliser le message utilisateur expose par la CLI.
@@ -139,10 +284,196 @@ def build_parser() -> argparse.ArgumentParser:
         help="path to write logs to",
     # Pour clore le bloc sans ambiguite de structure.
     )
+    # Pour choisir la politique de priorisation sans forker le moteur.
+    parser.add_argument(
+        "--policy",
+        default="default",
+        choices=policy_names(),
+        help="process priority policy used by the simulator (default: default)",
+    )
+    # Pour comparer plusieurs priorisations sans changer le mode par defaut.
+    parser.add_argument(
+        "--portfolio",
+        action="store_true",
+        help="run every priority policy in parallel and keep the best trace",
+    )
+    # Pour brider les intermediaires que l'aval ne pourra pas consommer.
+    parser.add_argument(
+        "--demand-cap",
+        action="store_true",
+        help="throttle intermediate producers beyond what downstream can consume",
+    )
+    # Pour laisser la quiescence piloter la borne du mode optimize(time).
+    parser.add_argument(
+        "--horizon",
+        default="fixed",
+        choices=("fixed", "adaptive"),
+        help=(
+            "horizon used when optimize starts with time: fixed "
+            f"{TIME_MODE_DELAY} cycles or "
+            "adaptive growth until quiescence (default: fixed)"
+        ),
+    )
+    # Pour borner la croissance de l'horizon adaptatif.
+    parser.add_argument(
+        "--max-horizon",
+        type=int,
+        default=16384,
+        help="upper bound for --horizon adaptive (default: 16384)",
+    )
+    # Pour choisir le moteur de demarrage sans changer la trace produite.
+    parser.add_argument(
+        "--engine",
+        default="interp",
+        choices=ENGINES,
+        help="process start engine: generic interpreter or code generated per "
+        "config (default: interp)",
+    )
+    # Pour ne pas saturer le terminal sur les traces volumineuses.
+    parser.add_argument(
+        "--output",
+        default="full",
+        choices=OUTPUT_MODES,
+        help="stdout verbosity: full trace, summary (header, event counts and "
+        "final stocks) or none; the trace file is unchanged (default: full)",
+    )
+    # Pour arbitrer entre vitesse d'ecriture et resistance aux pannes.
+    parser.add_argument(
+        "--durability",
+        default="fsync",
+        choices=DURABILITY_MODES,
+        help="trace file persistence: none (no sync), fsync (in place) or "
+        "atomic (temp file, fsync, rename) (default: fsync)",
+    )
+    # Pour offrir un flux machine sans analyse de la sortie humaine.
+    parser.add_argument(
+        "--format",
+        default="text",
+        choices=("text", "ndjson"),
+        help="stdout format: human text or one JSON object per launch then a "
+        "final result record (default: text)",
+    )
+    # Pour simuler les chaines lineaires comme des macro-processus.
+    parser.add_argument(
+        "--fuse",
+        action="store_true",
+        help="simulate linear single-producer/single-consumer chains as "
+        "macro-processes (same trace)",
+    )
+    # Pour terminer la simulation des qu'un objectif de stock est atteint.
+    parser.add_argument(
+        "--stop-when",
+        action="append",
+        default=[],
+        type=_stop_condition,
+        metavar="COND",
+        help="stop as soon as a stock condition such as armoire>=10 holds "
+        "(repeatable, first met wins)",
+    )
+    # Pour borner le nombre de coeurs utilises par le portfolio.
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="number of worker processes for --portfolio (default: CPU count)",
+    )
+    # Pour savoir quelle ressource freine chaque processus.
+    parser.add_argument(
+        "--bottlenecks",
+        action="store_true",
+        help="count, per process, the cycles it was blocked and the first "
+        "short resource, then print starved resources and idle processes",
+    )
+    # Pour analyser la capacite a partir des niveaux de stock dans le temps.
+    parser.add_argument(
+        "--record-stocks",
+        default=None,
+        metavar="PATH",
+        help="write every stock change as CSV rows time,resource,delta,level "
+        "to PATH",
+    )
+    # Pour localiser le cout d'un run lent phase par phase.
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print a JSON report on stderr: wall time and tracemalloc peak of "
+        "each phase, simulator counters",
+    )
+    # Pour detailler la boucle de simulation fonction par fonction.
+    parser.add_argument(
+        "--cprofile",
+        default=None,
+        metavar="PATH",
+        help="dump cProfile statistics of the simulation phase to PATH "
+        "(pstats format)",
+    )
     # Pour rendre a l'appelant le resultat promis par le contrat.
     return parser
 
 
+# Pour garder les regles entre options dans une table plutot qu'en cascade.
+_FLAG_CONFLICTS: tuple[tuple[Callable[[argparse.Namespace], bool], str], ...] = (
+    (
+        lambda a: a.workers is not None and a.workers <= 0,
+        "workers must be a positive integer",
+    ),
+    (lambda a: a.max_horizon <= 0, "max horizon must be a positive integer"),
+    (
+        lambda a: bool(a.stop_when) and a.portfolio,
+        "--stop-when cannot be combined with --portfolio",
+    ),
+    (
+        lambda a: a.portfolio
+        and (a.policy != "default" or a.demand_cap or a.engine == "codegen"),
+        "--portfolio cannot be combined with --policy, --demand-cap or "
+        "--engine codegen",
+    ),
+    (
+        lambda a: a.format == "ndjson" and (a.analysis_log or a.output != "full"),
+        "--format ndjson cannot be combined with --analysis-log or --output",
+    ),
+    (
+        lambda a: a.fuse
+        and (
+            a.demand_cap
+            or bool(a.stop_when)
+            or a.portfolio
+            or a.horizon == "adaptive"
+            or a.engine == "codegen"
+        ),
+        "--fuse cannot be combined with --demand-cap, --stop-when, "
+        "--portfolio, --horizon adaptive or --engine codegen",
+    ),
+    (
+        lambda a: bool(a.analysis_log_level or a.analysis_log_sample)
+        and a.analysis_log_file is None,
+        "--analysis-log-level and --analysis-log-sample require "
+        "--analysis-log-file",
+    ),
+    (
+        lambda a: a.bottlenecks and (a.portfolio or a.fuse),
+        "--bottlenecks cannot be combined with --portfolio or --fuse",
+    ),
+    (
+        lambda a: a.record_stocks is not None and (a.portfolio or a.fuse),
+        "--record-stocks cannot be combined with --portfolio or --fuse",
+    ),
+)
+
+
+# Pour isoler _check_flag_conflicts et faciliter son evolution sous tests.
+def _check_flag_conflicts(
+    args: argparse.Namespace, parser: argparse.ArgumentParser
+) -> None:
+    """Rejette la premiere regle de ``_FLAG_CONFLICTS`` violee par ``args``."""
+    # Pour conserver l'ordre de priorite des messages d'erreur.
+    for violated, message in _FLAG_CONFLICTS:
+        # Pour ne rejeter que les combinaisons effectivement demandees.
+        if violated(args):
+            # Pour fournir une erreur CLI uniforme et immediate a l'utilisateur.
+            parser.error(message)
+
+
 # Pour isoler _validate_args et faciliter son evolution sous tests.
 def _validate_args(
     args: argparse.Namespace,
@@ -209,6 +540,8 @@ def _validate_args(
     if not positive_delay:
         # Pour fournir une erreur CLI uniforme et immediate a l'utilisateur.
         parser.error("delay must be a positive integer")
+    # Pour refuser les valeurs hors contrat et les options incompatibles.
+    _check_flag_conflicts(args, parser)
     # Pour marquer la fin du bloc de validation dans le flux d'analyse.
     analysis_logger.log_step("VALIDATION_DONE", scope=scope)
 
@@ -217,15 +550,23 @@ def _validate_args(
 def _run_simulation(
     args: argparse.Namespace,
     analysis_logger: AnalysisLogger,
-) -> tuple[Simulator, bool]:
+    ndjson: NdjsonWriter | None = None,
+    profiler: Profiler | None = None,
+) -> tuple[Simulator, bool, bool]:
     """Execute la simulation et persiste la trace machine.
 
     Parameters:
         args: Arguments valides fournis par la CLI.
+        ndjson: Flux machine qui recoit chaque lancement, ``None`` en
+            sortie texte.
+        profiler: Collecteur de ``--profile``/``--cprofile`` qui mesure
+            chaque phase, ``None`` hors profilage.
 
     Returns:
-        Un tuple ``(simulateur, ignore_delay)`` permettant a ``main`` de
-        calculer le code retour selon le mode d'optimisation.
+        Un tuple ``(simulateur, ignore_delay, borne_atteinte)`` permettant a
+        ``main`` de calculer le code retour selon le mode d'optimisation;
+        ``borne_atteinte`` signale un horizon adaptatif coupe par
+        ``--max-horizon`` avant quiescence.
 
     Raises:
         ParseError:
@@ -237,12 +578,16 @@ def _run_simulation(
     """
     # Pour etiqueter clairement les logs emis par cette fonction.
     scope = "_run_simulation"
+    # Pour delimiter les phases sans surcout hors profilage.
+    phase = profiler.phase if profiler is not None else _no_phase
     # Pour exposer clairement les phases metier executees par la CLI.
     analysis_logger.log_header("SIMULATION PIPELINE", scope=scope)
     # Pour tracer le point d'entree exact du parsing de configuration.
     analysis_logger.log_step("PARSING_CONFIG_FILE", args.config, scope=scope)
-    # Pour reutiliser la validation canonique plutot qu'un parsing local.
-    config = parser_mod.parse_file(Path(args.config))
+    # Pour mesurer le parsing seul.
+    with phase("parse_file"):
+        # Pour reutiliser la validation canonique plutot qu'un parsing local.
+        config = _CONFIG_LOADER(Path(args.config))
     # Pour inspecter les donnees source qui pilotent l'orchestration.
     analysis_logger.log_key_value("INITIAL_STOCKS", config.stocks, scope=scope)
     # Pour afficher l'ordre de declaration des processus disponibles.
@@ -272,40 +617,220 @@ def _run_simulation(
     # Pour indiquer explicitement le passage de controle au moteur de simulation.
     analysis_logger.log_step(
         "SIMULATOR_INIT_START",
-        "calling Simulator(config)",
+        f"calling Simulator(config, policy={args.policy!r}, "
+        f"demand_cap={args.demand_cap}, engine={args.engine!r})",
         scope=scope,
     )
-    # Pour executer la logique metier via l'implementation de reference.
-    sim = Simulator(config)
-    # Pour exposer l'etat initial du moteur juste apres son initialisation.
-    analysis_logger.log_key_value(
-        "SIMULATOR_STATE_AFTER_INIT",
-        _serialize_simulator_state(sim),
-        scope=scope,
+    # Pour refuser une condition d'arret sur une ressource inconnue.
+    _check_stop_resources(args, config, ndjson)
+    # Pour ne laisser la quiescence choisir la borne qu'en mode optimize(time).
+    adaptive = ignore_delay and args.horizon == "adaptive"
+    # Pour ne construire et instrumenter que le simulateur reellement execute.
+    single = (
+        None
+        if args.portfolio or adaptive or args.fuse
+        else _build_simulator(args, config, profiler, analysis_logger)
     )
     # Pour contextualiser l'execution avant la trace des cycles.
-    print_header(config)
-    # Pour imposer une borne finie meme en mode optimisation.
-    run_delay = args.delay if not ignore_delay else 500
-    # Pour expliciter la borne effectivement transmise au simulateur.
-    analysis_logger.log_calculation(
-        "RUN_DELAY",
-        [
-            "run_delay = args.delay if not ignore_delay else 500",
-            f"args.delay = {args.delay}",
-            f"ignore_delay = {ignore_delay}",
-        ],
-        run_delay,
-        scope=scope,
-    )
-    # Pour indiquer explicitement le lancement du moteur de simulation.
-    analysis_logger.log_step(
-        "SIMULATOR_RUN_START",
-        {"max_time": run_delay},
-        scope=scope,
-    )
+    if args.output != "none":
+        # Pour annoncer la configuration simulee.
+        print_header(config)
+    # Pour mesurer la boucle de simulation, quel que soit le mode.
+    with phase("step_loop"):
+        # Pour ne signaler la borne maximale qu'en horizon adaptatif.
+        horizon_exhausted = False
+        # Pour faire croitre l'horizon avec le travail reellement disponible.
+        if adaptive:
+            # Pour executer jusqu'a quiescence ou jusqu'a la borne maximale.
+            sim, run_delay, horizon_exhausted = run_until_quiescent(
+                config,
+                args.max_horizon,
+                policy=args.policy,
+                demand_cap=args.demand_cap,
+                stop_when=args.stop_when,
+                engine=args.engine,
+                bottlenecks=args.bottlenecks,
+                record_stocks=args.record_stocks is not None,
+            )
+            # Pour indiquer a l'utilisateur la borne effectivement retenue.
+            if args.output != "none":
+                # Pour publier la borne retenue.
+                print(f"Horizon: {run_delay}")
+        # Pour couvrir explicitement le cas complementaire du contrat.
+        else:
+            # Pour imposer une borne finie meme en mode optimisation.
+            run_delay = args.delay if not ignore_delay else TIME_MODE_DELAY
+        # Pour expliciter la borne effectivement transmise au simulateur.
+        analysis_logger.log_calculation(
+            "RUN_DELAY",
+            [
+                "run_delay = args.delay if not ignore_delay else "
+                f"{TIME_MODE_DELAY}",
+                f"args.delay = {args.delay}",
+                f"ignore_delay = {ignore_delay}",
+                f"adaptive = {adaptive}",
+            ],
+            run_delay,
+            scope=scope,
+        )
+        # Pour indiquer explicitement le lancement du moteur de simulation.
+        analysis_logger.log_step(
+            "SIMULATOR_RUN_START",
+            {"max_time": run_delay},
+            scope=scope,
+        )
+        # Pour executer le simulateur construit pour un run unique.
+        if single is not None:
+            # Pour publier l'etat final de ce simulateur.
+            sim = single
+            # Pour produire la trace, en flux machine si demande.
+            trace = _run_single(sim, run_delay, ndjson)
+        # Pour comparer toutes les variantes quand le portfolio est demande.
+        elif args.portfolio:
+            # Pour retenir la variante au meilleur score lexicographique.
+            sim = _run_portfolio(args, config, run_delay, analysis_logger)
+            # Pour reutiliser la trace gagnante comme trace officielle.
+            trace = sim.trace
+        # Pour reutiliser l'execution deja faite par l'horizon adaptatif.
+        elif adaptive:
+            # Pour publier la trace du dernier horizon essaye.
+            trace = sim.trace
+        # Pour eviter de re-tenter les maillons internes a chaque cycle.
+        else:
+            # Pour ne charger la fusion que sur demande.
+            from .fusion import run_fused
+
+            # Pour simuler les chaines fusionnees puis redeployer la trace.
+            sim = run_fused(config, run_delay, policy=args.policy)
+            # Pour publier la trace redeployee maillon par maillon.
+            trace = sim.trace
+    # Pour publier apres coup les traces des modes non incrementaux.
+    if ndjson is not None and (args.portfolio or adaptive or args.fuse):
+        # Pour conserver l'ordre temporel de la trace retenue.
+        ndjson.starts(trace)
+    # Pour publier la trace et les journaux du run termine.
+    _publish_trace(args, sim, trace, analysis_logger, phase)
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return sim, ignore_delay, horizon_exhausted
+
+
+# Pour isoler _check_stop_resources et faciliter son evolution sous tests.
+def _check_stop_resources(
+    args: argparse.Namespace, config: Config, ndjson: NdjsonWriter | None
+) -> None:
+    """Refuse une condition ``--stop-when`` sur une ressource inconnue."""
+    # Pour isoler les ressources absentes de la configuration.
+    unknown = {c.resource for c in args.stop_when} - config.all_stock_names()
+    # Pour signaler la premiere ressource inconnue de facon stable.
+    if unknown:
+        # Pour formuler l'erreur une seule fois pour les deux formats.
+        message = f"invalid stop condition: unknown resource '{min(unknown)}'"
+        # Pour publier l'erreur dans le format de sortie demande.
+        _report_error(message, ndjson)
+
+
+# Pour isoler _run_portfolio et faciliter son evolution sous tests.
+def _run_portfolio(
+    args: argparse.Namespace,
+    config: Config,
+    run_delay: int,
+    analysis_logger: AnalysisLogger,
+) -> Simulator:
+    """Execute le portfolio et annonce la variante retenue.
+
+    Parameters:
+        args: Arguments valides fournis par la CLI.
+        config: Configuration validee a simuler.
+        run_delay: Borne temporelle commune aux variantes.
+        analysis_logger: Journal d'analyse actif.
+
+    Returns:
+        Simulateur de la variante gagnante.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Seule la variante gagnante est publiee.
+    """
+    # Pour ne charger le pool de processus que pour le portfolio.
+    from .portfolio import run_portfolio
+
+    # Pour retenir la variante au meilleur score lexicographique.
+    sim, best = run_portfolio(config, run_delay, workers=args.workers)
+    # Pour exposer la variante retenue par le portfolio.
+    analysis_logger.log_key_value("PORTFOLIO_RESULT", best, scope="_run_simulation")
+    # Pour indiquer a l'utilisateur quelle variante a produit la trace.
+    if args.output != "none":
+        # Pour publier la variante gagnante.
+        print(f"Portfolio strategy: {best.strategy}")
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return sim
+
+
+# Pour isoler _run_single et faciliter son evolution sous tests.
+def _run_single(
+    sim: Simulator, run_delay: int, ndjson: NdjsonWriter | None
+) -> list[tuple[int, str]]:
+    """Execute un simulateur unique, en publiant chaque lancement en NDJSON.
+
+    Parameters:
+        sim: Simulateur construit par ``_build_simulator``.
+        run_delay: Borne temporelle de l'execution.
+        ndjson: Flux machine, ``None`` en sortie texte.
+
+    Returns:
+        Trace complete de l'execution.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        La trace est identique avec ou sans flux machine.
+    """
     # Pour produire l'etat de reference a partir du moteur unique.
-    trace = sim.run(run_delay)
+    if ndjson is None:
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return sim.run(run_delay)
+    # Pour consommer la simulation cycle par cycle.
+    for event in sim.iter_events(run_delay):
+        # Pour ne publier que les lancements, comme la trace.
+        if event.kind == EVENT_START:
+            # Pour ecrire la ligne sans attendre la fin du run.
+            ndjson.start(event.time, event.process)
+    # Pour persister la trace identique a celle de ``run``.
+    return sim.trace
+
+
+# Pour isoler _publish_trace et faciliter son evolution sous tests.
+def _publish_trace(
+    args: argparse.Namespace,
+    sim: Simulator,
+    trace: list[tuple[int, str]],
+    analysis_logger: AnalysisLogger,
+    phase: Callable[[str], ContextManager[None]],
+) -> None:
+    """Affiche, journalise et persiste la trace d'un run termine.
+
+    Parameters:
+        args: Arguments valides fournis par la CLI.
+        sim: Simulateur qui porte l'etat final.
+        trace: Trace retenue pour la sortie.
+        analysis_logger: Journal d'analyse actif.
+        phase: Delimiteur des phases de profilage.
+
+    Returns:
+        ``None``.
+
+    Raises:
+        OSError:
+            Propagee si la trace ou le journal des stocks ne peut etre ecrit.
+
+    Contrat:
+        La trace affichee a l'ecran et celle ecrite sur disque sont la meme.
+    """
+    # Pour etiqueter clairement les logs emis par cette fonction.
+    scope = "_run_simulation"
     # Pour indiquer explicitement la fin du run moteur et son resume.
     analysis_logger.log_step(
         "SIMULATOR_RUN_DONE",
@@ -322,8 +847,14 @@ def _run_simulation(
         _serialize_simulator_state(sim),
         scope=scope,
     )
-    # Pour convertir la trace une seule fois pour affichage et analyse.
-    trace_lines = format_trace(trace)
+    # Pour mesurer le formatage de la trace.
+    with phase("format_trace"):
+        # Pour ne formater la trace que si elle est affichee ou analysee.
+        trace_lines = (
+            format_trace(trace)
+            if args.output == "full" or analysis_logger.enabled
+            else []
+        )
     # Pour exposer la trace metier brute pour diagnostic.
     analysis_logger.log_key_value("TRACE_EVENTS", trace, scope=scope)
     # Pour exposer la forme textuelle ecrite en sortie utilisateur.
@@ -334,52 +865,443 @@ def _run_simulation(
     analysis_logger.log_key_value("SIM_DEADLOCK", sim.deadlock, scope=scope)
     # Pour exposer l'etat de stock final avant affichage.
     analysis_logger.log_key_value("STOCKS_AFTER_RUN", sim.stocks, scope=scope)
-    # Pour conserver l'ordre temporel lors de la sortie de trace.
-    for line in trace_lines:
+    # Pour publier la trace complete en un seul bloc tamponne.
+    if args.output == "full":
+        # Pour conserver l'ordre temporel lors de la sortie de trace.
+        write_lines(trace_lines)
+    # Pour resumer la trace sans publier chaque evenement.
+    elif args.output == "summary":
         # Pour fournir un retour utilisateur directement lisible en CLI.
-        print(line)
+        print_event_counts(trace)
     # Pour persister une trace verifiable avant la fin du processus.
     analysis_logger.log_step("SAVING_TRACE_FILE", args.trace, scope=scope)
-    save_trace(trace, Path(args.trace))
+    # Pour mesurer l'ecriture et la synchronisation de la trace.
+    with phase("save_trace"):
+        # Pour ecrire la trace selon la politique de persistance demandee.
+        save_trace(trace, Path(args.trace), durability=args.durability)
+    # Pour persister le journal des stocks quand il est demande.
+    if sim.stock_recorder is not None:
+        # Pour laisser le module csv gerer les fins de ligne.
+        with open(args.record_stocks, "w", encoding="utf-8", newline="") as out:
+            # Pour ecrire une ligne par variation de stock.
+            sim.stock_recorder.write_csv(out)
+
+
+# Pour isoler _build_simulator et faciliter son evolution sous tests.
+def _build_simulator(
+    args: argparse.Namespace,
+    config: Config,
+    profiler: Profiler | None,
+    analysis_logger: AnalysisLogger,
+) -> Simulator:
+    """Construit le simulateur d'un run unique, compteurs compris.
+
+    Parameters:
+        args: Arguments valides fournis par la CLI.
+        config: Configuration validee a simuler.
+        profiler: Collecteur de profilage, ``None`` hors profilage.
+        analysis_logger: Journal d'analyse actif.
+
+    Returns:
+        Simulateur pret a executer son premier cycle.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Les modes portfolio, fusion et horizon adaptatif construisent leurs
+        propres simulateurs et n'appellent pas cette fonction.
+    """
+    # Pour delimiter les phases sans surcout hors profilage.
+    phase = profiler.phase if profiler is not None else _no_phase
+    # Pour mesurer l'ordonnancement precalcule a la construction.
+    with phase("order_processes"):
+        # Pour executer la logique metier via l'implementation de reference.
+        sim = Simulator(
+            config,
+            policy=args.policy,
+            demand_cap=args.demand_cap,
+            stop_when=args.stop_when,
+            engine=args.engine,
+            bottlenecks=args.bottlenecks,
+            record_stocks=args.record_stocks is not None,
+            count_activity=profiler is not None and profiler.enabled,
+        )
+    # Pour exposer l'etat initial du moteur juste apres son initialisation.
+    analysis_logger.log_key_value(
+        "SIMULATOR_STATE_AFTER_INIT",
+        _serialize_simulator_state(sim),
+        scope="_run_simulation",
+    )
     # Pour rendre a l'appelant le resultat promis par le contrat.
-    return sim, ignore_delay
+    return sim
 
 
-# Pour isoler main et faciliter son evolution sous tests.
-def main(argv: list[str] | None = None) -> int:
-    """Point d'entree principal du binaire ``krpsim``.
+# Pour isoler build_sweep_parser et faciliter son evolution sous tests.
+def build_sweep_parser() -> argparse.ArgumentParser:
+    """Construit le parseur de la sous-commande ``krpsim sweep``.
 
     Parameters:
-        argv: Liste d'arguments optionnelle pour tests et appels internes.
+        Aucun parametre.
 
     Returns:
-        ``0`` si la simulation termine sans limite atteinte ni deadlock,
-        ``1`` sinon.
+        Un parseur ``argparse`` dedie au balayage d'horizon.
+
+    Raises:
+        Aucune exception n'est levee explicitement par cette fonction.
+
+    Contrat:
+        La sous-commande ne modifie pas l'interface historique de ``krpsim``.
+    """
+    # Pour declarer un contrat CLI explicite et versionnable.
+    parser = argparse.ArgumentParser(prog="krpsim sweep")
+    # Pour figer l'interface publique attendue par les scripts externes.
+    parser.add_argument("config", help="configuration file path")
+    # Pour recevoir la plage d'horizons a balayer.
+    parser.add_argument(
+        "--delays",
+        required=True,
+        help="inclusive delay range A:B, or D for 1:D",
+    )
+    # Pour choisir la politique de priorisation sans forker le moteur.
+    parser.add_argument(
+        "--policy",
+        default="default",
+        choices=policy_names(),
+        help="process priority policy used by the simulator (default: default)",
+    )
+    # Pour ecrire le CSV dans un fichier plutot que sur la sortie standard.
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="CSV output path (default: standard output)",
+    )
+    # Pour balayer une grille de stocks initiaux en plus des horizons.
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="RES=V1,V2",
+        help="initial stock values to sweep for a resource (repeatable)",
+    )
+    # Pour repartir les points de grille sur plusieurs processus.
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="worker processes for the stock grid (default: CPU count)",
+    )
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return parser
+
+
+# Pour isoler sweep_main et faciliter son evolution sous tests.
+def sweep_main(argv: list[str]) -> int:
+    """Point d'entree de ``krpsim sweep``.
+
+    Parameters:
+        argv: Arguments qui suivent le mot-cle ``sweep``.
+
+    Returns:
+        ``0`` une fois le CSV ecrit.
 
     Raises:
         SystemExit:
-            Levee explicitement si la configuration ne peut pas etre parsee.
+            Levee si les arguments ou la configuration sont invalides.
 
     Contrat:
-        Le code retour doit rester fiable pour les pipelines CI/CD.
+        Une ligne CSV par delai, identique a ``krpsim config <delai>``
+        hors mode ``optimize(time)`` qui ignore le delai.
     """
+    # Pour ne charger multiprocessing et csv que pour le balayage.
+    from .sweep import (
+        iter_grid,
+        parse_delays,
+        parse_overrides,
+        stock_grid,
+        write_csv,
+    )
+
     # Pour conserver un point unique de configuration des arguments.
-    parser = build_parser()
+    parser = build_sweep_parser()
     # Pour permettre l'injection d'arguments en test unitaire.
     args = parser.parse_args(argv)
-    # Pour etiqueter clairement les logs emis par cette fonction.
-    scope = "main"
-    # Pour centraliser les traces d'analyse du comportement de la CLI.
-    analysis_logger = AnalysisLogger(enabled=args.analysis_log)
-    # Pour partager le logger d'analyse avec les sous-modules (ex: optimizer).
-    set_active_analysis_logger(analysis_logger)
-    # Pour exposer les arguments parsees dans un bloc d'entree unique.
-    analysis_logger.log_header("CLI ENTRYPOINT", scope=scope)
-    # Pour garder un format deterministe pour reproduire un run exact.
-    analysis_logger.log_key_value("PARSED_ARGS", vars(args), scope=scope)
+    # Pour refuser un pool sans worker avant tout calcul.
+    if args.workers is not None and args.workers <= 0:
+        # Pour fournir une erreur CLI uniforme et immediate a l'utilisateur.
+        parser.error("workers must be a positive integer")
+    # Pour valider la plage et la grille avant toute lecture de fichier.
+    try:
+        # Pour convertir la plage en horizons exploitables.
+        delays = parse_delays(args.delays)
+        # Pour developper la grille des stocks initiaux demandes.
+        grid = stock_grid(parse_overrides(args.set))
+    # Pour fournir une erreur CLI uniforme et immediate a l'utilisateur.
+    except ValueError as exc:
+        # Pour fournir une erreur CLI uniforme et immediate a l'utilisateur.
+        parser.error(str(exc))
+    # Pour echouer tot quand la cible n'est pas un fichier valide.
+    if not Path(args.config).is_file():
+        # Pour fournir une erreur CLI uniforme et immediate a l'utilisateur.
+        parser.error(f"invalid config path: '{args.config}'")
+    # Pour traduire un echec de parsing en message stable pour l'appelant.
+    try:
+        # Pour reutiliser la validation canonique plutot qu'un parsing local.
+        config = _CONFIG_LOADER(Path(args.config))
+    # Pour traduire un echec technique en message stable pour l'appelant.
+    except ParseError as exc:
+        # Pour fournir un retour utilisateur directement lisible en CLI.
+        print(f"invalid config: {exc}")
+        # Pour signaler sans delai une violation explicite du contrat.
+        raise SystemExit(1)
+    # Pour refuser une surcharge de ressource inconnue avant le pool.
+    unknown = set(grid[0]) - config.all_stock_names()
+    # Pour signaler la premiere ressource inconnue de facon stable.
+    if unknown:
+        # Pour fournir une erreur CLI uniforme et immediate a l'utilisateur.
+        parser.error(f"unknown resource '{min(unknown)}'")
+    # Pour partager les prefixes d'execution entre horizons et points.
+    rows = iter_grid(config, grid, delays, args.policy, args.workers)
+    # Pour ecrire sur la sortie standard par defaut.
+    if args.output is None:
+        # Pour publier le CSV directement dans le terminal ou un pipe.
+        write_csv(config, rows, sys.stdout)
+    # Pour couvrir explicitement le cas complementaire du contrat.
+    else:
+        # Pour garantir la fermeture du fichier meme en cas d'erreur.
+        with open(args.output, "w", encoding="utf-8", newline="") as out:
+            # Pour persister le CSV au fil des points termines.
+            write_csv(config, rows, out)
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return 0
+
+
+# Pour isoler startup_main et faciliter son evolution sous tests.
+def startup_main(argv: list[str]) -> int:
+    """Point d'entree de ``krpsim --startup-report``.
+
+    Parameters:
+        argv: Arguments qui suivent l'option ``--startup-report``.
+
+    Returns:
+        ``0`` une fois le rapport affiche.
+
+    Raises:
+        SystemExit:
+            Levee si les arguments sont invalides.
+
+    Contrat:
+        Les mesures sont faites dans des interpreteurs neufs: le rapport
+        ne depend pas des modules deja charges par l'appelant.
+    """
+    # Pour ne charger subprocess que pour le diagnostic de demarrage.
+    from .startup import format_report, measure_cold_start, measure_imports
+
+    # Pour declarer un contrat CLI explicite et versionnable.
+    parser = argparse.ArgumentParser(prog="krpsim --startup-report")
+    # Pour mesurer un demarrage complet sur une configuration reelle.
+    parser.add_argument("config", nargs="?", help="configuration file path")
+    # Pour accompagner la configuration de son horizon.
+    parser.add_argument("delay", nargs="?", default="10", help="max delay")
+    # Pour borner la longueur du rapport d'imports.
+    parser.add_argument(
+        "--top", type=int, default=15, help="imports listed (default: 15)"
+    )
+    # Pour lisser le bruit de la machine sur plusieurs lancements.
+    parser.add_argument(
+        "--runs", type=int, default=5, help="cold-start runs (default: 5)"
+    )
+    # Pour permettre l'injection d'arguments en test unitaire.
+    args = parser.parse_args(argv)
+    # Pour refuser une mesure sans execution avant tout lancement.
+    if args.runs <= 0:
+        # Pour fournir une erreur CLI uniforme et immediate a l'utilisateur.
+        parser.error("runs must be a positive integer")
+    # Pour mesurer la simulation sans ecrire de trace sur disque.
+    run_argv = (
+        ["--help"]
+        if args.config is None
+        else [args.config, args.delay, "--trace", os.devnull]
+    )
+    # Pour attribuer le cout d'import module par module.
+    for line in format_report(measure_imports(), top=args.top):
+        # Pour publier le rapport ligne par ligne.
+        print(line)
+    # Pour conclure par la duree murale d'un lancement complet.
+    seconds = measure_cold_start(run_argv, runs=args.runs)
+    # Pour publier la meilleure duree observee.
+    print(f"cold start: {seconds * 1000:.1f} ms (krpsim {' '.join(run_argv)})")
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return 0
+
+
+# Pour isoler serve_main et faciliter son evolution sous tests.
+def serve_main(argv: list[str]) -> int:
+    """Point d'entree de ``krpsim serve``.
 
+    Parameters:
+        argv: Arguments qui suivent le mot-cle ``serve``.
+
+    Returns:
+        ``0`` une fois le serveur arrete par une interruption.
+
+    Raises:
+        SystemExit:
+            Levee si les arguments sont invalides ou la socket occupee.
+
+    Contrat:
+        Le serveur repond jusqu'a ``Ctrl-C`` puis supprime sa socket.
+    """
+    # Pour ne charger sockets et pool que pour le mode serveur.
+    from .server import DEFAULT_CACHE_SIZE, KrpsimServer
+
+    # Pour declarer un contrat CLI explicite et versionnable.
+    parser = argparse.ArgumentParser(prog="krpsim serve")
+    # Pour choisir le point de rendez-vous des clients.
+    parser.add_argument("--socket", required=True, help="Unix socket path")
+    # Pour borner le nombre de simulations simultanees.
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="worker processes (default: CPU count)",
+    )
+    # Pour borner la memoire du cache de configurations.
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help=f"parsed configs kept per worker (default: {DEFAULT_CACHE_SIZE})",
+    )
+    # Pour permettre l'injection d'arguments en test unitaire.
+    args = parser.parse_args(argv)
+    # Pour traduire un refus de demarrage en erreur CLI uniforme.
+    try:
+        # Pour creer la socket et demarrer les workers.
+        server = KrpsimServer(args.socket, args.workers, args.cache_size)
+    # Pour fournir une erreur CLI uniforme et immediate a l'utilisateur.
+    except (OSError, ValueError) as exc:
+        # Pour fournir une erreur CLI uniforme et immediate a l'utilisateur.
+        parser.error(str(exc))
+    # Pour ne charger la gestion des signaux que pour le mode serveur.
+    import signal
+
+    # Pour traiter l'arret d'un superviseur comme un ``Ctrl-C``.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    # Pour supprimer la socket quelle que soit la cause de l'arret.
+    with server:
+        # Pour indiquer au superviseur que le serveur ecoute.
+        print(f"krpsim serving on {args.socket}", flush=True)
+        # Pour traiter un arret clavier comme une fin normale.
+        try:
+            # Pour repondre aux clients jusqu'a l'interruption.
+            server.serve_forever()
+        # Pour terminer proprement sur ``Ctrl-C``.
+        except KeyboardInterrupt:
+            # Pour indiquer l'arret demande.
+            print("krpsim server stopped")
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return 0
+
+
+# Pour isoler batch_main et faciliter son evolution sous tests.
+def batch_main(argv: list[str]) -> int:
+    """Point d'entree de ``krpsim --batch DIR_OR_GLOB DELAY``.
+
+    Parameters:
+        argv: Arguments qui suivent l'option ``--batch``.
+
+    Returns:
+        ``0`` si chaque configuration aurait rendu ``0`` seule, ``1`` sinon.
+
+    Raises:
+        SystemExit:
+            Levee si les arguments sont invalides ou si aucun fichier ne
+            correspond.
+
+    Contrat:
+        Chaque trace ``<nom>.trace`` est identique a celle de
+        ``krpsim <config> <delai>``; le tableau suit l'ordre des chemins.
+    """
+    # Pour ne charger le pool de processus que pour le mode lot.
+    from .multiconfig import expand_configs, format_summary, run_batch
+
+    # Pour declarer un contrat CLI explicite et versionnable.
+    parser = argparse.ArgumentParser(prog="krpsim --batch")
+    # Pour designer les configurations par repertoire ou motif.
+    parser.add_argument("target", help="config directory or glob pattern")
+    # Pour appliquer le meme horizon a toutes les configurations.
+    parser.add_argument("delay", type=int, help="max delay for every config")
+    # Pour repartir les configurations sur plusieurs processus.
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="worker processes (default: 1)",
+    )
+    # Pour choisir la politique de priorisation sans forker le moteur.
+    parser.add_argument(
+        "--policy",
+        default="default",
+        choices=policy_names(),
+        help="process priority policy used by the simulator (default: default)",
+    )
+    # Pour regrouper les traces hors du repertoire courant.
+    parser.add_argument(
+        "--trace-dir",
+        default=".",
+        help="directory receiving <name>.trace files (default: .)",
+    )
+    # Pour accelerer les lots sur tmpfs sans sacrifier la production.
+    parser.add_argument(
+        "--durability",
+        default="fsync",
+        choices=DURABILITY_MODES,
+        help="trace file persistence: none, fsync or atomic (default: fsync)",
+    )
+    # Pour permettre l'injection d'arguments en test unitaire.
+    args = parser.parse_args(argv)
+    # Pour imposer une borne temporelle coherente avec le contrat CLI.
+    if args.delay <= 0:
+        # Pour fournir une erreur CLI uniforme et immediate a l'utilisateur.
+        parser.error("delay must be a positive integer")
+    # Pour refuser un pool sans worker avant toute simulation.
+    if args.jobs <= 0:
+        # Pour fournir une erreur CLI uniforme et immediate a l'utilisateur.
+        parser.error("jobs must be a positive integer")
+    # Pour refuser un lot vide ou ambigu avant toute simulation.
+    try:
+        # Pour fixer la liste ordonnee des configurations.
+        paths = expand_configs(args.target)
+    # Pour fournir une erreur CLI uniforme et immediate a l'utilisateur.
+    except ValueError as exc:
+        # Pour fournir une erreur CLI uniforme et immediate a l'utilisateur.
+        parser.error(str(exc))
+    # Pour simuler le lot dans cet interpreteur ou sur le pool.
+    results = run_batch(
+        paths,
+        args.delay,
+        args.policy,
+        Path(args.trace_dir),
+        args.jobs,
+        args.durability,
+    )
+    # Pour publier le tableau recapitulatif.
+    for line in format_summary(results):
+        # Pour fournir un retour utilisateur directement lisible en CLI.
+        print(line)
+    # Pour fournir au shell un code retour agrege exploitable en CI.
+    return 1 if any(r.exit_code for r in results) else 0
+
+
+# Pour isoler _configure_logging et faciliter son evolution sous tests.
+def _configure_logging(args: argparse.Namespace) -> None:
+    """Installe les sinks de ``logging`` demandes par la ligne de commande."""
     # Pour centraliser les sorties de logs sans multiplier la configuration.
-    handlers: list[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+    handlers: list[logging.Handler] = [
+        # Pour laisser la sortie standard au seul flux NDJSON.
+        logging.StreamHandler(sys.stderr if args.format == "ndjson" else sys.stdout)
+    ]
     # Pour n'ouvrir un fichier de log que sur demande explicite.
     if args.log:
         # Pour conserver une trace persistante utile en CI et support.
@@ -397,26 +1319,67 @@ def main(argv: list[str] | None = None) -> int:
     # Pour clore le bloc sans ambiguite de structure.
     )
 
-    # Pour echouer tot avant toute operation couteuse ou irreversible.
-    _validate_args(args, parser, analysis_logger)
 
-    # Pour convertir une erreur bas niveau en diagnostic exploitable.
-    try:
-        # Pour separer clairement execution metier et gestion du code retour.
-        sim, ignore_delay = _run_simulation(args, analysis_logger)
-    # Pour traduire un echec technique en message stable pour l'appelant.
-    except ParseError as exc:
-        # Pour relier l'erreur metier a la phase qui a echoue.
-        analysis_logger.log_step("PARSE_ERROR", str(exc), scope=scope)
+# Pour isoler _make_profiler et faciliter son evolution sous tests.
+def _make_profiler(args: argparse.Namespace) -> Profiler | None:
+    """Cree le collecteur de ``--profile``/``--cprofile``, ``None`` sinon."""
+    # Pour ne charger cProfile et tracemalloc que sur demande.
+    if not (args.profile or args.cprofile):
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return None
+    # Pour ne charger l'instrumentation qu'en mode profilage.
+    from .profiling import Profiler
+
+    # Pour mesurer les phases et, sur demande, la boucle sous cProfile.
+    return Profiler(enabled=args.profile, cprofile_path=args.cprofile)
+
+
+# Pour isoler _report_error et faciliter son evolution sous tests.
+def _report_error(message: str, ndjson: NdjsonWriter | None) -> NoReturn:
+    """Publie une erreur utilisateur dans le format de sortie puis sort en 1."""
+    # Pour fournir un retour utilisateur directement lisible en CLI.
+    if ndjson is None:
         # Pour fournir un retour utilisateur directement lisible en CLI.
-        print(f"invalid config: {exc}")
-        # Pour signaler sans delai une violation explicite du contrat.
-        raise SystemExit(1)
+        print(message)
+    # Pour garder un flux machine valide jusqu'a l'erreur.
+    else:
+        # Pour publier l'erreur comme enregistrement final.
+        ndjson.record("error", message=message)
+    # Pour signaler sans delai une violation explicite du contrat.
+    raise SystemExit(1)
+
+
+# Pour isoler _exit_decision et faciliter son evolution sous tests.
+def _exit_decision(
+    args: argparse.Namespace,
+    sim: Simulator,
+    ignore_delay: bool,
+    analysis_logger: AnalysisLogger,
+    horizon_exhausted: bool = False,
+) -> tuple[int, str]:
+    """Choisit code retour et issue de la simulation terminee.
+
+    Parameters:
+        args: Arguments valides fournis par la CLI.
+        sim: Simulateur dont la trace a ete publiee.
+        ignore_delay: ``True`` en mode ``optimize(time)``.
+        analysis_logger: Journal d'analyse actif.
+        horizon_exhausted: ``True`` si l'horizon adaptatif a atteint
+            ``--max-horizon`` sans quiescence.
+
+    Returns:
+        Tuple ``(code_retour, issue)``.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
 
+    Contrat:
+        Le message de fin est emis une seule fois, sur le canal ``logging``.
+    """
+    # Pour etiqueter clairement les logs emis par cette fonction.
+    scope = "main"
     # Pour garder un canal de diagnostic coherent dans tout le module.
     logger = logging.getLogger(__name__)
-    # Pour centraliser le statut final sans sorties anticipees.
-    exit_code = 0
     # Pour tracer les valeurs qui pilotent le code retour final.
     analysis_logger.log_header("EXIT DECISION", scope=scope)
     # Pour exposer les signaux utilises pour choisir la branche finale.
@@ -427,61 +1390,271 @@ def main(argv: list[str] | None = None) -> int:
     analysis_logger.log_key_value("REQUESTED_DELAY", args.delay, scope=scope)
     # Pour exposer les signaux utilises pour choisir la branche finale.
     analysis_logger.log_key_value("SIM_DEADLOCK", sim.deadlock, scope=scope)
-    # Pour traiter explicitement un cas d'entree invalide ou absent.
-    if not ignore_delay and sim.time >= args.delay:
-        # Pour afficher une borne coherente meme en cas de depassement.
-        limit = args.delay if sim.time > args.delay else sim.time
-        # Pour distinguer les terminaisons anormales dans les diagnostics.
-        logger.warning("Max time reached at time %d", limit)
-        # Pour rendre explicite la raison associee au code retour non nul.
-        analysis_logger.log_step(
-            "EXIT_REASON",
-            f"max_time_reached(limit={limit})",
-            scope=scope,
-        )
-        # Pour centraliser le statut final sans sorties anticipees.
-        exit_code = 1
-    # Pour maintenir un ordre de priorite stable entre cas exclusifs.
-    elif sim.deadlock:
-        # Pour distinguer les terminaisons anormales dans les diagnostics.
-        logger.warning("Deadlock detected at time %d", sim.time)
-        # Pour rendre explicite la raison associee au code retour non nul.
-        analysis_logger.log_step("EXIT_REASON", "deadlock", scope=scope)
-        # Pour centraliser le statut final sans sorties anticipees.
-        exit_code = 1
-    # Pour couvrir explicitement le cas complementaire du contrat.
-    else:
-        # Pour distinguer les terminaisons anormales dans les diagnostics.
-        logger.warning("No more process doable at time %d", sim.time)
-        # Pour rendre explicite la raison associee a une fin normale.
-        analysis_logger.log_step(
-            "EXIT_REASON",
-            "no_more_process_doable",
-            scope=scope,
-        )
+    # Pour appliquer la regle de fin partagee avec ``krpsim --batch``.
+    code, reason, message = exit_decision(
+        sim,
+        args.delay,
+        ignore_delay,
+        args.max_horizon if horizon_exhausted else None,
+    )
+    # Pour distinguer les terminaisons dans les diagnostics.
+    logger.warning("%s", message)
+    # Pour detailler dans le journal les issues qui portent une borne.
+    details = {
+        "stop_condition": f"stop_condition({sim.stopped})",
+        "max_time_reached": f"max_time_reached(limit={min(sim.time, args.delay)})",
+        "max_horizon_reached": f"max_horizon_reached(limit={args.max_horizon})",
+    }
+    # Pour rendre explicite la raison associee au code retour.
+    analysis_logger.log_step(
+        "EXIT_REASON", details.get(reason, reason), scope=scope
+    )
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return code, reason
+
+
+# Pour isoler _publish_bottlenecks et faciliter son evolution sous tests.
+def _publish_bottlenecks(
+    counters: BottleneckCounters, ndjson: NdjsonWriter | None
+) -> None:
+    """Publie l'attribution des blocages dans le format de sortie."""
+    # Pour fournir un retour utilisateur directement lisible en CLI.
+    if ndjson is None:
+        # Pour ne charger le formatage que pour ``--bottlenecks``.
+        from .bottlenecks import format_report
+
+        # Pour publier le rapport en un seul appel.
+        write_lines(format_report(counters))
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return
+    # Pour publier les deux classements dans un enregistrement.
+    ndjson.record(
+        "bottlenecks",
+        resources=[
+            {"name": r.name, "blocked": r.blocked, "processes": r.processes}
+            for r in counters.starved_resources()
+        ],
+        processes=[
+            {
+                "name": p.name,
+                "blocked": p.blocked,
+                "launches": p.launches,
+                "shortage": p.shortage,
+            }
+            for p in counters.idle_processes()
+        ],
+    )
+
 
+# Pour isoler _publish_outcome et faciliter son evolution sous tests.
+def _publish_outcome(
+    args: argparse.Namespace,
+    sim: Simulator,
+    ndjson: NdjsonWriter | None,
+    outcome: tuple[int, str],
+    analysis_logger: AnalysisLogger,
+) -> None:
+    """Publie stocks finaux, blocages et resultat dans le format de sortie.
+
+    Parameters:
+        args: Arguments valides fournis par la CLI.
+        sim: Simulateur dont la trace a ete publiee.
+        ndjson: Flux machine, ``None`` en sortie texte.
+        outcome: Tuple ``(code_retour, issue)`` de ``_exit_decision``.
+        analysis_logger: Journal d'analyse actif.
+
+    Returns:
+        ``None``.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        En sortie machine, l'enregistrement ``result`` est toujours le
+        dernier publie.
+    """
     # Pour stabiliser l'ordre d'affichage des ressources finales.
     stock_names = sorted(sim.config.all_stock_names())
-    # Pour aligner la sortie et faciliter la lecture des diffs.
-    max_len = max((len(name) for name in stock_names), default=0)
-    # Pour fournir un retour utilisateur directement lisible en CLI.
-    print("Final Stocks:")
+    # Pour fournir un snapshot stable des stocks finaux.
+    final = {name: sim.stocks.get(name, 0) for name in stock_names}
+    # Pour taire les stocks finaux quand aucune sortie n'est demandee.
+    show_stocks = args.output != "none"
+    # Pour annoncer les stocks finaux avant le journal d'analyse.
+    if show_stocks:
+        # Pour fournir un retour utilisateur directement lisible en CLI.
+        print("Final Stocks:")
     # Pour fournir un snapshot stable des stocks finaux pour le diagnostic.
-    analysis_logger.log_key_value(
-        "FINAL_STOCKS",
-        {name: sim.stocks.get(name, 0) for name in stock_names},
-        scope=scope,
-    )
+    analysis_logger.log_key_value("FINAL_STOCKS", final, scope="main")
     # Pour afficher les stocks dans un ordre deterministic.
-    for name in stock_names:
-        # Pour fournir un retour utilisateur directement lisible en CLI.
-        print(f"  {name:<{max_len}}  => {sim.stocks.get(name, 0)}")
+    if show_stocks:
+        # Pour aligner la sortie et faciliter la lecture des diffs.
+        max_len = max((len(name) for name in stock_names), default=0)
+        # Pour publier tous les stocks en un seul appel.
+        write_lines([f"  {name:<{max_len}}  => {qty}" for name, qty in final.items()])
+    # Pour publier l'attribution des blocages apres les stocks finaux.
+    if sim.bottlenecks is not None:
+        # Pour choisir le rendu selon le format de sortie.
+        _publish_bottlenecks(sim.bottlenecks, ndjson)
+    # Pour clore le flux machine par le resultat complet.
+    if ndjson is not None:
+        # Pour publier stocks, horloge, blocage et issue en une ligne.
+        ndjson.record(
+            "result",
+            time=sim.time,
+            deadlock=sim.deadlock,
+            reason=outcome[1],
+            stop_condition=None if sim.stopped is None else str(sim.stopped),
+            policy=sim.policy,
+            exit_code=outcome[0],
+            stocks=final,
+        )
+
 
+# Pour isoler _main_with_logger et faciliter son evolution sous tests.
+def _main_with_logger(
+    args: argparse.Namespace,
+    parser: argparse.ArgumentParser,
+    analysis_logger: AnalysisLogger,
+) -> int:
+    """Execute ``main`` une fois le journal d'analyse ouvert.
+
+    Parameters:
+        args: Arguments resolves par ``argparse``.
+        parser: Parseur utilise pour emettre des erreurs uniformes.
+        analysis_logger: Journal d'analyse actif, ferme par ``main``.
+
+    Returns:
+        Code retour de ``main``.
+
+    Raises:
+        SystemExit:
+            Levee explicitement si la configuration ne peut pas etre parsee.
+
+    Contrat:
+        Le journal n'est jamais ferme ici pour que ``main`` le vide sur
+        toutes les sorties, erreurs comprises.
+    """
+    # Pour etiqueter clairement les logs emis par cette fonction.
+    scope = "main"
+    # Pour exposer les arguments parsees dans un bloc d'entree unique.
+    analysis_logger.log_header("CLI ENTRYPOINT", scope=scope)
+    # Pour garder un format deterministe pour reproduire un run exact.
+    analysis_logger.log_key_value("PARSED_ARGS", vars(args), scope=scope)
+    # Pour router les messages de fin vers le bon flux.
+    _configure_logging(args)
+    # Pour echouer tot avant toute operation couteuse ou irreversible.
+    _validate_args(args, parser, analysis_logger)
+    # Pour remplacer la sortie humaine par le flux machine.
+    ndjson = NdjsonWriter() if args.format == "ndjson" else None
+    # Pour taire en-tete, trace et stocks humains en sortie machine.
+    if ndjson is not None:
+        # Pour reutiliser les gardes du mode sans sortie humaine.
+        args.output = "none"
+    # Pour ne charger cProfile et tracemalloc que sur demande.
+    profiler = _make_profiler(args)
+    # Pour convertir une erreur bas niveau en diagnostic exploitable.
+    try:
+        # Pour separer clairement execution metier et gestion du code retour.
+        sim, ignore_delay, horizon_exhausted = _run_simulation(
+            args, analysis_logger, ndjson, profiler
+        )
+    # Pour traduire un echec technique en message stable pour l'appelant.
+    except ParseError as exc:
+        # Pour relier l'erreur metier a la phase qui a echoue.
+        analysis_logger.log_step("PARSE_ERROR", str(exc), scope=scope)
+        # Pour publier l'erreur dans le format de sortie demande.
+        _report_error(f"invalid config: {exc}", ndjson)
+    # Pour centraliser le statut final sans sorties anticipees.
+    outcome = _exit_decision(
+        args, sim, ignore_delay, analysis_logger, horizon_exhausted
+    )
+    # Pour publier la fin de run dans le format demande.
+    _publish_outcome(args, sim, ndjson, outcome, analysis_logger)
     # Pour tracer la valeur de sortie renvoyee au shell.
-    analysis_logger.log_key_value("EXIT_CODE", exit_code, scope=scope)
+    analysis_logger.log_key_value("EXIT_CODE", outcome[0], scope=scope)
+    # Pour publier le rapport hors de la sortie standard.
+    if profiler is not None and profiler.enabled:
+        # Pour ne charger la serialisation qu'en mode profilage.
+        import json
 
+        # Pour livrer un rapport exploitable par un outil.
+        print(json.dumps(profiler.report(sim), indent=2), file=sys.stderr)
     # Pour fournir au shell un code retour exploitable en automatisation.
-    return exit_code
+    return outcome[0]
+
+
+# Pour isoler main et faciliter son evolution sous tests.
+def main(argv: list[str] | None = None) -> int:
+    """Point d'entree principal du binaire ``krpsim``.
+
+    Parameters:
+        argv: Liste d'arguments optionnelle pour tests et appels internes.
+
+    Returns:
+        ``0`` si la simulation termine sans limite atteinte ni deadlock,
+        ``1`` sinon.
+
+    Raises:
+        SystemExit:
+            Levee explicitement si la configuration ne peut pas etre parsee.
+
+    Contrat:
+        Le code retour doit rester fiable pour les pipelines CI/CD.
+    """
+    # Pour lire les arguments du processus quand aucun n'est injecte.
+    argv = sys.argv[1:] if argv is None else argv
+    # Pour router la sous-commande sans toucher a l'interface historique.
+    if argv and argv[0] == "sweep":
+        # Pour deleguer le balayage d'horizon a son point d'entree.
+        return sweep_main(argv[1:])
+    # Pour simuler plusieurs configurations dans un seul interpreteur.
+    if argv and argv[0] == "--batch":
+        # Pour deleguer le mode lot a son point d'entree.
+        return batch_main(argv[1:])
+    # Pour servir les simulations depuis un processus persistant.
+    if argv and argv[0] == "serve":
+        # Pour deleguer le mode serveur a son point d'entree.
+        return serve_main(argv[1:])
+    # Pour deleguer l'execution a un serveur deja demarre.
+    if argv and argv[0] == "--connect":
+        # Pour ne charger que le client socket en mode connecte.
+        from .client import connect_main
+
+        # Pour deleguer le mode client a son point d'entree.
+        return connect_main(argv[1:])
+    # Pour router le diagnostic de demarrage hors du parseur principal.
+    if argv and argv[0] == "--startup-report":
+        # Pour deleguer la mesure a son point d'entree.
+        return startup_main(argv[1:])
+    # Pour conserver un point unique de configuration des arguments.
+    parser = build_parser()
+    # Pour permettre l'injection d'arguments en test unitaire.
+    args = parser.parse_args(argv)
+    # Pour centraliser les traces d'analyse du comportement de la CLI.
+    analysis_logger = AnalysisLogger(
+        enabled=args.analysis_log or args.analysis_log_file is not None,
+        sink=(
+            JsonLinesSink(
+                args.analysis_log_file,
+                levels=dict(args.analysis_log_level),
+                sample=dict(args.analysis_log_sample),
+            )
+            if args.analysis_log_file is not None
+            else None
+        ),
+    )
+    # Pour partager le logger d'analyse avec les sous-modules (ex: optimizer).
+    set_active_analysis_logger(analysis_logger)
+    # Pour vider le tampon du journal structure sur toutes les sorties.
+    try:
+        # Pour separer le cycle de vie du journal de l'execution.
+        return _main_with_logger(args, parser, analysis_logger)
+    # Pour ecrire les derniers enregistrements meme en cas d'erreur.
+    finally:
+        # Pour fermer le fichier du journal structure.
+        analysis_logger.close()
+        # Pour ne pas laisser un journal ferme actif apres l'execution.
+        set_active_analysis_logger(None)
 
 
 # Pour proteger un invariant de comparaison critique ici.
@@ -0,0 +1,137 @@
+"""Client leger de ``krpsim serve``.
+
+Ce module n'importe ni le parser ni le simulateur: ``krpsim --connect``
+ne paie que le demarrage de l'interpreteur, la simulation etant faite par
+un worker deja initialise du serveur.
+"""
+
+# Pour retarder l'evaluation des types et limiter les cycles.
+from __future__ import annotations
+
+# Pour encoder requetes et reponses sans format maison.
+import json
+# Pour transmettre le repertoire courant du client.
+import os
+# Pour joindre le serveur local.
+import socket
+# Pour restituer les flux et le code retour distants.
+import sys
+# Pour garder des signatures stables sur les messages JSON.
+from typing import Any
+
+
+# Pour isoler send_request et faciliter son evolution sous tests.
+def send_request(path: str, request: dict[str, Any]) -> dict[str, Any]:
+    """Envoie une requete au serveur et attend sa reponse.
+
+    Parameters:
+        path: Chemin de la socket du serveur.
+        request: Requete a transmettre.
+
+    Returns:
+        Reponse ``{"exit_code", "stdout", "stderr"}`` du serveur.
+
+    Raises:
+        OSError:
+            Si le serveur est injoignable ou ferme la connexion.
+
+    Contrat:
+        Une connexion par requete: le client reste sans etat.
+    """
+    # Pour fermer la connexion meme en cas d'erreur.
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        # Pour joindre le serveur local.
+        sock.connect(path)
+        # Pour transmettre la requete sur une seule ligne.
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        # Pour lire la reponse ligne par ligne.
+        with sock.makefile("rb") as stream:
+            # Pour recevoir la reponse complete.
+            line = stream.readline()
+    # Pour detecter un serveur arrete en cours de requete.
+    if not line:
+        # Pour signaler sans delai une violation explicite du contrat.
+        raise ConnectionError("server closed the connection")
+    # Pour decoder la reponse du serveur.
+    response: dict[str, Any] = json.loads(line)
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return response
+
+
+# Pour isoler connect_main et faciliter son evolution sous tests.
+def connect_main(argv: list[str]) -> int:
+    """Point d'entree de ``krpsim --connect SOCKET <arguments krpsim>``.
+
+    Parameters:
+        argv: Chemin de la socket suivi des arguments habituels.
+
+    Returns:
+        Code retour de l'execution distante.
+
+    Raises:
+        SystemExit:
+            Levee si la socket manque ou si le serveur est injoignable.
+
+    Contrat:
+        Sorties et code retour identiques a ``krpsim <arguments>`` lance
+        depuis le repertoire courant.
+    """
+    # Pour exiger la socket avant les arguments transmis.
+    if not argv:
+        # Pour reproduire le format d'erreur d'usage d'argparse.
+        print("krpsim --connect: error: missing socket path", file=sys.stderr)
+        # Pour signaler sans delai une violation explicite du contrat.
+        raise SystemExit(2)
+    # Pour traduire un serveur absent en erreur lisible.
+    try:
+        # Pour executer la commande depuis le repertoire du client.
+        response = send_request(argv[0], {"argv": argv[1:], "cwd": os.getcwd()})
+    # Pour fournir une erreur CLI uniforme et immediate a l'utilisateur.
+    except OSError as exc:
+        # Pour expliquer l'echec de connexion.
+        print(f"krpsim: cannot reach server at '{argv[0]}': {exc}", file=sys.stderr)
+        # Pour signaler sans delai une violation explicite du contrat.
+        raise SystemExit(1)
+    # Pour restituer la sortie standard distante a l'identique.
+    sys.stdout.write(response["stdout"])
+    # Pour restituer la sortie d'erreur distante a l'identique.
+    sys.stderr.write(response["stderr"])
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return int(response["exit_code"])
+
+
+# Pour isoler main et faciliter son evolution sous tests.
+def main(argv: list[str] | None = None) -> int:
+    """Point d'entree du binaire ``krpsim``.
+
+    Parameters:
+        argv: Liste d'arguments optionnelle pour tests et appels internes.
+
+    Returns:
+        Code retour de ``connect_main`` ou de ``cli.main``.
+
+    Raises:
+        SystemExit:
+            Propagee depuis le point d'entree delegue.
+
+    Contrat:
+        Le mode ``--connect`` n'importe pas ``krpsim.cli``; tout autre
+        usage est strictement celui de ``cli.main``.
+    """
+    # Pour lire les arguments du processus quand aucun n'est injecte.
+    argv = sys.argv[1:] if argv is None else argv
+    # Pour eviter l'import du simulateur en mode connecte.
+    if argv and argv[0] == "--connect":
+        # Pour deleguer l'execution au serveur.
+        return connect_main(argv[1:])
+    # Pour ne charger la CLI complete qu'en execution locale.
+    from .cli import main as cli_main
+
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return cli_main(argv)
+
+
+# Pour proteger un invariant de comparaison critique ici.
+if __name__ == "__main__":
+    # Pour signaler sans delai une violation explicite du contrat.
+    raise SystemExit(main())
@@ -0,0 +1,203 @@
+"""Generation d'une fonction de demarrage specialisee par configuration.
+
+La boucle generique de ``Simulator._start_processes`` interprete a chaque
+tentative les dictionnaires ``needs`` des processus. Pour une politique
+statique, l'ordre des tentatives est fixe: ce module deroule donc ce
+parcours en source Python, avec les stocks concernes en variables locales,
+puis le compile une seule fois par configuration.
+"""
+
+# Pour retarder l'evaluation des types et limiter les cycles.
+from __future__ import annotations
+
+# Pour identifier une configuration par une empreinte stable.
+import hashlib
+# Pour reprendre le niveau de journal du chemin generique.
+import logging
+# Pour garder des signatures stables sur les fonctions generees.
+from typing import Any, Callable, Sequence
+
+# Pour limiter le couplage aux composants internes necessaires.
+from .parser import Process
+
+# Pour typer la fonction generee: ``start(sim, make_running, logger)``.
+StartFn = Callable[[Any, Callable[[Process, int], Any], Any], tuple[bool, bool]]
+
+# Pour ne compiler qu'une fois chaque parcours de processus.
+_CACHE: dict[str, StartFn] = {}
+
+
+# Pour isoler supports et faciliter son evolution sous tests.
+def supports(processes: Sequence[Process]) -> bool:
+    """Indique si un parcours peut etre genere sans changer la semantique.
+
+    Parameters:
+        processes: Processus dans l'ordre de tentative.
+
+    Returns:
+        ``True`` si tous les processus ont un delai et des besoins
+        strictement positifs.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Sans credit instantane, un demarrage ne fait que debiter des
+        ressources deja presentes: les stocks locaux suffisent.
+    """
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return all(
+        proc.delay > 0 and all(qty > 0 for qty in proc.needs.values())
+        for proc in processes
+    )
+
+
+# Pour isoler digest et faciliter son evolution sous tests.
+def digest(processes: Sequence[Process]) -> str:
+    """Calcule l'empreinte d'un parcours de processus.
+
+    Parameters:
+        processes: Processus dans l'ordre de tentative.
+
+    Returns:
+        Empreinte hexadecimale SHA-256.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Deux parcours de meme empreinte generent le meme source.
+    """
+    # Pour decrire chaque processus sans dependre de l'identite des objets.
+    spec = repr(
+        [
+            (
+                proc.name,
+                sorted(proc.needs.items()),
+                sorted(proc.results.items()),
+                proc.delay,
+            )
+            for proc in processes
+        ]
+    )
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return hashlib.sha256(spec.encode("utf-8")).hexdigest()
+
+
+# Pour isoler generate_source et faciliter son evolution sous tests.
+def generate_source(processes: Sequence[Process]) -> str:
+    """Produit le source de la fonction ``start`` specialisee.
+
+    Parameters:
+        processes: Processus dans l'ordre de tentative, acceptes par
+            ``supports``.
+
+    Returns:
+        Source Python d'une fonction ``start(sim, make_running, logger)``
+        qui renvoie ``(started, started_nonzero)``.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Le source reproduit ``_start_processes`` tentative par tentative;
+        les processus sont lus dans le tuple global ``_P`` au meme rang.
+    """
+    # Pour attribuer une variable locale a chaque ressource consommee.
+    slots: dict[str, str] = {}
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for proc in processes:
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for name in proc.needs:
+            # Pour ne creer qu'une variable par ressource.
+            slots.setdefault(name, f"r{len(slots)}")
+    # Pour lire l'etat du simulateur une seule fois par cycle.
+    lines = [
+        "def start(sim, make_running, logger):",
+        "    stocks = sim.stocks",
+        "    time = sim.time",
+        "    budget = sim._max_time - time",
+        "    running = sim._running",
+        "    trace = sim._trace_tail",
+        f"    log = logger.isEnabledFor({logging.INFO})",
+        "    started = False",
+    ]
+    # Pour charger les stocks consommes en variables locales.
+    for name, var in slots.items():
+        # Pour lire le stock courant, zero si la ressource est absente.
+        lines.append(f"    {var} = o{var[1:]} = stocks.get({name!r}, 0)")
+    # Pour derouler les tentatives dans l'ordre de la politique.
+    for rank, proc in enumerate(processes):
+        # Pour tester horizon et besoins sans parcourir de dictionnaire.
+        checks = [f"{proc.delay} <= budget"] + [
+            f"{slots[name]} >= {qty}" for name, qty in proc.needs.items()
+        ]
+        # Pour ouvrir la tentative du processus.
+        lines.append(f"    if {' and '.join(checks)}:")
+        # Pour debiter chaque besoin sur sa variable locale.
+        for name, qty in proc.needs.items():
+            # Pour consommer le besoin avant la tentative suivante.
+            lines.append(f"        {slots[name]} -= {qty}")
+        # Pour enregistrer le processus en cours, la trace et le journal.
+        lines += [
+            f"        running.append(make_running(_P[{rank}], {proc.delay}))",
+            f"        trace.append((time, {proc.name!r}))",
+            "        if log:",
+            f"            logger.info('%d:%s', time, {proc.name!r})",
+            "        started = True",
+        ]
+    # Pour ne reecrire que les stocks effectivement consommes.
+    for name, var in slots.items():
+        # Pour publier le stock local modifie dans le simulateur.
+        lines += [
+            f"    if {var} != o{var[1:]}:",
+            f"        stocks[{name!r}] = {var}",
+        ]
+    # Pour rendre le couple attendu par ``step``.
+    lines.append("    return started, started")
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return "\n".join(lines) + "\n"
+
+
+# Pour isoler compile_start et faciliter son evolution sous tests.
+def compile_start(processes: Sequence[Process]) -> StartFn:
+    """Compile, ou reprend du cache, la fonction ``start`` d'un parcours.
+
+    Parameters:
+        processes: Processus dans l'ordre de tentative, acceptes par
+            ``supports``.
+
+    Returns:
+        Fonction ``start(sim, make_running, logger)``.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Le cache est indexe par ``digest``: une configuration reparsee ou
+        simulee plusieurs fois n'est compilee qu'une fois par processus.
+    """
+    # Pour identifier le parcours independamment des objets parses.
+    key = digest(processes)
+    # Pour reprendre une compilation deja faite.
+    cached = _CACHE.get(key)
+    # Pour eviter une recompilation couteuse.
+    if cached is not None:
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return cached
+    # Pour exposer les processus au source genere par leur rang.
+    namespace: dict[str, Any] = {"_P": tuple(processes)}
+    # Pour compiler le source avec un nom de fichier reconnaissable.
+    code = compile(
+        generate_source(processes), f"<krpsim-codegen-{key[:12]}>", "exec"
+    )
+    # Pour definir la fonction dans un espace de noms dedie; le source ne
+    # contient que des noms issus du parseur, cites via ``!r``, et des
+    # litteraux entiers.
+    exec(code, namespace)  # nosec B102
+    # Pour memoriser la fonction compilee.
+    fn: StartFn = namespace["start"]
+    # Pour partager la compilation entre simulateurs.
+    _CACHE[key] = fn
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return fn
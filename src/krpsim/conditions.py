@@ -0,0 +1,179 @@
+"""Conditions d'arret declaratives sur les stocks.
+
+Une condition ``ressource<op>seuil`` est compilee en verifications
+rattachees aux seuls processus qui consomment ou produisent la ressource:
+le simulateur ne les evalue qu'au debit ou au credit concerne.
+"""
+
+# Pour retarder l'evaluation des types et limiter les cycles.
+from __future__ import annotations
+
+# Pour comparer un stock a son seuil sans table de lambdas.
+import operator
+# Pour reconnaitre une condition en une seule expression.
+import re
+# Pour formaliser des contrats de donnees clairs et compacts.
+from dataclasses import dataclass
+# Pour garder des signatures stables sur les collections.
+from typing import Callable, Sequence
+
+# Pour limiter le couplage aux composants internes necessaires.
+from .parser import Config
+
+# Pour associer chaque operateur textuel a sa comparaison.
+_OPERATORS: dict[str, Callable[[int, int], bool]] = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+# Pour decouper ``ressource<op>seuil`` en tolerant les espaces.
+_CONDITION_RE = re.compile(r"^\s*([^\s<>=!]+)\s*(>=|<=|==|!=|>|<)\s*(-?\d+)\s*$")
+
+
+# Pour fiabiliser les objets metier via un schema declaratif.
+@dataclass(frozen=True)
+# Pour encapsuler StopCondition autour d'un contrat clairement borne.
+class StopCondition:
+    """Comparaison d'un stock a un seuil.
+
+    Attributes:
+        resource: Ressource observee.
+        op: Operateur parmi ``>=``, ``<=``, ``==``, ``!=``, ``>``, ``<``.
+        threshold: Seuil compare au stock courant.
+
+    Contrat:
+        Une ressource absente des stocks vaut zero.
+    """
+
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    resource: str
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    op: str
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    threshold: int
+
+    # Pour isoler holds et faciliter son evolution sous tests.
+    def holds(self, stocks: dict[str, int]) -> bool:
+        """Indique si la condition est satisfaite par ``stocks``."""
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return _OPERATORS[self.op](stocks.get(self.resource, 0), self.threshold)
+
+    # Pour isoler __str__ et faciliter son evolution sous tests.
+    def __str__(self) -> str:
+        """Restitue la condition sous sa forme saisie normalisee."""
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return f"{self.resource}{self.op}{self.threshold}"
+
+
+# Pour isoler parse_condition et faciliter son evolution sous tests.
+def parse_condition(text: str) -> StopCondition:
+    """Analyse une condition ``ressource<op>seuil``.
+
+    Parameters:
+        text: Condition saisie, par exemple ``armoire>=10``.
+
+    Returns:
+        Condition d'arret correspondante.
+
+    Raises:
+        ValueError:
+            Si le texte ne respecte pas la grammaire attendue.
+
+    Contrat:
+        Les operateurs a deux caracteres sont reconnus avant ``>`` et ``<``.
+    """
+    # Pour reconnaitre la condition en une seule passe.
+    match = _CONDITION_RE.match(text)
+    # Pour refuser une condition hors grammaire.
+    if match is None:
+        # Pour signaler sans delai une violation explicite du contrat.
+        raise ValueError(f"invalid stop condition: '{text}'")
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return StopCondition(match.group(1), match.group(2), int(match.group(3)))
+
+
+# Pour encapsuler StopWatch autour d'un contrat clairement borne.
+class StopWatch:
+    """Index des conditions d'arret par processus concerne.
+
+    Parameters:
+        config: Configuration simulee.
+        conditions: Conditions dont la premiere satisfaite arrete la
+            simulation.
+
+    Contrat:
+        Une condition n'est evaluee qu'apres le debit d'un processus qui
+        consomme sa ressource ou le credit d'un processus qui la produit.
+    """
+
+    # Pour isoler __init__ et faciliter son evolution sous tests.
+    def __init__(self, config: Config, conditions: Sequence[StopCondition]):
+        """Compile les conditions en index par processus.
+
+        Parameters:
+            config: Configuration simulee.
+            conditions: Conditions a surveiller, dans l'ordre de priorite.
+
+        Returns:
+            ``None``.
+
+        Raises:
+            ValueError:
+                Si une condition porte sur une ressource inconnue.
+
+        Contrat:
+            Les processus sans ressource surveillee n'ont aucune entree.
+        """
+        # Pour refuser une condition qui ne pourrait jamais evoluer.
+        known = config.all_stock_names()
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for cond in conditions:
+            # Pour ignorer ce cas et laisser la boucle traiter les suivants.
+            if cond.resource in known:
+                # Pour passer a la condition suivante.
+                continue
+            # Pour signaler sans delai une violation explicite du contrat.
+            raise ValueError(f"unknown resource '{cond.resource}'")
+        # Pour conserver l'ordre de priorite des conditions.
+        self.conditions = tuple(conditions)
+        # Pour n'evaluer au demarrage que les conditions sur les besoins.
+        self._on_start: dict[str, tuple[StopCondition, ...]] = {}
+        # Pour n'evaluer au credit que les conditions sur les resultats.
+        self._on_end: dict[str, tuple[StopCondition, ...]] = {}
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for name, proc in config.processes.items():
+            # Pour rattacher les conditions sur les ressources consommees.
+            debit = tuple(c for c in self.conditions if c.resource in proc.needs)
+            # Pour rattacher les conditions sur les ressources produites.
+            credit = tuple(c for c in self.conditions if c.resource in proc.results)
+            # Pour ne garder que les processus reellement surveilles.
+            if debit:
+                # Pour indexer les verifications de debit du processus.
+                self._on_start[name] = debit
+            # Pour ne garder que les processus reellement surveilles.
+            if credit:
+                # Pour indexer les verifications de credit du processus.
+                self._on_end[name] = credit
+
+    # Pour isoler first_met et faciliter son evolution sous tests.
+    def first_met(self, stocks: dict[str, int]) -> StopCondition | None:
+        """Retourne la premiere condition satisfaite par ``stocks``."""
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return next((c for c in self.conditions if c.holds(stocks)), None)
+
+    # Pour isoler after_start et faciliter son evolution sous tests.
+    def after_start(self, process: str, stocks: dict[str, int]) -> StopCondition | None:
+        """Evalue les conditions touchees par le debit de ``process``."""
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return next(
+            (c for c in self._on_start.get(process, ()) if c.holds(stocks)), None
+        )
+
+    # Pour isoler after_end et faciliter son evolution sous tests.
+    def after_end(self, process: str, stocks: dict[str, int]) -> StopCondition | None:
+        """Evalue les conditions touchees par le credit de ``process``."""
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return next((c for c in self._on_end.get(process, ()) if c.holds(stocks)), None)
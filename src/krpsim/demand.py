@@ -0,0 +1,550 @@
+"""Propagation arriere de la demande depuis les cibles d'optimisation.
+
+Ce module remonte le graphe besoins/resultats depuis chaque cible de
+``optimize`` pour estimer combien de lancements de chaque processus et
+combien d'unites de chaque ressource une unite de cible exige.
+"""
+
+# Pour retarder l'evaluation des types et limiter les cycles.
+from __future__ import annotations
+
+# Pour formaliser des contrats de donnees clairs et compacts.
+from dataclasses import dataclass, field
+# Pour garder des ratios exacts sans erreur d'arrondi flottant.
+from fractions import Fraction
+# Pour typer un etat opaque restaure depuis un snapshot.
+from typing import cast
+
+# Pour limiter le couplage aux composants internes necessaires.
+from .parser import Config, Process
+
+# Pour typer un consommateur aval: (quantite, avance, intrants freres).
+_Consumer = tuple[int, int, tuple[tuple[str, int], ...]]
+
+
+# Pour fiabiliser les objets metier via un schema declaratif.
+@dataclass
+# Pour encapsuler DemandAnalysis autour d'un contrat clairement borne.
+class DemandAnalysis:
+    """Resultat de la propagation de demande pour une configuration.
+
+    Attributes:
+        targets: Cibles analysees, dans l'ordre de ``optimize``.
+        runs: Par cible, lancements de chaque processus par unite de cible.
+        ratios: Par cible, unites de chaque ressource par unite de cible.
+        weights: Poids lexicographique de contribution de chaque processus.
+
+    Contrat:
+        Un processus absent de ``runs[cible]`` ne contribue pas a la cible;
+        les poids sont nuls pour tous les processus sans contribution.
+    """
+
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    targets: list[str] = field(default_factory=list)
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    runs: dict[str, dict[str, Fraction]] = field(default_factory=dict)
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    ratios: dict[str, dict[str, Fraction]] = field(default_factory=dict)
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    weights: dict[str, tuple[Fraction, ...]] = field(default_factory=dict)
+
+    # Pour isoler contributes et faciliter son evolution sous tests.
+    def contributes(self, process: str) -> bool:
+        """Indique si ``process`` alimente au moins une cible."""
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return any(self.weights.get(process, ()))
+
+    # Pour isoler required_ratio et faciliter son evolution sous tests.
+    def required_ratio(self, resource: str) -> Fraction:
+        """Retourne le besoin de ``resource`` pour la premiere cible qui l'utilise.
+
+        Parameters:
+            resource: Ressource intermediaire ou cible.
+
+        Returns:
+            Unites necessaires par unite de cible, ``0`` si aucune cible ne
+            depend de la ressource.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            L'ordre de ``optimize`` est respecte: la premiere cible qui
+            consomme la ressource fixe le ratio.
+        """
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for target in self.targets:
+            # Pour retenir la cible la plus prioritaire qui utilise la ressource.
+            ratio = self.ratios[target].get(resource)
+            # Pour ignorer les cibles independantes de cette ressource.
+            if ratio:
+                # Pour rendre a l'appelant le resultat promis par le contrat.
+                return ratio
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return Fraction(0)
+
+
+# Pour isoler _net_producers et faciliter son evolution sous tests.
+def _net_producers(config: Config) -> dict[str, list[tuple[Process, int]]]:
+    """Indexe les producteurs nets de chaque ressource.
+
+    Parameters:
+        config: Configuration complete deja parsee et validee.
+
+    Returns:
+        Dictionnaire ``ressource -> [(processus, gain_net)]``.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Un processus qui rend exactement ce qu'il consomme (jeton) n'est pas
+        un producteur de cette ressource.
+    """
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    producers: dict[str, list[tuple[Process, int]]] = {}
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for proc in config.processes.values():
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for name, qty in proc.results.items():
+            # Pour ignorer les jetons et les ressources recyclees a perte.
+            gain = qty - proc.needs.get(name, 0)
+            # Pour ne retenir que les producteurs qui enrichissent le stock.
+            if gain > 0:
+                # Pour relier la ressource a son producteur net.
+                producers.setdefault(name, []).append((proc, gain))
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return producers
+
+
+# Pour isoler _net_needs et faciliter son evolution sous tests.
+def _net_needs(proc: Process) -> list[tuple[str, int]]:
+    """Retourne les consommations nettes d'un processus."""
+    # Pour exclure les jetons rendus en fin de processus.
+    return [
+        (name, qty - proc.results.get(name, 0))
+        for name, qty in proc.needs.items()
+        if qty > proc.results.get(name, 0)
+    ]
+
+
+# Pour isoler _demand_order et faciliter son evolution sous tests.
+def _demand_order(
+    target: str, producers: dict[str, list[tuple[Process, int]]]
+) -> list[str]:
+    """Ordonne les ressources atteignables depuis ``target``.
+
+    Parameters:
+        target: Ressource cible de l'analyse.
+        producers: Index des producteurs nets par ressource.
+
+    Returns:
+        Ressources en ordre topologique: toute ressource apparait apres
+        celles qui lui transmettent de la demande.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Les aretes retour des graphes cycliques sont ignorees pour que la
+        propagation termine.
+    """
+    # Pour memoriser l'ordre de fin d'exploration (post-ordre).
+    postorder: list[str] = []
+    # Pour ne visiter chaque ressource qu'une seule fois.
+    seen: set[str] = {target}
+    # Pour parcourir sans recursion, meme sur de longues chaines.
+    stack: list[tuple[str, list[str]]] = [(target, _inputs(target, producers))]
+    # Pour iterer tant que la progression fonctionnelle reste possible.
+    while stack:
+        # Pour reprendre l'exploration du sommet courant.
+        name, pending = stack[-1]
+        # Pour finaliser une ressource dont tous les intrants sont explores.
+        if not pending:
+            # Pour enregistrer la ressource en post-ordre.
+            postorder.append(name)
+            # Pour revenir au parent dans l'exploration.
+            stack.pop()
+            # Pour ignorer ce cas et laisser la boucle traiter les suivants.
+            continue
+        # Pour consommer le prochain intrant a explorer.
+        nxt = pending.pop()
+        # Pour ignorer les ressources deja visitees ou en cours (cycle).
+        if nxt in seen:
+            # Pour ignorer ce cas et laisser la boucle traiter les suivants.
+            continue
+        # Pour marquer la ressource avant de descendre dans ses intrants.
+        seen.add(nxt)
+        # Pour explorer les intrants de la ressource decouverte.
+        stack.append((nxt, _inputs(nxt, producers)))
+    # Pour obtenir un ordre topologique depuis la cible.
+    postorder.reverse()
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return postorder
+
+
+# Pour isoler _inputs et faciliter son evolution sous tests.
+def _inputs(name: str, producers: dict[str, list[tuple[Process, int]]]) -> list[str]:
+    """Liste triee des intrants nets des producteurs de ``name``."""
+    # Pour rendre un parcours deterministe quel que soit l'ordre des dicts.
+    return sorted(
+        {need for proc, _ in producers.get(name, []) for need, _ in _net_needs(proc)},
+        reverse=True,
+    )
+
+
+# Pour isoler _propagate et faciliter son evolution sous tests.
+def _propagate(
+    target: str, producers: dict[str, list[tuple[Process, int]]]
+) -> tuple[dict[str, Fraction], dict[str, Fraction]]:
+    """Propage une unite de demande de ``target`` vers l'amont.
+
+    Parameters:
+        target: Ressource cible de l'analyse.
+        producers: Index des producteurs nets par ressource.
+
+    Returns:
+        Tuple ``(runs, ratios)`` par unite de cible.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        La demande d'une ressource est partagee a parts egales entre ses
+        producteurs nets.
+    """
+    # Pour figer l'ordre dans lequel la demande peut etre transmise.
+    order = _demand_order(target, producers)
+    # Pour detecter les aretes retour en temps constant.
+    rank = {name: idx for idx, name in enumerate(order)}
+    # Pour partir d'une unite de cible demandee.
+    ratios: dict[str, Fraction] = {target: Fraction(1)}
+    # Pour cumuler les lancements requis par processus.
+    runs: dict[str, Fraction] = {}
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for name in order:
+        # Pour ne propager que les ressources effectivement demandees.
+        demand = ratios.get(name)
+        # Pour ignorer les ressources sans demande ou sans producteur.
+        if not demand or name not in producers:
+            # Pour ignorer ce cas et laisser la boucle traiter les suivants.
+            continue
+        # Pour partager la demande a parts egales entre producteurs.
+        share = demand / len(producers[name])
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for proc, gain in producers[name]:
+            # Pour convertir la part de demande en nombre de lancements.
+            launches = share / gain
+            # Pour cumuler les lancements sans supposer de cle existante.
+            runs[proc.name] = runs.get(proc.name, Fraction(0)) + launches
+            # Pour appliquer uniformement la regle a chaque element concerne.
+            for need, qty in _net_needs(proc):
+                # Pour couper les cycles vers des ressources deja traitees.
+                if rank.get(need, -1) <= rank[name]:
+                    # Pour ignorer ce cas et laisser la boucle traiter les suivants.
+                    continue
+                # Pour transmettre la demande a la ressource amont.
+                ratios[need] = ratios.get(need, Fraction(0)) + launches * qty
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return runs, ratios
+
+
+# Pour isoler analyze_demand et faciliter son evolution sous tests.
+def analyze_demand(config: Config) -> DemandAnalysis:
+    """Calcule poids de contribution et ratios d'intrants par cible.
+
+    Parameters:
+        config: Configuration complete deja parsee et validee.
+
+    Returns:
+        Analyse de demande pour toutes les cibles hors ``time``.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Le calcul est fait une seule fois par configuration et ne depend
+        pas des stocks courants.
+    """
+    # Pour indexer une seule fois les producteurs nets.
+    producers = _net_producers(config)
+    # Pour limiter l'analyse aux vraies ressources cibles.
+    targets = [t for t in (config.optimize or []) if t != "time"]
+    # Pour accumuler le resultat de chaque cible.
+    analysis = DemandAnalysis(targets=targets)
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for target in targets:
+        # Pour propager une unite de demande depuis la cible.
+        runs, ratios = _propagate(target, producers)
+        # Pour conserver les lancements requis pour cette cible.
+        analysis.runs[target] = runs
+        # Pour conserver les ratios d'intrants pour cette cible.
+        analysis.ratios[target] = ratios
+    # Pour exposer un poids lexicographique par processus.
+    analysis.weights = {
+        name: tuple(analysis.runs[t].get(name, Fraction(0)) for t in targets)
+        for name in config.processes
+    }
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return analysis
+
+
+# Pour isoler _downstream_tails et faciliter son evolution sous tests.
+def _downstream_tails(config: Config, analysis: DemandAnalysis) -> dict[str, int]:
+    """Calcule le delai aval minimal entre la fin d'un processus et une cible.
+
+    Parameters:
+        config: Configuration complete deja parsee et validee.
+        analysis: Demande deja propagee depuis les cibles.
+
+    Returns:
+        Dictionnaire ``processus -> cycles aval minimaux`` limite aux
+        processus contributeurs qui atteignent une cible.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Un producteur direct de cible a une queue nulle; les cycles sont
+        bornes par une relaxation en au plus ``len(processes)`` passes.
+    """
+    # Pour ne retenir que les processus qui alimentent une cible.
+    procs = [p for p in config.processes.values() if analysis.contributes(p.name)]
+    # Pour partir des producteurs directs de cible.
+    tails = {
+        p.name: 0
+        for p in procs
+        if any(p.results.get(t, 0) > p.needs.get(t, 0) for t in analysis.targets)
+    }
+    # Pour relier chaque ressource a ses consommateurs contributeurs.
+    consumers: dict[str, list[Process]] = {}
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for proc in procs:
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for name, _ in _net_needs(proc):
+            # Pour indexer le consommateur de la ressource.
+            consumers.setdefault(name, []).append(proc)
+    # Pour borner la relaxation meme sur des graphes cycliques.
+    for _ in range(len(procs)):
+        # Pour arreter des qu'un point fixe est atteint.
+        changed = False
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for proc in procs:
+            # Pour retenir le chemin aval le plus court vers une cible.
+            best = min(
+                (
+                    user.delay + tails[user.name]
+                    for name in proc.results
+                    for user in consumers.get(name, [])
+                    if user.name in tails
+                ),
+                default=None,
+            )
+            # Pour ne mettre a jour que sur une amelioration stricte.
+            if best is not None and best < tails.get(proc.name, best + 1):
+                # Pour memoriser la nouvelle queue aval minimale.
+                tails[proc.name] = best
+                # Pour signaler qu'une nouvelle passe est necessaire.
+                changed = True
+        # Pour eviter des passes inutiles une fois stabilise.
+        if not changed:
+            # Pour sortir de la relaxation au point fixe.
+            break
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return tails
+
+
+# Pour encapsuler DemandCap autour d'un contrat clairement borne.
+class DemandCap:
+    """Plafonne la production d'intermediaires a ce que l'aval peut consommer.
+
+    Chaque intermediaire recoit un niveau de tampon: pour chaque
+    consommateur aval, sa quantite requise multipliee par le nombre de
+    lancements encore possibles, borne a la fois par l'horizon restant et
+    par le lot suivant que les intrants freres permettent.
+
+    Contrat:
+        Un producteur direct de cible ou un processus sans sortie demandee
+        n'est jamais plafonne; la production engagee compte le stock et les
+        lancements encore en cours.
+    """
+
+    # Pour isoler __init__ et faciliter son evolution sous tests.
+    def __init__(self, config: Config, analysis: DemandAnalysis | None = None):
+        """Precalcule les consommateurs aval de chaque sortie plafonnee.
+
+        Parameters:
+            config: Configuration complete deja parsee et validee.
+            analysis: Demande deja propagee, recalculee si absente.
+
+        Returns:
+            ``None``.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            Le precalcul est fait une seule fois; ``allows`` reste en temps
+            proportionnel au nombre de consommateurs aval.
+        """
+        # Pour reutiliser une analyse existante quand l'appelant en a une.
+        analysis = analysis or analyze_demand(config)
+        # Pour connaitre le delai aval de chaque consommateur.
+        tails = _downstream_tails(config, analysis)
+        # Pour decrire chaque consommateur: (quantite, avance, intrants freres).
+        consumers: dict[str, list[_Consumer]] = {}
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for proc in config.processes.values():
+            # Pour ignorer les consommateurs qui n'atteignent aucune cible.
+            if proc.name not in tails:
+                # Pour ignorer ce cas et laisser la boucle traiter les suivants.
+                continue
+            # Pour ne retenir que les intrants nets effectivement demandes.
+            needs = [
+                (name, qty)
+                for name, qty in _net_needs(proc)
+                if analysis.required_ratio(name)
+            ]
+            # Pour appliquer uniformement la regle a chaque element concerne.
+            for name, qty in needs:
+                # Pour relier l'intermediaire au consommateur et a ses freres.
+                consumers.setdefault(name, []).append(
+                    (
+                        qty,
+                        proc.delay + tails[proc.name],
+                        tuple(item for item in needs if item[0] != name),
+                    )
+                )
+        # Pour indexer les sorties plafonnees de chaque processus.
+        self._caps: dict[str, tuple[tuple[str, tuple[_Consumer, ...]], ...]] = {}
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for proc in config.processes.values():
+            # Pour laisser libres les producteurs directs de cible.
+            if tails.get(proc.name) == 0:
+                # Pour ignorer ce cas et laisser la boucle traiter les suivants.
+                continue
+            # Pour ne plafonner que les sorties nettes consommees en aval.
+            outputs = tuple(
+                (name, tuple(consumers[name]))
+                for name, qty in proc.results.items()
+                if qty > proc.needs.get(name, 0) and name in consumers
+            )
+            # Pour ne plafonner que si toutes les sorties nettes sont suivies.
+            gains = [n for n, q in proc.results.items() if q > proc.needs.get(n, 0)]
+            # Pour ne plafonner que si toutes les sorties sont consommees.
+            if outputs and len(outputs) == len(gains):
+                # Pour memoriser les sorties plafonnees du processus.
+                self._caps[proc.name] = outputs
+        # Pour suivre les quantites engagees mais pas encore creditees.
+        self._inflight: dict[str, int] = {}
+
+    # Pour isoler _committed et faciliter son evolution sous tests.
+    def _committed(self, name: str, stocks: dict[str, int]) -> int:
+        """Retourne le stock disponible plus la production en cours."""
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return stocks.get(name, 0) + self._inflight.get(name, 0)
+
+    # Pour isoler level et faciliter son evolution sous tests.
+    def level(
+        self,
+        consumers: tuple[_Consumer, ...],
+        available: int,
+        max_time: int,
+        stocks: dict[str, int],
+    ) -> int:
+        """Calcule le niveau de tampon d'un intermediaire.
+
+        Parameters:
+            consumers: Consommateurs aval precalcules de l'intermediaire.
+            available: Cycle ou la nouvelle production serait creditee.
+            max_time: Borne temporelle de la simulation.
+            stocks: Stocks courants du simulateur.
+
+        Returns:
+            Quantite de l'intermediaire que l'aval peut encore absorber.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            Un consommateur ne peut demarrer qu'une fois par cycle et doit
+            encore atteindre une cible avant ``max_time``.
+        """
+        # Pour cumuler la capacite d'absorption de tous les consommateurs.
+        total = 0
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for qty, lead, siblings in consumers:
+            # Pour borner par les demarrages encore utiles avant l'horizon.
+            batches = max(0, max_time - lead - available + 1)
+            # Pour appliquer uniformement la regle a chaque element concerne.
+            for sibling, need in siblings:
+                # Pour ne pas devancer de plus d'un lot l'intrant le plus rare.
+                batches = min(batches, self._committed(sibling, stocks) // need + 1)
+            # Pour convertir les lancements possibles en quantite absorbee.
+            total += qty * batches
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return total
+
+    # Pour isoler allows et faciliter son evolution sous tests.
+    def allows(
+        self, proc: Process, time: int, max_time: int, stocks: dict[str, int]
+    ) -> bool:
+        """Indique si ``proc`` peut demarrer sans gonfler un tampon inutile.
+
+        Parameters:
+            proc: Processus candidat au demarrage.
+            time: Cycle courant du simulateur.
+            max_time: Borne temporelle de la simulation.
+            stocks: Stocks courants du simulateur.
+
+        Returns:
+            ``True`` si au moins une sortie reste sous son niveau de tampon.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            Les processus non plafonnes sont toujours autorises.
+        """
+        # Pour laisser libres les processus sans sortie plafonnee.
+        caps = self._caps.get(proc.name)
+        # Pour traiter explicitement un cas d'entree invalide ou absent.
+        if caps is None:
+            # Pour rendre a l'appelant le resultat promis par le contrat.
+            return True
+        # Pour evaluer le tampon au cycle ou la production arrivera.
+        available = time + proc.delay
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return any(
+            self._committed(name, stocks)
+            < self.level(consumers, available, max_time, stocks)
+            for name, consumers in caps
+        )
+
+    # Pour isoler launched et faciliter son evolution sous tests.
+    def launched(self, proc: Process) -> None:
+        """Engage les sorties plafonnees d'un processus differe."""
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for name, _ in self._caps.get(proc.name, ()):
+            # Pour compter la production des son demarrage.
+            self._inflight[name] = self._inflight.get(name, 0) + proc.results[name]
+
+    # Pour isoler get_state et faciliter son evolution sous tests.
+    def get_state(self) -> tuple[tuple[str, int], ...]:
+        """Fige les quantites engagees pour un snapshot."""
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return tuple(self._inflight.items())
+
+    # Pour isoler set_state et faciliter son evolution sous tests.
+    def set_state(self, state: object) -> None:
+        """Restaure les quantites engagees depuis un snapshot."""
+        # Pour recreer un compteur propre a ce simulateur.
+        self._inflight = dict(cast(tuple[tuple[str, int], ...], state))
+
+    # Pour isoler completed et faciliter son evolution sous tests.
+    def completed(self, proc: Process) -> None:
+        """Libere l'engagement d'un processus dont les sorties sont creditees."""
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for name, _ in self._caps.get(proc.name, ()):
+            # Pour eviter de compter deux fois une production creditee.
+            self._inflight[name] -= proc.results[name]
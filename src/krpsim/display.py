@@ -11,10 +11,14 @@ from __future__ import annotations
 import logging
 # Pour appliquer des verifications d'acces dependantes du systeme.
 import os
+# Pour ecrire la trace en une seule operation sur la sortie standard.
+import sys
 # Pour eviter les chemins fragiles relies aux separateurs OS.
 from pathlib import Path
+# Pour compter les evenements par processus sans boucle manuelle.
+from collections import Counter
 # Pour garder des signatures stables sur les objets iterables.
-from typing import Iterable
+from typing import Any, Iterable, Sequence, TextIO
 
 # Pour limiter le couplage aux composants internes necessaires.
 from .parser import Config
@@ -113,44 +117,226 @@ def format_trace(trace: Iterable[tuple[int, str]]) -> list[str]:
     return [f"{cycle}:{name}" for cycle, name in trace]
 
 
+# Pour isoler write_lines et faciliter son evolution sous tests.
+def write_lines(lines: Sequence[str]) -> None:
+    """Ecrit des lignes sur la sortie standard en un seul appel.
+
+    Parameters:
+        lines: Lignes a publier, sans fin de ligne.
+
+    Returns:
+        ``None``.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Sortie identique a un ``print`` par ligne, sans son cout par appel.
+    """
+    # Pour ne rien ecrire quand il n'y a aucune ligne.
+    if lines:
+        # Pour confier au tampon de la sortie un seul bloc contigu.
+        sys.stdout.write("\n".join(lines) + "\n")
+
+
+# Pour isoler print_event_counts et faciliter son evolution sous tests.
+def print_event_counts(trace: Iterable[tuple[int, str]]) -> None:
+    """Affiche le nombre d'evenements de la trace, total et par processus.
+
+    Parameters:
+        trace: Evenements bruts issus du simulateur.
+
+    Returns:
+        ``None``.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Les processus sont tries par nom et alignes comme les stocks finaux.
+    """
+    # Pour compter chaque lancement par processus.
+    counts = Counter(name for _, name in trace)
+    # Pour aligner la sortie et faciliter la lecture des diffs.
+    width = max((len(name) for name in counts), default=0)
+    # Pour annoncer le total d'evenements.
+    lines = [f"Trace events: {sum(counts.values())}"]
+    # Pour publier un compte par processus dans un ordre deterministe.
+    lines += [f"  {name:<{width}}  => {counts[name]}" for name in sorted(counts)]
+    # Pour publier le resume en un seul appel.
+    write_lines(lines)
+
+
+# Pour encapsuler NdjsonWriter autour d'un contrat clairement borne.
+class NdjsonWriter:
+    """Flux NDJSON des lancements puis du resultat final.
+
+    Parameters:
+        stream: Flux de sortie, ``sys.stdout`` par defaut.
+
+    Contrat:
+        Une ligne par objet, ecrite des qu'elle est connue: un lancement
+        ``{"event":"start","time":T,"process":P}`` puis un unique
+        enregistrement final ``{"event":"result",...}`` ou ``"error"``.
+    """
+
+    # Pour isoler __init__ et faciliter son evolution sous tests.
+    def __init__(self, stream: TextIO | None = None):
+        """Prepare l'encodeur compact.
+
+        Parameters:
+            stream: Flux de sortie, ``sys.stdout`` par defaut.
+
+        Returns:
+            ``None``.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            ``json`` n'est importe que pour la sortie machine.
+        """
+        # Pour ne charger l'encodeur JSON que pour la sortie machine.
+        import json
+
+        # Pour ecrire sur la sortie standard courante par defaut.
+        self._stream = sys.stdout if stream is None else stream
+        # Pour encoder sans espaces superflus.
+        self._dumps = json.JSONEncoder(separators=(",", ":")).encode
+        # Pour n'echapper chaque nom de processus qu'une seule fois.
+        self._prefixes: dict[str, str] = {}
+
+    # Pour isoler start et faciliter son evolution sous tests.
+    def start(self, time: int, process: str) -> None:
+        """Publie le lancement de ``process`` au cycle ``time``."""
+        # Pour reprendre le prefixe deja encode du processus.
+        prefix = self._prefixes.get(process)
+        # Pour encoder le nom au premier lancement seulement.
+        if prefix is None:
+            # Pour figer la partie constante de la ligne.
+            prefix = f'{{"event":"start","process":{self._dumps(process)},"time":'
+            # Pour reutiliser le prefixe aux lancements suivants.
+            self._prefixes[process] = prefix
+        # Pour publier la ligne sans passer par l'encodeur generique.
+        self._stream.write(f"{prefix}{time}}}\n")
+
+    # Pour isoler starts et faciliter son evolution sous tests.
+    def starts(self, trace: Iterable[tuple[int, str]]) -> None:
+        """Publie les lancements d'une trace deja calculee."""
+        # Pour conserver l'ordre temporel de la trace.
+        for time, process in trace:
+            # Pour publier chaque lancement.
+            self.start(time, process)
+
+    # Pour isoler record et faciliter son evolution sous tests.
+    def record(self, event: str, **fields: Any) -> None:
+        """Publie un enregistrement ``{"event": event, **fields}``."""
+        # Pour publier l'objet sur une ligne unique.
+        self._stream.write(self._dumps({"event": event, **fields}) + "\n")
+
+
 # Pour marquer explicitement une trace vide mais valide.
 EMPTY_TRACE_MSG = "# no process executed (optimization)"
 
 
+# Pour nommer les politiques de persistance de la trace.
+DURABILITY_MODES = ("none", "fsync", "atomic")
+
+
+# Pour isoler _fsync_dir et faciliter son evolution sous tests.
+def _fsync_dir(directory: Path) -> None:
+    """Synchronise un repertoire pour rendre durable un renommage."""
+    # Pour ignorer les systemes qui n'ouvrent pas les repertoires.
+    if not hasattr(os, "O_DIRECTORY"):
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return
+    # Pour obtenir un descripteur sur le repertoire parent.
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    # Pour fermer le descripteur meme si la synchronisation echoue.
+    try:
+        # Pour persister l'entree de repertoire renommee.
+        os.fsync(fd)
+    # Pour liberer le descripteur dans tous les cas.
+    finally:
+        # Pour ne pas fuir de descripteur.
+        os.close(fd)
+
+
 # Pour isoler save_trace et faciliter son evolution sous tests.
-def save_trace(trace: Iterable[tuple[int, str]], path: Path) -> None:
-    """Ecrit la trace machine sur disque avec persistance forte.
+def save_trace(
+    trace: Iterable[tuple[int, str]], path: Path, durability: str = "fsync"
+) -> None:
+    """Ecrit la trace machine sur disque selon la persistance demandee.
 
     Parameters:
         trace: Trace en memoire issue de la simulation.
         path: Fichier cible a ecrire.
+        durability: ``none`` ecrit sans synchronisation, ``fsync`` ecrit
+            en place puis synchronise, ``atomic`` ecrit un fichier
+            temporaire du meme repertoire, le synchronise puis le renomme.
 
     Returns:
         ``None``.
 
     Raises:
+        ValueError:
+            Si ``durability`` n'est pas une politique connue.
         OSError:
-            Si l'ecriture ou la synchronisation disque echoue.
+            Si l'ecriture, la synchronisation ou le renommage echoue.
 
     Contrat:
-        Le fichier doit representer un etat durable avant retour de fonction.
+        Le contenu est identique pour toutes les politiques; en mode
+        ``atomic``, ``path`` contient soit l'ancienne trace soit la
+        nouvelle complete, jamais une trace tronquee.
     """
+    # Pour refuser une politique inconnue avant toute ecriture.
+    if durability not in DURABILITY_MODES:
+        # Pour signaler sans delai une violation explicite du contrat.
+        raise ValueError(f"unknown durability '{durability}'")
     # Pour reutiliser un format unique entre affichage et persistance.
     lines = format_trace(trace)
     # Pour distinguer une execution vide d'une sortie absente.
     if not lines:
         # Pour differencier une trace vide valide d'un fichier corrompu.
         lines.append(EMPTY_TRACE_MSG)
-    # Pour garantir la fermeture de ressource meme en cas d'erreur.
-    with path.open("w", encoding="utf-8") as fh:
-        # Pour valider chaque ligne avec le meme niveau d'exigence.
-        for line in lines:
+    # Pour ecrire toute la trace en un seul appel.
+    content = "\n".join(lines) + "\n"
+    # Pour ecrire directement la cible hors mode atomique.
+    if durability != "atomic":
+        # Pour garantir la fermeture de ressource meme en cas d'erreur.
+        with path.open("w", encoding="utf-8") as fh:
             # Pour garantir une trace lisible ligne par ligne par le
             # verificateur.
-            fh.write(line + "\n")
-        # Pour vider le buffer Python avant synchronisation disque.
-        fh.flush()
-        # Pour reduire le risque de perte en cas d'arret brutal.
-        os.fsync(fh.fileno())
+            fh.write(content)
+            # Pour ne synchroniser que sur demande.
+            if durability == "fsync":
+                # Pour vider le buffer Python avant synchronisation disque.
+                fh.flush()
+                # Pour reduire le risque de perte en cas d'arret brutal.
+                os.fsync(fh.fileno())
+    # Pour ne jamais exposer une trace partiellement ecrite.
+    else:
+        # Pour renommer sans changer de systeme de fichiers.
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{os.urandom(4).hex()}.tmp")
+        # Pour supprimer le fichier temporaire si une etape echoue.
+        try:
+            # Pour garantir la fermeture de ressource meme en cas d'erreur.
+            with tmp.open("x", encoding="utf-8") as fh:
+                # Pour ecrire toute la trace en un seul bloc.
+                fh.write(content)
+                # Pour vider le buffer Python avant synchronisation disque.
+                fh.flush()
+                # Pour rendre le contenu durable avant de le publier.
+                os.fsync(fh.fileno())
+            # Pour publier la trace complete en une operation atomique.
+            os.replace(tmp, path)
+        # Pour ne pas laisser de fichier temporaire orphelin.
+        except BaseException:
+            # Pour nettoyer sans masquer l'erreur d'origine.
+            tmp.unlink(missing_ok=True)
+            # Pour propager l'erreur d'origine a l'appelant.
+            raise
+        # Pour rendre le renommage durable lui aussi.
+        _fsync_dir(path.parent)
     # Pour conserver un point d'audit sur le chemin de sortie reel.
     logging.getLogger(__name__).info("trace saved to %s", path)
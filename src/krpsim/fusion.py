@@ -0,0 +1,361 @@
+"""Fusion des chaines lineaires producteur unique / consommateur unique.
+
+Une ressource intermediaire produite par un seul processus et consommee par
+un seul autre, dans la meme quantite, est toujours consommee au cycle meme
+de son credit: les deux processus forment un macro-processus dont le delai
+est la somme des delais. La simulation fusionnee ne tente plus les maillons
+internes a chaque cycle; la trace est redeployee ligne a ligne a la fin.
+"""
+
+# Pour retarder l'evaluation des types et limiter les cycles.
+from __future__ import annotations
+
+# Pour formaliser des contrats de donnees clairs et compacts.
+from dataclasses import dataclass
+
+# Pour limiter le couplage aux composants internes necessaires.
+from .parser import Config, Process
+# Pour limiter le couplage aux composants internes necessaires.
+from .simulator import Simulator
+
+
+# Pour fiabiliser les objets metier via un schema declaratif.
+@dataclass(frozen=True)
+# Pour encapsuler Chain autour d'un contrat clairement borne.
+class Chain:
+    """Chaine lineaire fusionnable.
+
+    Attributes:
+        stages: Processus de la chaine, du producteur de tete a la queue.
+        links: Ressources intermediaires, ``links[i]`` relie ``stages[i]``
+            a ``stages[i + 1]``.
+        variants: Macro-processus des prefixes de longueur 2 a ``n``; le
+            dernier couvre toute la chaine.
+
+    Contrat:
+        Chaque maillon a exactement un producteur et un consommateur, sans
+        stock initial ni objectif d'optimisation.
+    """
+
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    stages: tuple[Process, ...]
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    links: tuple[str, ...]
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    variants: tuple[Process, ...]
+
+    # Pour isoler variant_for et faciliter son evolution sous tests.
+    def variant_for(self, budget: int) -> Process:
+        """Retourne le plus long prefixe qui tient dans ``budget`` cycles.
+
+        Parameters:
+            budget: Cycles restants avant l'horizon.
+
+        Returns:
+            Macro-processus du prefixe, ou le processus de tete si aucun
+            prefixe de deux maillons ne tient.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            Reproduit le lancement d'un maillon seulement s'il termine
+            avant l'horizon.
+        """
+        # Pour essayer d'abord la chaine complete.
+        for variant in reversed(self.variants):
+            # Pour retenir le premier prefixe qui tient dans l'horizon.
+            if variant.delay <= budget:
+                # Pour rendre a l'appelant le resultat promis par le contrat.
+                return variant
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return self.stages[0]
+
+
+# Pour isoler _single_link et faciliter son evolution sous tests.
+def _single_link(
+    config: Config,
+    proc: Process,
+    producers: dict[str, list[Process]],
+    consumers: dict[str, list[Process]],
+) -> Process | None:
+    """Retourne l'unique consommateur fusionnable avec ``proc``."""
+    # Pour exiger un unique resultat, transmis integralement a l'aval.
+    if len(proc.results) != 1:
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return None
+    # Pour lire la ressource intermediaire et sa quantite.
+    ((link, qty),) = proc.results.items()
+    # Pour ecarter un stock initial ou un objectif qui observerait le lien.
+    if link in config.stocks or link in (config.optimize or []):
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return None
+    # Pour exiger un producteur et un consommateur uniques.
+    if len(producers[link]) != 1 or len(consumers.get(link, [])) != 1:
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return None
+    # Pour lire l'unique consommateur du lien.
+    nxt = consumers[link][0]
+    # Pour exiger un consommateur qui ne depend que du lien, a quantite egale.
+    if nxt is proc or nxt.needs != {link: qty} or min(proc.delay, nxt.delay) <= 0:
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return None
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return nxt
+
+
+# Pour isoler find_chains et faciliter son evolution sous tests.
+def find_chains(config: Config) -> list[Chain]:
+    """Detecte les chaines lineaires fusionnables d'une configuration.
+
+    Parameters:
+        config: Configuration validee.
+
+    Returns:
+        Chaines maximales d'au moins deux processus, dans l'ordre de
+        declaration de leur tete.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Un cycle de maillons n'a pas de tete et n'est jamais fusionne; un
+        nom de macro deja pris par un processus bloque la fusion.
+    """
+    # Pour indexer producteurs et consommateurs de chaque ressource.
+    producers: dict[str, list[Process]] = {}
+    # Pour indexer producteurs et consommateurs de chaque ressource.
+    consumers: dict[str, list[Process]] = {}
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for proc in config.processes.values():
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for name in proc.results:
+            # Pour enregistrer le producteur de la ressource.
+            producers.setdefault(name, []).append(proc)
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for name in proc.needs:
+            # Pour enregistrer le consommateur de la ressource.
+            consumers.setdefault(name, []).append(proc)
+    # Pour relier chaque producteur a son consommateur fusionnable.
+    nxt: dict[str, Process] = {}
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for proc in config.processes.values():
+        # Pour chercher le maillon aval du processus.
+        follower = _single_link(config, proc, producers, consumers)
+        # Pour ne retenir que les maillons fusionnables.
+        if follower is not None:
+            # Pour chainer le producteur a son consommateur.
+            nxt[proc.name] = follower
+    # Pour reperer les processus qui suivent deja un maillon.
+    followers = {proc.name for proc in nxt.values()}
+    # Pour accumuler les chaines detectees.
+    chains: list[Chain] = []
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for proc in config.processes.values():
+        # Pour ne partir que des tetes de chaine.
+        if proc.name not in nxt or proc.name in followers:
+            # Pour ignorer ce cas et laisser la boucle traiter les suivants.
+            continue
+        # Pour derouler la chaine depuis sa tete.
+        stages = [proc]
+        # Pour suivre les maillons jusqu'a la queue.
+        while stages[-1].name in nxt:
+            # Pour ajouter le maillon aval.
+            stages.append(nxt[stages[-1].name])
+        # Pour construire la chaine et ses macro-processus.
+        chain = _build_chain(stages)
+        # Pour ecarter une macro dont le nom masquerait un processus.
+        if any(v.name in config.processes for v in chain.variants):
+            # Pour ignorer ce cas et laisser la boucle traiter les suivants.
+            continue
+        # Pour retenir la chaine fusionnable.
+        chains.append(chain)
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return chains
+
+
+# Pour isoler _build_chain et faciliter son evolution sous tests.
+def _build_chain(stages: list[Process]) -> Chain:
+    """Construit les macro-processus de chaque prefixe d'une chaine."""
+    # Pour construire un macro-processus par prefixe de deux maillons ou plus.
+    variants = tuple(
+        Process(
+            name="+".join(p.name for p in stages[:size]),
+            needs=dict(stages[0].needs),
+            results=dict(stages[size - 1].results),
+            delay=sum(p.delay for p in stages[:size]),
+        )
+        for size in range(2, len(stages) + 1)
+    )
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return Chain(
+        stages=tuple(stages),
+        links=tuple(next(iter(p.results)) for p in stages[:-1]),
+        variants=variants,
+    )
+
+
+# Pour isoler run_fused et faciliter son evolution sous tests.
+def run_fused(config: Config, max_time: int, policy: str = "default") -> Simulator:
+    """Simule ``config`` avec les chaines lineaires fusionnees.
+
+    Parameters:
+        config: Configuration validee.
+        max_time: Dernier cycle autorise pour demarrage/avancement.
+        policy: Nom de la politique de priorisation enregistree.
+
+    Returns:
+        Simulateur de ``config`` dont ``trace``, ``stocks``, ``time`` et
+        ``deadlock`` sont ceux d'une execution non fusionnee.
+
+    Raises:
+        ValueError:
+            Si ``policy`` n'est pas une politique enregistree.
+
+    Contrat:
+        La fusion ne s'applique qu'aux politiques statiques sans suivi des
+        demarrages et hors strategie custom; sinon la simulation est
+        executee telle quelle. Au sein d'un cycle, les lignes redeployees
+        suivent le rang de la politique sur la configuration d'origine.
+    """
+    # Pour produire le resultat public sur la configuration d'origine.
+    sim = Simulator(config, policy=policy)
+    # Pour ne fusionner que si l'ordre de tentative est fixe.
+    chains = find_chains(config)
+    # Pour garder la semantique exacte des politiques non statiques.
+    if not chains or sim._policy.dynamic or sim._policy.observes_launches:
+        # Pour executer la simulation de reference.
+        sim.run(max_time)
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return sim
+    # Pour laisser la strategie custom planifier la configuration d'origine.
+    sim._begin(max_time)
+    # Pour retenir le plan en forme close quand il s'applique.
+    if sim._custom_strategy(max_time):
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return sim
+    # Pour partir de l'ordre statique calcule sur la configuration d'origine.
+    base = sim._policy.order(config.stocks)
+    # Pour simuler les chaines comme des macro-processus.
+    fused = _simulate(config, chains, base, max_time, policy)
+    # Pour redeployer la trace dans l'ordre de la politique d'origine.
+    rank = {p.name: i for i, p in enumerate(base)}
+    # Pour retrouver les maillons de chaque processus simule.
+    expand: dict[str, tuple[Process, ...]] = {
+        name: (proc,) for name, proc in config.processes.items()
+    }
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for chain in chains:
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for size, variant in enumerate(chain.variants):
+            # Pour associer chaque prefixe a ses maillons.
+            expand[variant.name] = chain.stages[: size + 2]
+    # Pour accumuler les lignes par maillon.
+    lines: list[tuple[int, str]] = []
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for time, name in fused.trace:
+        # Pour redeployer un macro-processus maillon par maillon.
+        start = time
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for stage in expand[name]:
+            # Pour dater le maillon a la fin du precedent.
+            lines.append((start, stage.name))
+            # Pour decaler le maillon suivant.
+            start += stage.delay
+    # Pour reproduire l'ordre cycle puis rang de la boucle d'origine.
+    lines.sort(key=lambda line: (line[0], rank[line[1]]))
+    # Pour publier la trace redeployee.
+    sim.trace = lines
+    # Pour reprendre les stocks finaux de la simulation fusionnee.
+    sim.stocks = fused.stocks
+    # Pour tester en temps constant les macro-processus lances.
+    launched = {name for _, name in fused.trace}
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for chain in chains:
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for size, variant in enumerate(chain.variants):
+            # Pour ignorer ce cas et laisser la boucle traiter les suivants.
+            if variant.name not in launched:
+                # Pour passer au prefixe suivant.
+                continue
+            # Pour recreer les liens credites puis consommes a zero.
+            for link in chain.links[: size + 1]:
+                # Pour conserver un stock deja credite par un prefixe.
+                sim.stocks.setdefault(link, 0)
+    # Pour reprendre l'horloge finale.
+    sim.time = fused.time
+    # Pour reprendre le diagnostic de blocage.
+    sim.deadlock = fused.deadlock
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return sim
+
+
+# Pour fiabiliser les objets metier via un schema declaratif.
+@dataclass
+# Pour encapsuler _FusedRun autour d'un contrat clairement borne.
+class _FusedRun:
+    """Resultat brut d'une simulation fusionnee."""
+
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    trace: list[tuple[int, str]]
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    stocks: dict[str, int]
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    time: int
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    deadlock: bool
+
+
+# Pour isoler _simulate et faciliter son evolution sous tests.
+def _simulate(
+    config: Config,
+    chains: list[Chain],
+    base: list[Process],
+    max_time: int,
+    policy: str,
+) -> _FusedRun:
+    """Execute la boucle de ``Simulator.run`` sur les macro-processus."""
+    # Pour reperer les maillons internes qui disparaissent de l'ordre.
+    inner = {p.name for chain in chains for p in chain.stages[1:]}
+    # Pour remplacer chaque tete par sa chaine.
+    heads = {chain.stages[0].name: chain for chain in chains}
+    # Pour declarer les macro-processus aupres du simulateur fusionne.
+    processes = {
+        name: proc for name, proc in config.processes.items() if name not in inner
+    }
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for chain in chains:
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for variant in chain.variants:
+            # Pour rendre chaque prefixe resolvable par nom.
+            processes[variant.name] = variant
+    # Pour simuler sans re-tenter les maillons internes a chaque cycle.
+    sim = Simulator(Config(config.stocks, processes, config.optimize), policy)
+    # Pour ne construire chaque ordre tronque qu'une fois.
+    orders: dict[int, list[Process]] = {}
+    # Pour savoir a partir de quel budget toutes les chaines tiennent.
+    longest = max(chain.variants[-1].delay for chain in chains)
+    # Pour preparer la simulation comme ``run``.
+    sim._begin(max_time)
+    # Pour iterer tant que la progression fonctionnelle reste possible.
+    while sim.time <= max_time:
+        # Pour borner le budget aux seuls cas qui changent l'ordre.
+        budget = min(max_time - sim.time, longest)
+        # Pour construire l'ordre du budget a la premiere rencontre.
+        if budget not in orders:
+            # Pour placer chaque chaine au rang de sa tete.
+            orders[budget] = [
+                heads[p.name].variant_for(budget) if p.name in heads else p
+                for p in base
+                if p.name not in inner
+            ]
+        # Pour imposer l'ordre du budget courant a la politique statique.
+        sim._policy._ordered = orders[budget]
+        # Pour s'arreter au meme point que ``run``.
+        if not sim.step():
+            # Pour sortir une fois la convergence atteinte.
+            break
+    # Pour calculer le diagnostic de blocage de l'execution.
+    sim._finish()
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return _FusedRun(sim.trace, sim.stocks, sim.time, sim.deadlock)
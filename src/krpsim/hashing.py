@@ -0,0 +1,149 @@
+"""Hachage incremental d'etats de simulation et table de transposition.
+
+Ce module fournit des cles de type Zobrist calculees a la demande et une
+table de transposition pour elaguer les etats deja visites en recherche.
+"""
+
+# Pour retarder l'evaluation des types et limiter les cycles.
+from __future__ import annotations
+
+# Pour borner toutes les cles sur 64 bits.
+MASK64 = (1 << 64) - 1
+# Pour separer les cles de stocks de celles des processus en cours.
+STOCK_DOMAIN = 1
+# Pour separer les cles de stocks de celles des processus en cours.
+RUNNING_DOMAIN = 2
+
+
+# Pour isoler _mix et faciliter son evolution sous tests.
+def _mix(value: int) -> int:
+    """Melange un entier 64 bits (finaliseur splitmix64)."""
+    # Pour decaler la graine et eviter le point fixe en zero.
+    value = (value + 0x9E3779B97F4A7C15) & MASK64
+    # Pour diffuser les bits hauts vers les bits bas.
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    # Pour diffuser une seconde fois avant la derniere passe.
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return value ^ (value >> 31)
+
+
+# Pour isoler zobrist_key et faciliter son evolution sous tests.
+def zobrist_key(domain: int, index: int, value: int) -> int:
+    """Retourne la cle pseudo-aleatoire d'un couple ``(element, valeur)``.
+
+    Parameters:
+        domain: Famille de cle (``STOCK_DOMAIN`` ou ``RUNNING_DOMAIN``).
+        index: Position de la ressource ou du processus dans son index.
+        value: Quantite en stock ou cycles restants.
+
+    Returns:
+        Cle 64 bits deterministe.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Les cles sont calculees a la volee: aucune table n'est allouee,
+        quelle que soit l'amplitude des stocks.
+    """
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return _mix(_mix((domain << 32) | index) ^ (value & MASK64))
+
+
+# Pour encapsuler TranspositionTable autour d'un contrat clairement borne.
+class TranspositionTable:
+    """Memorise le meilleur cout atteint pour chaque etat deja visite.
+
+    Parameters:
+        capacity: Nombre maximal d'entrees, ``None`` pour ne pas borner.
+
+    Contrat:
+        Quand la capacite est atteinte, l'entree la plus ancienne est
+        evincee en premier.
+    """
+
+    # Pour isoler __init__ et faciliter son evolution sous tests.
+    def __init__(self, capacity: int | None = None):
+        """Initialise une table vide.
+
+        Parameters:
+            capacity: Nombre maximal d'entrees conservees.
+
+        Returns:
+            ``None``.
+
+        Raises:
+            ValueError:
+                Si ``capacity`` n'est pas strictement positive.
+
+        Contrat:
+            Une table bornee garde une empreinte memoire constante.
+        """
+        # Pour refuser une table qui ne pourrait rien memoriser.
+        if capacity is not None and capacity <= 0:
+            # Pour signaler sans delai une violation explicite du contrat.
+            raise ValueError("capacity must be a positive integer")
+        # Pour conserver la borne d'eviction.
+        self.capacity = capacity
+        # Pour associer chaque hachage d'etat a son meilleur cout.
+        self._entries: dict[int, int] = {}
+
+    # Pour isoler __len__ et faciliter son evolution sous tests.
+    def __len__(self) -> int:
+        """Retourne le nombre d'etats memorises."""
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return len(self._entries)
+
+    # Pour isoler __contains__ et faciliter son evolution sous tests.
+    def __contains__(self, key: object) -> bool:
+        """Indique si un hachage d'etat est deja memorise."""
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return key in self._entries
+
+    # Pour isoler get et faciliter son evolution sous tests.
+    def get(self, key: int) -> int | None:
+        """Retourne le meilleur cout memorise pour ``key``."""
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return self._entries.get(key)
+
+    # Pour isoler probe et faciliter son evolution sous tests.
+    def probe(self, key: int, cost: int) -> bool:
+        """Teste puis memorise un etat atteint avec le cout ``cost``.
+
+        Parameters:
+            key: Hachage d'etat, typiquement ``Simulator.state_hash``.
+            cost: Cout d'atteinte de l'etat (ex: cycle courant).
+
+        Returns:
+            ``True`` si l'etat a deja ete atteint a un cout inferieur ou
+            egal et peut etre elague, ``False`` sinon.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            Un etat atteint a moindre cout remplace l'entree existante.
+        """
+        # Pour comparer au meilleur cout deja connu.
+        best = self._entries.get(key)
+        # Pour elaguer un etat deja atteint au moins aussi tot.
+        if best is not None and best <= cost:
+            # Pour rendre a l'appelant le resultat promis par le contrat.
+            return True
+        # Pour evincer l'entree la plus ancienne quand la table est pleine.
+        if best is None and self.capacity is not None:
+            # Pour garder la taille sous la capacite demandee.
+            if len(self._entries) >= self.capacity:
+                # Pour retirer l'entree inseree en premier.
+                del self._entries[next(iter(self._entries))]
+        # Pour memoriser le meilleur cout connu pour cet etat.
+        self._entries[key] = cost
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return False
+
+    # Pour isoler clear et faciliter son evolution sous tests.
+    def clear(self) -> None:
+        """Vide la table."""
+        # Pour repartir d'une table neuve sans realloue l'objet.
+        self._entries.clear()
@@ -0,0 +1,301 @@
+"""Simulation de plusieurs configurations dans un seul interpreteur.
+
+``krpsim --batch DIR_OR_GLOB DELAY`` remplace une boucle shell qui lance un
+processus ``krpsim`` par fichier: chaque configuration est simulee comme
+par ``krpsim <config> <delai>``, sa trace ecrite dans ``<nom>.trace`` et
+son issue resumee sur une ligne d'un tableau final.
+"""
+
+# Pour retarder l'evaluation des types et limiter les cycles.
+from __future__ import annotations
+
+# Pour developper un motif de fichiers comme le shell.
+import glob
+# Pour mesurer la duree murale de chaque configuration.
+import time
+# Pour repartir les configurations sur plusieurs coeurs CPU.
+from concurrent.futures import ProcessPoolExecutor
+# Pour formaliser des contrats de donnees clairs et compacts.
+from dataclasses import dataclass
+# Pour eviter les chemins fragiles relies aux separateurs OS.
+from pathlib import Path
+# Pour garder des signatures stables sur les collections.
+from typing import Sequence
+
+# Pour limiter le couplage aux composants internes necessaires.
+from . import parser as parser_mod
+# Pour limiter le couplage aux composants internes necessaires.
+from .display import save_trace
+# Pour limiter le couplage aux composants internes necessaires.
+from .parser import ParseError
+# Pour limiter le couplage aux composants internes necessaires.
+from .simulator import TIME_MODE_DELAY, Simulator, exit_decision
+
+
+# Pour fiabiliser les objets metier via un schema declaratif.
+@dataclass(frozen=True)
+# Pour encapsuler ConfigResult autour d'un contrat clairement borne.
+class ConfigResult:
+    """Issue de la simulation d'une configuration.
+
+    Attributes:
+        name: Nom du fichier de configuration.
+        exit_code: Code retour qu'aurait rendu ``krpsim`` seul.
+        reason: Issue courte, nommee comme ``EXIT_REASON`` dans le journal
+            d'analyse: ``max_time_reached``, ``deadlock``,
+            ``no_more_process_doable`` ou ``invalid_config``.
+        message: Message de fin, identique a celui de la CLI.
+        time: Horloge finale, ``None`` si la configuration est invalide.
+        stocks: Stocks finaux tries par nom.
+        wall: Duree murale en secondes, parsing et ecriture compris.
+
+    Contrat:
+        Le resultat est serialisable pour traverser un pool de processus.
+    """
+
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    name: str
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    exit_code: int
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    reason: str
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    message: str
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    time: int | None
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    stocks: tuple[tuple[str, int], ...]
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    wall: float
+
+
+# Pour isoler expand_configs et faciliter son evolution sous tests.
+def expand_configs(target: str) -> list[Path]:
+    """Liste les configurations designees par un repertoire ou un motif.
+
+    Parameters:
+        target: Repertoire, dont les fichiers directs sont retenus, ou
+            motif ``glob``.
+
+    Returns:
+        Fichiers tries par chemin.
+
+    Raises:
+        ValueError:
+            Si aucun fichier ne correspond ou si deux fichiers partagent le
+            meme nom, ce qui ferait collisionner leurs traces.
+
+    Contrat:
+        Les fichiers caches et les sous-repertoires sont ignores.
+    """
+    # Pour traiter un repertoire comme tous ses fichiers directs.
+    if Path(target).is_dir():
+        # Pour ne retenir que les fichiers du repertoire.
+        candidates = list(Path(target).iterdir())
+    # Pour couvrir explicitement le cas complementaire du contrat.
+    else:
+        # Pour developper le motif sans passer par un shell.
+        candidates = [Path(match) for match in glob.glob(target)]
+    # Pour ignorer sous-repertoires et fichiers caches.
+    paths = sorted(
+        path
+        for path in candidates
+        if path.is_file() and not path.name.startswith(".")
+    )
+    # Pour refuser un lot vide qui passerait pour un succes.
+    if not paths:
+        # Pour signaler sans delai une violation explicite du contrat.
+        raise ValueError(f"no config matches '{target}'")
+    # Pour detecter deux configurations qui ecriraient la meme trace.
+    seen: set[str] = set()
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for path in paths:
+        # Pour refuser une collision de traces.
+        if path.name in seen:
+            # Pour signaler sans delai une violation explicite du contrat.
+            raise ValueError(f"duplicate config name '{path.name}'")
+        # Pour memoriser le nom deja attribue.
+        seen.add(path.name)
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return paths
+
+
+# Pour isoler run_config et faciliter son evolution sous tests.
+def run_config(
+    path: str, delay: int, policy: str, trace_dir: str, durability: str = "fsync"
+) -> ConfigResult:
+    """Simule une configuration comme ``krpsim <config> <delai>``.
+
+    Parameters:
+        path: Fichier de configuration.
+        delay: Horizon demande.
+        policy: Politique de priorisation.
+        trace_dir: Repertoire qui recoit ``<nom>.trace``.
+        durability: Politique de persistance transmise a ``save_trace``.
+
+    Returns:
+        Issue de la simulation.
+
+    Raises:
+        OSError:
+            Si la trace ne peut pas etre ecrite.
+
+    Contrat:
+        Code retour et message de fin suivent les regles de ``cli.main``;
+        une configuration invalide n'ecrit pas de trace.
+    """
+    # Pour mesurer la configuration de bout en bout.
+    start = time.perf_counter()
+    # Pour nommer la trace et la ligne du tableau.
+    name = Path(path).name
+    # Pour traduire un echec de parsing en ligne de tableau.
+    try:
+        # Pour reutiliser la validation canonique plutot qu'un parsing local.
+        config = parser_mod.parse_file(Path(path))
+    # Pour reproduire le message de la CLI.
+    except ParseError as exc:
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return ConfigResult(
+            name,
+            1,
+            "invalid_config",
+            f"invalid config: {exc}",
+            None,
+            (),
+            time.perf_counter() - start,
+        )
+    # Pour respecter l'exception de delai du mode optimize(time).
+    ignore_delay = bool(config.optimize and config.optimize[0] == "time")
+    # Pour executer la logique metier via l'implementation de reference.
+    sim = Simulator(config, policy=policy)
+    # Pour produire la trace avec la meme borne que la CLI.
+    trace = sim.run(delay if not ignore_delay else TIME_MODE_DELAY)
+    # Pour persister une trace verifiable par configuration.
+    save_trace(trace, Path(trace_dir) / f"{name}.trace", durability)
+    # Pour appliquer la regle de fin de ``cli.main``.
+    exit_code, reason, message = exit_decision(sim, delay, ignore_delay)
+    # Pour stabiliser l'ordre d'affichage des ressources finales.
+    stocks = tuple(
+        (res, sim.stocks.get(res, 0)) for res in sorted(config.all_stock_names())
+    )
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return ConfigResult(
+        name,
+        exit_code,
+        reason,
+        message,
+        sim.time,
+        stocks,
+        time.perf_counter() - start,
+    )
+
+
+# Pour isoler run_batch et faciliter son evolution sous tests.
+def run_batch(
+    paths: Sequence[Path],
+    delay: int,
+    policy: str = "default",
+    trace_dir: Path = Path("."),
+    jobs: int = 1,
+    durability: str = "fsync",
+) -> list[ConfigResult]:
+    """Simule chaque configuration, en parallele si ``jobs > 1``.
+
+    Parameters:
+        paths: Configurations a simuler.
+        delay: Horizon demande pour toutes les configurations.
+        policy: Politique de priorisation.
+        trace_dir: Repertoire qui recoit les traces, cree si absent.
+        jobs: Nombre de processus de simulation.
+        durability: Politique de persistance des traces.
+
+    Returns:
+        Resultats dans l'ordre de ``paths``.
+
+    Raises:
+        ValueError:
+            Si ``jobs`` n'est pas strictement positif.
+        OSError:
+            Si le repertoire ou une trace ne peut pas etre ecrit.
+
+    Contrat:
+        Les resultats ne dependent pas de ``jobs``, hormis les durees.
+    """
+    # Pour refuser un pool sans worker.
+    if jobs <= 0:
+        # Pour signaler sans delai une violation explicite du contrat.
+        raise ValueError("jobs must be a positive integer")
+    # Pour accepter un repertoire de traces encore absent.
+    trace_dir.mkdir(parents=True, exist_ok=True)
+    # Pour transmettre des arguments serialisables aux workers.
+    args = [str(path) for path in paths]
+    # Pour eviter le cout du pool quand un seul processus est demande.
+    if jobs == 1 or len(args) == 1:
+        # Pour simuler sequentiellement dans l'interpreteur courant.
+        return [
+            run_config(path, delay, policy, str(trace_dir), durability)
+            for path in args
+        ]
+    # Pour garantir la fermeture du pool meme en cas d'erreur.
+    with ProcessPoolExecutor(max_workers=min(jobs, len(args))) as pool:
+        # Pour conserver l'ordre des configurations independamment des workers.
+        return list(
+            pool.map(
+                run_config,
+                args,
+                [delay] * len(args),
+                [policy] * len(args),
+                [str(trace_dir)] * len(args),
+                [durability] * len(args),
+            )
+        )
+
+
+# Pour isoler format_summary et faciliter son evolution sous tests.
+def format_summary(results: Sequence[ConfigResult]) -> list[str]:
+    """Formate le tableau recapitulatif d'un lot.
+
+    Parameters:
+        results: Resultats a presenter.
+
+    Returns:
+        Lignes du tableau, en-tete et bilan compris.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Une ligne par configuration: nom, code retour, horloge finale,
+        duree murale, issue puis stocks finaux ``ressource=quantite``, ou
+        message d'erreur pour une configuration invalide.
+    """
+    # Pour aligner les noms sur la plus longue configuration.
+    width = max([len("config")] + [len(r.name) for r in results])
+    # Pour aligner les issues entre elles.
+    reason_width = max([len("reason")] + [len(r.reason) for r in results])
+    # Pour annoncer les colonnes du tableau.
+    lines = [
+        f"{'config':<{width}}  exit  cycles  wall_ms  "
+        f"{'reason':<{reason_width}}  stocks"
+    ]
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for r in results:
+        # Pour resumer les stocks, ou l'erreur, sur la derniere colonne.
+        detail = (
+            " ".join(f"{name}={qty}" for name, qty in r.stocks)
+            if r.time is not None
+            else r.message
+        )
+        # Pour marquer l'absence d'horloge d'une configuration invalide.
+        cycles = "-" if r.time is None else str(r.time)
+        # Pour publier la ligne de la configuration.
+        lines.append(
+            f"{r.name:<{width}}  {r.exit_code:>4}  {cycles:>6}  "
+            f"{r.wall * 1000:>7.1f}  {r.reason:<{reason_width}}  {detail}".rstrip()
+        )
+    # Pour compter les configurations en echec.
+    failed = sum(1 for r in results if r.exit_code)
+    # Pour conclure par le bilan du lot.
+    lines.append(f"{len(results)} configs, {failed} failed")
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return lines
@@ -2,24 +2,258 @@
 
 Ce module isole la politique d'ordonnancement pour pouvoir faire evoluer
 la priorisation sans diffuser des effets de bord dans le simulateur.
+Les politiques sont enregistrees par nom et exposent un hook de
+precalcul pour que le cout par cycle reste constant par processus.
 """
 
 # Pour retarder l'evaluation des types et limiter les cycles.
 from __future__ import annotations
 
+# Pour comparer des rendements par cycle sans erreur d'arrondi flottant.
+from fractions import Fraction
+# Pour garder des signatures stables sur les objets appelables.
+from typing import TYPE_CHECKING, Callable, TypeVar, cast
+
 from logger.analysis_log_krpsim import get_active_analysis_logger
 
+# Pour limiter le couplage aux composants internes necessaires.
+from .demand import analyze_demand
 # Pour limiter le couplage aux composants internes necessaires.
 from .parser import Config, Process
 
+# Pour typer les compteurs de profilage sans les importer au demarrage.
+if TYPE_CHECKING:
+    # Pour typer les compteurs de ``count_activity=True``.
+    from .profiling import SimulatorCounters
+
+# Pour typer une cle de tri ordonnable commune a toutes les politiques.
+SortKey = tuple[Fraction | int | str, ...]
+# Pour conserver le type exact des classes decorees par le registre.
+_PolicyT = TypeVar("_PolicyT", bound="type[Policy]")
+
+# Pour indexer les politiques disponibles par nom public.
+_POLICIES: dict[str, type[Policy]] = {}
+
+
+# Pour isoler register_policy et faciliter son evolution sous tests.
+def register_policy(name: str) -> Callable[[_PolicyT], _PolicyT]:
+    """Enregistre une classe de politique sous un nom public.
+
+    Parameters:
+        name: Nom expose a ``--policy`` et a ``get_policy``.
+
+    Returns:
+        Decorateur qui enregistre puis renvoie la classe inchangee.
+
+    Raises:
+        ValueError:
+            Si le nom est deja enregistre.
+
+    Contrat:
+        Un nom ne peut designer qu'une seule politique pour garder des
+        traces reproductibles d'une execution a l'autre.
+    """
+
+    # Pour isoler _register et faciliter son evolution sous tests.
+    def _register(cls: _PolicyT) -> _PolicyT:
+        """Ajoute ``cls`` au registre sous ``name``."""
+        # Pour refuser un ecrasement silencieux d'une politique existante.
+        if name in _POLICIES:
+            # Pour signaler sans delai une violation explicite du contrat.
+            raise ValueError(f"policy '{name}' is already registered")
+        # Pour relier la classe a son nom public.
+        cls.name = name
+        # Pour rendre la politique selectionnable par nom.
+        _POLICIES[name] = cls
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return cls
+
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return _register
 
-# Pour isoler order_processes et faciliter son evolution sous tests.
-def order_processes(config: Config) -> list[Process]:
-    """Retourne les processus tries selon ``config.optimize``.
+
+# Pour isoler policy_names et faciliter son evolution sous tests.
+def policy_names() -> tuple[str, ...]:
+    """Retourne les noms de politiques enregistrees dans l'ordre d'ajout."""
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return tuple(_POLICIES)
+
+
+# Pour isoler get_policy et faciliter son evolution sous tests.
+def get_policy(name: str, config: Config) -> Policy:
+    """Instancie et precalcule la politique ``name`` pour ``config``.
 
     Parameters:
+        name: Nom d'une politique enregistree.
         config: Configuration complete deja parsee et validee.
 
+    Returns:
+        Politique prete a fournir un ordre a chaque cycle.
+
+    Raises:
+        ValueError:
+            Si ``name`` ne correspond a aucune politique enregistree.
+
+    Contrat:
+        Le precalcul est fait une seule fois ici, jamais dans la boucle de
+        simulation.
+    """
+    # Pour rejeter tot une politique inconnue plutot qu'un tri silencieux.
+    if name not in _POLICIES:
+        # Pour signaler sans delai une violation explicite du contrat.
+        raise ValueError(f"unknown policy '{name}'")
+    # Pour separer construction et precalcul dependant de la configuration.
+    policy = _POLICIES[name]()
+    # Pour preparer les donnees utilisees a chaque cycle.
+    policy.precompute(config)
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return policy
+
+
+# Pour isoler _target_names et faciliter son evolution sous tests.
+def _target_names(config: Config) -> list[str]:
+    """Retourne les cibles d'optimisation hors critere ``time``."""
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return [t for t in (config.optimize or []) if t != "time"]
+
+
+# Pour encapsuler Policy autour d'un contrat clairement borne.
+class Policy:
+    """Politique de priorisation des processus a chaque cycle.
+
+    Attributes:
+        name: Nom public sous lequel la politique est enregistree.
+        dynamic: ``True`` si l'ordre depend des stocks courants.
+        observes_launches: ``True`` si ``launched`` doit etre notifie.
+        activity: Compteurs de profilage dont ``sort_invocations`` est
+            incremente a chaque tri effectif, ``None`` hors profilage.
+
+    Contrat:
+        ``precompute`` est appele une fois par simulation; ``sort_key``
+        doit ensuite rester en temps constant par processus.
+    """
+
+    # Pour exposer un nom par defaut avant enregistrement.
+    name = ""
+    # Pour signaler au simulateur qu'un ordre fige peut etre reutilise.
+    dynamic = False
+    # Pour epargner l'appel du hook de demarrage aux politiques sans etat.
+    observes_launches = False
+
+    # Pour isoler __init__ et faciliter son evolution sous tests.
+    def __init__(self) -> None:
+        """Initialise une politique sans configuration associee."""
+        # Pour memoriser les processus a ordonner apres precalcul.
+        self._processes: list[Process] = []
+        # Pour reutiliser l'ordre fige des politiques statiques.
+        self._ordered: list[Process] = []
+        # Pour ne compter les tris que sous profilage.
+        self.activity: SimulatorCounters | None = None
+
+    # Pour isoler precompute et faciliter son evolution sous tests.
+    def precompute(self, config: Config) -> None:
+        """Prepare les donnees de tri et l'ordre initial.
+
+        Parameters:
+            config: Configuration complete deja parsee et validee.
+
+        Returns:
+            ``None``.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            L'ordre initial est calcule sur les stocks de depart et publie
+            dans le journal d'analyse.
+        """
+        # Pour conserver l'ordre de declaration comme base de tri stable.
+        self._processes = list(config.processes.values())
+        # Pour laisser chaque politique preparer ses propres donnees.
+        self._prepare(config)
+        # Pour calculer une seule fois l'ordre des politiques statiques.
+        self._ordered = _logged_order(config, self)
+
+    # Pour isoler _prepare et faciliter son evolution sous tests.
+    def _prepare(self, config: Config) -> None:
+        """Hook de precalcul specifique, vide par defaut."""
+
+    # Pour isoler launched et faciliter son evolution sous tests.
+    def launched(self, proc: Process) -> None:
+        """Hook notifie a chaque demarrage, vide par defaut."""
+
+    # Pour isoler get_state et faciliter son evolution sous tests.
+    def get_state(self) -> object:
+        """Retourne l'etat mutable de la politique sous forme immuable.
+
+        Contrat:
+            Les politiques sans etat rendent ``None``; le resultat doit
+            pouvoir etre partage entre snapshots sans copie.
+        """
+        # Pour signaler qu'aucun etat ne depend de l'execution.
+        return None
+
+    # Pour isoler set_state et faciliter son evolution sous tests.
+    def set_state(self, state: object) -> None:
+        """Restaure un etat rendu par ``get_state``, sans effet par defaut."""
+
+    # Pour isoler sort_key et faciliter son evolution sous tests.
+    def sort_key(self, proc: Process, stocks: dict[str, int]) -> SortKey:
+        """Construit la cle de tri d'un processus.
+
+        Parameters:
+            proc: Processus dont on calcule la priorite.
+            stocks: Stocks courants, utiles aux politiques dynamiques.
+
+        Returns:
+            Tuple ordonnable, les plus petites cles demarrent en premier.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            Le nom du processus termine la cle pour garantir un tie-break
+            deterministe.
+        """
+        # Pour garantir un tie-break deterministic a score equivalent.
+        return (proc.name,)
+
+    # Pour isoler order et faciliter son evolution sous tests.
+    def order(self, stocks: dict[str, int]) -> list[Process]:
+        """Retourne l'ordre de lancement a appliquer au cycle courant.
+
+        Parameters:
+            stocks: Stocks courants du simulateur.
+
+        Returns:
+            Processus dans l'ordre ou ils doivent etre tentes.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            Les politiques statiques renvoient l'ordre precalcule sans tri.
+        """
+        # Pour reutiliser l'ordre fige quand les stocks n'influencent rien.
+        if not self.dynamic:
+            # Pour rendre a l'appelant le resultat promis par le contrat.
+            return self._ordered
+        # Pour compter le tri reellement effectue sous profilage.
+        if self.activity is not None:
+            # Pour cumuler les tris de la simulation profilee.
+            self.activity.sort_invocations += 1
+        # Pour reprioriser a partir des stocks courants.
+        return sorted(self._processes, key=lambda proc: self.sort_key(proc, stocks))
+
+
+# Pour isoler _logged_order et faciliter son evolution sous tests.
+def _logged_order(config: Config, policy: Policy) -> list[Process]:
+    """Trie les processus via ``policy`` en publiant les cles calculees.
+
+    Parameters:
+        config: Configuration complete deja parsee et validee.
+        policy: Politique dont les donnees sont deja preparees.
+
     Returns:
         Liste de processus ordonnee de maniere deterministe.
 
@@ -27,8 +261,8 @@ def order_processes(config: Config) -> list[Process]:
         Aucune exception n'est levee explicitement.
 
     Contrat:
-        A criteres equivalents, l'ordre alphabétique des noms doit rester
-        stable pour eviter des traces non deterministes.
+        Les libelles de journal restent ceux de ``order_processes`` pour ne
+        pas casser les outils d'analyse existants.
     """
     # Pour obtenir le logger d'analyse partage avec la couche CLI.
     analysis_logger = get_active_analysis_logger()
@@ -42,45 +276,16 @@ def order_processes(config: Config) -> list[Process]:
         {
             "optimize": config.optimize or [],
             "process_names": list(config.processes),
+            "policy": policy.name,
         },
         scope=order_scope,
     )
 
     # Pour isoler sort_key et faciliter son evolution sous tests.
-    def sort_key(proc: Process) -> tuple[int | str, ...]:
-        """Construit une cle de tri multi-criteres deterministic.
-
-        Parameters:
-            proc: Processus dont on calcule la priorite.
-
-        Returns:
-            Tuple ordonnable utilise par ``sorted``.
-
-        Raises:
-            Aucune exception n'est levee explicitement.
-
-        Contrat:
-            Chaque critere ajoute dans ``optimize`` doit influencer
-            l'ordre de facon previsible et reproducible.
-        """
-        # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
-        key: list[int | str] = []
-        # Pour appliquer la logique specifique au mode optimisation.
-        if config.optimize:
-            # Pour appliquer uniformement la regle a chaque element concerne.
-            for target in config.optimize:
-                # Pour proteger un invariant de comparaison critique ici.
-                if target == "time":
-                    # Pour prioriser les processus les plus courts.
-                    # Ce choix suit le critere optimize(time).
-                    key.append(proc.delay)
-                # Pour couvrir explicitement le cas complementaire du contrat.
-                else:
-                    # Pour inverser le tri et favoriser les plus gros
-                    # producteurs sur la cible courante.
-                    key.append(-proc.results.get(target, 0))
-        # Pour garantir un tie-break deterministic a score equivalent.
-        key.append(proc.name)
+    def sort_key(proc: Process) -> SortKey:
+        """Calcule puis journalise la cle de tri d'un processus."""
+        # Pour deleguer le calcul a la politique selectionnee.
+        key = policy.sort_key(proc, config.stocks)
         # Pour rendre visible la cle calculee pour chaque processus.
         analysis_logger.log_key_value(
             "SORT_KEY_RESULT",
@@ -88,12 +293,12 @@ def order_processes(config: Config) -> list[Process]:
                 "process_name": proc.name,
                 "delay": proc.delay,
                 "results": proc.results,
-                "key": tuple(key),
+                "key": key,
             },
             scope=key_scope,
         )
         # Pour rendre a l'appelant le resultat promis par le contrat.
-        return tuple(key)
+        return key
 
     # Pour calculer un ordre deterministic selon les regles d'optimisation.
     ordered = sorted(config.processes.values(), key=sort_key)
@@ -105,3 +310,404 @@ def order_processes(config: Config) -> list[Process]:
     )
     # Pour rendre a l'appelant le resultat promis par le contrat.
     return ordered
+
+
+# Pour isoler order_processes et faciliter son evolution sous tests.
+def order_processes(config: Config, policy: str = "default") -> list[Process]:
+    """Retourne les processus tries selon ``config.optimize``.
+
+    Parameters:
+        config: Configuration complete deja parsee et validee.
+        policy: Nom de la politique enregistree a appliquer.
+
+    Returns:
+        Liste de processus ordonnee de maniere deterministe.
+
+    Raises:
+        ValueError:
+            Si ``policy`` n'est pas enregistree.
+
+    Contrat:
+        A criteres equivalents, l'ordre alphabétique des noms doit rester
+        stable pour eviter des traces non deterministes.
+    """
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return get_policy(policy, config).order(config.stocks)
+
+
+# Pour isoler critical_path_lengths et faciliter son evolution sous tests.
+def critical_path_lengths(config: Config) -> dict[str, int]:
+    """Calcule la longueur du plus long chemin aval de chaque processus.
+
+    Parameters:
+        config: Configuration complete deja parsee et validee.
+
+    Returns:
+        Dictionnaire ``nom -> cycles`` cumulant le delai du processus et
+        celui de la plus longue chaine de consommateurs de ses resultats.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Les cycles du graphe (ressources recyclees, jetons) sont coupes a
+        la premiere revisite pour garantir un calcul fini.
+    """
+    # Pour indexer une seule fois les consommateurs de chaque ressource.
+    consumers: dict[str, list[Process]] = {}
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for proc in config.processes.values():
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for name in proc.needs:
+            # Pour relier chaque ressource aux processus qui la consomment.
+            consumers.setdefault(name, []).append(proc)
+    # Pour memoriser les longueurs deja resolues et rester lineaire.
+    lengths: dict[str, int] = {}
+    # Pour couper les cycles sans boucler indefiniment.
+    visiting: set[str] = set()
+
+    # Pour isoler _depth et faciliter son evolution sous tests.
+    def _depth(proc: Process) -> int:
+        """Retourne la profondeur aval memoisee d'un processus."""
+        # Pour reutiliser un resultat deja calcule.
+        if proc.name in lengths:
+            # Pour rendre a l'appelant le resultat promis par le contrat.
+            return lengths[proc.name]
+        # Pour neutraliser une arete retour dans un graphe cyclique.
+        if proc.name in visiting:
+            # Pour rendre a l'appelant le resultat promis par le contrat.
+            return 0
+        # Pour marquer le processus comme en cours d'exploration.
+        visiting.add(proc.name)
+        # Pour retenir la plus longue chaine aval sans supposer de successeur.
+        downstream = 0
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for name in proc.results:
+            # Pour ignorer les jetons rendus a l'identique par le processus.
+            if name in proc.needs:
+                # Pour ignorer ce cas et laisser la boucle traiter les suivants.
+                continue
+            # Pour appliquer uniformement la regle a chaque element concerne.
+            for nxt in consumers.get(name, []):
+                # Pour retenir la plus longue chaine parmi les consommateurs.
+                downstream = max(downstream, _depth(nxt))
+        # Pour liberer le marqueur une fois l'exploration terminee.
+        visiting.discard(proc.name)
+        # Pour memoriser la longueur resolue du processus courant.
+        lengths[proc.name] = proc.delay + downstream
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return lengths[proc.name]
+
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for proc in config.processes.values():
+        # Pour garantir une entree pour chaque processus declare.
+        _depth(proc)
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return lengths
+
+
+# Pour exposer la priorisation historique sous son nom par defaut.
+@register_policy("default")
+# Pour encapsuler DefaultPolicy autour d'un contrat clairement borne.
+class DefaultPolicy(Policy):
+    """Suit les criteres ``optimize`` dans l'ordre de la configuration.
+
+    Contrat:
+        ``time`` favorise les delais courts, toute autre cible favorise
+        les plus gros producteurs directs de cette cible.
+    """
+
+    # Pour isoler _prepare et faciliter son evolution sous tests.
+    def _prepare(self, config: Config) -> None:
+        """Fige la liste ordonnee des criteres d'optimisation."""
+        # Pour eviter de relire la configuration a chaque calcul de cle.
+        self._optimize = list(config.optimize or [])
+
+    # Pour isoler sort_key et faciliter son evolution sous tests.
+    def sort_key(self, proc: Process, stocks: dict[str, int]) -> SortKey:
+        """Construit une cle de tri multi-criteres deterministic."""
+        # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+        key: list[Fraction | int | str] = []
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for target in self._optimize:
+            # Pour proteger un invariant de comparaison critique ici.
+            if target == "time":
+                # Pour prioriser les processus les plus courts.
+                # Ce choix suit le critere optimize(time).
+                key.append(proc.delay)
+            # Pour couvrir explicitement le cas complementaire du contrat.
+            else:
+                # Pour inverser le tri et favoriser les plus gros
+                # producteurs sur la cible courante.
+                key.append(-proc.results.get(target, 0))
+        # Pour garantir un tie-break deterministic a score equivalent.
+        key.append(proc.name)
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return tuple(key)
+
+
+# Pour exposer une priorisation par duree seule.
+@register_policy("delay")
+# Pour encapsuler DelayPolicy autour d'un contrat clairement borne.
+class DelayPolicy(Policy):
+    """Lance d'abord les processus les plus courts."""
+
+    # Pour isoler sort_key et faciliter son evolution sous tests.
+    def sort_key(self, proc: Process, stocks: dict[str, int]) -> SortKey:
+        """Favorise les lancements qui liberent vite leurs resultats."""
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return (proc.delay, proc.name)
+
+
+# Pour exposer une priorisation par rendement direct sur les cibles.
+@register_policy("yield")
+# Pour encapsuler YieldPolicy autour d'un contrat clairement borne.
+class YieldPolicy(Policy):
+    """Lance d'abord les plus gros producteurs directs des cibles."""
+
+    # Pour isoler _prepare et faciliter son evolution sous tests.
+    def _prepare(self, config: Config) -> None:
+        """Fige les cibles hors ``time``."""
+        # Pour limiter les criteres de rendement aux vraies ressources cibles.
+        self._targets = _target_names(config)
+
+    # Pour isoler sort_key et faciliter son evolution sous tests.
+    def sort_key(self, proc: Process, stocks: dict[str, int]) -> SortKey:
+        """Favorise le rendement puis departage par la duree."""
+        # Pour favoriser les plus gros producteurs de chaque cible.
+        key: list[Fraction | int | str] = [
+            -proc.results.get(target, 0) for target in self._targets
+        ]
+        # Pour departager les producteurs equivalents par leur duree.
+        key.extend((proc.delay, proc.name))
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return tuple(key)
+
+
+# Pour exposer un ordre purement alphabetique de reference.
+@register_policy("name")
+# Pour encapsuler NamePolicy autour d'un contrat clairement borne.
+class NamePolicy(Policy):
+    """Lance les processus dans l'ordre alphabetique de leurs noms."""
+
+
+# Pour exposer une priorisation par profondeur de chaine aval.
+@register_policy("critical_path")
+# Pour encapsuler CriticalPathPolicy autour d'un contrat clairement borne.
+class CriticalPathPolicy(Policy):
+    """Lance d'abord les processus qui ouvrent les chaines les plus longues."""
+
+    # Pour isoler _prepare et faciliter son evolution sous tests.
+    def _prepare(self, config: Config) -> None:
+        """Precalcule la profondeur aval de chaque processus."""
+        # Pour ne parcourir le graphe qu'une seule fois par simulation.
+        self._depths = critical_path_lengths(config)
+
+    # Pour isoler sort_key et faciliter son evolution sous tests.
+    def sort_key(self, proc: Process, stocks: dict[str, int]) -> SortKey:
+        """Favorise la plus longue chaine aval."""
+        # Pour inverser le tri et favoriser la plus longue chaine aval.
+        return (-self._depths[proc.name], proc.name)
+
+
+# Pour exposer une priorisation par rendement par cycle sur les cibles.
+@register_policy("yield_per_cycle")
+# Pour encapsuler YieldPerCyclePolicy autour d'un contrat clairement borne.
+class YieldPerCyclePolicy(Policy):
+    """Favorise la quantite de cible produite par cycle de delai."""
+
+    # Pour isoler _prepare et faciliter son evolution sous tests.
+    def _prepare(self, config: Config) -> None:
+        """Precalcule les ratios rendement/delai de chaque processus."""
+        # Pour limiter les criteres de rendement aux vraies ressources cibles.
+        targets = _target_names(config)
+        # Pour figer des ratios exacts et comparables sans flottants.
+        self._ratios = {
+            proc.name: tuple(
+                -Fraction(proc.results.get(target, 0), proc.delay)
+                for target in targets
+            )
+            for proc in config.processes.values()
+        }
+
+    # Pour isoler sort_key et faciliter son evolution sous tests.
+    def sort_key(self, proc: Process, stocks: dict[str, int]) -> SortKey:
+        """Favorise le meilleur rendement par cycle puis le delai."""
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return (*self._ratios[proc.name], proc.delay, proc.name)
+
+
+# Pour exposer une priorisation qui epargne les ressources rares.
+@register_policy("scarcity")
+# Pour encapsuler ScarcityPolicy autour d'un contrat clairement borne.
+class ScarcityPolicy(Policy):
+    """Penalise la consommation des ressources les plus disputees.
+
+    Contrat:
+        La rarete d'une ressource est le rapport entre la demande totale
+        des processus et l'offre (stock initial plus production unitaire).
+    """
+
+    # Pour isoler _prepare et faciliter son evolution sous tests.
+    def _prepare(self, config: Config) -> None:
+        """Precalcule le cout pondere par la rarete de chaque processus."""
+        # Pour cumuler la demande de chaque ressource.
+        demand: dict[str, int] = {}
+        # Pour partir des stocks initiaux comme offre minimale.
+        supply: dict[str, int] = dict(config.stocks)
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for proc in config.processes.values():
+            # Pour appliquer uniformement la regle a chaque element concerne.
+            for name, qty in proc.needs.items():
+                # Pour cumuler la demande sans supposer de cle existante.
+                demand[name] = demand.get(name, 0) + qty
+            # Pour appliquer uniformement la regle a chaque element concerne.
+            for name, qty in proc.results.items():
+                # Pour cumuler l'offre sans supposer de cle existante.
+                supply[name] = supply.get(name, 0) + qty
+        # Pour exprimer la rarete sans division par zero.
+        scarcity = {
+            name: Fraction(qty, supply.get(name, 0) + 1) for name, qty in demand.items()
+        }
+        # Pour limiter les criteres de rendement aux vraies ressources cibles.
+        targets = _target_names(config)
+        # Pour figer une cle par processus et garder un tri en O(1) par cle.
+        self._keys: dict[str, SortKey] = {
+            proc.name: (
+                *(-proc.results.get(target, 0) for target in targets),
+                sum(
+                    (qty * scarcity[name] for name, qty in proc.needs.items()),
+                    Fraction(0),
+                ),
+                proc.name,
+            )
+            for proc in config.processes.values()
+        }
+
+    # Pour isoler sort_key et faciliter son evolution sous tests.
+    def sort_key(self, proc: Process, stocks: dict[str, int]) -> SortKey:
+        """Favorise les cibles puis la consommation la moins rare."""
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return self._keys[proc.name]
+
+
+# Pour exposer une priorisation recalculee a partir des stocks courants.
+@register_policy("dynamic")
+# Pour encapsuler DynamicPolicy autour d'un contrat clairement borne.
+class DynamicPolicy(Policy):
+    """Repriorise a chaque cycle selon la marge de stock des besoins.
+
+    Contrat:
+        A rendement egal sur les cibles, le processus dont le besoin le
+        plus limitant peut etre satisfait le plus de fois demarre d'abord.
+    """
+
+    # Pour signaler au simulateur que l'ordre doit etre recalcule.
+    dynamic = True
+
+    # Pour isoler _prepare et faciliter son evolution sous tests.
+    def _prepare(self, config: Config) -> None:
+        """Precalcule rendements et besoins sous forme de tuples."""
+        # Pour limiter les criteres de rendement aux vraies ressources cibles.
+        targets = _target_names(config)
+        # Pour eviter de recalculer les rendements a chaque cycle.
+        self._yields = {
+            proc.name: tuple(-proc.results.get(target, 0) for target in targets)
+            for proc in config.processes.values()
+        }
+        # Pour parcourir les besoins sans recreer de vues de dictionnaire.
+        self._needs = {
+            proc.name: tuple(proc.needs.items()) for proc in config.processes.values()
+        }
+
+    # Pour isoler sort_key et faciliter son evolution sous tests.
+    def sort_key(self, proc: Process, stocks: dict[str, int]) -> SortKey:
+        """Favorise les cibles puis la plus grande marge de lancement."""
+        # Pour borner la marge par le besoin le plus limitant.
+        headroom = min(
+            (stocks.get(name, 0) // qty for name, qty in self._needs[proc.name]),
+            default=0,
+        )
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return (*self._yields[proc.name], -headroom, proc.name)
+
+
+# Pour exposer une priorisation guidee par la demande remontee des cibles.
+@register_policy("demand")
+# Pour encapsuler DemandPolicy autour d'un contrat clairement borne.
+class DemandPolicy(Policy):
+    """Favorise les processus qui alimentent les cibles dans leurs ratios.
+
+    Contrat:
+        A rendement egal sur les cibles, les processus contributeurs passent
+        avant les autres, puis celui dont la production engagee est la plus
+        en retard sur le ratio requis demarre d'abord.
+    """
+
+    # Pour signaler au simulateur que l'ordre doit etre recalcule.
+    dynamic = True
+    # Pour suivre la production engagee, en cours comprise.
+    observes_launches = True
+
+    # Pour isoler _prepare et faciliter son evolution sous tests.
+    def _prepare(self, config: Config) -> None:
+        """Precalcule la demande et les sorties utiles de chaque processus."""
+        # Pour propager une seule fois la demande depuis les cibles.
+        self.analysis = analyze_demand(config)
+        # Pour limiter les criteres de rendement aux vraies ressources cibles.
+        targets = _target_names(config)
+        # Pour figer la partie statique de la cle de chaque processus.
+        self._static: dict[str, SortKey] = {
+            proc.name: (
+                *(-proc.results.get(target, 0) for target in targets),
+                0 if self.analysis.contributes(proc.name) else 1,
+            )
+            for proc in config.processes.values()
+        }
+        # Pour ne parcourir a chaque cycle que les sorties demandees.
+        self._outputs = {
+            proc.name: tuple(
+                (name, ratio)
+                for name in proc.results
+                if (ratio := self.analysis.required_ratio(name))
+            )
+            for proc in config.processes.values()
+        }
+        # Pour cumuler la production engagee depuis le debut du run.
+        self._committed: dict[str, int] = {}
+
+    # Pour isoler launched et faciliter son evolution sous tests.
+    def launched(self, proc: Process) -> None:
+        """Cumule les sorties demandees d'un processus qui demarre."""
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for name, _ in self._outputs[proc.name]:
+            # Pour compter la production des son engagement.
+            self._committed[name] = (
+                self._committed.get(name, 0) + proc.results[name]
+            )
+
+    # Pour isoler get_state et faciliter son evolution sous tests.
+    def get_state(self) -> object:
+        """Fige la production engagee pour un snapshot."""
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return tuple(self._committed.items())
+
+    # Pour isoler set_state et faciliter son evolution sous tests.
+    def set_state(self, state: object) -> None:
+        """Restaure la production engagee depuis un snapshot."""
+        # Pour recreer un compteur propre a ce simulateur.
+        self._committed = dict(cast(tuple[tuple[str, int], ...], state))
+
+    # Pour isoler sort_key et faciliter son evolution sous tests.
+    def sort_key(self, proc: Process, stocks: dict[str, int]) -> SortKey:
+        """Favorise les cibles puis la sortie la moins engagee."""
+        # Pour mesurer la production engagee en unites de cible.
+        coverage = min(
+            (
+                Fraction(self._committed.get(name, 0)) / ratio
+                for name, ratio in self._outputs[proc.name]
+            ),
+            default=Fraction(0),
+        )
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return (*self._static[proc.name], coverage, proc.name)
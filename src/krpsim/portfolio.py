@@ -0,0 +1,223 @@
+"""Portfolio de strategies d'ordonnancement executees en parallele.
+
+Ce module lance plusieurs variantes de priorisation sur la meme
+configuration et conserve l'execution au meilleur score lexicographique
+selon ``optimize``.
+"""
+
+# Pour retarder l'evaluation des types et limiter les cycles.
+from __future__ import annotations
+
+# Pour repartir les variantes sur plusieurs coeurs CPU.
+from concurrent.futures import ProcessPoolExecutor
+# Pour formaliser des contrats de donnees clairs et compacts.
+from dataclasses import dataclass
+
+# Pour limiter le couplage aux composants internes necessaires.
+from .optimizer import policy_names
+# Pour limiter le couplage aux composants internes necessaires.
+from .parser import Config
+# Pour limiter le couplage aux composants internes necessaires.
+from .simulator import Simulator
+
+# Pour partager la configuration parsee une seule fois par worker.
+_WORKER_CONFIG: Config | None = None
+
+
+# Pour fiabiliser les objets metier via un schema declaratif.
+@dataclass
+# Pour encapsuler PortfolioResult autour d'un contrat clairement borne.
+class PortfolioResult:
+    """Resume transportable d'une execution de strategie.
+
+    Attributes:
+        strategy: Variante de priorisation executee.
+        trace: Trace ordonnee des demarrages ``(cycle, process_name)``.
+        stocks: Stocks finaux de l'execution.
+        time: Horloge finale du simulateur.
+        deadlock: Drapeau de blocage calcule par le simulateur.
+        score: Score lexicographique, plus grand est meilleur.
+
+    Contrat:
+        L'objet reste leger pour limiter le cout de serialisation entre
+        processus.
+    """
+
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    strategy: str
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    trace: list[tuple[int, str]]
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    stocks: dict[str, int]
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    time: int
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    deadlock: bool
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    score: tuple[int, ...]
+
+
+# Pour isoler score_simulation et faciliter son evolution sous tests.
+def score_simulation(
+    optimize: list[str] | None, stocks: dict[str, int], time: int, launches: int
+) -> tuple[int, ...]:
+    """Calcule le score lexicographique d'une execution.
+
+    Parameters:
+        optimize: Criteres d'optimisation de la configuration.
+        stocks: Stocks finaux de l'execution.
+        time: Horloge finale de l'execution.
+        launches: Nombre de processus lances par l'execution.
+
+    Returns:
+        Tuple comparable ou une valeur plus grande designe un meilleur run.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Une execution sans lancement, donc bloquee des le depart, est
+        classee apres toute execution qui a progresse. Ensuite ``time``
+        est minimise (valeur negee), toute autre cible est maximisee, dans
+        l'ordre de la ligne ``optimize``.
+    """
+    # Pour qu'un blocage immediat ne gagne pas par son horloge nulle.
+    score: list[int] = [int(launches > 0)]
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for target in optimize or []:
+        # Pour proteger un invariant de comparaison critique ici.
+        if target == "time":
+            # Pour favoriser les executions qui convergent le plus tot.
+            score.append(-time)
+        # Pour couvrir explicitement le cas complementaire du contrat.
+        else:
+            # Pour favoriser les executions qui produisent le plus la cible.
+            score.append(stocks.get(target, 0))
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return tuple(score)
+
+
+# Pour isoler _init_worker et faciliter son evolution sous tests.
+def _init_worker(config: Config) -> None:
+    """Installe la configuration partagee dans le worker courant."""
+    # Pour eviter de re-serialiser la configuration a chaque tache.
+    global _WORKER_CONFIG
+    # Pour conserver la configuration pour toutes les taches du worker.
+    _WORKER_CONFIG = config
+
+
+# Pour isoler _run_strategy et faciliter son evolution sous tests.
+def _run_strategy(strategy: str, max_time: int) -> PortfolioResult:
+    """Execute une variante sur la configuration installee dans le worker.
+
+    Parameters:
+        strategy: Variante de priorisation a simuler.
+        max_time: Borne temporelle transmise a ``Simulator.run``.
+
+    Returns:
+        Resume de l'execution pour comparaison dans le processus parent.
+
+    Raises:
+        RuntimeError:
+            Si le worker n'a pas ete initialise avec une configuration.
+
+    Contrat:
+        Chaque variante part d'un simulateur neuf pour rester independante.
+    """
+    # Pour echouer explicitement sur un worker mal initialise.
+    if _WORKER_CONFIG is None:
+        # Pour signaler sans delai une violation explicite du contrat.
+        raise RuntimeError("portfolio worker is not initialized")
+    # Pour executer la logique metier via l'implementation de reference.
+    sim = Simulator(_WORKER_CONFIG, policy=strategy)
+    # Pour produire l'etat de reference a partir du moteur unique.
+    trace = sim.run(max_time)
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return PortfolioResult(
+        strategy=strategy,
+        trace=trace,
+        stocks=sim.stocks,
+        time=sim.time,
+        deadlock=sim.deadlock,
+        score=score_simulation(
+            _WORKER_CONFIG.optimize, sim.stocks, sim.time, len(trace)
+        ),
+    )
+
+
+# Pour isoler run_portfolio et faciliter son evolution sous tests.
+def run_portfolio(
+    config: Config,
+    max_time: int,
+    strategies: tuple[str, ...] | None = None,
+    workers: int | None = None,
+) -> tuple[Simulator, PortfolioResult]:
+    """Execute plusieurs variantes et retient la meilleure.
+
+    Parameters:
+        config: Configuration validee a simuler.
+        max_time: Borne temporelle commune a toutes les variantes.
+        strategies: Politiques a comparer, dans l'ordre de preference;
+            ``None`` compare toutes les politiques enregistrees.
+        workers: Nombre de processus du pool; ``1`` execute en local.
+
+    Returns:
+        Tuple ``(simulateur, resultat)`` ou le simulateur porte l'etat final
+        de la variante gagnante.
+
+    Raises:
+        ValueError:
+            Si aucune variante n'est fournie ou si une variante est inconnue.
+
+    Contrat:
+        A score egal, la premiere variante de ``strategies`` l'emporte pour
+        garder une trace deterministe quel que soit l'ordre de completion.
+    """
+    # Pour comparer par defaut toutes les politiques disponibles.
+    if strategies is None:
+        # Pour figer la liste au moment de l'appel, extensions comprises.
+        strategies = policy_names()
+    # Pour refuser un portfolio vide qui n'aurait aucun gagnant.
+    if not strategies:
+        # Pour signaler sans delai une violation explicite du contrat.
+        raise ValueError("portfolio needs at least one strategy")
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for strategy in strategies:
+        # Pour echouer avant de lancer des workers couteux.
+        if strategy not in policy_names():
+            # Pour signaler sans delai une violation explicite du contrat.
+            raise ValueError(f"unknown policy '{strategy}'")
+    # Pour eviter le cout du pool quand un seul worker est demande.
+    if workers == 1:
+        # Pour reutiliser exactement le chemin d'execution des workers.
+        _init_worker(config)
+        # Pour executer sequentiellement chaque variante.
+        results = [_run_strategy(s, max_time) for s in strategies]
+    # Pour couvrir explicitement le cas complementaire du contrat.
+    else:
+        # Pour garantir la fermeture du pool meme en cas d'erreur.
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(config,),
+        ) as pool:
+            # Pour conserver l'ordre des variantes independamment des workers.
+            results = list(
+                pool.map(_run_strategy, strategies, [max_time] * len(strategies))
+            )
+    # Pour retenir le premier meilleur score et garder un tie-break stable.
+    best = max(results, key=lambda result: result.score)
+    # Pour reconstruire un simulateur exploitable par l'affichage CLI.
+    sim = Simulator(config, policy=best.strategy)
+    # Pour exposer l'etat final coherent avec la trace retenue.
+    sim.stocks = best.stocks
+    # Pour publier la trace gagnante comme resultat officiel.
+    sim.trace = best.trace
+    # Pour aligner l'horloge finale sur l'execution retenue.
+    sim.time = best.time
+    # Pour conserver le diagnostic de blocage de la variante gagnante.
+    sim.deadlock = best.deadlock
+    # Pour conserver la borne effectivement appliquee.
+    sim.max_time = max_time
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return sim, best
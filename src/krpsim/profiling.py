@@ -0,0 +1,221 @@
+"""Instrumentation par phase d'une execution de la CLI.
+
+``krpsim --profile`` chronometre chaque phase (parsing, ordonnancement,
+boucle de simulation, formatage et ecriture de la trace), releve le pic
+memoire ``tracemalloc`` de chacune et publie l'activite du simulateur. Les
+compteurs sont tenus par le simulateur construit avec
+``count_activity=True``; hors profilage, ils ne sont pas alloues.
+"""
+
+# Pour retarder l'evaluation des types et limiter les cycles.
+from __future__ import annotations
+
+# Pour produire des donnees exploitables par ``pstats`` et snakeviz.
+import cProfile
+# Pour mesurer le pic memoire propre a chaque phase.
+import tracemalloc
+# Pour chronometrer chaque phase avec une horloge monotone.
+import time
+# Pour delimiter une phase par un bloc ``with``.
+from contextlib import contextmanager
+# Pour formaliser des contrats de donnees clairs et compacts.
+from dataclasses import dataclass
+# Pour garder des signatures stables sur les collections.
+from typing import Any, Iterator
+
+# Pour limiter le couplage aux composants internes necessaires.
+from .simulator import Simulator
+
+
+# Pour fiabiliser les objets metier via un schema declaratif.
+@dataclass
+# Pour encapsuler SimulatorCounters autour d'un contrat clairement borne.
+class SimulatorCounters:
+    """Compteurs d'activite d'un simulateur construit avec ``count_activity``.
+
+    Attributes:
+        cycles: Appels a ``step``.
+        feasibility_checks: Tests ``stocks >= besoins`` effectues, apres
+            les filtres d'horizon et de plafonnement.
+        sort_invocations: Tris effectifs d'une politique dynamique.
+
+    Contrat:
+        Une branche ``fork`` repart d'une copie et ne cumule pas chez
+        l'original.
+    """
+
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    cycles: int = 0
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    feasibility_checks: int = 0
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    sort_invocations: int = 0
+
+
+# Pour encapsuler Profiler autour d'un contrat clairement borne.
+class Profiler:
+    """Collecteur de mesures par phase, inerte s'il est desactive.
+
+    Parameters:
+        enabled: Active chronometres, ``tracemalloc`` et compteurs.
+        cprofile_path: Fichier ``.pstats`` de la phase ``step_loop``.
+
+    Contrat:
+        Desactive, ``phase`` ne mesure rien; les compteurs sont lus sur le
+        simulateur par ``report``.
+    """
+
+    # Pour isoler __init__ et faciliter son evolution sous tests.
+    def __init__(self, enabled: bool = False, cprofile_path: str | None = None):
+        """Prepare un collecteur vide.
+
+        Parameters:
+            enabled: Active chronometres, ``tracemalloc`` et compteurs.
+            cprofile_path: Fichier ``.pstats`` de la phase ``step_loop``.
+
+        Returns:
+            ``None``.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            ``tracemalloc`` n'est demarre qu'a la premiere phase mesuree.
+        """
+        # Pour ne rien mesurer hors profilage.
+        self.enabled = enabled
+        # Pour ne lancer cProfile que sur demande explicite.
+        self.cprofile_path = cprofile_path
+        # Pour conserver les mesures dans l'ordre d'execution.
+        self.phases: dict[str, dict[str, float | int]] = {}
+        # Pour arreter tracemalloc seulement s'il a ete demarre ici.
+        self._owns_tracemalloc = False
+
+    # Pour isoler phase et faciliter son evolution sous tests.
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Mesure duree murale et pic memoire du bloc ``with``.
+
+        Le pic est compte au-dessus de la memoire deja retenue a l'entree
+        de la phase.
+
+        Parameters:
+            name: Nom de la phase; une phase repetee cumule sa duree et
+                garde le plus haut pic.
+
+        Returns:
+            Gestionnaire de contexte sans valeur.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            La phase ``step_loop`` est aussi profilee par cProfile quand
+            ``cprofile_path`` est fourni, meme sans ``enabled``.
+        """
+        # Pour figer la destination du profil avant le bloc mesure.
+        cprofile_path = self.cprofile_path
+        # Pour profiler la seule boucle de simulation sur demande.
+        profile = (
+            cProfile.Profile()
+            if cprofile_path is not None and name == "step_loop"
+            else None
+        )
+        # Pour ne rien mesurer hors profilage.
+        if not self.enabled and profile is None:
+            # Pour executer le bloc sans surcout.
+            yield
+            # Pour rendre a l'appelant le resultat promis par le contrat.
+            return
+        # Pour demarrer le suivi memoire a la premiere phase mesuree.
+        if self.enabled and not tracemalloc.is_tracing():
+            # Pour suivre les allocations Python de toutes les phases.
+            tracemalloc.start()
+            # Pour arreter le suivi a la fin du rapport.
+            self._owns_tracemalloc = True
+        # Pour ne compter que les allocations propres a la phase.
+        baseline = 0
+        # Pour isoler le pic de cette phase des precedentes.
+        if self.enabled:
+            # Pour repartir du niveau courant d'allocations.
+            tracemalloc.reset_peak()
+            # Pour retrancher la memoire deja retenue par les phases passees.
+            baseline = tracemalloc.get_traced_memory()[0]
+        # Pour dater le debut de la phase.
+        start = time.perf_counter()
+        # Pour enregistrer la phase meme si le bloc echoue.
+        try:
+            # Pour activer cProfile sur le seul bloc demande.
+            if profile is not None:
+                # Pour profiler la boucle de simulation.
+                profile.enable()
+            # Pour executer le bloc mesure.
+            yield
+        # Pour consigner les mesures en toute circonstance.
+        finally:
+            # Pour figer la duree avant tout travail de consignation.
+            wall = time.perf_counter() - start
+            # Pour arreter et publier le profil cProfile.
+            if profile is not None and cprofile_path is not None:
+                # Pour ne plus profiler au-dela de la phase.
+                profile.disable()
+                # Pour ecrire un fichier lisible par ``pstats``.
+                profile.dump_stats(cprofile_path)
+            # Pour ne consigner que si le profilage est actif.
+            if self.enabled:
+                # Pour lire le pic d'allocations de la phase.
+                peak = tracemalloc.get_traced_memory()[1] - baseline
+                # Pour cumuler une phase executee plusieurs fois.
+                entry = self.phases.setdefault(name, {"wall_s": 0.0, "peak_bytes": 0})
+                # Pour cumuler la duree murale.
+                entry["wall_s"] += wall
+                # Pour garder le plus haut pic observe.
+                entry["peak_bytes"] = max(entry["peak_bytes"], peak)
+
+    # Pour isoler report et faciliter son evolution sous tests.
+    def report(self, sim: Simulator) -> dict[str, Any]:
+        """Construit le rapport JSON du profilage.
+
+        Parameters:
+            sim: Simulateur dont la trace est publiee.
+
+        Returns:
+            ``{"phases": ..., "total_wall_s": ..., "counters": ...}``.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            Les compteurs sans mesure fiable valent ``None``: activite
+            d'un simulateur construit sans ``count_activity`` (portfolio,
+            horizon adaptatif, fusion), examens et tris du moteur
+            ``codegen``.
+        """
+        # Pour ne fournir que les compteurs tenus par ce simulateur.
+        activity = sim.activity
+        # Pour ne pas annoncer d'examens que le code genere ne compte pas.
+        interpreted = activity if sim._start_fn is None else None
+        # Pour compter les lancements a partir de la trace publiee.
+        launches = sim.trace_length
+        # Pour arreter le suivi memoire demarre par ce collecteur.
+        if self._owns_tracemalloc:
+            # Pour ne pas ralentir la suite du processus.
+            tracemalloc.stop()
+            # Pour ne l'arreter qu'une seule fois.
+            self._owns_tracemalloc = False
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return {
+            "phases": self.phases,
+            "total_wall_s": sum(float(p["wall_s"]) for p in self.phases.values()),
+            "counters": {
+                "cycles": activity.cycles if activity is not None else None,
+                "feasibility_checks": (
+                    interpreted.feasibility_checks if interpreted is not None else None
+                ),
+                "sort_invocations": (
+                    interpreted.sort_invocations if interpreted is not None else None
+                ),
+                "launches": launches,
+                "completions": launches - len(sim._running),
+            },
+        }
@@ -0,0 +1,264 @@
+"""Enregistrement des niveaux de stock au fil de la simulation.
+
+Le simulateur ne garde que les stocks finaux. Avec ``record_stocks=True``,
+chaque debit et chaque credit ajoute un triplet ``(cycle, ressource,
+delta)`` a trois tableaux ``array``: la memoire suit le nombre de
+variations de stock, pas ``cycles x ressources``. La serie d'une ressource
+est reconstruite a la demande par cumul des deltas.
+"""
+
+# Pour retarder l'evaluation des types et limiter les cycles.
+from __future__ import annotations
+
+# Pour retrouver le niveau en vigueur a un instant donne.
+import bisect
+# Pour deleguer l'echappement CSV au module standard.
+import csv
+# Pour garder des colonnes compactes, sans un objet Python par variation.
+from array import array
+# Pour garder des signatures stables sur les flux et collections.
+from typing import TYPE_CHECKING, Iterator, TextIO
+
+# Pour limiter le couplage aux composants internes necessaires.
+from .parser import Config
+
+# Pour typer le DataFrame sans importer pandas a l'execution.
+if TYPE_CHECKING:
+    # Pour exposer le type de retour de ``to_dataframe`` aux outils.
+    import pandas as pd
+
+# Pour nommer les colonnes communes au CSV et au DataFrame.
+COLUMNS = ("time", "resource", "delta", "level")
+
+
+# Pour encapsuler StockRecorder autour d'un contrat clairement borne.
+class StockRecorder:
+    """Journal des variations de stock encode en deltas.
+
+    Parameters:
+        config: Configuration simulee, qui fixe les niveaux initiaux.
+
+    Contrat:
+        Les deltas sont conserves dans l'ordre ou le simulateur les
+        applique; un debit et un credit d'un meme cycle restent deux
+        entrees distinctes.
+    """
+
+    # Pour isoler __init__ et faciliter son evolution sous tests.
+    def __init__(self, config: Config):
+        """Indexe les ressources et prepare des colonnes vides.
+
+        Parameters:
+            config: Configuration simulee.
+
+        Returns:
+            ``None``.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            Une ressource absente des stocks initiaux part de zero.
+        """
+        # Pour indexer les ressources dans un ordre stable.
+        self.resources = tuple(sorted(config.all_stock_names()))
+        # Pour retrouver en O(1) l'identifiant d'une ressource.
+        self._index = {name: i for i, name in enumerate(self.resources)}
+        # Pour reconstruire chaque serie a partir de son niveau initial.
+        self.initial = array("q", (config.stocks.get(r, 0) for r in self.resources))
+        # Pour dater chaque variation.
+        self.times = array("q")
+        # Pour designer la ressource de chaque variation.
+        self.ids = array("I")
+        # Pour conserver la quantite signee de chaque variation.
+        self.deltas = array("q")
+
+    # Pour isoler __copy__ et faciliter son evolution sous tests.
+    def __copy__(self) -> StockRecorder:
+        """Duplique le journal pour une branche ``Simulator.fork``."""
+        # Pour partager les index immuables sans rappeler le constructeur.
+        clone = object.__new__(StockRecorder)
+        # Pour reprendre index et colonnes de l'original.
+        clone.__dict__.update(self.__dict__)
+        # Pour isoler les colonnes mutables de la branche.
+        clone.times = array("q", self.times)
+        # Pour isoler les colonnes mutables de la branche.
+        clone.ids = array("I", self.ids)
+        # Pour isoler les colonnes mutables de la branche.
+        clone.deltas = array("q", self.deltas)
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return clone
+
+    # Pour isoler __len__ et faciliter son evolution sous tests.
+    def __len__(self) -> int:
+        """Retourne le nombre de variations enregistrees."""
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return len(self.deltas)
+
+    # Pour isoler record et faciliter son evolution sous tests.
+    def record(self, time: int, quantities: dict[str, int], sign: int) -> None:
+        """Ajoute les variations d'un debit (``-1``) ou d'un credit (``1``)."""
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for name, qty in quantities.items():
+            # Pour dater la variation.
+            self.times.append(time)
+            # Pour designer la ressource touchee.
+            self.ids.append(self._index[name])
+            # Pour conserver la quantite signee.
+            self.deltas.append(sign * qty)
+
+    # Pour isoler _changes et faciliter son evolution sous tests.
+    def _changes(self, resource: str) -> Iterator[tuple[int, int, int]]:
+        """Produit ``(cycle, delta, niveau)`` pour chaque variation."""
+        # Pour refuser une ressource inconnue avec un message explicite.
+        if resource not in self._index:
+            # Pour signaler sans delai une violation explicite du contrat.
+            raise KeyError(f"unknown resource '{resource}'")
+        # Pour filtrer les variations de la ressource.
+        rid = self._index[resource]
+        # Pour cumuler les deltas depuis le niveau initial.
+        level = self.initial[rid]
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for time, ident, delta in zip(self.times, self.ids, self.deltas):
+            # Pour ne cumuler que la ressource demandee.
+            if ident == rid:
+                # Pour appliquer la variation.
+                level += delta
+                # Pour publier le niveau atteint.
+                yield time, delta, level
+
+    # Pour isoler series et faciliter son evolution sous tests.
+    def series(self, resource: str) -> list[tuple[int, int]]:
+        """Reconstruit la serie en escalier d'une ressource.
+
+        Parameters:
+            resource: Ressource a reconstruire.
+
+        Returns:
+            Points ``(cycle, niveau)``: le niveau initial au cycle ``0``
+            puis le niveau en fin de chaque cycle ou il a change.
+
+        Raises:
+            KeyError:
+                Si la ressource n'existe pas dans la configuration.
+
+        Contrat:
+            Les variations d'un meme cycle sont agregees; un cycle dont le
+            solde est nul n'ajoute pas de point.
+        """
+        # Pour partir du niveau initial de la ressource.
+        points = [(0, self.initial[self._index[resource]])]
+        # Pour agreger les variations cycle par cycle.
+        for time, _, level in self._changes(resource):
+            # Pour remplacer le niveau d'un cycle deja ouvert.
+            if points[-1][0] == time and len(points) > 1:
+                # Pour garder le niveau en fin de cycle.
+                points[-1] = (time, level)
+            # Pour couvrir explicitement le cas complementaire du contrat.
+            else:
+                # Pour ouvrir un nouveau cycle.
+                points.append((time, level))
+            # Pour ignorer un cycle qui revient au niveau precedent.
+            if len(points) > 1 and points[-1][1] == points[-2][1]:
+                # Pour ne pas publier de palier sans changement.
+                points.pop()
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return points
+
+    # Pour isoler downsample et faciliter son evolution sous tests.
+    def downsample(
+        self, resource: str, points: int, until: int | None = None
+    ) -> list[tuple[int, int]]:
+        """Echantillonne la serie a intervalles reguliers pour un graphique.
+
+        Parameters:
+            resource: Ressource a echantillonner.
+            points: Nombre maximal d'echantillons, au moins ``2``.
+            until: Dernier cycle couvert, dernier changement par defaut.
+
+        Returns:
+            Points ``(cycle, niveau)`` du cycle ``0`` a ``until`` inclus.
+
+        Raises:
+            ValueError:
+                Si ``points`` est inferieur a ``2``.
+            KeyError:
+                Si la ressource n'existe pas dans la configuration.
+
+        Contrat:
+            Chaque niveau est celui en vigueur en fin du cycle echantillonne;
+            les cycles sont distincts et croissants.
+        """
+        # Pour garantir au moins le debut et la fin de la plage.
+        if points < 2:
+            # Pour signaler sans delai une violation explicite du contrat.
+            raise ValueError("points must be at least 2")
+        # Pour lire la serie exacte une seule fois.
+        exact = self.series(resource)
+        # Pour separer les cycles de changement pour la recherche binaire.
+        times = [time for time, _ in exact]
+        # Pour couvrir la simulation jusqu'au dernier changement par defaut.
+        end = times[-1] if until is None else until
+        # Pour repartir les echantillons sans doublon de cycle.
+        samples = sorted({end * i // (points - 1) for i in range(points)})
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return [
+            (time, exact[bisect.bisect_right(times, time) - 1][1]) for time in samples
+        ]
+
+    # Pour isoler rows et faciliter son evolution sous tests.
+    def rows(self) -> Iterator[tuple[int, str, int, int]]:
+        """Produit ``(cycle, ressource, delta, niveau)`` par variation."""
+        # Pour suivre le niveau courant de chaque ressource.
+        levels = list(self.initial)
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for time, ident, delta in zip(self.times, self.ids, self.deltas):
+            # Pour appliquer la variation.
+            levels[ident] += delta
+            # Pour publier la variation et le niveau atteint.
+            yield time, self.resources[ident], delta, levels[ident]
+
+    # Pour isoler write_csv et faciliter son evolution sous tests.
+    def write_csv(self, out: TextIO) -> None:
+        """Ecrit une ligne ``time,resource,delta,level`` par variation.
+
+        Parameters:
+            out: Flux texte de destination.
+
+        Returns:
+            ``None``.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            Les lignes suivent l'ordre d'application des variations.
+        """
+        # Pour deleguer l'echappement au module standard.
+        writer = csv.writer(out, lineterminator="\n")
+        # Pour nommer chaque colonne du fichier produit.
+        writer.writerow(COLUMNS)
+        # Pour ecrire toutes les variations en flux.
+        writer.writerows(self.rows())
+
+    # Pour isoler to_dataframe et faciliter son evolution sous tests.
+    def to_dataframe(self) -> pd.DataFrame:
+        """Convertit le journal en ``pandas.DataFrame``.
+
+        Returns:
+            Tableau avec les colonnes de ``write_csv``.
+
+        Raises:
+            ModuleNotFoundError:
+                Si ``pandas`` n'est pas installe.
+
+        Contrat:
+            ``pandas`` n'est importe qu'a l'appel; un
+            ``pivot_table(index="time", columns="resource", values="level",
+            aggfunc="last")`` donne la vue large par cycle.
+        """
+        # Pour ne payer l'import de pandas que sur demande.
+        import pandas as pd
+
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return pd.DataFrame(list(self.rows()), columns=list(COLUMNS))
@@ -0,0 +1,457 @@
+"""Serveur ``krpsim`` persistant sur une socket Unix locale.
+
+Pour les petites configurations, le demarrage d'un interpreteur coute plus
+que la simulation. ``krpsim serve`` garde des workers deja initialises et
+leur confie des requetes JSON d'une ligne; le client ``krpsim --connect``
+(``src/krpsim/client.py``) reproduit a l'identique la sortie et le code
+retour de la CLI.
+
+Protocole, une ligne JSON par requete puis par reponse::
+
+    {"argv": [...], "cwd": "..."}
+    {"config": "chemin" | "config_text": "...", "delay": 10,
+     "options": ["--policy", "delay"], "cwd": "..."}
+    -> {"exit_code": 0, "stdout": "...", "stderr": "..."}
+"""
+
+# Pour retarder l'evaluation des types et limiter les cycles.
+from __future__ import annotations
+
+# Pour encoder requetes et reponses sans format maison.
+import json
+# Pour executer chaque requete depuis le repertoire du client.
+import os
+# Pour joindre le serveur depuis le client.
+import socket
+# Pour accepter les clients en parallele du pool de workers.
+import socketserver
+# Pour ecrire un message d'arret sur la sortie d'erreur capturee.
+import sys
+# Pour materialiser une configuration transmise en texte.
+import tempfile
+# Pour restituer une erreur inattendue comme l'interpreteur.
+import traceback
+# Pour borner le cache en evincant la configuration la moins recente.
+from collections import OrderedDict
+# Pour executer les simulations hors des threads de connexion.
+from concurrent.futures import ProcessPoolExecutor
+# Pour capturer la sortie exacte de la CLI dans le worker.
+from contextlib import redirect_stderr, redirect_stdout
+# Pour accumuler la sortie capturee en memoire.
+from io import StringIO
+# Pour eviter les chemins fragiles relies aux separateurs OS.
+from pathlib import Path
+# Pour garder des signatures stables sur les messages JSON.
+from typing import Any
+
+# Pour limiter le couplage aux composants internes necessaires.
+from . import cli
+# Pour limiter le couplage aux composants internes necessaires.
+from . import parser as parser_mod
+# Pour limiter le couplage aux composants internes necessaires.
+from .parser import Config
+
+# Pour borner la memoire du cache de chaque worker.
+DEFAULT_CACHE_SIZE = 64
+# Pour refuser les commandes qui n'ont pas de sens dans un worker.
+_SERVER_COMMANDS = ("serve", "--connect", "--startup-report")
+
+
+# Pour encapsuler ConfigCache autour d'un contrat clairement borne.
+class ConfigCache:
+    """Cache LRU des configurations parsees, indexe par contenu.
+
+    Parameters:
+        maxsize: Nombre maximal de configurations conservees.
+
+    Contrat:
+        La cle est le contenu brut du fichier: une configuration modifiee
+        est reparsee, une copie identique sous un autre chemin ne l'est pas.
+        Les erreurs de parsing ne sont jamais mises en cache.
+    """
+
+    # Pour isoler __init__ et faciliter son evolution sous tests.
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        """Initialise un cache vide.
+
+        Parameters:
+            maxsize: Nombre maximal de configurations conservees.
+
+        Returns:
+            ``None``.
+
+        Raises:
+            ValueError:
+                Si ``maxsize`` n'est pas strictement positif.
+
+        Contrat:
+            Les compteurs ``hits`` et ``misses`` partent de zero.
+        """
+        # Pour refuser un cache qui evincerait chaque entree aussitot.
+        if maxsize <= 0:
+            # Pour signaler sans delai une violation explicite du contrat.
+            raise ValueError("cache size must be a positive integer")
+        # Pour conserver la borne d'eviction.
+        self.maxsize = maxsize
+        # Pour ordonner les entrees de la moins a la plus recente.
+        self._entries: OrderedDict[bytes, Config] = OrderedDict()
+        # Pour mesurer l'efficacite du cache.
+        self.hits = 0
+        # Pour mesurer l'efficacite du cache.
+        self.misses = 0
+
+    # Pour isoler __len__ et faciliter son evolution sous tests.
+    def __len__(self) -> int:
+        """Retourne le nombre de configurations en cache."""
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return len(self._entries)
+
+    # Pour isoler load et faciliter son evolution sous tests.
+    def load(self, path: Path) -> Config:
+        """Retourne la configuration de ``path``, parsee au plus une fois.
+
+        Parameters:
+            path: Chemin du fichier de configuration.
+
+        Returns:
+            Configuration parsee.
+
+        Raises:
+            ParseError:
+                Propagee depuis ``parser.parse_file`` si le fichier est
+                invalide.
+
+        Contrat:
+            Meme comportement observable que ``parser.parse_file``.
+        """
+        # Pour deleguer au parser les diagnostics de chemin et d'acces.
+        try:
+            # Pour indexer la configuration par son contenu exact.
+            key = path.read_bytes()
+        # Pour reproduire les messages d'erreur du parsing direct.
+        except OSError:
+            # Pour rendre a l'appelant le resultat promis par le contrat.
+            return parser_mod.parse_file(path)
+        # Pour reprendre une configuration deja parsee.
+        config = self._entries.get(key)
+        # Pour servir la configuration sans reparsing.
+        if config is not None:
+            # Pour marquer l'entree comme la plus recente.
+            self._entries.move_to_end(key)
+            # Pour comptabiliser le succes du cache.
+            self.hits += 1
+            # Pour rendre a l'appelant le resultat promis par le contrat.
+            return config
+        # Pour valider le contenu avec le parser canonique.
+        config = parser_mod.parse_file(path)
+        # Pour comptabiliser le parsing effectif.
+        self.misses += 1
+        # Pour memoriser la configuration validee.
+        self._entries[key] = config
+        # Pour respecter la borne en evincant la plus ancienne.
+        if len(self._entries) > self.maxsize:
+            # Pour liberer l'entree la moins recemment utilisee.
+            self._entries.popitem(last=False)
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return config
+
+
+# Pour isoler request_argv et faciliter son evolution sous tests.
+def request_argv(request: dict[str, Any]) -> list[str]:
+    """Traduit une requete en arguments de la CLI.
+
+    Parameters:
+        request: Requete decodee, forme ``argv`` ou forme structuree.
+
+    Returns:
+        Arguments a transmettre a ``cli.main``; le chemin de configuration
+        d'une requete ``config_text`` vaut ``"-"`` en attendant d'etre
+        materialise.
+
+    Raises:
+        ValueError:
+            Si la requete est incomplete, mal typee ou vise une commande
+            reservee au processus client.
+
+    Contrat:
+        Les deux formes produisent exactement les arguments de la CLI.
+    """
+    # Pour accepter telle quelle la ligne de commande du client.
+    if "argv" in request:
+        # Pour relire les arguments transmis.
+        argv = request["argv"]
+    # Pour construire la ligne de commande depuis la forme structuree.
+    else:
+        # Pour exiger exactement une source de configuration.
+        if ("config" in request) == ("config_text" in request):
+            # Pour signaler sans delai une violation explicite du contrat.
+            raise ValueError("request needs exactly one of 'config', 'config_text'")
+        # Pour exiger un horizon entier comme la CLI.
+        if not isinstance(request.get("delay"), int):
+            # Pour signaler sans delai une violation explicite du contrat.
+            raise ValueError("request needs an integer 'delay'")
+        # Pour reserver un emplacement au fichier temporaire.
+        config = request.get("config", "-")
+        # Pour assembler la ligne de commande equivalente.
+        argv = [config, str(request["delay"]), *request.get("options", [])]
+    # Pour refuser des arguments non textuels.
+    if not isinstance(argv, list) or not all(isinstance(a, str) for a in argv):
+        # Pour signaler sans delai une violation explicite du contrat.
+        raise ValueError("request arguments must be a list of strings")
+    # Pour ne pas relancer un serveur ou un client depuis un worker.
+    if argv and argv[0] in _SERVER_COMMANDS:
+        # Pour signaler sans delai une violation explicite du contrat.
+        raise ValueError(f"'{argv[0]}' is not available through the server")
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return argv
+
+
+# Pour isoler _init_worker et faciliter son evolution sous tests.
+def _init_worker(cache_size: int) -> None:
+    """Installe un cache de configurations dans le worker courant."""
+    # Pour partager les parsings entre toutes les requetes du worker.
+    cli.set_config_loader(ConfigCache(cache_size).load)
+
+
+# Pour isoler _run_cli et faciliter son evolution sous tests.
+def _run_cli(argv: list[str]) -> int:
+    """Execute ``cli.main`` et traduit sa sortie en code retour shell."""
+    # Pour convertir les arrets explicites comme le ferait l'interpreteur.
+    try:
+        # Pour executer exactement le point d'entree de la CLI.
+        return cli.main(argv)
+    # Pour reproduire le code retour de ``raise SystemExit``.
+    except SystemExit as exc:
+        # Pour traduire un arret sans code en succes.
+        if exc.code is None:
+            # Pour rendre a l'appelant le resultat promis par le contrat.
+            return 0
+        # Pour conserver un code retour numerique.
+        if isinstance(exc.code, int):
+            # Pour rendre a l'appelant le resultat promis par le contrat.
+            return exc.code
+        # Pour afficher un message d'arret comme l'interpreteur.
+        print(exc.code, file=sys.stderr)
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return 1
+
+
+# Pour isoler handle_request et faciliter son evolution sous tests.
+def handle_request(request: dict[str, Any]) -> dict[str, Any]:
+    """Execute une requete dans le worker courant.
+
+    Parameters:
+        request: Requete decodee.
+
+    Returns:
+        Reponse ``{"exit_code", "stdout", "stderr"}``.
+
+    Raises:
+        Aucune exception n'est propagee: les erreurs deviennent une reponse
+        de code retour ``1`` ou ``2``.
+
+    Contrat:
+        Sortie standard, sortie d'erreur et code retour sont ceux de
+        ``krpsim`` lance depuis ``cwd``.
+    """
+    # Pour refuser une requete invalide avec l'erreur d'usage de la CLI.
+    try:
+        # Pour obtenir la ligne de commande equivalente.
+        argv = request_argv(request)
+    # Pour repondre sans executer la requete.
+    except ValueError as exc:
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return {"exit_code": 2, "stdout": "", "stderr": f"krpsim: {exc}\n"}
+    # Pour capturer la sortie standard de la CLI.
+    out = StringIO()
+    # Pour capturer la sortie d'erreur de la CLI.
+    err = StringIO()
+    # Pour restaurer le repertoire du worker apres la requete.
+    previous = os.getcwd()
+    # Pour nettoyer la configuration temporaire en toute circonstance.
+    text_path: str | None = None
+    # Pour garantir la restauration du worker meme en cas d'erreur.
+    try:
+        # Pour resoudre les chemins relatifs comme le client.
+        os.chdir(request.get("cwd", previous))
+        # Pour materialiser une configuration transmise en texte.
+        if "config_text" in request:
+            # Pour ecrire le texte dans un fichier lisible par le parser.
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", suffix=".krpsim", delete=False
+            ) as tmp:
+                # Pour reproduire exactement le contenu transmis.
+                tmp.write(request["config_text"])
+            # Pour retenir le fichier a supprimer.
+            text_path = tmp.name
+            # Pour substituer le fichier a l'emplacement reserve.
+            argv[0] = text_path
+        # Pour capturer les deux flux de la CLI.
+        with redirect_stdout(out), redirect_stderr(err):
+            # Pour restituer une erreur inattendue sans tuer le worker.
+            try:
+                # Pour executer la requete comme un lancement de ``krpsim``.
+                code = _run_cli(argv)
+            # Pour reproduire la sortie d'une exception non geree: comme
+            # l'interpreteur, toute erreur de la CLI devient une trace et un
+            # code ``1``, sans tuer le worker partage par les clients.
+            except Exception:  # noqa: BLE001
+                # Pour afficher la trace comme l'interpreteur.
+                traceback.print_exc()
+                # Pour reproduire le code retour de l'interpreteur.
+                code = 1
+    # Pour signaler un repertoire client inaccessible.
+    except OSError as exc:
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return {"exit_code": 1, "stdout": "", "stderr": f"krpsim: {exc}\n"}
+    # Pour laisser le worker dans un etat neutre.
+    finally:
+        # Pour retrouver le repertoire du worker.
+        os.chdir(previous)
+        # Pour supprimer la configuration temporaire.
+        if text_path is not None:
+            # Pour ne pas accumuler de fichiers temporaires.
+            os.unlink(text_path)
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return {"exit_code": code, "stdout": out.getvalue(), "stderr": err.getvalue()}
+
+
+# Pour encapsuler _Handler autour d'un contrat clairement borne.
+class _Handler(socketserver.StreamRequestHandler):
+    """Traite les requetes d'une connexion, une ligne JSON a la fois."""
+
+    # Pour typer le serveur parent attendu par le gestionnaire.
+    server: KrpsimServer
+
+    # Pour isoler handle et faciliter son evolution sous tests.
+    def handle(self) -> None:
+        """Repond a chaque ligne recue jusqu'a la fermeture du client."""
+        # Pour traiter plusieurs requetes sur une meme connexion.
+        for line in self.rfile:
+            # Pour decoder la requete sans interrompre la connexion.
+            try:
+                # Pour relire la requete JSON.
+                request = json.loads(line)
+            # Pour traiter une ligne illisible comme une requete invalide.
+            except ValueError:
+                # Pour aiguiller la ligne vers la reponse d'erreur.
+                request = None
+            # Pour refuser une requete qui n'est pas un objet JSON.
+            if not isinstance(request, dict):
+                # Pour expliquer le rejet au client.
+                response = {
+                    "exit_code": 2,
+                    "stdout": "",
+                    "stderr": "krpsim: invalid request\n",
+                }
+            # Pour couvrir explicitement le cas complementaire du contrat.
+            else:
+                # Pour executer la requete dans un worker deja initialise.
+                response = self.server.pool.submit(handle_request, request).result()
+            # Pour publier la reponse sur une seule ligne.
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            # Pour ne pas retarder le client sur un tampon partiel.
+            self.wfile.flush()
+
+
+# Pour encapsuler KrpsimServer autour d'un contrat clairement borne.
+class KrpsimServer(socketserver.ThreadingUnixStreamServer):
+    """Serveur de simulations sur une socket Unix.
+
+    Parameters:
+        path: Chemin de la socket a creer.
+        workers: Nombre de processus de simulation.
+        cache_size: Taille du cache LRU de configurations par worker.
+
+    Contrat:
+        Les workers sont crees avant toute connexion; la socket est
+        supprimee a la fermeture du serveur.
+    """
+
+    # Pour ne pas bloquer l'arret sur des connexions encore ouvertes.
+    daemon_threads = True
+
+    # Pour isoler __init__ et faciliter son evolution sous tests.
+    def __init__(
+        self,
+        path: str,
+        workers: int | None = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ):
+        """Cree la socket et demarre les workers.
+
+        Parameters:
+            path: Chemin de la socket a creer.
+            workers: Nombre de processus, ``None`` pour le nombre de CPU.
+            cache_size: Taille du cache LRU de chaque worker.
+
+        Returns:
+            ``None``.
+
+        Raises:
+            ValueError:
+                Si ``workers`` ou ``cache_size`` n'est pas strictement
+                positif.
+            OSError:
+                Si la socket est deja servie ou ne peut pas etre creee.
+
+        Contrat:
+            Une socket orpheline d'un serveur arrete est remplacee.
+        """
+        # Pour refuser un pool sans worker.
+        if workers is not None and workers <= 0:
+            # Pour signaler sans delai une violation explicite du contrat.
+            raise ValueError("workers must be a positive integer")
+        # Pour refuser un cache inutilisable avant de creer la socket.
+        if cache_size <= 0:
+            # Pour signaler sans delai une violation explicite du contrat.
+            raise ValueError("cache size must be a positive integer")
+        # Pour remplacer une socket laissee par un serveur arrete.
+        _remove_stale_socket(path)
+        # Pour supprimer a la fermeture le chemin effectivement demande.
+        self.path = path
+        # Pour demarrer les workers avant les threads de connexion.
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(cache_size,),
+        )
+        # Pour lancer les workers tant que le processus n'a qu'un thread.
+        self.pool.submit(int).result()
+        # Pour ecouter sur la socket demandee.
+        super().__init__(path, _Handler)
+
+    # Pour isoler server_close et faciliter son evolution sous tests.
+    def server_close(self) -> None:
+        """Ferme la socket, arrete les workers et supprime le fichier."""
+        # Pour ne plus accepter de connexion.
+        super().server_close()
+        # Pour liberer les processus de simulation.
+        self.pool.shutdown()
+        # Pour ne pas laisser de socket orpheline.
+        if os.path.exists(self.path):
+            # Pour supprimer le point d'entree du serveur arrete.
+            os.unlink(self.path)
+
+
+# Pour isoler _remove_stale_socket et faciliter son evolution sous tests.
+def _remove_stale_socket(path: str) -> None:
+    """Supprime une socket sans serveur, refuse une socket servie."""
+    # Pour ne rien faire si aucun fichier n'occupe le chemin.
+    if not os.path.exists(path):
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return
+    # Pour sonder la socket existante.
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        # Pour distinguer une socket servie d'une socket orpheline.
+        try:
+            # Pour detecter un serveur encore actif.
+            probe.connect(path)
+        # Pour remplacer une socket orpheline.
+        except ConnectionRefusedError:
+            # Pour liberer le chemin de la socket.
+            os.unlink(path)
+            # Pour rendre a l'appelant le resultat promis par le contrat.
+            return
+    # Pour signaler sans delai une violation explicite du contrat.
+    raise OSError(f"socket already in use: '{path}'")
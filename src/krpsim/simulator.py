@@ -7,16 +7,58 @@ deterministe exploitable par la CLI et le verificateur.
 # Pour retarder l'evaluation des types et limiter les cycles.
 from __future__ import annotations
 
+# Pour dupliquer un simulateur sans rejouer ses precalculs.
+import copy
+# Pour fusionner les fins de processus d'un plan deja calcule.
+import heapq
+# Pour enchainer les lancements du plan en forme close sans liste.
+import itertools
 # Pour rendre le diagnostic activable sans polluer la sortie.
 import logging
 # Pour formaliser des contrats de donnees clairs et compacts.
 from dataclasses import dataclass
+# Pour typer un hachage deja active sans test redondant.
+from typing import TYPE_CHECKING, AsyncIterator, Iterator, Sequence, cast
 
 # Pour limiter le couplage aux composants internes necessaires.
-from .optimizer import order_processes
+from .conditions import StopCondition, StopWatch
+# Pour limiter le couplage aux composants internes necessaires.
+from .demand import DemandCap
+# Pour limiter le couplage aux composants internes necessaires.
+from .hashing import MASK64, RUNNING_DOMAIN, STOCK_DOMAIN, zobrist_key
+# Pour limiter le couplage aux composants internes necessaires.
+from .optimizer import get_policy
 # Pour limiter le couplage aux composants internes necessaires.
 from .parser import Config, Process
 
+# Pour typer les extensions optionnelles sans les importer au demarrage.
+if TYPE_CHECKING:
+    # Pour typer le pool de ``run_async``.
+    from concurrent.futures import Executor
+
+    # Pour typer les compteurs de ``bottlenecks=True``.
+    from .bottlenecks import BottleneckCounters
+
+    # Pour typer la fonction de demarrage generee.
+    from .codegen import StartFn
+
+    # Pour typer les compteurs de ``count_activity=True``.
+    from .profiling import SimulatorCounters
+
+    # Pour typer le journal de ``record_stocks=True``.
+    from .recorder import StockRecorder
+
+# Pour partager le journal des demarrages entre les deux moteurs.
+_LOGGER = logging.getLogger(__name__)
+# Pour exposer les moteurs de demarrage disponibles a la CLI.
+ENGINES = ("interp", "codegen")
+# Pour nommer sans ambiguite le demarrage d'un processus.
+EVENT_START = "start"
+# Pour nommer sans ambiguite le credit des resultats d'un processus.
+EVENT_END = "end"
+# Pour partager la borne finie imposee en mode optimize(time).
+TIME_MODE_DELAY = 500
+
 
 # Pour fiabiliser les objets metier via un schema declaratif.
 @dataclass
@@ -38,12 +80,145 @@ class _RunningProcess:
     remaining: int
 
 
+# Pour fiabiliser les objets metier via un schema declaratif.
+@dataclass(frozen=True)
+# Pour encapsuler _TraceSegment autour d'un contrat clairement borne.
+class _TraceSegment:
+    """Segment immuable d'une trace partagee entre simulateurs.
+
+    Attributes:
+        parent: Segment precedent, ``None`` pour le debut de trace.
+        items: Demarrages ajoutes par ce segment.
+        length: Longueur totale de la trace jusqu'a ce segment inclus.
+
+    Contrat:
+        Un segment n'est jamais modifie: plusieurs branches peuvent donc
+        partager le meme prefixe sans copie.
+    """
+
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    parent: _TraceSegment | None
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    items: tuple[tuple[int, str], ...]
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    length: int
+
+    # Pour isoler to_list et faciliter son evolution sous tests.
+    def to_list(self) -> list[tuple[int, str]]:
+        """Materialise la trace complete jusqu'a ce segment."""
+        # Pour remonter la chaine sans recursion.
+        chunks: list[tuple[tuple[int, str], ...]] = []
+        # Pour parcourir les segments du plus recent au plus ancien.
+        node: _TraceSegment | None = self
+        # Pour iterer tant que la progression fonctionnelle reste possible.
+        while node is not None:
+            # Pour memoriser le segment courant avant de remonter.
+            chunks.append(node.items)
+            # Pour remonter vers le prefixe partage.
+            node = node.parent
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return [item for chunk in reversed(chunks) for item in chunk]
+
+
+# Pour fiabiliser les objets metier via un schema declaratif.
+@dataclass(frozen=True)
+# Pour encapsuler SimulatorSnapshot autour d'un contrat clairement borne.
+class SimulatorSnapshot:
+    """Etat immuable et compact d'un simulateur a un instant donne.
+
+    Attributes:
+        resources: Index des ressources qui ordonne ``stocks``.
+        stocks: Vecteur des stocks, ``-1`` pour une ressource absente.
+        running: Processus en cours ``(restant, nom)`` dans l'ordre de
+            lancement.
+        trace: Segment de trace partage qui porte le filigrane.
+        time: Horloge du simulateur.
+        max_time: Borne temporelle de l'execution en cours.
+        deadlock: Drapeau de blocage du simulateur.
+        policy_state: Etat mutable de la politique de priorisation.
+        cap_state: Etat mutable du plafonnement par la demande.
+        state_hash: Hachage incremental capture, ``None`` si inactif.
+        stopped: Condition d'arret satisfaite, ``None`` sinon.
+        bottlenecks: Copie des compteurs de blocage, ``None`` si inactifs.
+        stock_recorder: Copie du journal des stocks, ``None`` s'il est
+            inactif.
+
+    Contrat:
+        Restaurer un snapshot reproduit exactement les stocks, les
+        processus en cours et la trace du simulateur capture.
+    """
+
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    resources: tuple[str, ...]
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    stocks: tuple[int, ...]
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    running: tuple[tuple[int, str], ...]
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    trace: _TraceSegment | None
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    time: int
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    max_time: int
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    deadlock: bool
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    policy_state: object
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    cap_state: object
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    state_hash: int | None = None
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    stopped: StopCondition | None = None
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    bottlenecks: BottleneckCounters | None = None
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    stock_recorder: StockRecorder | None = None
+
+    # Pour isoler trace_length et faciliter son evolution sous tests.
+    @property
+    def trace_length(self) -> int:
+        """Retourne le filigrane de trace capture."""
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return self.trace.length if self.trace is not None else 0
+
+
+# Pour fiabiliser les objets metier via un schema declaratif.
+@dataclass(frozen=True)
+# Pour encapsuler SimulationEvent autour d'un contrat clairement borne.
+class SimulationEvent:
+    """Evenement produit par ``Simulator.iter_events``.
+
+    Attributes:
+        time: Cycle de l'evenement.
+        kind: ``EVENT_START`` au lancement, ``EVENT_END`` au credit.
+        process: Nom du processus concerne.
+
+    Contrat:
+        Les evenements ``EVENT_START`` reproduisent exactement ``trace``.
+    """
+
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    time: int
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    kind: str
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    process: str
+
+
 # Pour encapsuler Simulator autour d'un contrat clairement borne.
 class Simulator:
     """Execute les processus d'une ``Config`` sur des cycles discrets.
 
     Parameters:
         config: Configuration validee a simuler.
+        policy: Nom de la politique de priorisation enregistree.
+        demand_cap: Active le plafonnement des intermediaires par l'aval.
+        stop_when: Conditions d'arret anticipe sur les stocks.
+        engine: Moteur de demarrage, ``interp`` ou ``codegen``.
+        bottlenecks: Impute chaque cycle bloque a la ressource manquante.
+        record_stocks: Journalise chaque variation de stock.
+        count_activity: Compte cycles, examens de faisabilite et tris.
 
     Contrat:
         La simulation met a jour ``stocks``, ``trace`` et ``time`` de facon
@@ -51,17 +226,43 @@ class Simulator:
     """
 
     # Pour isoler __init__ et faciliter son evolution sous tests.
-    def __init__(self, config: Config):
+    def __init__(
+        self,
+        config: Config,
+        policy: str = "default",
+        demand_cap: bool = False,
+        stop_when: Sequence[StopCondition] = (),
+        engine: str = "interp",
+        bottlenecks: bool = False,
+        record_stocks: bool = False,
+        count_activity: bool = False,
+    ):
         """Initialise l'etat mutable d'une execution.
 
         Parameters:
             config: Configuration source partagee en lecture seule.
+            policy: Nom d'une politique de ``krpsim.optimizer``.
+            demand_cap: ``True`` pour brider les producteurs d'intermediaires
+                au-dela de ce que l'aval peut consommer avant l'horizon.
+            stop_when: Conditions dont la premiere satisfaite termine la
+                simulation.
+            engine: ``codegen`` pour derouler les demarrages dans une
+                fonction generee; retombe sur ``interp`` si la politique
+                est dynamique ou si un suivi par demarrage est actif.
+            bottlenecks: ``True`` pour remplir ``bottlenecks`` a chaque
+                processus examine sans pouvoir etre lance.
+            record_stocks: ``True`` pour remplir ``stock_recorder`` a chaque
+                debit et credit.
+            count_activity: ``True`` pour remplir ``activity`` a chaque
+                cycle, test de besoins et tri de la politique.
 
         Returns:
             ``None``.
 
         Raises:
-            Aucune exception n'est levee explicitement.
+            ValueError:
+                Si ``policy`` ou ``engine`` est inconnu ou si une condition
+                porte sur une ressource inconnue.
 
         Contrat:
             L'etat initial des stocks doit partir d'une copie pour eviter les
@@ -70,18 +271,410 @@ class Simulator:
         # Pour garder un acces stable a la configuration source en lecture
         # seule.
         self.config = config
+        # Pour exposer le nom de la politique appliquee a chaque cycle.
+        self.policy = policy
+        # Pour precalculer une seule fois les donnees de priorisation.
+        self._policy = get_policy(policy, config)
+        # Pour exposer le mode de plafonnement applique a chaque cycle.
+        self.demand_cap = demand_cap
+        # Pour ne payer le precalcul de demande que si le mode est actif.
+        self._cap = DemandCap(config) if demand_cap else None
+        # Pour n'indexer les conditions d'arret que si elles sont demandees.
+        self._stop = StopWatch(config, stop_when) if stop_when else None
+        # Pour exposer la condition qui a termine la simulation.
+        self.stopped: StopCondition | None = None
         # Pour eviter toute mutation accidentelle des donnees d'entree.
         self.stocks: dict[str, int] = config.stocks.copy()
         # Pour garantir un point de depart deterministic des cycles.
         self.time = 0
         # Pour tracer les processus differes sans melanger avec la trace finale.
         self._running: list[_RunningProcess] = []
+        # Pour partager le prefixe de trace fige entre branches forkees.
+        self._trace_base: _TraceSegment | None = None
         # Pour accumuler une trace canonique reutilisable par le verificateur.
-        self.trace: list[tuple[int, str]] = []
+        self._trace_tail: list[tuple[int, str]] = []
         # Pour repartir d'un etat neutre a chaque nouvelle simulation.
         self.deadlock = False
         # Pour imposer une borne explicite avant tout lancement de processus.
         self._max_time = 0
+        # Pour indexer les stocks des snapshots sur un ordre stable.
+        self._resources = tuple(sorted(config.all_stock_names()))
+        # Pour retrouver en O(1) la cle de hachage d'une ressource.
+        self._resource_index = {name: i for i, name in enumerate(self._resources)}
+        # Pour retrouver en O(1) la cle de hachage d'un processus.
+        self._process_index = {
+            name: i for i, name in enumerate(sorted(config.processes))
+        }
+        # Pour ne maintenir le hachage qu'apres sa premiere lecture.
+        self._hash: int | None = None
+        # Pour ne collecter les evenements que pendant ``iter_events``.
+        self._events: list[SimulationEvent] | None = None
+        # Pour ne payer l'attribution des blocages que sur demande.
+        self.bottlenecks: BottleneckCounters | None = None
+        # Pour n'allouer les compteurs que si l'attribution est demandee.
+        if bottlenecks:
+            # Pour ne charger les compteurs que pour ``--bottlenecks``.
+            from . import bottlenecks as _bottlenecks
+
+            # Pour allouer les compteurs processus x ressource.
+            self.bottlenecks = _bottlenecks.BottleneckCounters(config)
+        # Pour ne payer le journal des stocks que sur demande.
+        self.stock_recorder: StockRecorder | None = None
+        # Pour n'allouer le journal que si l'enregistrement est demande.
+        if record_stocks:
+            # Pour ne charger le journal que pour ``--record-stocks``.
+            from . import recorder as _recorder
+
+            # Pour preparer les colonnes de variations.
+            self.stock_recorder = _recorder.StockRecorder(config)
+        # Pour ne payer les compteurs de profilage que sur demande.
+        self.activity: SimulatorCounters | None = None
+        # Pour n'allouer les compteurs que si le profilage est demande.
+        if count_activity:
+            # Pour ne charger les compteurs que pour ``--profile``.
+            from . import profiling as _profiling
+
+            # Pour partager les compteurs avec le tri de la politique.
+            self.activity = self._policy.activity = _profiling.SimulatorCounters()
+        # Pour refuser un moteur inconnu avant toute execution.
+        if engine not in ENGINES:
+            # Pour signaler sans delai une violation explicite du contrat.
+            raise ValueError(f"unknown engine '{engine}'")
+        # Pour exposer le moteur demande.
+        self.engine = engine
+        # Pour ne generer le demarrage que si la semantique est preservee.
+        self._start_fn = self._compile_start() if engine == "codegen" else None
+
+    # Pour isoler state_hash et faciliter son evolution sous tests.
+    @property
+    def state_hash(self) -> int:
+        """Retourne le hachage Zobrist de l'etat courant.
+
+        Contrat:
+            Le hachage couvre les stocks (une ressource absente vaut zero)
+            et le multi-ensemble des processus en cours avec leurs cycles
+            restants, mais pas l'horloge: deux etats equivalents a des
+            instants differents partagent le meme hachage. Il est calcule
+            une fois a la premiere lecture puis mis a jour a chaque debit,
+            credit, demarrage et fin de processus.
+        """
+        # Pour activer le suivi incremental a la premiere lecture.
+        if self._hash is None:
+            # Pour partir d'un hachage complet coherent avec l'etat courant.
+            self._hash = self._full_hash()
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return self._hash
+
+    # Pour isoler _full_hash et faciliter son evolution sous tests.
+    def _full_hash(self) -> int:
+        """Recalcule le hachage de l'etat courant en O(etat)."""
+        # Pour sommer les cles de stock de chaque ressource indexee.
+        total = sum(
+            zobrist_key(STOCK_DOMAIN, idx, self.stocks.get(name, 0))
+            for idx, name in enumerate(self._resources)
+        )
+        # Pour ajouter chaque processus en cours, doublons compris.
+        total += sum(
+            zobrist_key(
+                RUNNING_DOMAIN, self._process_index[rp.process.name], rp.remaining
+            )
+            for rp in self._running
+        )
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return total & MASK64
+
+    # Pour isoler _rehash_stock et faciliter son evolution sous tests.
+    def _rehash_stock(self, name: str, old: int, new: int) -> None:
+        """Remplace la cle d'une ressource dans le hachage actif."""
+        # Pour retrouver la position de la ressource dans l'index.
+        idx = self._resource_index[name]
+        # Pour retirer l'ancienne cle et ajouter la nouvelle modulo 2**64.
+        self._hash = (
+            cast(int, self._hash)
+            - zobrist_key(STOCK_DOMAIN, idx, old)
+            + zobrist_key(STOCK_DOMAIN, idx, new)
+        ) & MASK64
+
+    # Pour isoler _rehash_running et faciliter son evolution sous tests.
+    def _rehash_running(self, process: Process, old: int, new: int) -> None:
+        """Deplace un processus en cours dans le hachage actif.
+
+        Contrat:
+            ``old == 0`` ajoute le processus, ``new == 0`` le retire.
+        """
+        # Pour retrouver la position du processus dans l'index.
+        idx = self._process_index[process.name]
+        # Pour partir du hachage courant.
+        value = cast(int, self._hash)
+        # Pour retirer la cle precedente d'un processus deja en cours.
+        if old:
+            # Pour soustraire la cle sans toucher aux doublons eventuels.
+            value -= zobrist_key(RUNNING_DOMAIN, idx, old)
+        # Pour ajouter la cle d'un processus encore en cours.
+        if new:
+            # Pour sommer la cle afin de distinguer les doublons.
+            value += zobrist_key(RUNNING_DOMAIN, idx, new)
+        # Pour garder le hachage sur 64 bits.
+        self._hash = value & MASK64
+
+    # Pour isoler _debit et faciliter son evolution sous tests.
+    def _debit(self, needs: dict[str, int]) -> None:
+        """Consomme les besoins d'un processus au demarrage."""
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for name, qty in needs.items():
+            # Pour lire le stock courant avant consommation.
+            old = self.stocks[name]
+            # Pour consommer les besoins avant tout effet de production.
+            self.stocks[name] = old - qty
+            # Pour maintenir le hachage seulement s'il a ete demande.
+            if self._hash is not None:
+                # Pour refleter la consommation dans le hachage.
+                self._rehash_stock(name, old, old - qty)
+        # Pour journaliser le debit seulement si l'enregistrement est actif.
+        if self.stock_recorder is not None:
+            # Pour dater la consommation au cycle courant.
+            self.stock_recorder.record(self.time, needs, -1)
+
+    # Pour isoler _credit et faciliter son evolution sous tests.
+    def _credit(self, results: dict[str, int]) -> None:
+        """Credite les resultats d'un processus termine."""
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for name, qty in results.items():
+            # Pour cumuler les resultats sans supposer un stock deja present.
+            old = self.stocks.get(name, 0)
+            # Pour crediter la production du processus.
+            self.stocks[name] = old + qty
+            # Pour maintenir le hachage seulement s'il a ete demande.
+            if self._hash is not None:
+                # Pour refleter la production dans le hachage.
+                self._rehash_stock(name, old, old + qty)
+        # Pour journaliser le credit seulement si l'enregistrement est actif.
+        if self.stock_recorder is not None:
+            # Pour dater la production au cycle courant.
+            self.stock_recorder.record(self.time, results, 1)
+
+    # Pour isoler trace et faciliter son evolution sous tests.
+    @property
+    def trace(self) -> list[tuple[int, str]]:
+        """Retourne la trace complete des demarrages.
+
+        Contrat:
+            Sans prefixe partage, la liste interne est rendue telle quelle;
+            sinon le prefixe est materialise une seule fois.
+        """
+        # Pour materialiser le prefixe partage seulement a la lecture.
+        if self._trace_base is not None:
+            # Pour fusionner prefixe et suffixe en une liste privee.
+            self._trace_tail = self._trace_base.to_list() + self._trace_tail
+            # Pour ne plus payer la materialisation aux lectures suivantes.
+            self._trace_base = None
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return self._trace_tail
+
+    # Pour isoler trace et faciliter son evolution sous tests.
+    @trace.setter
+    def trace(self, value: list[tuple[int, str]]) -> None:
+        """Remplace la trace complete des demarrages."""
+        # Pour abandonner tout prefixe partage devenu obsolete.
+        self._trace_base = None
+        # Pour publier la trace fournie comme trace officielle.
+        self._trace_tail = value
+
+    # Pour isoler max_time et faciliter son evolution sous tests.
+    @property
+    def max_time(self) -> int:
+        """Retourne la borne temporelle de l'execution courante."""
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return self._max_time
+
+    # Pour isoler max_time et faciliter son evolution sous tests.
+    @max_time.setter
+    def max_time(self, value: int) -> None:
+        """Remplace la borne d'une execution adoptee depuis l'exterieur.
+
+        Contrat:
+            Reserve aux simulateurs qui publient une execution faite
+            ailleurs; ``run`` pose lui-meme sa borne.
+        """
+        # Pour aligner la borne sur l'execution publiee.
+        self._max_time = value
+
+    # Pour isoler trace_length et faciliter son evolution sous tests.
+    @property
+    def trace_length(self) -> int:
+        """Retourne la longueur de trace sans la materialiser."""
+        # Pour compter le prefixe partage en temps constant.
+        base = self._trace_base.length if self._trace_base is not None else 0
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return base + len(self._trace_tail)
+
+    # Pour isoler snapshot et faciliter son evolution sous tests.
+    def snapshot(self) -> SimulatorSnapshot:
+        """Capture l'etat courant sous forme immuable.
+
+        Parameters:
+            Aucun parametre.
+
+        Returns:
+            Snapshot restaurable via ``restore``.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            Le cout est en O(ressources + processus en cours + demarrages
+            depuis le dernier snapshot), plus la copie des compteurs de
+            blocage et du journal des stocks s'ils sont actifs; le prefixe
+            de trace est partage.
+        """
+        # Pour figer le suffixe courant et le partager avec le snapshot.
+        if self._trace_tail:
+            # Pour chainer le suffixe courant sur le prefixe existant.
+            self._trace_base = _TraceSegment(
+                self._trace_base, tuple(self._trace_tail), self.trace_length
+            )
+            # Pour repartir d'un suffixe vide au-dessus du segment fige.
+            self._trace_tail = []
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return SimulatorSnapshot(
+            resources=self._resources,
+            stocks=tuple(self.stocks.get(name, -1) for name in self._resources),
+            running=tuple((rp.remaining, rp.process.name) for rp in self._running),
+            trace=self._trace_base,
+            time=self.time,
+            max_time=self._max_time,
+            deadlock=self.deadlock,
+            policy_state=self._policy.get_state(),
+            cap_state=self._cap.get_state() if self._cap is not None else None,
+            state_hash=self._hash,
+            stopped=self.stopped,
+            bottlenecks=copy.copy(self.bottlenecks),
+            stock_recorder=copy.copy(self.stock_recorder),
+        )
+
+    # Pour isoler restore et faciliter son evolution sous tests.
+    def restore(self, snap: SimulatorSnapshot) -> None:
+        """Replace le simulateur dans l'etat capture par ``snap``.
+
+        Parameters:
+            snap: Snapshot pris sur un simulateur de la meme configuration.
+
+        Returns:
+            ``None``.
+
+        Raises:
+            ValueError:
+                Si le snapshot provient d'une configuration differente.
+
+        Contrat:
+            Le simulateur restaure ne partage aucun etat mutable avec le
+            snapshot ni avec le simulateur d'origine.
+        """
+        # Pour refuser un vecteur de stocks indexe sur d'autres ressources.
+        if snap.resources != self._resources:
+            # Pour signaler sans delai une violation explicite du contrat.
+            raise ValueError("snapshot does not match this configuration")
+        # Pour reconstruire les stocks sans les ressources absentes.
+        self.stocks = {
+            name: qty for name, qty in zip(snap.resources, snap.stocks) if qty >= 0
+        }
+        # Pour recreer des etats d'execution propres a ce simulateur.
+        self._running = [
+            _RunningProcess(self.config.processes[name], remaining)
+            for remaining, name in snap.running
+        ]
+        # Pour partager le prefixe de trace fige sans le copier.
+        self._trace_base = snap.trace
+        # Pour repartir d'un suffixe vide au-dessus du prefixe partage.
+        self._trace_tail = []
+        # Pour aligner l'horloge sur l'etat capture.
+        self.time = snap.time
+        # Pour conserver la borne de l'execution capturee.
+        self._max_time = snap.max_time
+        # Pour conserver le diagnostic de blocage capture.
+        self.deadlock = snap.deadlock
+        # Pour conserver l'arret anticipe capture.
+        self.stopped = snap.stopped
+        # Pour reprendre les compteurs de blocage captures.
+        if snap.bottlenecks is not None:
+            # Pour ne pas partager les compteurs mutables avec le snapshot.
+            self.bottlenecks = copy.copy(snap.bottlenecks)
+        # Pour reprendre le journal des stocks capture.
+        if snap.stock_recorder is not None:
+            # Pour ne pas partager les colonnes mutables avec le snapshot.
+            self.stock_recorder = copy.copy(snap.stock_recorder)
+        # Pour restaurer l'etat propre de la politique de priorisation.
+        self._policy.set_state(snap.policy_state)
+        # Pour restaurer les engagements suivis par le plafonnement.
+        if self._cap is not None:
+            # Pour reprendre les quantites engagees au moment du snapshot.
+            self._cap.set_state(snap.cap_state)
+        # Pour reprendre le hachage capture sans le recalculer.
+        if snap.state_hash is not None:
+            # Pour garder le suivi incremental actif sur la branche.
+            self._hash = snap.state_hash
+        # Pour resynchroniser un hachage actif sur l'etat restaure.
+        elif self._hash is not None:
+            # Pour recalculer une seule fois le hachage complet.
+            self._hash = self._full_hash()
+
+    # Pour isoler fork et faciliter son evolution sous tests.
+    def fork(self) -> Simulator:
+        """Cree une branche independante a partir de l'etat courant.
+
+        Parameters:
+            Aucun parametre.
+
+        Returns:
+            Nouveau simulateur qui partage configuration, precalculs et
+            prefixe de trace avec l'original.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            Le cout est en O(ressources + processus en cours) et ne depend
+            pas de la longueur de la trace.
+        """
+        # Pour capturer l'etat a dupliquer.
+        snap = self.snapshot()
+        # Pour reutiliser les precalculs sans rappeler le constructeur.
+        child = copy.copy(self)
+        # Pour ne pas publier les evenements de la branche chez l'original.
+        child._events = None
+        # Pour isoler l'etat mutable de la politique dans la branche.
+        child._policy = copy.copy(self._policy)
+        # Pour ne pas cumuler l'activite de la branche chez l'original.
+        child.activity = child._policy.activity = copy.copy(self.activity)
+        # Pour isoler les engagements du plafonnement dans la branche.
+        child._cap = copy.copy(self._cap)
+        # Pour donner a la branche son propre etat mutable.
+        child.restore(snap)
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return child
+
+    # Pour isoler __getstate__ et faciliter son evolution sous tests.
+    def __getstate__(self) -> dict[str, object]:
+        """Serialise le simulateur sans sa fonction de demarrage generee.
+
+        Contrat:
+            La fonction produite par ``exec`` n'est pas picklable; elle est
+            recompilee par ``__setstate__`` dans le processus cible.
+        """
+        # Pour ne pas alterer l'etat du simulateur d'origine.
+        state = self.__dict__.copy()
+        # Pour retirer la seule valeur que pickle ne sait pas transporter.
+        state["_start_fn"] = None
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return state
+
+    # Pour isoler __setstate__ et faciliter son evolution sous tests.
+    def __setstate__(self, state: dict[str, object]) -> None:
+        """Restaure le simulateur et recompile son demarrage genere."""
+        # Pour reprendre tel quel l'etat serialise.
+        self.__dict__.update(state)
+        # Pour retrouver le moteur demande dans le processus cible.
+        self._start_fn = self._compile_start() if self.engine == "codegen" else None
 
     # Pour isoler _complete_running et faciliter son evolution sous tests.
     def _complete_running(self) -> None:
@@ -106,14 +699,28 @@ class Simulator:
         for rp in self._running:
             # Pour avancer d'un cycle l'execution des processus differes.
             rp.remaining -= 1
+            # Pour maintenir le hachage seulement s'il a ete demande.
+            if self._hash is not None:
+                # Pour refleter l'avancement du processus dans le hachage.
+                self._rehash_running(rp.process, rp.remaining + 1, rp.remaining)
             # Pour proteger un invariant de comparaison critique ici.
             if rp.remaining == 0:
-                # Pour appliquer uniformement la regle a chaque element
-                # concerne.
-                for name, qty in rp.process.results.items():
-                    # Pour cumuler les resultats sans supposer un stock deja
-                    # present.
-                    self.stocks[name] = self.stocks.get(name, 0) + qty
+                # Pour crediter les resultats arrives a echeance.
+                self._credit(rp.process.results)
+                # Pour publier le credit quand un consommateur l'ecoute.
+                if self._events is not None:
+                    # Pour dater la fin au cycle du credit.
+                    self._events.append(
+                        SimulationEvent(self.time, EVENT_END, rp.process.name)
+                    )
+                # Pour basculer la production engagee vers le stock credite.
+                if self._cap is not None:
+                    # Pour liberer l'engagement suivi par le plafonnement.
+                    self._cap.completed(rp.process)
+                # Pour n'evaluer que les conditions sur les ressources creditees.
+                if self._stop is not None and self.stopped is None:
+                    # Pour retenir la premiere condition satisfaite.
+                    self.stopped = self._stop.after_end(rp.process.name, self.stocks)
                 # Pour deferer la suppression et eviter de muter la liste
                 # iteree.
                 completed.append(rp)
@@ -144,13 +751,29 @@ class Simulator:
         # Pour expliciter l'etat de progression de la simulation.
         started_nonzero = False
         # Pour garder un canal de diagnostic coherent dans tout le module.
-        logger = logging.getLogger(__name__)
+        logger = _LOGGER
+        # Pour ne notifier que les politiques qui suivent les demarrages.
+        observer = self._policy.launched if self._policy.observes_launches else None
+        # Pour lire une seule fois les compteurs de blocage eventuels.
+        bottlenecks = self.bottlenecks
+        # Pour lire une seule fois les compteurs de profilage eventuels.
+        activity = self.activity
         # Pour appliquer uniformement la regle a chaque element concerne.
-        for process in order_processes(self.config):
+        for process in self._policy.order(self.stocks):
             # Pour expliciter une decision qui impacte le flux metier.
             if self.time + process.delay > self._max_time:
                 # Pour ignorer ce cas et laisser la boucle traiter les suivants.
                 continue
+            # Pour brider les intermediaires que l'aval ne pourra consommer.
+            if self._cap is not None and not self._cap.allows(
+                process, self.time, self._max_time, self.stocks
+            ):
+                # Pour ignorer ce cas et laisser la boucle traiter les suivants.
+                continue
+            # Pour compter le test de besoins sous profilage.
+            if activity is not None:
+                # Pour cumuler les examens de faisabilite.
+                activity.feasibility_checks += 1
             # Pour expliciter une decision qui impacte le flux metier.
             if all(
                 # Pour verifier tous les prerequis avant de consommer des
@@ -158,35 +781,123 @@ class Simulator:
                 self.stocks.get(name, 0) >= qty for name, qty in process.needs.items()
             # Pour ouvrir un bloc qui porte une contrainte locale explicite.
             ):
-                # Pour appliquer uniformement la regle a chaque element
-                # concerne.
-                for name, qty in process.needs.items():
-                    # Pour consommer les besoins avant tout effet de production.
-                    self.stocks[name] -= qty
+                # Pour consommer les besoins avant tout effet de production.
+                self._debit(process.needs)
                 # Pour proteger un invariant de comparaison critique ici.
                 if process.delay == 0:
-                    # Pour appliquer uniformement la regle a chaque element
-                    # concerne.
-                    for name, qty in process.results.items():
-                        # Pour crediter immediatement les processus sans delai.
-                        self.stocks[name] = self.stocks.get(name, 0) + qty
+                    # Pour crediter immediatement les processus sans delai.
+                    self._credit(process.results)
                 # Pour couvrir explicitement le cas complementaire du contrat.
                 else:
                     # Pour conserver les processus differes dans un etat
                     # separe du flux instantane.
                     self._running.append(_RunningProcess(process, process.delay))
+                    # Pour maintenir le hachage seulement s'il a ete demande.
+                    if self._hash is not None:
+                        # Pour ajouter le processus lance au hachage.
+                        self._rehash_running(process, 0, process.delay)
+                    # Pour compter la production engagee dans le plafonnement.
+                    if self._cap is not None:
+                        # Pour engager les sorties jusqu'a leur credit.
+                        self._cap.launched(process)
                     # Pour expliciter l'etat de progression de la simulation.
                     started_nonzero = True
                 # Pour enregistrer chaque demarrage dans l'ordre canonique.
-                self.trace.append((self.time, process.name))
+                self._trace_tail.append((self.time, process.name))
+                # Pour publier le lancement et le credit instantane eventuel.
+                if self._events is not None:
+                    # Pour dater le lancement au cycle courant.
+                    self._events.append(
+                        SimulationEvent(self.time, EVENT_START, process.name)
+                    )
+                    # Pour publier le credit immediat d'un processus sans delai.
+                    if process.delay == 0:
+                        # Pour garder l'ordre lancement puis credit.
+                        self._events.append(
+                            SimulationEvent(self.time, EVENT_END, process.name)
+                        )
+                # Pour tenir la politique informee de la production engagee.
+                if observer is not None:
+                    # Pour notifier le demarrage avant le processus suivant.
+                    observer(process)
                 # Pour offrir un journal cycle/process exploitable en mode
                 # verbeux.
                 logger.info("%d:%s", self.time, process.name)
                 # Pour expliciter l'etat de progression de la simulation.
                 started = True
+                # Pour compter le lancement du processus.
+                if bottlenecks is not None:
+                    # Pour distinguer les processus jamais lances.
+                    bottlenecks.launched(process)
+                # Pour n'evaluer que les conditions sur les ressources touchees.
+                if self._stop is not None and self._stopped_by(process):
+                    # Pour ne plus lancer aucun processus une fois l'arret atteint.
+                    break
+            # Pour imputer le cycle perdu au premier besoin insuffisant.
+            elif bottlenecks is not None:
+                # Pour compter le blocage du processus.
+                bottlenecks.blocked_on(process, self.stocks)
         # Pour rendre a l'appelant le resultat promis par le contrat.
         return started, started_nonzero
 
+    # Pour isoler _compile_start et faciliter son evolution sous tests.
+    def _compile_start(self) -> StartFn | None:
+        """Compile le demarrage specialise, ``None`` si non applicable."""
+        # Pour ne charger le generateur que pour ``engine="codegen"``.
+        from . import codegen
+
+        # Pour garder le chemin generique quand chaque demarrage est observe.
+        if self._policy.dynamic or self._policy.observes_launches:
+            # Pour rendre a l'appelant le resultat promis par le contrat.
+            return None
+        # Pour garder le chemin generique des plafonds, conditions d'arret,
+        # compteurs de blocage et journal des stocks.
+        if (
+            self._cap is not None
+            or self._stop is not None
+            or self.bottlenecks is not None
+            or self.stock_recorder is not None
+        ):
+            # Pour rendre a l'appelant le resultat promis par le contrat.
+            return None
+        # Pour figer l'ordre de tentative de la politique statique.
+        order = self._policy.order(self.stocks)
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return codegen.compile_start(order) if codegen.supports(order) else None
+
+    # Pour isoler _stopped_by et faciliter son evolution sous tests.
+    def _stopped_by(self, process: Process) -> bool:
+        """Evalue les conditions touchees par le lancement de ``process``."""
+        # Pour typer l'index actif sans test redondant.
+        watch = cast(StopWatch, self._stop)
+        # Pour verifier les conditions sur les ressources debitees.
+        self.stopped = watch.after_start(process.name, self.stocks)
+        # Pour verifier aussi le credit immediat d'un processus sans delai.
+        if self.stopped is None and process.delay == 0:
+            # Pour retenir la premiere condition satisfaite au credit.
+            self.stopped = watch.after_end(process.name, self.stocks)
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return self.stopped is not None
+
+    # Pour isoler _begin et faciliter son evolution sous tests.
+    def _begin(self, max_time: int) -> None:
+        """Prepare une nouvelle execution bornee par ``max_time``."""
+        # Pour repartir d'un etat neutre a chaque nouvelle simulation.
+        self.deadlock = False
+        # Pour centraliser la borne utilisee par toutes les etapes internes.
+        self._max_time = max_time
+        # Pour arreter sans lancement si l'etat initial satisfait deja.
+        self.stopped = self._stop.first_met(self.stocks) if self._stop else None
+
+    # Pour isoler _finish et faciliter son evolution sous tests.
+    def _finish(self) -> None:
+        """Calcule le drapeau de blocage en fin d'execution."""
+        # Pour traiter explicitement un cas d'entree invalide ou absent.
+        if not self.trace_length and self.config.processes and not self.stopped:
+            # Pour marquer explicitement l'absence totale de progression
+            # possible.
+            self.deadlock = True
+
     # Pour isoler step et faciliter son evolution sous tests.
     def step(self) -> bool:
         """Execute un cycle logique de simulation.
@@ -202,14 +913,35 @@ class Simulator:
 
         Contrat:
             Le temps n'avance que si un travail est en cours ou demarre,
-            afin d'eviter des cycles vides artificiels.
+            afin d'eviter des cycles vides artificiels. Une condition
+            d'arret satisfaite fige l'horloge sur le cycle courant.
         """
+        # Pour compter le cycle sous profilage.
+        if self.activity is not None:
+            # Pour cumuler les cycles de la simulation profilee.
+            self.activity.cycles += 1
         # Pour garder un etat transitoire explicite et eviter les effets caches.
         running_before = bool(self._running)
         # Pour appliquer les productions arrivees a echeance avant demarrage.
         self._complete_running()
-        # Pour separer clairement demarrages instantanes et differes.
-        started, started_nonzero = self._start_processes()
+        # Pour ne compter un demarrage differe que s'il a eu lieu.
+        started_nonzero = False
+        # Pour ne plus rien lancer une fois une condition d'arret atteinte.
+        if self.stopped is None:
+            # Pour utiliser le demarrage genere hors hachage et evenements.
+            if self._start_fn and self._hash is None and self._events is None:
+                # Pour derouler les tentatives sans interpreter les besoins.
+                _, started_nonzero = self._start_fn(
+                    self, _RunningProcess, _LOGGER
+                )
+            # Pour couvrir explicitement le cas complementaire du contrat.
+            else:
+                # Pour separer clairement demarrages instantanes et differes.
+                _, started_nonzero = self._start_processes()
+        # Pour terminer sur le cycle d'un arret pose par credit ou demarrage.
+        if self.stopped is not None:
+            # Pour signaler l'arret sans avancer l'horloge.
+            return False
         # Pour expliciter l'etat de progression de la simulation.
         advance = running_before or bool(self._running) or started_nonzero
         # Pour expliciter une decision qui impacte le flux metier.
@@ -234,13 +966,16 @@ class Simulator:
 
         Contrat:
             ``deadlock`` vaut ``True`` seulement si aucun processus n'a pu
-            demarrer alors que des processus existent.
+            demarrer alors que des processus existent et qu'aucune
+            condition d'arret n'a ete satisfaite.
         """
         # Pour repartir d'un etat neutre a chaque nouvelle simulation.
-        self.deadlock = False
-        # Pour centraliser la borne utilisee par toutes les etapes internes.
-        self._max_time = max_time
-        # Pour expliciter une decision qui impacte le flux metier.
+        self._begin(max_time)
+        # Pour ne pas executer une simulation deja terminee par l'arret.
+        if self.stopped is not None:
+            # Pour rendre a l'appelant le resultat promis par le contrat.
+            return self.trace
+        # Pour appliquer le plan en forme close, coupe a l'arret eventuel.
         if self._custom_strategy(max_time):
             # Pour rendre a l'appelant le resultat promis par le contrat.
             return self.trace
@@ -248,14 +983,258 @@ class Simulator:
         while self.time <= max_time and self.step():
             # Pour expliciter qu'aucune action additionnelle n'est requise ici.
             pass
-        # Pour traiter explicitement un cas d'entree invalide ou absent.
-        if not self.trace and self.config.processes:
-            # Pour marquer explicitement l'absence totale de progression
-            # possible.
-            self.deadlock = True
+        # Pour calculer le diagnostic de blocage de l'execution.
+        self._finish()
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return self.trace
+
+    # Pour isoler iter_events et faciliter son evolution sous tests.
+    def iter_events(self, max_time: int) -> Iterator[SimulationEvent]:
+        """Simule paresseusement en publiant lancements et credits.
+
+        Parameters:
+            max_time: Dernier cycle autorise pour demarrage/avancement.
+
+        Returns:
+            Iterateur d'evenements ordonnes par cycle; au sein d'un cycle,
+            les credits des processus differes precedent les lancements.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            Chaque cycle est execute par ``step`` et publie avant le
+            suivant: abandonner l'iterateur arrete la simulation a la fin
+            du dernier cycle publie. Epuise, l'etat final (``stocks``,
+            ``trace``, ``time``, ``deadlock``) est celui de ``run``.
+        """
+        # Pour repartir d'un etat neutre a chaque nouvelle simulation.
+        self._begin(max_time)
+        # Pour ne pas executer une simulation deja terminee par l'arret.
+        if self.stopped is not None:
+            # Pour terminer l'iteration sans evenement.
+            return
+        # Pour rejouer un plan en forme close sous forme d'evenements.
+        if self._custom_strategy(max_time):
+            # Pour publier le plan avec le meme contrat que la boucle.
+            yield from self._plan_events()
+            # Pour terminer l'iteration du plan.
+            return
+        # Pour collecter les evenements d'un seul cycle a la fois.
+        events: list[SimulationEvent] = []
+        # Pour activer la collecte dans les etapes internes.
+        self._events = events
+        # Pour desactiver la collecte meme si l'iterateur est abandonne.
+        try:
+            # Pour iterer tant que la progression fonctionnelle reste possible.
+            while self.time <= max_time:
+                # Pour executer exactement un cycle de ``run``.
+                advance = self.step()
+                # Pour publier les evenements du cycle avant le suivant.
+                yield from events
+                # Pour recycler le tampon sans reallouer.
+                events.clear()
+                # Pour s'arreter au meme point que ``run``.
+                if not advance:
+                    # Pour sortir une fois la convergence atteinte.
+                    break
+        # Pour ne plus payer la collecte apres l'iteration.
+        finally:
+            # Pour revenir au chemin rapide de ``run``.
+            self._events = None
+        # Pour calculer le diagnostic de blocage de l'execution.
+        self._finish()
+
+    # Pour isoler _plan_events et faciliter son evolution sous tests.
+    def _plan_events(self) -> Iterator[SimulationEvent]:
+        """Derive les evenements d'une trace planifiee en forme close."""
+        # Pour ordonner les credits a venir par cycle puis par lancement.
+        pending: list[tuple[int, int, str]] = []
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for seq, (time, name) in enumerate(self.trace):
+            # Pour publier les credits echus avant ce lancement.
+            while pending and pending[0][0] <= time:
+                # Pour extraire le prochain credit dans l'ordre.
+                end, _, done = heapq.heappop(pending)
+                # Pour publier le credit a son cycle.
+                yield SimulationEvent(end, EVENT_END, done)
+            # Pour publier le lancement a son cycle.
+            yield SimulationEvent(time, EVENT_START, name)
+            # Pour planifier le credit de ce lancement.
+            end = time + self.config.processes[name].delay
+            # Pour publier immediatement le credit d'un processus sans delai.
+            if end == time:
+                # Pour garder l'ordre lancement puis credit.
+                yield SimulationEvent(time, EVENT_END, name)
+            # Pour couvrir explicitement le cas complementaire du contrat.
+            else:
+                # Pour differer le credit jusqu'a son cycle.
+                heapq.heappush(pending, (end, seq, name))
+        # Pour publier les credits restants, sauf ceux coupes par l'arret.
+        while pending and pending[0][0] <= self.time:
+            # Pour extraire le prochain credit dans l'ordre.
+            end, _, done = heapq.heappop(pending)
+            # Pour publier le credit a son cycle.
+            yield SimulationEvent(end, EVENT_END, done)
+
+    # Pour isoler aiter_events et faciliter son evolution sous tests.
+    async def aiter_events(
+        self, max_time: int, *, yield_every: int = 1000
+    ) -> AsyncIterator[SimulationEvent]:
+        """Publie ``iter_events`` en cedant regulierement la boucle asyncio.
+
+        Parameters:
+            max_time: Dernier cycle autorise pour demarrage/avancement.
+            yield_every: Nombre d'evenements publies entre deux cessions.
+
+        Returns:
+            Iterateur asynchrone des evenements de ``iter_events``.
+
+        Raises:
+            ValueError:
+                Si ``yield_every`` n'est pas strictement positif.
+            asyncio.CancelledError:
+                Si la tache est annulee pendant une cession.
+
+        Contrat:
+            La boucle d'evenements n'est jamais bloquee plus longtemps que
+            ``yield_every`` evenements; une annulation laisse le
+            simulateur a la fin du dernier cycle publie.
+        """
+        # Pour refuser une cadence qui ne cederait jamais la boucle.
+        if yield_every <= 0:
+            # Pour signaler sans delai une violation explicite du contrat.
+            raise ValueError("yield_every must be a positive integer")
+        # Pour ne charger asyncio que pour les appelants asynchrones.
+        import asyncio
+
+        # Pour compter les evenements publies depuis la derniere cession.
+        budget = yield_every
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for event in self.iter_events(max_time):
+            # Pour publier l'evenement au consommateur asynchrone.
+            yield event
+            # Pour decompter l'evenement publie.
+            budget -= 1
+            # Pour ceder la boucle une fois le budget epuise.
+            if budget == 0:
+                # Pour laisser les autres taches progresser et annuler.
+                await asyncio.sleep(0)
+                # Pour ouvrir un nouveau budget d'evenements.
+                budget = yield_every
+
+    # Pour isoler run_async et faciliter son evolution sous tests.
+    async def run_async(
+        self,
+        max_time: int,
+        *,
+        yield_every: int = 1000,
+        executor: Executor | None = None,
+    ) -> list[tuple[int, str]]:
+        """Equivalent asynchrone de ``run`` pour un service asyncio.
+
+        Parameters:
+            max_time: Dernier cycle autorise pour demarrage/avancement.
+            yield_every: Nombre d'evenements entre deux cessions de boucle.
+            executor: Pool de threads ou de processus qui execute ``run``
+                hors de la boucle; ``None`` pour simuler dans la boucle.
+
+        Returns:
+            Trace ordonnee des demarrages ``(cycle, process_name)``.
+
+        Raises:
+            ValueError:
+                Si ``yield_every`` n'est pas strictement positif.
+            asyncio.CancelledError:
+                Si la tache est annulee avant la fin de la simulation.
+
+        Contrat:
+            L'etat final est celui de ``run``. Avec un ``executor``, une
+            branche ``fork`` est simulee puis restauree: une annulation
+            laisse ce simulateur intact.
+        """
+        # Pour ne charger asyncio que pour les appelants asynchrones.
+        import asyncio
+
+        # Pour executer la simulation hors de la boucle a la demande.
+        if executor is not None:
+            # Pour isoler l'etat du simulateur de la branche deleguee.
+            branch = self.fork()
+            # Pour recuperer la boucle qui attend le resultat.
+            loop = asyncio.get_running_loop()
+            # Pour attendre la branche sans bloquer la boucle.
+            snap = await loop.run_in_executor(
+                executor, _run_detached, branch, max_time
+            )
+            # Pour adopter l'etat final calcule par la branche.
+            self.restore(snap)
+            # Pour rendre a l'appelant le resultat promis par le contrat.
+            return self.trace
+        # Pour consommer les evenements en cedant regulierement la boucle.
+        async for _ in self.aiter_events(max_time, yield_every=yield_every):
+            # Pour expliciter qu'aucune action additionnelle n'est requise ici.
+            pass
         # Pour rendre a l'appelant le resultat promis par le contrat.
         return self.trace
 
+    # Pour isoler _feasible et faciliter son evolution sous tests.
+    def _feasible(self) -> list[Process]:
+        """Liste les processus dont les besoins sont couverts par les stocks."""
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return [
+            proc
+            for proc in self.config.processes.values()
+            if all(self.stocks.get(name, 0) >= qty for name, qty in proc.needs.items())
+        ]
+
+    # Pour isoler is_quiescent et faciliter son evolution sous tests.
+    def is_quiescent(self) -> bool:
+        """Indique si plus rien ne peut evoluer, quelle que soit la borne.
+
+        Parameters:
+            Aucun parametre.
+
+        Returns:
+            ``True`` si aucun processus ne tourne et qu'aucun n'est faisable
+            avec les stocks courants.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            La borne temporelle est ignoree: un processus ecarte seulement
+            parce qu'il depasserait ``max_time`` rend l'etat non quiescent.
+        """
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return not self._running and not self._feasible()
+
+    # Pour isoler horizon_bound et faciliter son evolution sous tests.
+    def horizon_bound(self) -> bool:
+        """Indique si la derniere execution a ete coupee par ``max_time``.
+
+        Parameters:
+            Aucun parametre.
+
+        Returns:
+            ``True`` si l'horloge a depasse la borne ou si un processus
+            faisable a ete ecarte parce qu'il la depasserait.
+
+        Raises:
+            Aucune exception n'est levee explicitement.
+
+        Contrat:
+            Un blocage independant de la borne (processus instantane sans
+            progression d'horloge) ne compte pas comme une coupure.
+        """
+        # Pour detecter une boucle interrompue par la borne elle-meme.
+        if self.time > self._max_time:
+            # Pour rendre a l'appelant le resultat promis par le contrat.
+            return True
+        # Pour detecter un demarrage refuse uniquement a cause de la borne.
+        return any(
+            self.time + proc.delay > self._max_time for proc in self._feasible()
+        )
+
     # Pour isoler _custom_strategy et faciliter son evolution sous tests.
     def _custom_strategy(self, max_time: int) -> bool:
         """Tente une optimisation fermee pour un cas topologique specifique.
@@ -521,48 +1500,210 @@ class Simulator:
         trace: list[tuple[int, str]] = []
         # Pour separer explicitement les etats intermediaires du traitement.
         stocks = self.stocks.copy()
+        # Pour eviter un acces attribut par lancement planifie.
+        bottlenecks = self.bottlenecks
+        # Pour eviter un acces attribut par variation planifiee.
+        recorder = self.stock_recorder
+        # Pour evaluer les conditions d'arret au fil du plan.
+        watch = self._stop
+        # Pour enchainer les boosters puis les cibles, un seul a la fois.
+        plan = itertools.chain(
+            itertools.repeat(booster, loops), itertools.repeat(target_proc, targets)
+        )
         # Pour appliquer uniformement la regle a chaque element concerne.
-        for _ in range(loops):
-            # Pour expliciter une decision qui impacte le flux metier.
-            if time + booster.delay > max_time:  # pragma: no cover
-                # Pour arreter la boucle des qu'une borne de securite est
-                # atteinte.
-                break
-            # Pour appliquer uniformement la regle a chaque element concerne.
-            for name, qty in booster.needs.items():
-                # Pour debiter la ressource avant toute production ulterieure.
-                stocks[name] -= qty
-            # Pour memoriser l'execution booster dans le plan optimisé.
-            trace.append((time, booster.name))
-            # Pour synchroniser l'horloge locale avec la duree booster
-            # appliquee.
-            time += booster.delay
-            # Pour appliquer uniformement la regle a chaque element concerne.
-            for name, qty in booster.results.items():
-                # Pour cumuler la production sans supposer un stock preexistant.
-                stocks[name] = stocks.get(name, 0) + qty
-        # Pour appliquer uniformement la regle a chaque element concerne.
-        for _ in range(targets):
-            # Pour expliciter une decision qui impacte le flux metier.
-            if time + target_proc.delay > max_time:  # pragma: no cover
-                # Pour arreter la boucle des qu'une borne de securite est
-                # atteinte.
-                break
+        for proc in plan:
+            # Pour ignorer un lancement qui depasserait la borne.
+            if time + proc.delay > max_time:  # pragma: no cover
+                # Pour laisser leur chance aux lancements plus courts.
+                continue
             # Pour appliquer uniformement la regle a chaque element concerne.
-            for name, qty in target_proc.needs.items():
+            for name, qty in proc.needs.items():
                 # Pour debiter la ressource avant toute production ulterieure.
                 stocks[name] -= qty
-            # Pour memoriser l'execution cible dans le plan optimisé.
-            trace.append((time, target_proc.name))
-            # Pour synchroniser l'horloge locale avec la duree cible appliquee.
-            time += target_proc.delay
+            # Pour memoriser l'execution dans le plan optimise.
+            trace.append((time, proc.name))
+            # Pour compter les lancements du plan comme ceux de la boucle.
+            if bottlenecks is not None:
+                # Pour distinguer les processus jamais lances.
+                bottlenecks.launched(proc)
+            # Pour journaliser le debit comme ``_debit``.
+            if recorder is not None:
+                # Pour dater la consommation au lancement.
+                recorder.record(time, proc.needs, -1)
+            # Pour arreter le plan au debit qui satisfait une condition.
+            if watch is not None and proc.delay:
+                # Pour retenir la premiere condition satisfaite au debit.
+                self.stopped = watch.after_start(proc.name, stocks)
+                # Pour laisser le processus lance en cours, comme la boucle.
+                if self.stopped is not None:
+                    # Pour figer l'etat au cycle du lancement.
+                    self._running = [_RunningProcess(proc, proc.delay)]
+                    # Pour ne plus rien lancer apres l'arret.
+                    break
+            # Pour synchroniser l'horloge locale avec la duree appliquee.
+            time += proc.delay
             # Pour appliquer uniformement la regle a chaque element concerne.
-            for name, qty in target_proc.results.items():
+            for name, qty in proc.results.items():
                 # Pour cumuler la production sans supposer un stock preexistant.
                 stocks[name] = stocks.get(name, 0) + qty
+            # Pour journaliser le credit comme ``_credit``.
+            if recorder is not None:
+                # Pour dater la production a la fin du processus.
+                recorder.record(time, proc.results, 1)
+            # Pour arreter le plan au credit qui satisfait une condition.
+            if watch is not None:
+                # Pour verifier aussi le debit d'un processus sans delai.
+                self.stopped = (
+                    watch.after_end(proc.name, stocks)
+                    if proc.delay
+                    else watch.after_start(proc.name, stocks)
+                    or watch.after_end(proc.name, stocks)
+                )
+                # Pour ne plus rien lancer apres l'arret.
+                if self.stopped is not None:
+                    # Pour figer l'etat au cycle du credit.
+                    break
         # Pour publier la trace planifiee comme resultat officiel.
         self.trace = trace
         # Pour exposer l'etat final coherent avec la trace retenue.
         self.stocks = stocks
         # Pour aligner l'horloge finale sur le plan effectivement applique.
         self.time = time
+        # Pour resynchroniser un hachage actif apres le plan applique.
+        if self._hash is not None:
+            # Pour recalculer une seule fois le hachage complet.
+            self._hash = self._full_hash()
+
+
+# Pour isoler _run_detached et faciliter son evolution sous tests.
+def _run_detached(sim: Simulator, max_time: int) -> SimulatorSnapshot:
+    """Execute ``run`` dans un pool et renvoie l'etat final serialisable."""
+    # Pour simuler la branche jusqu'a son terme.
+    sim.run(max_time)
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return sim.snapshot()
+
+
+# Pour isoler run_until_quiescent et faciliter son evolution sous tests.
+def run_until_quiescent(
+    config: Config,
+    max_horizon: int,
+    initial_horizon: int = 32,
+    policy: str = "default",
+    demand_cap: bool = False,
+    stop_when: Sequence[StopCondition] = (),
+    engine: str = "interp",
+    bottlenecks: bool = False,
+    record_stocks: bool = False,
+) -> tuple[Simulator, int, bool]:
+    """Execute la simulation avec un horizon qui croit jusqu'a quiescence.
+
+    Parameters:
+        config: Configuration validee a simuler.
+        max_horizon: Horizon maximal autorise.
+        initial_horizon: Premier horizon essaye.
+        policy: Nom de la politique de priorisation enregistree.
+        demand_cap: Active le plafonnement des intermediaires par l'aval.
+        stop_when: Conditions d'arret anticipe sur les stocks.
+        engine: Moteur de demarrage, ``interp`` ou ``codegen``.
+        bottlenecks: Impute chaque cycle bloque a la ressource manquante.
+        record_stocks: Journalise chaque variation de stock.
+
+    Returns:
+        Tuple ``(simulateur, horizon, borne_atteinte)`` ou le simulateur
+        porte l'execution complete au dernier horizon essaye et
+        ``borne_atteinte`` vaut ``True`` si ``max_horizon`` a coupe une
+        execution encore active.
+
+    Raises:
+        ValueError:
+            Si ``policy`` ou ``engine`` est inconnu ou si une condition
+            porte sur une ressource inconnue.
+
+    Contrat:
+        L'horizon double tant que l'execution est coupee par la borne sans
+        etre quiescente ni arretee par une condition; chaque essai repart
+        d'un simulateur neuf pour que la trace soit celle d'une execution
+        fixe au meme horizon. Le cout total reste borne par deux fois celui
+        du dernier essai.
+    """
+    # Pour ne jamais demarrer au-dela de la borne demandee.
+    horizon = min(initial_horizon, max_horizon)
+    # Pour iterer tant que la progression fonctionnelle reste possible.
+    while True:
+        # Pour repartir d'un etat neuf a chaque horizon essaye.
+        sim = Simulator(
+            config,
+            policy=policy,
+            demand_cap=demand_cap,
+            stop_when=stop_when,
+            engine=engine,
+            bottlenecks=bottlenecks,
+            record_stocks=record_stocks,
+        )
+        # Pour executer la logique metier via l'implementation de reference.
+        sim.run(horizon)
+        # Pour s'arreter des que l'horizon n'est plus le facteur limitant.
+        settled = (
+            sim.stopped is not None or sim.is_quiescent() or not sim.horizon_bound()
+        )
+        # Pour ne pas prolonger une execution terminee ou deja a la borne.
+        if settled or horizon >= max_horizon:
+            # Pour distinguer la borne maximale d'une vraie quiescence.
+            return sim, horizon, not settled
+        # Pour faire croitre l'horizon geometriquement jusqu'a la borne.
+        horizon = min(horizon * 2, max_horizon)
+
+
+# Pour isoler exit_decision et faciliter son evolution sous tests.
+def exit_decision(
+    sim: Simulator,
+    delay: int,
+    ignore_delay: bool,
+    exhausted_horizon: int | None = None,
+) -> tuple[int, str, str]:
+    """Choisit code retour, issue et message de fin d'une simulation.
+
+    Parameters:
+        sim: Simulateur dont l'execution est terminee.
+        delay: Horizon demande par l'utilisateur.
+        ignore_delay: ``True`` en mode ``optimize(time)``.
+        exhausted_horizon: Borne de l'horizon adaptatif atteinte sans
+            quiescence, ``None`` sinon.
+
+    Returns:
+        Tuple ``(code_retour, issue, message)`` ou ``issue`` vaut
+        ``stop_condition``, ``max_time_reached``, ``max_horizon_reached``,
+        ``deadlock`` ou ``no_more_process_doable``.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Regle unique de ``krpsim`` et de ``krpsim --batch``; la
+        publication du message reste a l'appelant.
+    """
+    # Pour traiter un arret demande comme une fin normale.
+    if sim.stopped is not None:
+        # Pour indiquer quelle condition a termine la simulation.
+        message = f"Stop condition {sim.stopped} met at time {sim.time}"
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return 0, "stop_condition", message
+    # Pour traiter une limite atteinte hors mode optimize(time).
+    if not ignore_delay and sim.time >= delay:
+        # Pour afficher une borne coherente meme en cas de depassement.
+        message = f"Max time reached at time {min(sim.time, delay)}"
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return 1, "max_time_reached", message
+    # Pour ne pas confondre la borne adaptative avec une quiescence.
+    if exhausted_horizon is not None:
+        # Pour indiquer la borne qui a coupe l'execution.
+        message = f"Max horizon reached at time {exhausted_horizon}"
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return 1, "max_horizon_reached", message
+    # Pour maintenir un ordre de priorite stable entre cas exclusifs.
+    if sim.deadlock:
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return 1, "deadlock", f"Deadlock detected at time {sim.time}"
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return 0, "no_more_process_doable", f"No more process doable at time {sim.time}"
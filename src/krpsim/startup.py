@@ -0,0 +1,222 @@
+"""Mesure du temps de demarrage a froid du point d'entree ``krpsim``.
+
+Pour les petites configurations, le demarrage de l'interpreteur et les
+imports coutent plus que la simulation. Ce module relance un interpreteur
+neuf avec ``-X importtime`` pour attribuer ce cout module par module.
+"""
+
+# Pour retarder l'evaluation des types et limiter les cycles.
+from __future__ import annotations
+
+# Pour transmettre au sous-processus le chemin d'import courant.
+import os
+# Pour relancer un interpreteur neuf, seul moyen de mesurer a froid; seul
+# ``sys.executable`` est lance, sans shell.
+import subprocess  # nosec B404
+# Pour reutiliser l'interpreteur et le chemin d'import courants.
+import sys
+# Pour mesurer la duree murale d'un demarrage complet.
+import time
+# Pour formaliser des contrats de donnees clairs et compacts.
+from dataclasses import dataclass
+# Pour garder des signatures stables sur les collections.
+from typing import Sequence
+
+
+# Pour fiabiliser les objets metier via un schema declaratif.
+@dataclass(frozen=True)
+# Pour encapsuler ImportTiming autour d'un contrat clairement borne.
+class ImportTiming:
+    """Ligne ``-X importtime`` d'un module.
+
+    Attributes:
+        module: Nom du module importe.
+        self_us: Temps propre d'import en microsecondes.
+        cumulative_us: Temps cumule, sous-imports compris.
+        depth: Profondeur d'import, ``0`` pour un import de premier niveau.
+
+    Contrat:
+        Les valeurs sont celles rapportees par l'interpreteur.
+    """
+
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    module: str
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    self_us: int
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    cumulative_us: int
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    depth: int
+
+
+# Pour isoler _child_env et faciliter son evolution sous tests.
+def _child_env() -> dict[str, str]:
+    """Construit l'environnement d'un interpreteur neuf equivalent."""
+    # Pour partir de l'environnement courant.
+    env = dict(os.environ)
+    # Pour retrouver ``krpsim`` meme sans installation.
+    env["PYTHONPATH"] = os.pathsep.join(path for path in sys.path if path)
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return env
+
+
+# Pour isoler parse_importtime et faciliter son evolution sous tests.
+def parse_importtime(text: str) -> list[ImportTiming]:
+    """Analyse la sortie d'erreur de ``python -X importtime``.
+
+    Parameters:
+        text: Sortie d'erreur de l'interpreteur.
+
+    Returns:
+        Mesures dans l'ordre d'emission.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        L'en-tete et les lignes etrangeres au format sont ignores.
+    """
+    # Pour accumuler les mesures reconnues.
+    timings: list[ImportTiming] = []
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for line in text.splitlines():
+        # Pour ne garder que les lignes de mesure.
+        if not line.startswith("import time:"):
+            # Pour ignorer ce cas et laisser la boucle traiter les suivants.
+            continue
+        # Pour separer temps propre, temps cumule et module.
+        fields = line[len("import time:") :].split("|")
+        # Pour ignorer l'en-tete et les lignes mal formees.
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # Pour ignorer ce cas et laisser la boucle traiter les suivants.
+            continue
+        # Pour deduire la profondeur de l'indentation du nom.
+        name = fields[2].rstrip()
+        # Pour memoriser la mesure du module.
+        timings.append(
+            ImportTiming(
+                module=name.strip(),
+                self_us=int(fields[0]),
+                cumulative_us=int(fields[1]),
+                depth=(len(name) - len(name.lstrip()) - 1) // 2,
+            )
+        )
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return timings
+
+
+# Pour isoler measure_imports et faciliter son evolution sous tests.
+def measure_imports(module: str = "krpsim.cli") -> list[ImportTiming]:
+    """Mesure les imports de ``module`` dans un interpreteur neuf.
+
+    Parameters:
+        module: Module a importer a froid.
+
+    Returns:
+        Mesures ``-X importtime`` de l'import.
+
+    Raises:
+        subprocess.CalledProcessError:
+            Si l'import echoue dans le sous-processus.
+
+    Contrat:
+        Le processus courant n'est pas affecte par la mesure.
+    """
+    # Pour importer le module a froid avec la mesure de l'interpreteur; la
+    # commande est une liste sans shell qui relance ``sys.executable``.
+    proc = subprocess.run(  # nosec B603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=_child_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return parse_importtime(proc.stderr)
+
+
+# Pour isoler measure_cold_start et faciliter son evolution sous tests.
+def measure_cold_start(
+    argv: Sequence[str], runs: int = 5, module: str = "krpsim.client"
+) -> float:
+    """Mesure la duree murale minimale de ``krpsim argv`` a froid.
+
+    Parameters:
+        argv: Arguments transmis a ``python -m module``.
+        runs: Nombre d'executions, dont seule la plus rapide compte.
+        module: Point d'entree lance; ``krpsim.client`` est la cible du
+            script ``krpsim`` installe, ``krpsim.cli`` la CLI directe.
+
+    Returns:
+        Duree minimale en secondes.
+
+    Raises:
+        ValueError:
+            Si ``runs`` n'est pas strictement positif.
+
+    Contrat:
+        Le minimum ecarte le bruit d'ordonnancement de la machine; les
+        sorties standard et d'erreur sont ignorees.
+    """
+    # Pour refuser une mesure sans execution.
+    if runs <= 0:
+        # Pour signaler sans delai une violation explicite du contrat.
+        raise ValueError("runs must be a positive integer")
+    # Pour reutiliser le meme environnement pour chaque execution.
+    env = _child_env()
+    # Pour retenir la meilleure duree observee.
+    best = float("inf")
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for _ in range(runs):
+        # Pour dater le lancement de l'interpreteur.
+        start = time.perf_counter()
+        # Pour executer un demarrage complet de la CLI, sans shell, avec
+        # l'interpreteur courant.
+        subprocess.run(  # nosec B603
+            [sys.executable, "-m", module, *argv],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
+        # Pour conserver la duree la plus courte.
+        best = min(best, time.perf_counter() - start)
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return best
+
+
+# Pour isoler format_report et faciliter son evolution sous tests.
+def format_report(timings: Sequence[ImportTiming], top: int = 20) -> list[str]:
+    """Formate les imports les plus couteux au format ``-X importtime``.
+
+    Parameters:
+        timings: Mesures a presenter.
+        top: Nombre maximal de modules affiches.
+
+    Returns:
+        Lignes du rapport, en-tete et total compris.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Les modules sont tries par temps cumule decroissant; le total est
+        la somme des imports de premier niveau.
+    """
+    # Pour reprendre l'en-tete de l'interpreteur.
+    lines = ["import time: self [us] | cumulative | imported package"]
+    # Pour presenter d'abord les imports les plus couteux.
+    ranked = sorted(timings, key=lambda t: t.cumulative_us, reverse=True)
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for timing in ranked[:top]:
+        # Pour aligner les colonnes comme la sortie native.
+        lines.append(
+            f"import time: {timing.self_us:>9} | {timing.cumulative_us:>10} | "
+            f"{'  ' * timing.depth} {timing.module}"
+        )
+    # Pour sommer les imports de premier niveau sans double compte.
+    total = sum(t.cumulative_us for t in timings if t.depth == 0)
+    # Pour conclure par le cout total des imports.
+    lines.append(f"total import time: {total / 1000:.1f} ms")
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return lines
@@ -0,0 +1,581 @@
+"""Balayage d'horizon: stocks finaux pour chaque delai en une seule passe.
+
+Deux executions d'horizons ``d < D`` sont identiques jusqu'au premier cycle
+ou l'execution ``D`` lance un processus qui finirait apres ``d``. Le
+balayage execute donc l'horizon le plus long en posant un point de reprise
+a chaque cycle, puis repart de ce point de divergence pour chaque horizon
+plus court.
+"""
+
+# Pour retarder l'evaluation des types et limiter les cycles.
+from __future__ import annotations
+
+# Pour produire un CSV conforme sans echappement manuel.
+import csv
+# Pour developper la grille de surcharges sans boucles imbriquees.
+import itertools
+# Pour serialiser une seule fois la configuration partagee; seuls les
+# segments ecrits par le processus parent sont deserialises.
+import pickle  # nosec B403
+# Pour repartir les points de grille sur plusieurs coeurs CPU.
+from concurrent.futures import ProcessPoolExecutor, as_completed
+# Pour formaliser des contrats de donnees clairs et compacts.
+from dataclasses import dataclass, field
+# Pour publier la configuration aux workers sans la recopier par tache.
+from multiprocessing import shared_memory
+# Pour garder des signatures stables sur les flux et collections.
+from typing import TYPE_CHECKING, Iterable, Iterator, Mapping, Sequence, TextIO
+
+# Pour limiter le couplage aux composants internes necessaires.
+from .optimizer import policy_names
+# Pour limiter le couplage aux composants internes necessaires.
+from .parser import Config
+# Pour limiter le couplage aux composants internes necessaires.
+from .simulator import Simulator, SimulatorSnapshot
+
+# Pour typer le DataFrame sans importer pandas a l'execution.
+if TYPE_CHECKING:
+    # Pour exposer le type de retour de ``to_dataframe`` aux outils.
+    import pandas as pd
+
+# Pour partager la configuration deserialisee une seule fois par worker.
+_WORKER_CONFIG: Config | None = None
+
+
+# Pour fiabiliser les objets metier via un schema declaratif.
+@dataclass
+# Pour encapsuler SweepRow autour d'un contrat clairement borne.
+class SweepRow:
+    """Resultat d'une execution du balayage.
+
+    Attributes:
+        delay: Horizon ``max_time`` de l'execution.
+        time: Horloge finale du simulateur.
+        deadlock: Drapeau de blocage calcule par le simulateur.
+        stocks: Stocks finaux de l'execution.
+        overrides: Surcharges de stocks initiaux du point de grille.
+
+    Contrat:
+        Chaque ligne est identique a ``Simulator(config).run(delay)`` sur
+        la configuration surchargee.
+    """
+
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    delay: int
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    time: int
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    deadlock: bool
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    stocks: dict[str, int]
+    # Pour typer explicitement le champ et fiabiliser le contrat de donnees.
+    overrides: dict[str, int] = field(default_factory=dict)
+
+
+# Pour isoler parse_delays et faciliter son evolution sous tests.
+def parse_delays(text: str) -> range:
+    """Analyse une plage ``D`` ou ``A:B`` de delais.
+
+    Parameters:
+        text: Plage saisie par l'utilisateur.
+
+    Returns:
+        Plage inclusive des delais a balayer.
+
+    Raises:
+        ValueError:
+            Si la plage est mal formee, vide ou non strictement positive.
+
+    Contrat:
+        ``D`` est un raccourci pour ``1:D``.
+    """
+    # Pour accepter la forme courte comme la forme explicite.
+    parts = text.split(":")
+    # Pour convertir les bornes en entiers avec un message unique.
+    try:
+        # Pour interpreter la forme courte comme ``1:D``.
+        if len(parts) == 1:
+            # Pour partir du premier delai utile.
+            start, stop = 1, int(parts[0])
+        # Pour interpreter la forme explicite ``A:B``.
+        elif len(parts) == 2:
+            # Pour lire les deux bornes inclusives.
+            start, stop = int(parts[0]), int(parts[1])
+        # Pour couvrir explicitement le cas complementaire du contrat.
+        else:
+            # Pour signaler sans delai une violation explicite du contrat.
+            raise ValueError(text)
+    # Pour traduire une erreur de conversion en message stable.
+    except ValueError:
+        # Pour signaler sans delai une violation explicite du contrat.
+        raise ValueError(f"invalid delay range: '{text}'") from None
+    # Pour refuser une plage vide ou des delais non positifs.
+    if start <= 0 or stop < start:
+        # Pour signaler sans delai une violation explicite du contrat.
+        raise ValueError(f"invalid delay range: '{text}'")
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return range(start, stop + 1)
+
+
+# Pour isoler _row et faciliter son evolution sous tests.
+def _row(sim: Simulator, delay: int) -> SweepRow:
+    """Resume l'etat final d'un simulateur."""
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return SweepRow(delay, sim.time, sim.deadlock, dict(sim.stocks))
+
+
+# Pour isoler _run_recorded et faciliter son evolution sous tests.
+def _run_recorded(
+    sim: Simulator,
+    max_time: int,
+    checkpoints: list[SimulatorSnapshot],
+    reach: list[int],
+) -> None:
+    """Execute ``sim`` jusqu'a ``max_time`` en posant un point par cycle.
+
+    Parameters:
+        sim: Simulateur deja positionne au cycle ``len(checkpoints)``.
+        max_time: Horizon de l'execution.
+        checkpoints: Etats captures avant chaque cycle, completes sur place.
+        reach: Fin la plus tardive des lancements de chaque cycle.
+
+    Returns:
+        ``None``.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        La boucle reproduit exactement ``Simulator.run`` hors strategie
+        custom: ``checkpoints[t]`` est l'etat avant le cycle ``t``.
+    """
+    # Pour repartir d'un etat neutre comme le ferait ``run``.
+    sim.deadlock = False
+    # Pour centraliser la borne utilisee par toutes les etapes internes.
+    sim._max_time = max_time
+    # Pour iterer tant que la progression fonctionnelle reste possible.
+    while sim.time <= max_time:
+        # Pour figer l'etat avant le cycle et isoler ses lancements.
+        checkpoints.append(sim.snapshot())
+        # Pour executer le cycle courant.
+        advanced = sim.step()
+        # Pour memoriser la fin la plus tardive lancee a ce cycle.
+        reach.append(
+            max(
+                (
+                    start + sim.config.processes[name].delay
+                    for start, name in sim._trace_tail
+                ),
+                default=-1,
+            )
+        )
+        # Pour s'arreter comme ``run`` quand plus rien n'avance.
+        if not advanced:
+            # Pour sortir de la boucle au meme cycle que ``run``.
+            break
+    # Pour marquer explicitement l'absence totale de progression possible.
+    if not sim.trace_length and sim.config.processes:
+        # Pour aligner le diagnostic sur celui de ``run``.
+        sim.deadlock = True
+
+
+# Pour isoler sweep_horizons et faciliter son evolution sous tests.
+def sweep_horizons(
+    config: Config, delays: range, policy: str = "default"
+) -> list[SweepRow]:
+    """Calcule les stocks finaux pour chaque horizon de ``delays``.
+
+    Parameters:
+        config: Configuration validee a simuler.
+        delays: Horizons a balayer.
+        policy: Nom de la politique de priorisation enregistree.
+
+    Returns:
+        Lignes dans l'ordre croissant des delais.
+
+    Raises:
+        ValueError:
+            Si ``policy`` n'est pas une politique enregistree.
+
+    Contrat:
+        Chaque ligne est identique a une execution independante. Les
+        horizons sont traites par ordre decroissant: chacun reprend le
+        prefixe partage de l'horizon precedent jusqu'a sa divergence. La
+        strategie custom, qui planifie en forme close selon l'horizon,
+        retombe sur des executions separees.
+    """
+    # Pour detecter la voie rapide custom sans perturber le balayage.
+    probe = Simulator(config, policy=policy)
+    # Pour executer separement quand la strategie custom s'applique.
+    if probe._custom_strategy(max(delays)):
+        # Pour rendre a l'appelant le resultat promis par le contrat.
+        return [_fresh_row(config, delay, policy) for delay in delays]
+    # Pour partir de l'horizon le plus long, qui couvre tous les autres.
+    sim = Simulator(config, policy=policy)
+    # Pour memoriser l'etat avant chaque cycle de l'execution de reference.
+    checkpoints: list[SimulatorSnapshot] = []
+    # Pour memoriser la fin la plus tardive lancee a chaque cycle.
+    reach: list[int] = []
+    # Pour executer l'horizon le plus long en posant les points de reprise.
+    _run_recorded(sim, max(delays), checkpoints, reach)
+    # Pour collecter les lignes par horizon.
+    rows = {max(delays): _row(sim, max(delays))}
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for delay in reversed(delays[:-1]):
+        # Pour trouver le premier cycle qui depasse cet horizon.
+        cycle = next(
+            (t for t, end in enumerate(reach) if end > delay or t > delay),
+            len(reach),
+        )
+        # Pour reutiliser l'etat final quand aucun cycle ne diverge.
+        if cycle < len(checkpoints):
+            # Pour reinstaller l'etat d'avant le cycle de divergence.
+            sim.restore(checkpoints[cycle])
+            # Pour ne garder que le prefixe partage avec l'horizon precedent.
+            del checkpoints[cycle:]
+            # Pour aligner les fins de lancement sur le prefixe conserve.
+            del reach[cycle:]
+            # Pour terminer l'horizon courant en enregistrant ses points.
+            _run_recorded(sim, delay, checkpoints, reach)
+        # Pour memoriser le resultat de l'horizon courant.
+        rows[delay] = _row(sim, delay)
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return [rows[delay] for delay in delays]
+
+
+# Pour isoler _fresh_row et faciliter son evolution sous tests.
+def _fresh_row(config: Config, delay: int, policy: str) -> SweepRow:
+    """Execute un horizon depuis zero."""
+    # Pour executer la logique metier via l'implementation de reference.
+    sim = Simulator(config, policy=policy)
+    # Pour produire l'etat de reference a partir du moteur unique.
+    sim.run(delay)
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return _row(sim, delay)
+
+
+# Pour isoler parse_overrides et faciliter son evolution sous tests.
+def parse_overrides(items: Sequence[str]) -> dict[str, list[int]]:
+    """Analyse des surcharges de stock ``ressource=v1,v2,...``.
+
+    Parameters:
+        items: Surcharges saisies par l'utilisateur.
+
+    Returns:
+        Valeurs candidates par ressource, dans l'ordre de saisie.
+
+    Raises:
+        ValueError:
+            Si une surcharge est mal formee, negative ou dupliquee.
+
+    Contrat:
+        Chaque ressource apparait au plus une fois.
+    """
+    # Pour conserver l'ordre de saisie des colonnes de surcharge.
+    overrides: dict[str, list[int]] = {}
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for item in items:
+        # Pour separer la ressource de ses valeurs candidates.
+        name, sep, values = item.partition("=")
+        # Pour convertir les valeurs avec un message unique.
+        try:
+            # Pour lire chaque valeur candidate.
+            parsed = [int(v) for v in values.split(",")]
+        # Pour traduire une erreur de conversion en message stable.
+        except ValueError:
+            # Pour signaler sans delai une violation explicite du contrat.
+            raise ValueError(f"invalid stock override: '{item}'") from None
+        # Pour refuser une ressource vide, dupliquee ou une valeur negative.
+        if not sep or not name or name in overrides or min(parsed) < 0:
+            # Pour signaler sans delai une violation explicite du contrat.
+            raise ValueError(f"invalid stock override: '{item}'")
+        # Pour memoriser les valeurs candidates de la ressource.
+        overrides[name] = parsed
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return overrides
+
+
+# Pour isoler stock_grid et faciliter son evolution sous tests.
+def stock_grid(overrides: dict[str, list[int]]) -> list[dict[str, int]]:
+    """Developpe le produit cartesien des surcharges de stock."""
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return [
+        dict(zip(overrides, combo)) for combo in itertools.product(*overrides.values())
+    ]
+
+
+# Pour isoler _attach_config et faciliter son evolution sous tests.
+def _attach_config(name: str) -> None:
+    """Charge dans le worker la configuration publiee en memoire partagee.
+
+    Parameters:
+        name: Nom du segment ``SharedMemory`` cree par le parent.
+
+    Returns:
+        ``None``.
+
+    Raises:
+        FileNotFoundError:
+            Si le segment n'existe plus.
+
+    Contrat:
+        La configuration est deserialisee une fois par worker; le segment
+        reste la propriete du parent qui seul le detruit.
+    """
+    # Pour partager la configuration entre toutes les taches du worker.
+    global _WORKER_CONFIG
+    # Pour s'attacher au segment sans le copier via le pipe du pool.
+    shm = shared_memory.SharedMemory(name=name)
+    # Pour liberer le segment meme si la deserialisation echoue.
+    try:
+        # Pour rappeler au typage qu'un segment attache expose son buffer.
+        buf = shm.buf
+        # Pour signaler sans delai un segment deja ferme.
+        if buf is None:
+            # Pour refuser un segment inutilisable avec un message explicite.
+            raise FileNotFoundError(f"shared memory segment '{name}' is closed")
+        # Pour reconstruire la configuration ecrite par le parent, de
+        # confiance: le segment n'est jamais alimente par une source externe.
+        _WORKER_CONFIG = pickle.loads(buf)  # nosec B301
+    # Pour garantir la fermeture du mapping local.
+    finally:
+        # Pour detacher le worker sans detruire le segment du parent.
+        shm.close()
+
+
+# Pour isoler _sweep_task et faciliter son evolution sous tests.
+def _sweep_task(
+    overrides: dict[str, int], delays: range, policy: str
+) -> list[SweepRow]:
+    """Balaye les horizons d'un point de la grille dans un worker.
+
+    Parameters:
+        overrides: Stocks initiaux a surcharger.
+        delays: Horizons a balayer.
+        policy: Nom de la politique de priorisation enregistree.
+
+    Returns:
+        Lignes du point de grille, une par horizon.
+
+    Raises:
+        RuntimeError:
+            Si le worker n'a pas ete initialise avec une configuration.
+
+    Contrat:
+        Les processus sont partages avec la configuration de base, seuls
+        les stocks initiaux sont remplaces.
+    """
+    # Pour echouer explicitement sur un worker mal initialise.
+    if _WORKER_CONFIG is None:
+        # Pour signaler sans delai une violation explicite du contrat.
+        raise RuntimeError("sweep worker is not initialized")
+    # Pour appliquer les surcharges sans muter la configuration partagee.
+    config = Config(
+        stocks={**_WORKER_CONFIG.stocks, **overrides},
+        processes=_WORKER_CONFIG.processes,
+        optimize=_WORKER_CONFIG.optimize,
+    )
+    # Pour reutiliser le balayage en une passe pour ce point de grille.
+    rows = sweep_horizons(config, delays, policy=policy)
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for row in rows:
+        # Pour rattacher chaque ligne a son point de grille.
+        row.overrides = dict(overrides)
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return rows
+
+
+# Pour isoler iter_grid et faciliter son evolution sous tests.
+def iter_grid(
+    config: Config,
+    grid: list[dict[str, int]],
+    delays: range,
+    policy: str = "default",
+    workers: int | None = None,
+) -> Iterator[SweepRow]:
+    """Balaye une grille de stocks initiaux sur un pool de processus.
+
+    Parameters:
+        config: Configuration validee servant de base.
+        grid: Points de grille, chacun une surcharge de stocks.
+        delays: Horizons a balayer pour chaque point.
+        policy: Nom de la politique de priorisation enregistree.
+        workers: Nombre de processus du pool; ``1`` execute en local.
+
+    Returns:
+        Iterateur de lignes, produites au fil de la completion des points.
+
+    Raises:
+        ValueError:
+            Si la grille est vide, surcharge une ressource inconnue ou si
+            ``policy`` est inconnue.
+
+    Contrat:
+        La configuration est publiee une seule fois en memoire partagee;
+        chaque tache ne transporte que sa surcharge de stocks. Le segment
+        est detruit a la fin de l'iteration, meme interrompue.
+    """
+    # Pour refuser une grille vide qui n'aurait aucune ligne.
+    if not grid:
+        # Pour signaler sans delai une violation explicite du contrat.
+        raise ValueError("sweep grid needs at least one point")
+    # Pour refuser une surcharge qui ne toucherait aucune ressource connue.
+    known = config.all_stock_names()
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for name in grid[0]:
+        # Pour ignorer ce cas et laisser la boucle traiter les suivants.
+        if name in known:
+            # Pour passer a la surcharge suivante.
+            continue
+        # Pour signaler sans delai une violation explicite du contrat.
+        raise ValueError(f"unknown resource '{name}'")
+    # Pour echouer avant de lancer des workers couteux.
+    if policy not in policy_names():
+        # Pour signaler sans delai une violation explicite du contrat.
+        raise ValueError(f"unknown policy '{policy}'")
+    # Pour eviter le cout du pool quand un seul worker suffit.
+    if workers == 1 or len(grid) == 1:
+        # Pour reutiliser exactement le chemin d'execution des workers.
+        global _WORKER_CONFIG
+        # Pour installer la configuration dans le processus courant.
+        _WORKER_CONFIG = config
+        # Pour appliquer uniformement la regle a chaque element concerne.
+        for overrides in grid:
+            # Pour publier les lignes de chaque point des qu'il est calcule.
+            yield from _sweep_task(overrides, delays, policy)
+        # Pour terminer l'iteration locale.
+        return
+    # Pour serialiser une seule fois la configuration compilee.
+    payload = pickle.dumps(config, protocol=pickle.HIGHEST_PROTOCOL)
+    # Pour publier la configuration sans la recopier a chaque tache.
+    shm = shared_memory.SharedMemory(create=True, size=len(payload))
+    # Pour garantir la destruction du segment en toute circonstance.
+    try:
+        # Pour rappeler au typage qu'un segment cree expose son buffer.
+        buf = shm.buf
+        # Pour signaler sans delai un segment deja ferme.
+        if buf is None:
+            # Pour refuser un segment inutilisable avec un message explicite.
+            raise FileNotFoundError(f"shared memory segment '{shm.name}' is closed")
+        # Pour copier la configuration dans le segment partage.
+        buf[: len(payload)] = payload
+        # Pour garantir la fermeture du pool meme en cas d'erreur.
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_attach_config,
+            initargs=(shm.name,),
+        ) as pool:
+            # Pour lancer toutes les taches sans attendre les precedentes.
+            futures = [
+                pool.submit(_sweep_task, overrides, delays, policy)
+                for overrides in grid
+            ]
+            # Pour publier chaque point des qu'il est termine.
+            for future in as_completed(futures):
+                # Pour diffuser les lignes sans attendre toute la grille.
+                yield from future.result()
+    # Pour liberer le segment partage une fois le pool ferme.
+    finally:
+        # Pour detacher le parent du segment.
+        shm.close()
+        # Pour detruire le segment partage.
+        shm.unlink()
+
+
+# Pour isoler to_dataframe et faciliter son evolution sous tests.
+def to_dataframe(config: Config, rows: Iterable[SweepRow]) -> pd.DataFrame:
+    """Convertit des lignes de balayage en ``pandas.DataFrame``.
+
+    Parameters:
+        config: Configuration qui fixe les colonnes de stocks.
+        rows: Lignes produites par ``sweep_horizons`` ou ``iter_grid``.
+
+    Returns:
+        Tableau avec les colonnes de ``write_csv``.
+
+    Raises:
+        ModuleNotFoundError:
+            Si ``pandas`` n'est pas installe.
+
+    Contrat:
+        ``pandas`` n'est importe qu'a l'appel pour garder un demarrage
+        leger de la CLI.
+    """
+    # Pour ne payer l'import de pandas que sur demande.
+    import pandas as pd
+
+    # Pour materialiser les lignes une seule fois.
+    materialized = list(rows)
+    # Pour reprendre exactement les colonnes du CSV.
+    header = _header(config, materialized[0].overrides if materialized else {})
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return pd.DataFrame(
+        [_cells(config, row) for row in materialized], columns=header
+    )
+
+
+# Pour isoler _header et faciliter son evolution sous tests.
+def _header(config: Config, overrides: Mapping[str, int]) -> list[str]:
+    """Construit l'en-tete commun au CSV et au DataFrame."""
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return [
+        *(f"init_{name}" for name in overrides),
+        "delay",
+        "time",
+        "deadlock",
+        *sorted(config.all_stock_names()),
+    ]
+
+
+# Pour isoler _cells et faciliter son evolution sous tests.
+def _cells(config: Config, row: SweepRow) -> list[int]:
+    """Construit les cellules d'une ligne dans l'ordre de ``_header``."""
+    # Pour rendre a l'appelant le resultat promis par le contrat.
+    return [
+        *row.overrides.values(),
+        row.delay,
+        row.time,
+        int(row.deadlock),
+        *(row.stocks.get(name, 0) for name in sorted(config.all_stock_names())),
+    ]
+
+
+# Pour isoler write_csv et faciliter son evolution sous tests.
+def write_csv(config: Config, rows: Iterable[SweepRow], out: TextIO) -> None:
+    """Ecrit le balayage au format CSV au fil des lignes recues.
+
+    Parameters:
+        config: Configuration qui fixe les colonnes de stocks.
+        rows: Lignes produites par ``sweep_horizons`` ou ``iter_grid``.
+        out: Flux texte de destination.
+
+    Returns:
+        ``None``.
+
+    Raises:
+        Aucune exception n'est levee explicitement.
+
+    Contrat:
+        Les colonnes de surcharge ``init_<ressource>`` precedent le delai;
+        les colonnes de stocks suivent l'ordre alphabetique, comme
+        l'affichage ``Final Stocks``. Chaque ligne est ecrite des sa
+        reception pour que le fichier se remplisse pendant le balayage.
+    """
+    # Pour deleguer l'echappement au module standard.
+    writer = csv.writer(out, lineterminator="\n")
+    # Pour n'ecrire l'en-tete qu'une fois la premiere ligne connue.
+    first = True
+    # Pour appliquer uniformement la regle a chaque element concerne.
+    for row in rows:
+        # Pour deduire les colonnes de surcharge de la premiere ligne.
+        if first:
+            # Pour nommer chaque colonne du fichier produit.
+            writer.writerow(_header(config, row.overrides))
+            # Pour ne plus reecrire l'en-tete.
+            first = False
+        # Pour ecrire une ligne par horizon et point de grille.
+        writer.writerow(_cells(config, row))
+    # Pour ecrire un en-tete meme sans aucune ligne.
+    if first:
+        # Pour nommer chaque colonne du fichier produit.
+        writer.writerow(_header(config, {}))
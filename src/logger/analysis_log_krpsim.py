@@ -2,12 +2,105 @@
 
 from __future__ import annotations
 
-from pprint import pformat
-from typing import Iterable
+from typing import IO, Iterable, Mapping
+
+# Ordered from quietest to most verbose; a scope logs kinds up to its level.
+ANALYSIS_LEVELS = ("off", "steps", "all")
+
+_KIND_LEVELS = {
+    "header": 1,
+    "subheader": 1,
+    "step": 1,
+    "value": 2,
+    "calculation": 2,
+}
+
+
+class JsonLinesSink:
+    """Buffered backend writing one JSON line ``{scope, label, kind, value}``.
+
+    ``levels`` maps a scope prefix to one of ``ANALYSIS_LEVELS``; the longest
+    matching prefix wins and unmatched scopes log everything. ``sample`` maps a
+    label to ``N`` so only every ``N``-th occurrence of that label is written.
+    Filtered records are dropped before their value is serialized.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        levels: Mapping[str, str] | None = None,
+        sample: Mapping[str, int] | None = None,
+        buffer_size: int = 1 << 20,
+    ) -> None:
+        # Imported here: only the structured backend serializes values.
+        import json
+
+        for scope, level in (levels or {}).items():
+            if level not in ANALYSIS_LEVELS:
+                raise ValueError(f"unknown analysis level '{level}' for '{scope}'")
+        for label, every in (sample or {}).items():
+            if every <= 0:
+                raise ValueError(f"sample rate for '{label}' must be positive")
+        # Longest prefix first so the most specific scope setting wins.
+        self._levels = sorted(
+            (
+                (scope, ANALYSIS_LEVELS.index(level))
+                for scope, level in (levels or {}).items()
+            ),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+        self._sample = dict(sample or {})
+        self._seen: dict[str, int] = {}
+        self._scope_level: dict[str | None, int] = {}
+        self._dumps = json.JSONEncoder(
+            separators=(",", ":"), default=repr, ensure_ascii=False
+        ).encode
+        self._stream: IO[str] = open(
+            path, "w", encoding="utf-8", buffering=buffer_size
+        )
+
+    def _level(self, scope: str | None) -> int:
+        level = self._scope_level.get(scope)
+        if level is None:
+            level = next(
+                (
+                    value
+                    for prefix, value in self._levels
+                    if scope is not None
+                    and (scope == prefix or scope.startswith(prefix + "."))
+                ),
+                len(ANALYSIS_LEVELS) - 1,
+            )
+            self._scope_level[scope] = level
+        return level
+
+    def write(
+        self, kind: str, label: str, value: object, scope: str | None
+    ) -> None:
+        if _KIND_LEVELS[kind] > self._level(scope):
+            return
+        every = self._sample.get(label)
+        if every is not None:
+            count = self._seen.get(label, 0)
+            self._seen[label] = count + 1
+            if count % every:
+                return
+        self._stream.write(
+            self._dumps({"scope": scope, "label": label, "kind": kind, "value": value})
+        )
+        self._stream.write("\n")
+
+    def close(self) -> None:
+        self._stream.close()
 
 
 class AnalysisLogger:
-    """Verbose logger dedicated to CLI behaviour analysis."""
+    """Verbose logger dedicated to CLI behaviour analysis.
+
+    Without a ``sink`` records are pretty-printed on stdout; with a
+    ``JsonLinesSink`` they are written as JSON lines instead.
+    """
 
     GRAPHICAL_SEPARATOR = (
         "/*   -'-,-'-,-'-,-'-,-'-,-'-,-'-,-'-,-'-,-'-,-'-,-'-,-'-,-'-,-'-,-'-,-',-'   */"
@@ -16,8 +109,15 @@ class AnalysisLogger:
     VALUE_SEPARATOR = "--------------------------------------------------------------"
     SUBHEADER_PADDING = " " * 24
 
-    def __init__(self, enabled: bool = False) -> None:
+    def __init__(
+        self, enabled: bool = False, sink: JsonLinesSink | None = None
+    ) -> None:
         self.enabled = enabled
+        self.sink = sink
+
+    def close(self) -> None:
+        if self.sink is not None:
+            self.sink.close()
 
     def _emit(self, message: str = "") -> None:
         if not self.enabled:
@@ -25,6 +125,9 @@ class AnalysisLogger:
         print(message)
 
     def _format_value(self, value: object) -> str:
+        # Imported here: only enabled loggers format values, keep startup lean.
+        from pprint import pformat
+
         return pformat(value, compact=False, sort_dicts=False)
 
     def _format_scope(self, scope: str | None) -> str:
@@ -38,6 +141,9 @@ class AnalysisLogger:
     def log_header(self, title: str, scope: str | None = None) -> None:
         if not self.enabled:
             return
+        if self.sink is not None:
+            self.sink.write("header", title, None, scope)
+            return
         scope_prefix = self._format_scope(scope)
         full_title = f"{scope_prefix}{title}" if scope_prefix else title
         self._emit("")
@@ -49,6 +155,9 @@ class AnalysisLogger:
     def log_subheader(self, title: str, scope: str | None = None) -> None:
         if not self.enabled:
             return
+        if self.sink is not None:
+            self.sink.write("subheader", title, None, scope)
+            return
         scope_prefix = self._format_scope(scope)
         full_title = f"{scope_prefix}{title}" if scope_prefix else title
         self._emit(f"{self.SUBHEADER_PADDING}{self.SUBHEADER_SEPARATOR}")
@@ -63,6 +172,9 @@ class AnalysisLogger:
     ) -> None:
         if not self.enabled:
             return
+        if self.sink is not None:
+            self.sink.write("step", label, detail, scope)
+            return
         scope_prefix = self._format_scope(scope)
         if detail is None:
             self._emit(f"{scope_prefix}[STEP] {label}")
@@ -77,6 +189,9 @@ class AnalysisLogger:
     ) -> None:
         if not self.enabled:
             return
+        if self.sink is not None:
+            self.sink.write("value", label, value, scope)
+            return
         scope_prefix = self._format_scope(scope)
         formatted = self._format_value(value)
         if "\n" in formatted:
@@ -95,6 +210,14 @@ class AnalysisLogger:
     ) -> None:
         if not self.enabled:
             return
+        if self.sink is not None:
+            self.sink.write(
+                "calculation",
+                label,
+                {"steps": list(steps), "result": result},
+                scope,
+            )
+            return
         scope_prefix = self._format_scope(scope)
         self._emit(f"{scope_prefix}{label}")
         self._emit(f"{scope_prefix}CALCULE :")
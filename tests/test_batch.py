@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import pytest
+
+from krpsim import parser
+from krpsim.batch import BatchSimulator
+from krpsim.simulator import Simulator
+
+
+def _reference(cfg: parser.Config, stocks: dict[str, int], policy: str, delay: int):
+    sim = Simulator(cfg, policy=policy)
+    sim.stocks.update(stocks)
+    sim.run(delay)
+    return sim
+
+
+@pytest.mark.parametrize(
+    ("name", "policy"),
+    [
+        ("ikea", "default"),
+        ("steak", "critical_path"),
+        ("inception", "default"),
+        ("stress_multi_objective", "scarcity"),
+        ("recre", "default"),
+        ("simple", "dynamic"),
+    ],
+)
+def test_batch_matches_simulator(name: str, policy: str) -> None:
+    cfg = parser.parse_file(Path("resources") / name)
+    scenarios = [
+        {res: qty * factor for res, qty in cfg.stocks.items()} for factor in range(4)
+    ]
+    for delay in (5, 80):
+        result = BatchSimulator(cfg, scenarios, policy=policy).run(
+            delay, record_traces=True
+        )
+        assert result.traces is not None
+        for i, stocks in enumerate(scenarios):
+            sim = _reference(cfg, stocks, policy, delay)
+            expected = {res: sim.stocks.get(res, 0) for res in result.resources}
+            assert result.stocks_for(i) == expected
+            assert int(result.time[i]) == sim.time
+            assert bool(result.deadlock[i]) == sim.deadlock
+            assert result.traces[i] == sim.trace
+
+
+def test_batch_without_traces() -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    result = BatchSimulator(cfg, [{}, {"planche": 14}]).run(100)
+    assert result.traces is None
+    assert result.stocks.shape == (2, len(result.resources))
+
+
+def test_batch_rejects_bad_scenarios() -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    with pytest.raises(ValueError, match="at least one scenario"):
+        BatchSimulator(cfg, [])
+    with pytest.raises(ValueError, match="unknown resource 'bois'"):
+        BatchSimulator(cfg, [{"bois": 1}])
@@ -0,0 +1,99 @@
+import asyncio
+import copy
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from _pytest.capture import CaptureFixture
+
+from krpsim import cli, parser
+from krpsim.bottlenecks import BottleneckCounters, format_report
+from krpsim.parser import Config, Process
+from krpsim.simulator import Simulator
+
+
+def _config() -> Config:
+    return Config(
+        stocks={"a": 1},
+        processes={
+            "make": Process("make", {"a": 1}, {"b": 1}, 2),
+            "use": Process("use", {"b": 2, "c": 1}, {"d": 1}, 1),
+        },
+        optimize=["d"],
+    )
+
+
+def test_blocked_cycles_go_to_first_short_need() -> None:
+    sim = Simulator(_config(), bottlenecks=True)
+    sim.run(5)
+    counters = sim.bottlenecks
+    assert counters is not None
+    starved = {r.name: r for r in counters.starved_resources()}
+    assert set(starved) == {"a", "b"}
+    assert starved["b"].processes == ("use",)
+    idle = {p.name: p for p in counters.idle_processes()}
+    assert idle["use"].launches == 0 and idle["use"].shortage == "b"
+    assert idle["use"].blocked == starved["b"].blocked
+    assert idle["make"].launches == 1
+    assert idle["make"].blocked == starved["a"].blocked
+
+
+def test_tracking_keeps_trace_and_disables_codegen() -> None:
+    config = parser.parse_file(Path("resources/ikea"))
+    expected = Simulator(config).run(50)
+    sim = Simulator(config, engine="codegen", bottlenecks=True)
+    assert sim._start_fn is None
+    assert sim.run(50) == expected
+    assert sum(sim.bottlenecks.launches) == len(expected)  # type: ignore[union-attr]
+
+
+def test_closed_form_plan_counts_launches() -> None:
+    config = parser.parse_file(Path("resources/recre"))
+    expected = Simulator(config).run(50)
+    sim = Simulator(config, bottlenecks=True)
+    assert sim.run(50) == expected
+    counters = sim.bottlenecks
+    assert counters is not None
+    assert sum(counters.launches) == len(expected)
+    for name, launches in zip(counters.processes, counters.launches):
+        assert launches == sum(1 for _, proc in expected if proc == name)
+
+
+def test_snapshot_and_executor_keep_counters() -> None:
+    sim = Simulator(_config(), bottlenecks=True)
+    snap = sim.snapshot()
+    sim.run(5)
+    assert list(sim.bottlenecks.launches) == [1, 0]  # type: ignore[union-attr]
+    sim.restore(snap)
+    assert list(sim.bottlenecks.launches) == [0, 0]  # type: ignore[union-attr]
+    config = parser.parse_file(Path("resources/ikea"))
+    ref = Simulator(config, bottlenecks=True)
+    ref.run(200)
+    branch = Simulator(config, bottlenecks=True)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        asyncio.run(branch.run_async(200, executor=executor))
+    assert branch.bottlenecks.launches == ref.bottlenecks.launches  # type: ignore
+    assert branch.bottlenecks.blocked == ref.bottlenecks.blocked  # type: ignore
+
+
+def test_counters_copy_is_independent() -> None:
+    counters = BottleneckCounters(_config())
+    clone = copy.copy(counters)
+    clone.launched(_config().processes["make"])
+    assert list(counters.launches) == [0, 0]
+    assert format_report(counters)[-1] == "  use   blocked      0  launches      0"
+
+
+def test_cli_bottleneck_report(tmp_path: Path, capsys: CaptureFixture[str]) -> None:
+    argv = ["resources/steak", "50", "--trace", str(tmp_path / "t.txt")]
+    cli.main(argv + ["--bottlenecks", "--output", "none"])
+    out = capsys.readouterr().out.splitlines()
+    assert out[-10] == "Starved resources:"
+    assert out[-5].startswith("  cuisson_3 ")
+    cli.main(argv + ["--bottlenecks", "--format", "ndjson"])
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert records[-2]["event"] == "bottlenecks"
+    assert records[-2]["resources"][0]["blocked"] > 0
+    with pytest.raises(SystemExit):
+        cli.main(argv + ["--bottlenecks", "--fuse"])
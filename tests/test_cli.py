@@ -1,3 +1,4 @@
+import json
 import os
 from pathlib import Path
 
@@ -305,3 +306,304 @@ def test_cli_ignore_delay_when_optimize_time_first(
     assert "Max time reached" not in captured.out
     assert "40:livraison" in captured.out
     assert "client_content  => 1" in captured.out
+
+
+def test_cli_portfolio(tmp_path: Path, capsys: CaptureFixture[str]) -> None:
+    trace_path = tmp_path / "trace.txt"
+    exit_code = cli.main(
+        [
+            "resources/ikea",
+            "100",
+            "--portfolio",
+            "--workers",
+            "1",
+            "--trace",
+            str(trace_path),
+        ]
+    )
+    captured = capsys.readouterr()
+    assert exit_code == 0
+    assert "Portfolio strategy: " in captured.out
+    assert "armoire  => 1" in captured.out
+    assert trace_path.read_text().splitlines()
+
+
+@pytest.mark.parametrize(
+    "extra", [["--policy", "demand"], ["--demand-cap"], ["--engine", "codegen"]]
+)
+def test_cli_portfolio_rejects_single_run_options(extra: list[str]) -> None:
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["resources/ikea", "50", "--portfolio", *extra])
+    assert exc.value.code == 2
+
+
+def test_cli_rejects_non_positive_workers(tmp_path: Path) -> None:
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["resources/simple", "10", "--workers", "0"])
+    assert exc.value.code == 2
+
+
+def test_cli_policy_option(tmp_path: Path, capsys: CaptureFixture[str]) -> None:
+    trace_path = tmp_path / "trace.txt"
+    exit_code = cli.main(
+        ["resources/ikea", "100", "--policy", "name", "--trace", str(trace_path)]
+    )
+    captured = capsys.readouterr()
+    assert exit_code == 0
+    assert trace_path.read_text().splitlines()[0] in captured.out
+
+
+def test_cli_rejects_unknown_policy() -> None:
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["resources/simple", "10", "--policy", "nope"])
+    assert exc.value.code == 2
+
+
+def test_cli_demand_cap(tmp_path: Path, capsys: CaptureFixture[str]) -> None:
+    trace_path = tmp_path / "trace.txt"
+    exit_code = cli.main(
+        ["resources/ikea", "100", "--demand-cap", "--trace", str(trace_path)]
+    )
+    captured = capsys.readouterr()
+    assert exit_code == 0
+    assert "armoire  => 1" in captured.out
+
+
+def test_cli_adaptive_horizon(tmp_path: Path, capsys: CaptureFixture[str]) -> None:
+    trace_path = tmp_path / "trace.txt"
+    exit_code = cli.main(
+        [
+            "resources/simple",
+            "1",
+            "--horizon",
+            "adaptive",
+            "--trace",
+            str(trace_path),
+        ]
+    )
+    captured = capsys.readouterr()
+    assert exit_code == 0
+    assert "Horizon: 64" in captured.out
+    assert "client_content  => 1" in captured.out
+
+
+def test_cli_adaptive_horizon_reports_max_horizon(
+    tmp_path: Path, capsys: CaptureFixture[str]
+) -> None:
+    argv = ["resources/simple", "1", "--horizon", "adaptive", "--max-horizon", "16"]
+    exit_code = cli.main(argv + ["--trace", str(tmp_path / "t.txt")])
+    captured = capsys.readouterr()
+    assert exit_code == 1
+    assert "Horizon: 16" in captured.out
+    assert "Max horizon reached at time 16" in captured.out
+    assert "No more process doable" not in captured.out
+
+
+def test_cli_rejects_non_positive_max_horizon() -> None:
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["resources/simple", "10", "--max-horizon", "0"])
+    assert exc.value.code == 2
+
+
+def test_cli_sweep(tmp_path: Path, capsys: CaptureFixture[str]) -> None:
+    assert cli.main(["sweep", "resources/ikea", "--delays", "21:22"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith("delay,time,deadlock,")
+    assert len(lines) == 3
+    out_path = tmp_path / "sweep.csv"
+    assert (
+        cli.main(
+            ["sweep", "resources/ikea", "--delays", "2", "--output", str(out_path)]
+        )
+        == 0
+    )
+    assert len(out_path.read_text().splitlines()) == 3
+
+
+def test_cli_sweep_stock_grid(capsys: CaptureFixture[str]) -> None:
+    argv = ["sweep", "resources/ikea", "--delays", "30", "--set", "planche=7,14"]
+    assert cli.main([*argv, "--workers", "2"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith("init_planche,delay,")
+    assert len(lines) == 61
+    assert cli.main([*argv, "--workers", "1"]) == 0
+    assert sorted(capsys.readouterr().out.splitlines()) == sorted(lines)
+
+
+def test_cli_sweep_rejects_bad_input(tmp_path: Path) -> None:
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["sweep", "resources/ikea", "--delays", "0"])
+    assert exc.value.code == 2
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["sweep", str(tmp_path / "missing"), "--delays", "3"])
+    assert exc.value.code == 2
+    for extra in (["--set", "planche"], ["--set", "gold=1"], ["--workers", "0"]):
+        with pytest.raises(SystemExit) as exc:
+            cli.main(["sweep", "resources/ikea", "--delays", "3", *extra])
+        assert exc.value.code == 2
+    bad = tmp_path / "bad"
+    bad.write_text("not a config\n")
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["sweep", str(bad), "--delays", "3"])
+    assert exc.value.code == 1
+
+
+def test_cli_stop_when(tmp_path: Path, capsys: CaptureFixture[str]) -> None:
+    trace = str(tmp_path / "trace.txt")
+    argv = ["resources/ikea", "100", "--trace", trace]
+    assert cli.main([*argv, "--stop-when", "etagere>=2"]) == 0
+    out = capsys.readouterr().out
+    assert "Stop condition etagere>=2 met at time 11" in out
+    with pytest.raises(SystemExit) as exc:
+        cli.main([*argv, "--stop-when", "etagere=>2"])
+    assert exc.value.code == 2
+    with pytest.raises(SystemExit) as exc:
+        cli.main([*argv, "--stop-when", "gold>1"])
+    assert exc.value.code == 1
+    with pytest.raises(SystemExit) as exc:
+        cli.main([*argv, "--stop-when", "etagere>1", "--portfolio"])
+    assert exc.value.code == 2
+
+
+def test_cli_codegen_engine_matches_default(
+    tmp_path: Path, capsys: CaptureFixture[str]
+) -> None:
+    outputs = []
+    for engine in ("interp", "codegen"):
+        trace = tmp_path / f"{engine}.txt"
+        argv = ["resources/steak", "50", "--trace", str(trace)]
+        assert cli.main([*argv, "--engine", engine]) == 0
+        outputs.append((capsys.readouterr().out, trace.read_text()))
+    assert outputs[0] == outputs[1]
+
+
+def test_cli_fuse_matches_default(
+    tmp_path: Path, capsys: CaptureFixture[str]
+) -> None:
+    outputs = []
+    for extra in ([], ["--fuse"]):
+        trace = tmp_path / "trace.txt"
+        assert cli.main(["resources/simple", "100", "--trace", str(trace), *extra]) == 0
+        outputs.append((capsys.readouterr().out, trace.read_text()))
+    assert outputs[0] == outputs[1]
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["resources/simple", "100", "--fuse", "--demand-cap"])
+    assert exc.value.code == 2
+
+
+def test_cli_output_modes_keep_trace_file(
+    tmp_path: Path, capsys: CaptureFixture[str]
+) -> None:
+    outputs = {}
+    for mode in ("full", "summary", "none"):
+        trace = tmp_path / f"{mode}.txt"
+        argv = ["resources/simple", "100", "--trace", str(trace), "--output", mode]
+        assert cli.main(argv) == 0
+        outputs[mode] = (capsys.readouterr().out.splitlines(), trace.read_text())
+    full, summary, none = outputs["full"], outputs["summary"], outputs["none"]
+    assert full[1] == summary[1] == none[1]
+    assert "0:achat_materiel" in full[0]
+    assert "0:achat_materiel" not in summary[0]
+    assert summary[0][:4] == full[0][:4]
+    assert "Trace events: 3" in summary[0]
+    assert "  livraison            => 1" in summary[0]
+    assert summary[0][-5:] == full[0][-5:]
+    assert none[0] == ["No more process doable at time 61"]
+
+
+def test_cli_durability_atomic_matches_fsync(
+    tmp_path: Path, capsys: CaptureFixture[str]
+) -> None:
+    outputs = []
+    for durability in ("fsync", "atomic", "none"):
+        trace = tmp_path / f"{durability}.txt"
+        argv = ["resources/steak", "50", "--trace", str(trace)]
+        assert cli.main([*argv, "--durability", durability]) == 0
+        outputs.append((capsys.readouterr().out, trace.read_text()))
+    assert outputs[0] == outputs[1] == outputs[2]
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["resources/steak", "50", "--durability", "sync"])
+    assert exc.value.code == 2
+
+
+@pytest.mark.parametrize("extra", [[], ["--portfolio"], ["--fuse"]])
+def test_cli_ndjson_stream_matches_trace(
+    tmp_path: Path, capsys: CaptureFixture[str], extra: list[str]
+) -> None:
+    trace = tmp_path / "trace.txt"
+    argv = ["resources/ikea", "40", "--trace", str(trace), "--format", "ndjson"]
+    code = cli.main([*argv, *extra])
+    captured = capsys.readouterr()
+    records = [json.loads(line) for line in captured.out.splitlines()]
+    starts = [f"{r['time']}:{r['process']}" for r in records[:-1]]
+    assert {r["event"] for r in records[:-1]} == {"start"}
+    assert starts == trace.read_text().splitlines()
+    result = records[-1]
+    assert result["event"] == "result"
+    assert result["exit_code"] == code
+    assert result["reason"] in ("max_time_reached", "no_more_process_doable")
+    assert set(result["stocks"]) == {"armoire", "etagere", "fond", "montant", "planche"}
+    assert "Final Stocks" not in captured.out
+    assert "at time" in captured.err
+
+
+def test_cli_ndjson_reports_invalid_config(capsys: CaptureFixture[str]) -> None:
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["resources/pomme", "10", "--format", "ndjson"])
+    assert exc.value.code == 1
+    record = json.loads(capsys.readouterr().out)
+    assert record["event"] == "error"
+    assert record["message"].startswith("invalid config: invalid delay")
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["resources/ikea", "10", "--format", "ndjson", "--output", "none"])
+    assert exc.value.code == 2
+
+
+def test_cli_analysis_log_file_filters_and_samples(
+    tmp_path: Path, capsys: CaptureFixture[str]
+) -> None:
+    log = tmp_path / "analysis.jsonl"
+    argv = ["resources/ikea", "50", "--trace", str(tmp_path / "t.txt")]
+    cli.main(argv)
+    expected = capsys.readouterr().out
+    cli.main(
+        argv
+        + ["--analysis-log-file", str(log)]
+        + ["--analysis-log-level", "_run_simulation=steps"]
+        + ["--analysis-log-level", "optimizer=off"]
+        + ["--analysis-log-sample", "PARSED_ARGS=1"]
+    )
+    assert capsys.readouterr().out == expected
+    records = [json.loads(line) for line in log.read_text().splitlines()]
+    assert set(records[0]) == {"scope", "label", "kind", "value"}
+    run = [r for r in records if r["scope"] == "_run_simulation"]
+    assert run and {r["kind"] for r in run} <= {"header", "step"}
+    assert not any(r["scope"].startswith("optimizer") for r in records)
+    assert any(r["label"] == "EXIT_CODE" and r["value"] == 0 for r in records)
+
+
+def test_cli_analysis_log_sampling_and_validation(
+    tmp_path: Path, capsys: CaptureFixture[str]
+) -> None:
+    log = tmp_path / "analysis.jsonl"
+    argv = ["resources/ikea", "50", "--trace", str(tmp_path / "t.txt")]
+    cli.main(argv + ["--analysis-log-file", str(log)])
+
+    def sort_keys() -> int:
+        lines = log.read_text().splitlines()
+        return sum(json.loads(line)["label"] == "SORT_KEY_RESULT" for line in lines)
+
+    full = sort_keys()
+    cli.main(
+        argv
+        + ["--analysis-log-file", str(log)]
+        + ["--analysis-log-sample", "SORT_KEY_RESULT=2"]
+    )
+    assert full > 1 and sort_keys() == (full + 1) // 2
+    capsys.readouterr()
+    for extra in (["--analysis-log-sample", "X=0"], ["--analysis-log-level", "x=y"]):
+        with pytest.raises(SystemExit) as exc:
+            cli.main(argv + ["--analysis-log-file", str(log), *extra])
+        assert exc.value.code == 2
+    with pytest.raises(SystemExit):
+        cli.main(argv + ["--analysis-log-sample", "X=2"])
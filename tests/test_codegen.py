@@ -0,0 +1,69 @@
+import asyncio
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from krpsim import codegen, parser
+from krpsim.optimizer import policy_names
+from krpsim.parser import Config, Process
+from krpsim.simulator import Simulator
+
+RESOURCES = ["ikea", "steak", "inception", "recre", "simple", "exponential"]
+
+
+@pytest.mark.parametrize("name", RESOURCES)
+@pytest.mark.parametrize("policy", policy_names())
+def test_codegen_engine_matches_interpreter(name: str, policy: str) -> None:
+    cfg = parser.parse_file(Path("resources") / name)
+    for max_time in (7, 300):
+        ref = Simulator(cfg, policy=policy)
+        ref.run(max_time)
+        sim = Simulator(cfg, policy=policy, engine="codegen")
+        sim.run(max_time)
+        assert (sim.trace, sim.stocks, sim.time, sim.deadlock) == (
+            ref.trace,
+            ref.stocks,
+            ref.time,
+            ref.deadlock,
+        )
+
+
+def test_codegen_falls_back_for_dynamic_policy_and_caps() -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    assert Simulator(cfg, engine="codegen")._start_fn is not None
+    assert Simulator(cfg, policy="dynamic", engine="codegen")._start_fn is None
+    assert Simulator(cfg, demand_cap=True, engine="codegen")._start_fn is None
+    with pytest.raises(ValueError, match="unknown engine 'jit'"):
+        Simulator(cfg, engine="jit")
+
+
+def test_compile_start_is_cached_by_digest() -> None:
+    procs = [Process("a", {"x": 2}, {"y": 1}, 3)]
+    first = codegen.compile_start(procs)
+    assert codegen.compile_start([Process("a", {"x": 2}, {"y": 1}, 3)]) is first
+    assert codegen.compile_start([Process("a", {"x": 2}, {"y": 2}, 3)]) is not first
+    source = codegen.generate_source(procs)
+    assert "r0 >= 2" in source and "needs" not in source
+
+
+def test_codegen_supports_rejects_zero_delay() -> None:
+    assert not codegen.supports([Process("a", {"x": 1}, {"y": 1}, 0)])
+    cfg = Config({"x": 1}, {"a": Process("a", {"x": 1}, {"y": 1}, 0)})
+    sim = Simulator(cfg, engine="codegen")
+    assert sim._start_fn is None
+    sim.run(5)
+    assert sim.stocks == {"x": 0, "y": 1}
+
+
+def test_codegen_simulator_pickles_and_runs_in_process_pool() -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    ref = Simulator(cfg)
+    ref.run(300)
+    clone = pickle.loads(pickle.dumps(Simulator(cfg, engine="codegen")))
+    assert clone._start_fn is not None
+    sim = Simulator(cfg, engine="codegen")
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        trace = asyncio.run(sim.run_async(300, executor=executor))
+    assert (trace, sim.stocks, sim.time) == (ref.trace, ref.stocks, ref.time)
@@ -0,0 +1,31 @@
+from pathlib import Path
+
+import pytest
+
+from krpsim import parser
+from krpsim.conditions import StopCondition, StopWatch, parse_condition
+
+
+def test_parse_condition_operators() -> None:
+    assert parse_condition("armoire>=10") == StopCondition("armoire", ">=", 10)
+    assert parse_condition(" fond == 0 ") == StopCondition("fond", "==", 0)
+    assert str(parse_condition("euro<-3")) == "euro<-3"
+    for bad in ("armoire", "armoire=>1", ">=1", "a>=b", "a b>=1"):
+        with pytest.raises(ValueError, match="invalid stop condition"):
+            parse_condition(bad)
+
+
+def test_stop_condition_treats_missing_resource_as_zero() -> None:
+    assert parse_condition("armoire<=0").holds({})
+    assert not parse_condition("armoire>0").holds({"planche": 3})
+
+
+def test_stop_watch_indexes_only_touching_processes() -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    watch = StopWatch(cfg, [parse_condition("planche<=0")])
+    assert set(watch._on_start) == {"do_montant", "do_fond", "do_etagere"}
+    assert watch._on_end == {}
+    assert watch.after_end("do_fond", {"planche": 0}) is None
+    assert watch.after_start("do_fond", {"planche": 0}) is not None
+    with pytest.raises(ValueError, match="unknown resource 'gold'"):
+        StopWatch(cfg, [parse_condition("gold>1")])
@@ -0,0 +1,110 @@
+from fractions import Fraction
+from pathlib import Path
+
+from krpsim import parser
+from krpsim.demand import DemandCap, analyze_demand
+from krpsim.optimizer import get_policy
+from krpsim.simulator import Simulator
+
+
+def test_analyze_demand_ikea_ratios() -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    analysis = analyze_demand(cfg)
+    assert analysis.targets == ["armoire"]
+    assert analysis.runs["armoire"] == {
+        "do_armoire_ikea": 1,
+        "do_montant": 2,
+        "do_fond": 1,
+        "do_etagere": 3,
+    }
+    assert analysis.ratios["armoire"]["planche"] == 7
+    assert analysis.required_ratio("etagere") == 3
+    assert analysis.required_ratio("unknown") == 0
+    assert analysis.contributes("do_fond")
+
+
+def test_analyze_demand_splits_producers_and_skips_tokens() -> None:
+    cfg = parser.Config(
+        stocks={"a": 1, "tool": 1},
+        processes={
+            "p1": parser.Process("p1", {"a": 1}, {"b": 1}, 1),
+            "p2": parser.Process("p2", {"a": 2}, {"b": 1}, 1),
+            "use": parser.Process("use", {"b": 2, "tool": 1}, {"t": 1, "tool": 1}, 1),
+            "idle": parser.Process("idle", {"a": 1}, {"z": 1}, 1),
+        },
+        optimize=["time", "t"],
+    )
+    analysis = analyze_demand(cfg)
+    assert analysis.targets == ["t"]
+    assert analysis.runs["t"] == {"use": 1, "p1": 1, "p2": 1}
+    assert analysis.ratios["t"] == {"t": 1, "b": 2, "a": 3}
+    assert "tool" not in analysis.ratios["t"]
+    assert not analysis.contributes("idle")
+    assert analysis.weights["idle"] == (Fraction(0),)
+
+
+def test_analyze_demand_terminates_on_cycles() -> None:
+    for name in ("recre", "inception", "exponential", "self_gen"):
+        cfg = parser.parse_file(Path("resources") / name)
+        analysis = analyze_demand(cfg)
+        assert set(analysis.weights) == set(cfg.processes)
+
+
+def test_demand_policy_prefers_least_committed_output() -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    policy = get_policy("demand", cfg)
+    names = [p.name for p in policy.order({"planche": 7})]
+    assert names[0] == "do_armoire_ikea"
+    for name in ("do_montant", "do_fond", "do_etagere"):
+        policy.launched(cfg.processes[name])
+    policy.launched(cfg.processes["do_montant"])
+    assert [p.name for p in policy.order({})][1:] == [
+        "do_etagere",
+        "do_fond",
+        "do_montant",
+    ]
+
+
+def test_demand_policy_builds_target_on_ikea() -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    sim = Simulator(cfg, policy="demand")
+    sim.run(200)
+    assert sim.stocks["armoire"] == 1
+
+
+def test_demand_cap_balances_ikea_intermediates() -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    greedy = Simulator(cfg)
+    greedy.run(100)
+    capped = Simulator(cfg, demand_cap=True)
+    capped.run(100)
+    assert greedy.stocks.get("armoire", 0) == 0
+    assert capped.stocks["armoire"] == 1
+    assert capped.stocks["planche"] == 0
+
+
+def test_demand_cap_levels_follow_horizon_and_siblings() -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    cap = DemandCap(cfg)
+    etagere = cfg.processes["do_etagere"]
+    assert cap.allows(etagere, 0, 100, {})
+    assert not cap.allows(etagere, 0, 100, {"etagere": 3})
+    assert cap.allows(etagere, 0, 100, {"etagere": 3, "montant": 2, "fond": 1})
+    assert not cap.allows(etagere, 61, 100, {})
+    assert cap.allows(cfg.processes["do_armoire_ikea"], 99, 100, {})
+    cap.launched(etagere)
+    assert not cap.allows(etagere, 0, 100, {"etagere": 2})
+    cap.completed(etagere)
+    assert cap.allows(etagere, 0, 100, {"etagere": 2})
+
+
+def test_demand_cap_never_lowers_targets() -> None:
+    for name in ("exponential", "steak", "simple", "stress_multi_objective"):
+        cfg = parser.parse_file(Path("resources") / name)
+        greedy = Simulator(cfg)
+        greedy.run(200)
+        capped = Simulator(cfg, demand_cap=True)
+        capped.run(200)
+        for target in cfg.optimize or []:
+            if target != "time":
+                assert capped.stocks.get(target, 0) >= greedy.stocks.get(target, 0)
@@ -1,6 +1,19 @@
+import io
+import json
+import os
 from pathlib import Path
 
-from krpsim.display import format_trace, save_trace
+import pytest
+from _pytest.capture import CaptureFixture
+
+from krpsim.display import (
+    DURABILITY_MODES,
+    NdjsonWriter,
+    format_trace,
+    print_event_counts,
+    save_trace,
+    write_lines,
+)
 
 
 def test_format_trace() -> None:
@@ -19,3 +32,63 @@ def test_save_empty_trace(tmp_path: Path) -> None:
     target = tmp_path / "trace.txt"
     save_trace([], target)
     assert target.read_text().splitlines() == ["# no process executed (optimization)"]
+
+
+def test_write_lines_matches_print(capsys: CaptureFixture[str]) -> None:
+    write_lines(["0:p1", "5:p2"])
+    write_lines([])
+    assert capsys.readouterr().out == "0:p1\n5:p2\n"
+
+
+def test_print_event_counts(capsys: CaptureFixture[str]) -> None:
+    print_event_counts([(0, "p1"), (0, "long_name"), (5, "p1")])
+    assert capsys.readouterr().out.splitlines() == [
+        "Trace events: 3",
+        "  long_name  => 1",
+        "  p1         => 2",
+    ]
+
+
+@pytest.mark.parametrize("durability", DURABILITY_MODES)
+def test_save_trace_durability_modes_write_same_content(
+    tmp_path: Path, durability: str
+) -> None:
+    target = tmp_path / "trace.txt"
+    save_trace([(0, "p1"), (5, "p2")], target, durability)
+    assert target.read_text() == "0:p1\n5:p2\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["trace.txt"]
+
+
+def test_save_trace_atomic_keeps_previous_trace_on_failure(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    target = tmp_path / "trace.txt"
+    save_trace([(0, "old")], target, "atomic")
+
+    def fail(src: object, dst: object) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError, match="disk full"):
+        save_trace([(0, "new")], target, "atomic")
+    assert target.read_text() == "0:old\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["trace.txt"]
+
+
+def test_save_trace_rejects_unknown_durability(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="unknown durability 'sync'"):
+        save_trace([], tmp_path / "trace.txt", "sync")
+    assert not (tmp_path / "trace.txt").exists()
+
+
+def test_ndjson_writer_escapes_names_and_records() -> None:
+    stream = io.StringIO()
+    writer = NdjsonWriter(stream)
+    writer.starts([(0, 'a"b'), (3, 'a"b')])
+    writer.record("result", time=4, stocks={"x": 1})
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert lines == [
+        {"event": "start", "process": 'a"b', "time": 0},
+        {"event": "start", "process": 'a"b', "time": 3},
+        {"event": "result", "time": 4, "stocks": {"x": 1}},
+    ]
@@ -0,0 +1,69 @@
+from pathlib import Path
+
+import pytest
+
+from krpsim import parser
+from krpsim.fusion import find_chains, run_fused
+from krpsim.optimizer import policy_names
+from krpsim.parser import Config, Process
+from krpsim.simulator import Simulator
+
+
+def _pipeline(depth: int) -> Config:
+    procs = {"src": Process("src", {"a": 1}, {"l0": 1}, 2)}
+    for i in range(1, depth):
+        procs[f"s{i}"] = Process(f"s{i}", {f"l{i - 1}": 1}, {f"l{i}": 1}, i)
+    procs["sink"] = Process("sink", {f"l{depth - 1}": 1}, {"z": 1}, 3)
+    procs["side"] = Process("side", {"a": 2}, {"b": 1}, 4)
+    return Config({"a": 40}, procs, ["z"])
+
+
+def _assert_same(cfg: Config, policy: str, max_time: int) -> None:
+    ref = Simulator(cfg, policy=policy)
+    ref.run(max_time)
+    sim = run_fused(cfg, max_time, policy=policy)
+    assert (sim.trace, sim.stocks, sim.time, sim.deadlock) == (
+        ref.trace,
+        ref.stocks,
+        ref.time,
+        ref.deadlock,
+    )
+
+
+def test_find_chains_on_simple() -> None:
+    cfg = parser.parse_file(Path("resources/simple"))
+    (chain,) = find_chains(cfg)
+    assert [p.name for p in chain.stages] == [
+        "achat_materiel",
+        "realisation_produit",
+        "livraison",
+    ]
+    assert chain.links == ("materiel", "produit")
+    assert [v.delay for v in chain.variants] == [40, 60]
+    assert chain.variant_for(45).name == "achat_materiel+realisation_produit"
+    assert chain.variant_for(5) is chain.stages[0]
+
+
+def test_find_chains_rejects_shared_or_observed_links() -> None:
+    cfg = _pipeline(3)
+    cfg.processes["tap"] = Process("tap", {"l1": 1}, {"b": 1}, 1)
+    assert [c.links for c in find_chains(cfg)] == [("l0",), ("l2",)]
+    cfg = _pipeline(3)
+    cfg.stocks["l1"] = 1
+    assert [c.links for c in find_chains(cfg)] == [("l0",), ("l2",)]
+    cfg = _pipeline(3)
+    cfg.processes["s2"] = Process("s2", {"l1": 2}, {"l2": 1}, 1)
+    assert [c.links for c in find_chains(cfg)] == [("l0",), ("l2",)]
+    assert [c.links for c in find_chains(_pipeline(3))] == [("l0", "l1", "l2")]
+
+
+@pytest.mark.parametrize("policy", policy_names())
+@pytest.mark.parametrize("max_time", [1, 9, 23, 60, 400])
+def test_run_fused_matches_plain_run(policy: str, max_time: int) -> None:
+    _assert_same(_pipeline(5), policy, max_time)
+    _assert_same(parser.parse_file(Path("resources/simple")), policy, max_time)
+
+
+@pytest.mark.parametrize("name", ["ikea", "recre", "stress_gantt_overflow_right"])
+def test_run_fused_on_bundled_resources(name: str) -> None:
+    _assert_same(parser.parse_file(Path("resources") / name), "default", 200)
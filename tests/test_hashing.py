@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import pytest
+
+from krpsim import parser
+from krpsim.hashing import TranspositionTable, zobrist_key
+from krpsim.simulator import Simulator, _RunningProcess
+
+
+def test_zobrist_key_is_deterministic_and_spread() -> None:
+    assert zobrist_key(1, 0, 5) == zobrist_key(1, 0, 5)
+    keys = {zobrist_key(d, i, v) for d in (1, 2) for i in range(4) for v in range(8)}
+    assert len(keys) == 64
+
+
+@pytest.mark.parametrize("name", ["ikea", "steak", "recre", "inception"])
+def test_state_hash_matches_full_recompute(name: str) -> None:
+    cfg = parser.parse_file(Path("resources") / name)
+    sim = Simulator(cfg)
+    initial = sim.state_hash
+    sim.run(60)
+    assert sim.state_hash == sim._full_hash()
+    assert Simulator(cfg).state_hash == initial
+
+
+def test_state_hash_ignores_time_and_counts_duplicates() -> None:
+    proc = parser.Process("p", {"a": 1}, {"b": 1}, 3)
+    cfg = parser.Config(stocks={"a": 2}, processes={"p": proc}, optimize=["b"])
+    sim = Simulator(cfg)
+    empty = sim.state_hash
+    sim.time = 42
+    assert sim._full_hash() == empty
+    sim._running = [_RunningProcess(proc, 2)]
+    single = sim._full_hash()
+    sim._running.append(_RunningProcess(proc, 2))
+    assert len({empty, single, sim._full_hash()}) == 3
+
+
+def test_snapshot_keeps_state_hash() -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    sim = Simulator(cfg)
+    sim.run(12)
+    child = sim.fork()
+    assert child.state_hash == sim.state_hash
+    child.run(100)
+    assert child.state_hash == child._full_hash()
+    assert child.state_hash != sim.state_hash
+
+
+def test_transposition_table_prunes_revisits() -> None:
+    table = TranspositionTable(capacity=2)
+    assert not table.probe(1, 5)
+    assert table.probe(1, 7)
+    assert not table.probe(1, 3)
+    assert table.get(1) == 3
+    assert not table.probe(2, 0)
+    assert not table.probe(3, 0)
+    assert 1 not in table
+    assert len(table) == 2
+    table.clear()
+    assert len(table) == 0
+    with pytest.raises(ValueError):
+        TranspositionTable(capacity=0)
@@ -0,0 +1,125 @@
+from pathlib import Path
+
+import pytest
+from _pytest.capture import CaptureFixture
+
+from krpsim import cli
+from krpsim.multiconfig import expand_configs, format_summary, run_batch
+
+NAMES = ["ikea", "simple", "steak", "recre", "pomme"]
+
+
+def _copy(tmp_path: Path, names: list[str]) -> Path:
+    src = tmp_path / "configs"
+    src.mkdir()
+    for name in names:
+        (src / name).write_bytes(Path("resources", name).read_bytes())
+    return src
+
+
+def test_batch_traces_match_single_runs(
+    tmp_path: Path, capsys: CaptureFixture[str]
+) -> None:
+    src = _copy(tmp_path, NAMES)
+    out = tmp_path / "traces"
+    code = cli.main(["--batch", str(src), "30", "--trace-dir", str(out)])
+    summary = capsys.readouterr().out.splitlines()
+    assert code == 1
+    assert summary[-1] == "5 configs, 1 failed"
+    expected_codes = {}
+    for name in NAMES:
+        trace = tmp_path / f"{name}.txt"
+        try:
+            expected_codes[name] = cli.main(
+                [str(src / name), "30", "--trace", str(trace)]
+            )
+        except SystemExit as exc:
+            expected_codes[name] = exc.code
+        capsys.readouterr()
+        if trace.exists():
+            assert (out / f"{name}.trace").read_text() == trace.read_text()
+        else:
+            assert not (out / f"{name}.trace").exists()
+    rows = {line.split()[0]: int(line.split()[1]) for line in summary[1:-1]}
+    assert rows == expected_codes
+
+
+def test_batch_results_do_not_depend_on_jobs(tmp_path: Path) -> None:
+    paths = expand_configs(str(_copy(tmp_path, NAMES)))
+    seq = run_batch(paths, 50, trace_dir=tmp_path / "a", jobs=1)
+    par = run_batch(paths, 50, trace_dir=tmp_path / "b", jobs=3)
+    strip = [(r.name, r.exit_code, r.reason, r.time, r.stocks) for r in seq]
+    assert strip == [(r.name, r.exit_code, r.reason, r.time, r.stocks) for r in par]
+    for name in ["ikea", "simple"]:
+        a = (tmp_path / "a" / f"{name}.trace").read_text()
+        assert a == (tmp_path / "b" / f"{name}.trace").read_text()
+
+
+def test_batch_glob_and_all_success_exit_code(
+    tmp_path: Path, capsys: CaptureFixture[str]
+) -> None:
+    src = _copy(tmp_path, ["simple", "steak"])
+    code = cli.main(["--batch", str(src / "s*"), "100", "--trace-dir", str(tmp_path)])
+    assert code == 0
+    lines = capsys.readouterr().out.splitlines()
+    header = ["config", "exit", "cycles", "wall_ms", "reason", "stocks"]
+    assert lines[0].split() == header
+    assert lines[1].split()[:3] == ["simple", "0", "61"]
+    assert lines[-1] == "2 configs, 0 failed"
+
+
+def test_expand_configs_rejects_empty_and_duplicate_names(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="no config matches"):
+        expand_configs(str(tmp_path / "none*"))
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a" / "x").write_text("")
+    (tmp_path / "b" / "x").write_text("")
+    (tmp_path / "a" / ".hidden").write_text("")
+    assert expand_configs(str(tmp_path / "a")) == [tmp_path / "a" / "x"]
+    with pytest.raises(ValueError, match="duplicate config name 'x'"):
+        expand_configs(str(tmp_path / "*" / "x"))
+
+
+@pytest.mark.parametrize(
+    "args, message",
+    [
+        (["resources", "0"], "delay must be a positive integer"),
+        (["resources", "5", "--jobs", "0"], "jobs must be a positive integer"),
+        (["nothing-here*", "5"], "no config matches"),
+    ],
+)
+def test_batch_cli_rejects_invalid_arguments(
+    args: list[str], message: str, capsys: CaptureFixture[str]
+) -> None:
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["--batch", *args])
+    assert exc.value.code == 2
+    assert message in capsys.readouterr().err
+
+
+def test_format_summary_reports_invalid_config_message(tmp_path: Path) -> None:
+    results = run_batch([Path("resources/pomme")], 5, trace_dir=tmp_path)
+    lines = format_summary(results)
+    assert lines[1].split()[:3] == ["pomme", "1", "-"]
+    assert "invalid_config  invalid config: invalid delay" in lines[1]
+
+
+@pytest.mark.parametrize(
+    ("text", "code", "reason"),
+    [
+        ("a:1\nb:0\np:(b:1):(a:1):1\noptimize:(a)\n", 1, "deadlock"),
+        (Path("resources/best").read_text(), 0, "no_more_process_doable"),
+    ],
+)
+def test_batch_exit_matches_single_run(
+    tmp_path: Path, capsys: CaptureFixture[str], text: str, code: int, reason: str
+) -> None:
+    config = tmp_path / "config"
+    config.write_text(text)
+    [result] = run_batch([config], 30, trace_dir=tmp_path)
+    single = tmp_path / "single.txt"
+    assert cli.main([str(config), "30", "--trace", str(single)]) == code
+    assert (result.exit_code, result.reason) == (code, reason)
+    assert result.message in capsys.readouterr().out.splitlines()
+    assert (tmp_path / "config.trace").read_text() == single.read_text()
@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import pytest
+
+from krpsim import parser, portfolio
+from krpsim.optimizer import policy_names
+from krpsim.simulator import Simulator
+
+
+def test_score_simulation_lexicographic() -> None:
+    assert portfolio.score_simulation(["time", "b"], {"b": 3}, 7, 2) == (1, -7, 3)
+    assert portfolio.score_simulation(None, {"b": 3}, 7, 2) == (1,)
+
+
+def test_score_simulation_ranks_blocked_runs_last() -> None:
+    blocked = portfolio.score_simulation(["time", "b"], {"b": 0}, 0, 0)
+    producing = portfolio.score_simulation(["time", "b"], {"b": 5}, 40, 5)
+    assert producing > blocked
+
+
+def test_run_portfolio_keeps_best_score() -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    sim, best = portfolio.run_portfolio(cfg, 100, workers=1)
+    for policy in policy_names():
+        other = Simulator(cfg, policy=policy)
+        other.run(100)
+        assert best.score >= portfolio.score_simulation(
+            cfg.optimize, other.stocks, other.time, len(other.trace)
+        )
+    assert sim.trace == best.trace
+    assert sim.stocks == best.stocks
+    assert sim.policy == best.strategy
+    assert sim.max_time == 100
+
+
+def test_run_portfolio_tie_keeps_first_strategy() -> None:
+    cfg = parser.parse_file(Path("resources/custom_finite"))
+    _, best = portfolio.run_portfolio(cfg, 10, strategies=("name", "delay"), workers=1)
+    assert best.strategy == "name"
+
+
+def test_run_portfolio_process_pool_matches_local() -> None:
+    cfg = parser.parse_file(Path("resources/steak"))
+    _, local = portfolio.run_portfolio(cfg, 100, workers=1)
+    sim, pooled = portfolio.run_portfolio(cfg, 100, workers=2)
+    assert pooled == local
+    assert sim.time == local.time
+
+
+def test_run_portfolio_rejects_bad_strategies() -> None:
+    cfg = parser.parse_file(Path("resources/simple"))
+    with pytest.raises(ValueError, match="at least one"):
+        portfolio.run_portfolio(cfg, 10, strategies=())
+    with pytest.raises(ValueError, match="unknown policy"):
+        portfolio.run_portfolio(cfg, 10, strategies=("nope",))
+
+
+def test_run_strategy_requires_initialized_worker(monkeypatch) -> None:
+    monkeypatch.setattr(portfolio, "_WORKER_CONFIG", None)
+    with pytest.raises(RuntimeError, match="not initialized"):
+        portfolio._run_strategy("default", 10)
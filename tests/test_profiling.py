@@ -0,0 +1,87 @@
+import json
+import pstats
+from pathlib import Path
+
+from _pytest.capture import CaptureFixture
+
+from krpsim import cli, parser
+from krpsim.profiling import Profiler
+from krpsim.simulator import Simulator
+
+PHASES = ["parse_file", "order_processes", "step_loop", "format_trace", "save_trace"]
+
+
+def test_counted_run_keeps_trace_and_counts() -> None:
+    config = parser.parse_file(Path("resources/ikea"))
+    expected = Simulator(config).run(50)
+    sim = Simulator(config, count_activity=True)
+    profiler = Profiler(enabled=True)
+    with profiler.phase("step_loop"):
+        assert sim.run(50) == expected
+    counters = profiler.report(sim)["counters"]
+    assert counters["cycles"] == sim.time + 1
+    assert counters["sort_invocations"] == 0
+    assert counters["feasibility_checks"] >= counters["launches"] == len(expected)
+    assert counters["completions"] == len(expected)
+
+
+def test_counters_skip_horizon_filtered_candidates() -> None:
+    config = parser.parse_file(Path("resources/simple"))
+    sim = Simulator(config, count_activity=True)
+    sim.run(0)
+    assert sim.activity is not None
+    assert sim.activity.cycles == 1
+    assert sim.activity.feasibility_checks == 0
+
+
+def test_dynamic_policy_counts_each_sort() -> None:
+    config = parser.parse_file(Path("resources/ikea"))
+    sim = Simulator(config, policy="dynamic", count_activity=True)
+    sim.run(50)
+    assert sim.activity is not None
+    assert sim.activity.sort_invocations == sim.activity.cycles > 0
+    child = sim.fork()
+    child.run(60)
+    assert child.activity is not sim.activity
+    assert sim.activity.sort_invocations == sim.activity.cycles
+
+
+def test_disabled_profiler_measures_nothing() -> None:
+    sim = Simulator(parser.parse_file(Path("resources/simple")))
+    profiler = Profiler()
+    with profiler.phase("step_loop"):
+        sim.run(10)
+    assert profiler.phases == {}
+    assert sim.activity is None
+    assert profiler.report(sim)["counters"]["cycles"] is None
+
+
+def test_cli_profile_report_on_stderr(
+    tmp_path: Path, capsys: CaptureFixture[str]
+) -> None:
+    trace = tmp_path / "trace.txt"
+    pstats_path = tmp_path / "run.pstats"
+    argv = ["resources/ikea", "50", "--trace", str(trace)]
+    assert cli.main(argv) == 0
+    expected = capsys.readouterr().out
+    code = cli.main(argv + ["--profile", "--cprofile", str(pstats_path)])
+    captured = capsys.readouterr()
+    assert code == 0
+    assert captured.out == expected
+    report = json.loads(captured.err)
+    assert list(report["phases"]) == PHASES
+    for measure in report["phases"].values():
+        assert measure["wall_s"] >= 0 and measure["peak_bytes"] >= 0
+    assert report["counters"]["launches"] == len(trace.read_text().splitlines())
+    stats = pstats.Stats(str(pstats_path))
+    assert any(func[2] == "step" for func in stats.stats)  # type: ignore[attr-defined]
+
+
+def test_cli_profile_reports_unmeasured_counters_as_null(
+    tmp_path: Path, capsys: CaptureFixture[str]
+) -> None:
+    argv = ["resources/ikea", "50", "--trace", str(tmp_path / "t.txt"), "--fuse"]
+    cli.main(argv + ["--profile", "--output", "none"])
+    counters = json.loads(capsys.readouterr().err)["counters"]
+    assert counters["cycles"] is None
+    assert counters["launches"] == counters["completions"] > 0
@@ -0,0 +1,122 @@
+import asyncio
+import copy
+import csv
+import io
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from _pytest.capture import CaptureFixture
+
+from krpsim import cli, parser
+from krpsim.parser import Config, Process
+from krpsim.recorder import StockRecorder
+from krpsim.simulator import Simulator
+
+
+def _config() -> Config:
+    return Config(
+        stocks={"a": 3},
+        processes={
+            "make": Process("make", {"a": 1}, {"b": 2}, 2),
+            "swap": Process("swap", {"b": 1}, {"b": 1}, 0),
+        },
+        optimize=["b"],
+    )
+
+
+def test_series_rebuilds_final_stocks() -> None:
+    config = parser.parse_file(Path("resources/ikea"))
+    expected = Simulator(config).run(50)
+    sim = Simulator(config, engine="codegen", record_stocks=True)
+    assert sim.run(50) == expected
+    recorder = sim.stock_recorder
+    assert recorder is not None
+    for resource in recorder.resources:
+        assert recorder.series(resource)[-1][1] == sim.stocks.get(resource, 0)
+
+
+def test_closed_form_plan_records_deltas() -> None:
+    config = parser.parse_file(Path("resources/recre"))
+    sim = Simulator(config, record_stocks=True)
+    assert sim.run(50) == Simulator(config).run(50)
+    recorder = sim.stock_recorder
+    assert recorder is not None and len(recorder) > 0
+    for resource in recorder.resources:
+        assert recorder.series(resource)[-1][1] == sim.stocks.get(resource, 0)
+
+
+def test_to_dataframe_ends_on_final_stocks() -> None:
+    pytest.importorskip("pandas")
+    sim = Simulator(parser.parse_file(Path("resources/simple")), record_stocks=True)
+    sim.run(20)
+    frame = sim.stock_recorder.to_dataframe()  # type: ignore[union-attr]
+    assert list(frame.columns) == ["time", "resource", "delta", "level"]
+    assert len(frame) == len(sim.stock_recorder)  # type: ignore[arg-type]
+    last = frame.groupby("resource")["level"].last()
+    assert not last.empty
+    assert last.to_dict() == {res: sim.stocks.get(res, 0) for res in last.index}
+
+
+def test_snapshot_and_executor_keep_recorder() -> None:
+    sim = Simulator(_config(), record_stocks=True)
+    snap = sim.snapshot()
+    sim.run(5)
+    assert len(sim.stock_recorder) > 0  # type: ignore[arg-type]
+    sim.restore(snap)
+    assert len(sim.stock_recorder) == 0  # type: ignore[arg-type]
+    config = parser.parse_file(Path("resources/ikea"))
+    ref = Simulator(config, record_stocks=True)
+    ref.run(200)
+    branch = Simulator(config, record_stocks=True)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        asyncio.run(branch.run_async(200, executor=executor))
+    assert list(branch.stock_recorder.rows()) == list(  # type: ignore[union-attr]
+        ref.stock_recorder.rows()  # type: ignore[union-attr]
+    )
+    assert len(ref.stock_recorder) > 0  # type: ignore[arg-type]
+
+
+def test_series_merges_cycles_and_skips_net_zero() -> None:
+    recorder = StockRecorder(_config())
+    recorder.record(0, {"a": 1}, -1)
+    recorder.record(0, {"a": 1}, -1)
+    recorder.record(2, {"b": 2}, 1)
+    recorder.record(3, {"b": 1}, -1)
+    recorder.record(3, {"b": 1}, 1)
+    assert len(recorder) == 5
+    assert recorder.series("a") == [(0, 3), (0, 1)]
+    assert recorder.series("b") == [(0, 0), (2, 2)]
+    assert recorder.downsample("b", 3, until=4) == [(0, 0), (2, 2), (4, 2)]
+    with pytest.raises(KeyError):
+        recorder.series("missing")
+    with pytest.raises(ValueError):
+        recorder.downsample("b", 1)
+
+
+def test_csv_and_copy() -> None:
+    recorder = StockRecorder(_config())
+    recorder.record(1, {"a": 2}, -1)
+    clone = copy.copy(recorder)
+    clone.record(2, {"a": 1}, 1)
+    out = io.StringIO()
+    recorder.write_csv(out)
+    assert out.getvalue() == "time,resource,delta,level\n1,a,-2,1\n"
+    assert len(clone) == 2
+
+
+def test_cli_record_stocks(tmp_path: Path, capsys: CaptureFixture[str]) -> None:
+    path = tmp_path / "stocks.csv"
+    argv = ["resources/ikea", "50", "--trace", str(tmp_path / "t.txt")]
+    cli.main(argv + ["--record-stocks", str(path)])
+    final = capsys.readouterr().out.split("Final Stocks:\n")[1].splitlines()
+    levels = {}
+    with path.open(newline="") as handle:
+        for row in csv.DictReader(handle):
+            levels[row["resource"]] = int(row["level"])
+    for line in final:
+        name, qty = line.split("=>")
+        if name.strip() in levels:
+            assert levels[name.strip()] == int(qty)
+    with pytest.raises(SystemExit):
+        cli.main(argv + ["--record-stocks", str(path), "--portfolio"])
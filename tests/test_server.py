@@ -0,0 +1,339 @@
+import os
+import signal
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from _pytest.capture import CaptureFixture
+
+from krpsim import cli, client, parser
+from krpsim.parser import ParseError
+from krpsim.client import send_request
+from krpsim import server as server_mod
+from krpsim.server import ConfigCache, KrpsimServer, handle_request, request_argv
+from krpsim.startup import measure_imports
+
+
+@pytest.fixture
+def server(tmp_path: Path) -> Iterator[str]:
+    path = str(tmp_path / "krpsim.sock")
+    srv = KrpsimServer(path, workers=2, cache_size=4)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield path
+    srv.shutdown()
+    srv.server_close()
+    thread.join()
+    assert not Path(path).exists()
+
+
+def _local(argv: list[str], capsys: CaptureFixture[str]) -> tuple[int, str, str]:
+    try:
+        code = cli.main(argv)
+    except SystemExit as exc:
+        code = exc.code if isinstance(exc.code, int) else 1
+    out, err = capsys.readouterr()
+    return code, out, err
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["resources/simple", "10"],
+        ["resources/ikea", "50", "--policy", "delay"],
+        ["resources/inception", "5"],
+        ["resources/simple", "0"],
+        ["resources/missing", "10"],
+    ],
+)
+def test_connect_matches_local_cli(
+    server: str,
+    tmp_path: Path,
+    capsys: CaptureFixture[str],
+    args: list[str],
+) -> None:
+    trace = tmp_path / "local.txt"
+    local = _local([*args, "--trace", str(trace)], capsys)
+    remote_trace = tmp_path / "remote.txt"
+    remote = _local(
+        ["--connect", server, *args, "--trace", str(remote_trace)], capsys
+    )
+    assert remote == local
+    if trace.exists():
+        assert remote_trace.read_text() == trace.read_text()
+
+
+def test_connect_resolves_paths_from_client_cwd(
+    server: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    config = Path("resources/simple").resolve()
+    monkeypatch.chdir(tmp_path)
+    response = send_request(
+        server, {"argv": [str(config), "10"], "cwd": str(tmp_path)}
+    )
+    assert response["exit_code"] == 0
+    assert (tmp_path / "trace.txt").read_text()
+
+
+def test_structured_request_with_config_text(server: str, tmp_path: Path) -> None:
+    text = Path("resources/simple").read_text()
+    response = send_request(
+        server,
+        {
+            "config_text": text,
+            "delay": 10,
+            "options": ["--trace", str(tmp_path / "t.txt")],
+        },
+    )
+    assert response["exit_code"] == 0
+    assert "Final Stocks:" in response["stdout"]
+    assert (tmp_path / "t.txt").read_text()
+
+
+def test_invalid_requests_are_rejected(server: str) -> None:
+    assert send_request(server, {"delay": 3})["exit_code"] == 2
+    response = send_request(server, {"argv": ["serve", "--socket", "x"]})
+    assert response["exit_code"] == 2
+    assert "not available" in response["stderr"]
+
+
+def test_request_argv_builds_cli_arguments() -> None:
+    request = {"config": "resources/simple", "delay": 5, "options": ["-v"]}
+    assert request_argv(request) == ["resources/simple", "5", "-v"]
+    assert request_argv({"config_text": "x", "delay": 1}) == ["-", "1"]
+    with pytest.raises(ValueError):
+        request_argv({"config": "a", "config_text": "b", "delay": 1})
+    with pytest.raises(ValueError):
+        request_argv({"argv": "resources/simple 10"})
+    with pytest.raises(ValueError, match="integer 'delay'"):
+        request_argv({"config": "resources/simple"})
+    with pytest.raises(ValueError, match="not available"):
+        request_argv({"argv": ["--connect", "x"]})
+
+
+def test_config_cache_is_lru_by_content(tmp_path: Path) -> None:
+    cache = ConfigCache(maxsize=2)
+    names = ["simple", "ikea", "steak"]
+    for name in names:
+        (tmp_path / name).write_bytes(Path("resources", name).read_bytes())
+    first = cache.load(tmp_path / "simple")
+    assert first == parser.parse_file(Path("resources/simple"))
+    assert cache.load(Path("resources/simple")) is first
+    cache.load(tmp_path / "ikea")
+    cache.load(tmp_path / "simple")
+    cache.load(tmp_path / "steak")
+    assert (cache.hits, cache.misses, len(cache)) == (2, 3, 2)
+    assert cache.load(tmp_path / "simple") is first
+    cache.load(tmp_path / "ikea")
+    assert cache.misses == 4
+    with pytest.raises(ParseError):
+        cache.load(tmp_path / "missing")
+
+
+def test_server_refuses_socket_in_use(server: str) -> None:
+    with pytest.raises(OSError, match="already in use"):
+        KrpsimServer(server, workers=1)
+
+
+def test_connect_reports_unreachable_server(
+    tmp_path: Path, capsys: CaptureFixture[str]
+) -> None:
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["--connect", str(tmp_path / "none.sock"), "resources/simple", "1"])
+    assert exc.value.code == 1
+    assert "cannot reach server" in capsys.readouterr().err
+
+
+def test_client_import_stays_thin() -> None:
+    loaded = {t.module for t in measure_imports("krpsim.client")}
+    assert loaded.isdisjoint({"krpsim.cli", "krpsim.simulator", "krpsim.parser"})
+
+
+def test_client_main_delegates_to_cli(capsys: CaptureFixture[str]) -> None:
+    with pytest.raises(SystemExit) as exc:
+        client.main(["--help"])
+    assert exc.value.code == 0
+    assert "usage:" in capsys.readouterr().out
+
+
+def test_handle_request_runs_argv_in_cwd(
+    tmp_path: Path, capsys: CaptureFixture[str]
+) -> None:
+    config = str(Path("resources/simple").resolve())
+    local = _local([config, "10", "--trace", str(tmp_path / "local.txt")], capsys)
+    response = handle_request({"argv": [config, "10"], "cwd": str(tmp_path)})
+    assert (response["exit_code"], response["stdout"]) == local[:2]
+    assert (tmp_path / "trace.txt").read_text() == (tmp_path / "local.txt").read_text()
+    assert os.getcwd() != str(tmp_path)
+
+
+def test_handle_request_materializes_config_text(tmp_path: Path) -> None:
+    created: list[str] = []
+    unlink = os.unlink
+
+    def spy(path: str) -> None:
+        created.append(path)
+        unlink(path)
+
+    request = {
+        "config_text": Path("resources/simple").read_text(),
+        "delay": 10,
+        "options": ["--trace", str(tmp_path / "t.txt")],
+    }
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(server_mod.os, "unlink", spy)
+        response = handle_request(request)
+    assert response["exit_code"] == 0
+    assert "Final Stocks:" in response["stdout"]
+    assert len(created) == 1 and not Path(created[0]).exists()
+
+
+def test_handle_request_reports_bad_cwd_and_request(tmp_path: Path) -> None:
+    response = handle_request({"argv": ["x", "1"], "cwd": str(tmp_path / "none")})
+    assert response["exit_code"] == 1
+    assert response["stderr"].startswith("krpsim: ")
+    assert handle_request({"delay": 1})["exit_code"] == 2
+
+
+@pytest.mark.parametrize(
+    ("error", "code", "stderr"),
+    [
+        (SystemExit(None), 0, ""),
+        (SystemExit(3), 3, ""),
+        (SystemExit("boom"), 1, "boom\n"),
+    ],
+)
+def test_handle_request_translates_system_exit(
+    monkeypatch: pytest.MonkeyPatch, error: SystemExit, code: int, stderr: str
+) -> None:
+    def fail(argv: list[str]) -> int:
+        raise error
+
+    monkeypatch.setattr(cli, "main", fail)
+    response = handle_request({"argv": ["resources/simple", "1"]})
+    assert (response["exit_code"], response["stderr"]) == (code, stderr)
+
+
+def test_handle_request_prints_unexpected_errors(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def fail(argv: list[str]) -> int:
+        raise RuntimeError("broken")
+
+    monkeypatch.setattr(cli, "main", fail)
+    response = handle_request({"argv": ["resources/simple", "1"]})
+    assert response["exit_code"] == 1
+    assert response["stderr"].startswith("Traceback")
+    assert "RuntimeError: broken" in response["stderr"]
+
+
+def test_init_worker_installs_cache() -> None:
+    try:
+        server_mod._init_worker(1)
+        first = cli._CONFIG_LOADER(Path("resources/simple"))
+        assert cli._CONFIG_LOADER(Path("resources/simple")) is first
+    finally:
+        cli.set_config_loader(None)
+
+
+def test_server_rejects_invalid_sizes(tmp_path: Path) -> None:
+    path = str(tmp_path / "krpsim.sock")
+    with pytest.raises(ValueError):
+        ConfigCache(maxsize=0)
+    with pytest.raises(ValueError, match="workers"):
+        KrpsimServer(path, workers=0)
+    with pytest.raises(ValueError, match="cache size"):
+        KrpsimServer(path, workers=1, cache_size=0)
+    assert not Path(path).exists()
+
+
+def test_server_rejects_malformed_lines(server: str) -> None:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(server)
+        sock.sendall(b"not json\n[1]\n")
+        with sock.makefile("rb") as stream:
+            lines = [stream.readline(), stream.readline()]
+    assert all(b"invalid request" in line for line in lines)
+
+
+def test_server_replaces_orphan_socket(tmp_path: Path) -> None:
+    path = str(tmp_path / "krpsim.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as orphan:
+        orphan.bind(path)
+    srv = KrpsimServer(path, workers=1)
+    srv.server_close()
+    assert not Path(path).exists()
+
+
+def test_client_reports_closed_connection(tmp_path: Path) -> None:
+    path = str(tmp_path / "closing.sock")
+
+    def read_then_close(listener: socket.socket) -> None:
+        conn = listener.accept()[0]
+        with conn, conn.makefile("rb") as stream:
+            stream.readline()
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+        listener.bind(path)
+        listener.listen(1)
+        thread = threading.Thread(target=read_then_close, args=(listener,))
+        thread.start()
+        with pytest.raises(ConnectionError, match="closed the connection"):
+            send_request(path, {"argv": []})
+        thread.join()
+
+
+def test_client_connect_requires_socket(capsys: CaptureFixture[str]) -> None:
+    with pytest.raises(SystemExit) as exc:
+        client.main(["--connect"])
+    assert exc.value.code == 2
+    assert "missing socket path" in capsys.readouterr().err
+
+
+def test_client_main_connects(
+    server: str, tmp_path: Path, capsys: CaptureFixture[str]
+) -> None:
+    argv = ["resources/simple", "10", "--trace", str(tmp_path / "t.txt")]
+    assert client.main(["--connect", server, *argv]) == 0
+    assert "Final Stocks:" in capsys.readouterr().out
+
+
+def test_serve_main_rejects_bad_arguments(
+    tmp_path: Path, capsys: CaptureFixture[str]
+) -> None:
+    argv = ["serve", "--socket", str(tmp_path / "s.sock"), "--workers", "0"]
+    with pytest.raises(SystemExit) as exc:
+        cli.main(argv)
+    assert exc.value.code == 2
+    assert "workers must be a positive integer" in capsys.readouterr().err
+
+
+def test_serve_main_stops_on_sigterm(
+    tmp_path: Path, capsys: CaptureFixture[str]
+) -> None:
+    path = str(tmp_path / "krpsim.sock")
+    responses: list[dict[str, object]] = []
+
+    def request_then_stop() -> None:
+        while not Path(path).exists():
+            time.sleep(0.01)
+        argv = ["resources/simple", "10", "--trace", str(tmp_path / "t.txt")]
+        responses.append(send_request(path, {"argv": argv}))
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    previous = signal.getsignal(signal.SIGTERM)
+    thread = threading.Thread(target=request_then_stop)
+    thread.start()
+    try:
+        code = cli.main(["serve", "--socket", path, "--workers", "1"])
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+        thread.join()
+    assert code == 0
+    assert responses[0]["exit_code"] == 0
+    out = capsys.readouterr().out
+    assert out == f"krpsim serving on {path}\nkrpsim server stopped\n"
+    assert not Path(path).exists()
@@ -1,9 +1,25 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
 import pytest
 
 from krpsim import parser
-from krpsim.simulator import Simulator
+from krpsim.conditions import parse_condition
+from krpsim.optimizer import (
+    Policy,
+    critical_path_lengths,
+    get_policy,
+    order_processes,
+    policy_names,
+    register_policy,
+)
+from krpsim.simulator import (
+    EVENT_END,
+    EVENT_START,
+    Simulator,
+    run_until_quiescent,
+)
 
 
 def test_run_simple(tmp_path):
@@ -145,3 +161,308 @@ def test_recre_optimal() -> None:
 def test_zero_delay_process_rejected() -> None:
     with pytest.raises(parser.ParseError, match="Delay must be >= 1 cycle"):
         parser.parse_file(Path("resources/zero_delay"))
+
+
+def test_unknown_policy_rejected() -> None:
+    cfg = parser.parse_file(Path("resources/simple"))
+    with pytest.raises(ValueError, match="unknown policy"):
+        Simulator(cfg, policy="nope")
+    with pytest.raises(ValueError, match="unknown policy"):
+        order_processes(cfg, "nope")
+
+
+def test_policy_orders() -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    names = {
+        policy: [p.name for p in order_processes(cfg, policy)]
+        for policy in policy_names()
+    }
+    assert names["default"][0] == "do_armoire_ikea"
+    assert names["name"] == sorted(cfg.processes)
+    assert names["delay"][0] == "do_etagere"
+    assert names["yield"][0] == "do_armoire_ikea"
+    assert names["critical_path"][-1] == "do_armoire_ikea"
+    assert names["critical_path"][0] == "do_fond"
+    assert names["yield_per_cycle"][0] == "do_armoire_ikea"
+    assert names["yield_per_cycle"][1] == "do_etagere"
+    # planche is the scarcest input, do_fond eats two of them
+    assert names["scarcity"][-1] == "do_fond"
+    assert names["dynamic"][0] == "do_armoire_ikea"
+
+
+def test_dynamic_policy_reorders_from_stocks() -> None:
+    cfg = parser.Config(
+        stocks={"a": 1, "b": 5},
+        processes={
+            "pa": parser.Process("pa", {"a": 1}, {"x": 1}, 1),
+            "pb": parser.Process("pb", {"b": 1}, {"y": 1}, 1),
+        },
+    )
+    policy = get_policy("dynamic", cfg)
+    assert [p.name for p in policy.order({"a": 1, "b": 5})] == ["pb", "pa"]
+    assert [p.name for p in policy.order({"a": 9, "b": 5})] == ["pa", "pb"]
+
+
+def test_static_policy_order_is_precomputed() -> None:
+    cfg = parser.parse_file(Path("resources/simple"))
+    policy = get_policy("default", cfg)
+    assert policy.order({}) is policy.order({"euro": 0})
+
+
+def test_register_custom_policy(monkeypatch: pytest.MonkeyPatch) -> None:
+    from krpsim import optimizer
+
+    monkeypatch.setattr(optimizer, "_POLICIES", dict(optimizer._POLICIES))
+
+    @register_policy("reverse_name")
+    class ReverseNamePolicy(Policy):
+        def sort_key(self, proc, stocks):
+            return tuple(-ord(char) for char in proc.name)
+
+    assert "reverse_name" in policy_names()
+    cfg = parser.parse_file(Path("resources/ikea"))
+    sim = Simulator(cfg, policy="reverse_name")
+    assert sim.policy == "reverse_name"
+    with pytest.raises(ValueError, match="already registered"):
+        register_policy("reverse_name")(ReverseNamePolicy)
+
+
+@pytest.mark.parametrize("policy", policy_names())
+def test_every_policy_runs_valid_trace(policy: str) -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    sim = Simulator(cfg, policy=policy)
+    trace = sim.run(100)
+    assert trace
+    assert all(qty >= 0 for qty in sim.stocks.values())
+
+
+def test_critical_path_lengths_cut_cycles() -> None:
+    cfg = parser.Config(
+        stocks={"a": 1},
+        processes={
+            "p1": parser.Process("p1", {"a": 1}, {"b": 1}, 2),
+            "p2": parser.Process("p2", {"b": 1}, {"a": 1}, 3),
+            "tok": parser.Process("tok", {"t": 1}, {"t": 1, "a": 1}, 1),
+        },
+    )
+    lengths = critical_path_lengths(cfg)
+    assert lengths["p1"] == 5
+    assert lengths["p2"] == 3
+    assert lengths["tok"] == 6
+
+
+def test_is_quiescent_ignores_horizon() -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    sim = Simulator(cfg)
+    sim.run(10)
+    assert not sim.is_quiescent()
+    assert sim.horizon_bound()
+    done = Simulator(cfg)
+    done.run(100)
+    assert done.is_quiescent()
+    assert not done.horizon_bound()
+
+
+def test_run_until_quiescent_grows_horizon() -> None:
+    cfg = parser.parse_file(Path("resources/simple"))
+    sim, horizon, exhausted = run_until_quiescent(cfg, 1000, initial_horizon=8)
+    assert horizon == 64
+    assert not exhausted
+    assert sim.is_quiescent()
+    fixed = Simulator(cfg)
+    fixed.run(horizon)
+    assert sim.trace == fixed.trace
+    assert sim.stocks == fixed.stocks
+
+
+def test_run_until_quiescent_stops_at_max_horizon() -> None:
+    cfg = parser.parse_file(Path("resources/self_gen"))
+    sim, horizon, exhausted = run_until_quiescent(cfg, 100)
+    assert horizon == 100
+    assert exhausted
+    assert not sim.is_quiescent()
+
+
+@pytest.mark.parametrize("policy", ["default", "demand"])
+def test_fork_matches_uninterrupted_branch(policy: str) -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    sim = Simulator(cfg, policy=policy, demand_cap=True)
+    sim.run(12)
+    child = sim.fork()
+    assert child._trace_base is sim._trace_base
+    sim.run(100)
+    child.run(100)
+    assert child.trace == sim.trace
+    assert child.stocks == sim.stocks
+    assert child.time == sim.time
+
+
+def test_snapshot_restore_roundtrip() -> None:
+    cfg = parser.parse_file(Path("resources/steak"))
+    sim = Simulator(cfg)
+    sim.run(10)
+    snap = sim.snapshot()
+    stocks, trace = dict(sim.stocks), list(sim.trace)
+    sim.run(100)
+    final = (dict(sim.stocks), list(sim.trace), sim.time)
+    sim.restore(snap)
+    assert sim.stocks == stocks
+    assert sim.trace == trace
+    assert snap.trace_length == len(trace)
+    sim.run(100)
+    assert (sim.stocks, sim.trace, sim.time) == final
+
+
+def test_restore_rejects_foreign_snapshot() -> None:
+    snap = Simulator(parser.parse_file(Path("resources/simple"))).snapshot()
+    other = Simulator(parser.parse_file(Path("resources/ikea")))
+    with pytest.raises(ValueError, match="snapshot does not match"):
+        other.restore(snap)
+
+
+@pytest.mark.parametrize(
+    "name", ["ikea", "steak", "recre", "custom_finite", "inception"]
+)
+def test_iter_events_matches_run(name: str) -> None:
+    cfg = parser.parse_file(Path("resources") / name)
+    expected = Simulator(cfg)
+    expected.run(200)
+    sim = Simulator(cfg)
+    events = list(sim.iter_events(200))
+    starts = [(e.time, e.process) for e in events if e.kind == EVENT_START]
+    ends = sorted((e.time, e.process) for e in events if e.kind == EVENT_END)
+    assert starts == expected.trace == sim.trace
+    assert ends == sorted((t + cfg.processes[p].delay, p) for t, p in starts)
+    assert [e.time for e in events] == sorted(e.time for e in events)
+    assert (sim.stocks, sim.time, sim.deadlock) == (
+        expected.stocks,
+        expected.time,
+        expected.deadlock,
+    )
+
+
+def test_iter_events_stops_early() -> None:
+    cfg = parser.parse_file(Path("resources/inception"))
+    sim = Simulator(cfg)
+    for event in sim.iter_events(10_000):
+        if event.time >= 50:
+            break
+    assert 50 <= sim.time <= 51
+    assert sim._events is None
+    full = Simulator(cfg)
+    full.run(10_000)
+    assert sim.trace == full.trace[: sim.trace_length]
+
+
+def test_run_async_matches_run_and_interleaves() -> None:
+    cfg = parser.parse_file(Path("resources/inception"))
+    expected = Simulator(cfg)
+    expected.run(2000)
+    ticks = 0
+
+    async def ticker(done: asyncio.Event) -> None:
+        nonlocal ticks
+        while not done.is_set():
+            ticks += 1
+            await asyncio.sleep(0)
+
+    async def main() -> list[Simulator]:
+        done = asyncio.Event()
+        tick = asyncio.create_task(ticker(done))
+        sims = [Simulator(cfg) for _ in range(3)]
+        await asyncio.gather(*(s.run_async(2000, yield_every=5) for s in sims))
+        done.set()
+        await tick
+        return sims
+
+    for sim in asyncio.run(main()):
+        assert (sim.trace, sim.stocks, sim.time) == (
+            expected.trace,
+            expected.stocks,
+            expected.time,
+        )
+    assert ticks > 1
+    with pytest.raises(ValueError, match="yield_every"):
+        asyncio.run(Simulator(cfg).run_async(10, yield_every=0))
+
+
+def test_run_async_cancellation_keeps_consistent_state() -> None:
+    cfg = parser.parse_file(Path("resources/inception"))
+    sim = Simulator(cfg)
+
+    async def main() -> None:
+        task = asyncio.create_task(sim.run_async(100_000, yield_every=1))
+        for _ in range(20):
+            await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    full = Simulator(cfg)
+    full.run(100_000)
+    assert 0 < sim.trace_length < full.trace_length
+    assert sim.trace == full.trace[: sim.trace_length]
+
+
+@pytest.mark.parametrize("pool", [ThreadPoolExecutor, ProcessPoolExecutor])
+def test_run_async_offloads_to_executor(pool: type[Executor]) -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    expected = Simulator(cfg, policy="demand", demand_cap=True)
+    expected.run(300)
+    sim = Simulator(cfg, policy="demand", demand_cap=True)
+    with pool(max_workers=1) as executor:
+        trace = asyncio.run(sim.run_async(300, executor=executor))
+    assert trace == expected.trace
+    assert (sim.stocks, sim.time, sim.deadlock) == (
+        expected.stocks,
+        expected.time,
+        expected.deadlock,
+    )
+
+
+def test_stop_when_ends_at_first_met_cycle() -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    cond = parse_condition("etagere>=2")
+    sim = Simulator(cfg, stop_when=[cond])
+    sim.run(1000)
+    assert sim.stopped == cond
+    assert (sim.time, sim.stocks["etagere"], sim.deadlock) == (11, 2, False)
+    full = Simulator(cfg)
+    full.run(1000)
+    assert sim.trace == full.trace[: sim.trace_length]
+    events = list(Simulator(cfg, stop_when=[cond]).iter_events(1000))
+    assert events[-1].time == 11
+
+
+def test_stop_when_cuts_closed_form_plan() -> None:
+    cfg = parser.parse_file(Path("resources/recre"))
+    full = Simulator(cfg)
+    full.run(50)
+    never = Simulator(cfg, stop_when=[parse_condition("marelle>=100000")])
+    never.run(50)
+    assert never.stopped is None
+    assert (never.trace, never.stocks, never.time) == (
+        full.trace,
+        full.stocks,
+        full.time,
+    )
+    cond = parse_condition("marelle>=1")
+    sim = Simulator(cfg, stop_when=[cond])
+    sim.run(50)
+    assert sim.stopped == cond
+    assert sim.trace == full.trace[:1]
+    assert (sim.time, sim.stocks["marelle"]) == (20, 1)
+    events = list(Simulator(cfg, stop_when=[cond]).iter_events(50))
+    assert events[-1].time == 20
+
+
+def test_stop_when_met_initially_or_on_debit() -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    sim = Simulator(cfg, stop_when=[parse_condition("planche>=7")])
+    assert sim.run(100) == []
+    assert (sim.time, sim.deadlock) == (0, False)
+    sim = Simulator(cfg, stop_when=[parse_condition("planche<=4")])
+    sim.run(100)
+    assert (sim.time, sim.stocks["planche"]) == (0, 4)
+    assert sim.trace_length == 2
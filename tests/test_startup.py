@@ -0,0 +1,94 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from _pytest.capture import CaptureFixture
+
+from krpsim import cli, startup
+
+HEAVY_MODULES = [
+    "asyncio",
+    "pprint",
+    "importlib.metadata",
+    "concurrent.futures",
+    "multiprocessing",
+    "csv",
+    "pickle",
+    "hashlib",
+    "numpy",
+    "pandas",
+]
+
+
+def test_parse_importtime_reads_depth_and_skips_header() -> None:
+    text = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   _io\n"
+        "import time:        30 |        150 | krpsim\n"
+        "unrelated line\n"
+    )
+    assert startup.parse_importtime(text) == [
+        startup.ImportTiming("_io", 120, 120, 1),
+        startup.ImportTiming("krpsim", 30, 150, 0),
+    ]
+
+
+def test_cli_import_skips_heavy_modules() -> None:
+    timings = startup.measure_imports("krpsim.cli")
+    loaded = {t.module for t in timings}
+    assert "krpsim.cli" in loaded
+    assert loaded.isdisjoint(HEAVY_MODULES)
+
+
+def test_format_report_ranks_by_cumulative_time() -> None:
+    timings = [
+        startup.ImportTiming("a", 10, 10, 1),
+        startup.ImportTiming("b", 5, 40, 0),
+    ]
+    lines = startup.format_report(timings, top=1)
+    assert len(lines) == 3
+    assert lines[1].endswith(" b")
+    assert lines[-1] == "total import time: 0.0 ms"
+
+
+def test_startup_report_cli(capsys: CaptureFixture[str]) -> None:
+    assert cli.main(["--startup-report", "--top", "3", "--runs", "1"]) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert out[0].startswith("import time:")
+    assert len(out) == 6
+    assert out[-1].startswith("cold start: ")
+
+
+def test_startup_report_rejects_non_positive_runs() -> None:
+    with pytest.raises(SystemExit):
+        cli.main(["--startup-report", "--runs", "0"])
+
+
+ENTRY_POINTS = ["krpsim.client", "krpsim.cli"]
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_cold_start_budget(tmp_path: Path, module: str) -> None:
+    budget = float(os.environ.get("KRPSIM_COLD_START_BUDGET", "0.2"))
+    trace = tmp_path / "trace.txt"
+    argv = ["resources/simple", "10", "--trace", str(trace)]
+    seconds = startup.measure_cold_start(argv, runs=5, module=module)
+    assert trace.is_file()
+    assert seconds < budget
+
+
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_entry_point_runs_in_fresh_interpreter(tmp_path: Path, module: str) -> None:
+    trace = tmp_path / "trace.txt"
+    proc = subprocess.run(
+        [sys.executable, "-m", module, "resources/simple", "10"]
+        + ["--trace", str(trace)],
+        env=startup._child_env(),
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == 0
+    assert trace.read_text(encoding="utf-8")
@@ -0,0 +1,108 @@
+import io
+from pathlib import Path
+
+import pytest
+
+from krpsim import parser
+from krpsim.simulator import Simulator
+from krpsim.sweep import (
+    iter_grid,
+    parse_delays,
+    parse_overrides,
+    stock_grid,
+    sweep_horizons,
+    to_dataframe,
+    write_csv,
+)
+
+
+def test_parse_delays_forms() -> None:
+    assert parse_delays("3") == range(1, 4)
+    assert parse_delays("2:5") == range(2, 6)
+    for bad in ("0", "5:2", "a:b", "1:2:3", ""):
+        with pytest.raises(ValueError, match="invalid delay range"):
+            parse_delays(bad)
+
+
+@pytest.mark.parametrize(
+    ("name", "policy"),
+    [
+        ("ikea", "default"),
+        ("steak", "dynamic"),
+        ("inception", "demand"),
+        ("exponential", "default"),
+        ("recre", "default"),
+        ("simple", "default"),
+    ],
+)
+def test_sweep_matches_independent_runs(name: str, policy: str) -> None:
+    cfg = parser.parse_file(Path("resources") / name)
+    rows = sweep_horizons(cfg, range(1, 121), policy=policy)
+    for row in rows:
+        sim = Simulator(cfg, policy=policy)
+        sim.run(row.delay)
+        assert (row.time, row.deadlock, row.stocks) == (
+            sim.time,
+            sim.deadlock,
+            sim.stocks,
+        )
+
+
+def test_write_csv_uses_sorted_stock_columns() -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    out = io.StringIO()
+    write_csv(cfg, sweep_horizons(cfg, range(21, 23)), out)
+    assert out.getvalue().splitlines() == [
+        "delay,time,deadlock,armoire,etagere,fond,montant,planche",
+        "21,22,0,0,2,2,1,0",
+        "22,22,0,0,2,2,1,0",
+    ]
+
+
+def test_parse_overrides_and_grid() -> None:
+    overrides = parse_overrides(["planche=1,7", "euro=5"])
+    assert overrides == {"planche": [1, 7], "euro": [5]}
+    assert stock_grid(overrides) == [
+        {"planche": 1, "euro": 5},
+        {"planche": 7, "euro": 5},
+    ]
+    assert stock_grid({}) == [{}]
+    for bad in (["planche"], ["planche=a"], ["=1"], ["a=1", "a=2"], ["a=-1"]):
+        with pytest.raises(ValueError, match="invalid stock override"):
+            parse_overrides(bad)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_iter_grid_matches_independent_runs(workers: int) -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    grid = stock_grid({"planche": [7, 14, 21]})
+    rows = list(iter_grid(cfg, grid, range(20, 31), workers=workers))
+    assert len(rows) == 33
+    for row in rows:
+        stocks = {**cfg.stocks, **row.overrides}
+        sim = Simulator(parser.Config(stocks, cfg.processes, cfg.optimize))
+        sim.run(row.delay)
+        assert (row.time, row.deadlock, row.stocks) == (
+            sim.time,
+            sim.deadlock,
+            sim.stocks,
+        )
+
+
+def test_iter_grid_rejects_unknown_resource() -> None:
+    cfg = parser.parse_file(Path("resources/ikea"))
+    with pytest.raises(ValueError, match="unknown resource 'gold'"):
+        list(iter_grid(cfg, [{"gold": 1}], range(1, 3)))
+
+
+def test_grid_csv_and_dataframe_share_columns() -> None:
+    pytest.importorskip("pandas")
+    cfg = parser.parse_file(Path("resources/ikea"))
+    rows = list(iter_grid(cfg, [{"planche": 0}], range(1, 3), workers=1))
+    out = io.StringIO()
+    write_csv(cfg, rows, out)
+    lines = out.getvalue().splitlines()
+    assert lines[0].startswith("init_planche,delay,time,deadlock,")
+    frame = to_dataframe(cfg, rows)
+    assert list(frame.columns) == lines[0].split(",")
+    assert frame["init_planche"].tolist() == [0, 0]